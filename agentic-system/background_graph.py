@@ -1,10 +1,28 @@
 """
 Background analysis graph for analyzing conversations asynchronously.
+
+Two graph modes produce the same BackgroundState keys:
+
+    workers  one node (LLM call) per worker; six analyses in parallel, then
+             foerderfokus -> aufgaben and satzbauAnalyse -> satzbauBegrenzung,
+             three LLM round trips on the critical path
+    fused    one structured-output call for the independent analyses and a
+             second one for foerderfokus, aufgaben and satzbaubegrenzung
+             (FUSED_WORKER_GROUPS in nodes.py), two round trips
 """
+import time
+
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import Command
 from states import BackgroundState
 from nodes import (
+    BACKGROUND_WORKERS,
+    completed_workers_update,
     initialStateLoader,
+    is_worker_scheduled,
+    loadTranscript,
+    scheduleWorkers,
     speechGrammarWorker,
     speechComprehensionWorker,
     sprachhandlungsAnalyseWorker,
@@ -14,42 +32,120 @@ from nodes import (
     aufgabenWorker,
     satzbauAnalyseWorker,
     satzbauBegrenzungsWorker,
-    background_graph_needs_initial_state
+    historySummaryWorker,
+    background_graph_needs_initial_state,
+    FUSED_WORKER_GROUPS,
+    fused_background_graph_needs_initial_state,
+    fused_background_worker,
+    scheduled_fused_workers,
 )
+from model_registry import get_model_registry
+from worker_scheduler import get_worker_scheduler
+
+WORKERS = "workers"
+FUSED = "fused"
 
 
-def create_background_analysis_graph(llm, memory):
+def _with_completed_workers(result, workers, state):
+    """Add the watermark entries of the workers that completed their run to a node's result."""
+    return Command(update={**(result.update or {}), **completed_workers_update(workers, state)})
+
+
+def _worker_node(name, worker, llm):
+    """
+    Wrap a background worker as a node. Workers that scheduleWorkers did not schedule are
+    skipped and keep their last analysis. The node's model comes from the model registry.
+    """
+    llm = get_model_registry().get(name, llm)
+
+    def _run(state, config):
+        if not is_worker_scheduled(name, state):
+            get_worker_scheduler().record_skip(name)
+            return {}
+        start = time.perf_counter()
+        result = worker(state, config, llm)
+        get_worker_scheduler().record_run(name, time.perf_counter() - start)
+        return _with_completed_workers(result, [name], state)
+
+    return RunnableLambda(_run, name=name).with_config(callbacks=get_model_registry().callbacks(name))
+
+
+def _fused_node(name, llm):
+    """
+    Wrap a fused call as a node. It is skipped when scheduleWorkers scheduled none of its
+    workers; the call's time is shared out to the workers it ran for the scheduler's estimates.
+    """
+    llm = get_model_registry().get(name, llm)
+
+    def _record(state, result, seconds):
+        workers = scheduled_fused_workers(name, state)
+        for worker in workers:
+            get_worker_scheduler().record_run(worker, seconds / len(workers))
+        # Workers whose analysis is missing from the answer keep their previous watermark
+        written = [worker for worker in workers if BACKGROUND_WORKERS[worker][1] in (result.update or {})]
+        return _with_completed_workers(result, written, state)
+
+    def _skip(state):
+        if scheduled_fused_workers(name, state):
+            return False
+        for worker in FUSED_WORKER_GROUPS[name]:
+            get_worker_scheduler().record_skip(worker)
+        return True
+
+    def _run(state, config):
+        if _skip(state):
+            return {}
+        start = time.perf_counter()
+        result = fused_background_worker(name, state, config, llm)
+        return _record(state, result, time.perf_counter() - start)
+
+    return RunnableLambda(_run, name=name).with_config(callbacks=get_model_registry().callbacks(name))
+
+
+def create_background_analysis_graph(llm, memory, mode: str = WORKERS):
     """
     Create and compile the background analysis graph.
 
-    :param llm: Language model instance
+    :param llm: Language model instance (default for nodes without a model spec; see model_registry.py)
     :param memory: Memory checkpointer
+    :param mode: "workers" (one node per worker) or "fused" (two structured-output calls)
     :return: Compiled graph
     """
+    if mode == FUSED:
+        return _create_fused_graph(llm, memory)
+    if mode != WORKERS:
+        raise ValueError(f"Unknown background graph mode: {mode!r} (expected '{WORKERS}' or '{FUSED}')")
     builder = StateGraph(BackgroundState)
 
     # Add nodes with LLM binding
+    builder.add_node("loadTranscript", loadTranscript)
+    builder.add_node("scheduleWorkers", scheduleWorkers)
     builder.add_node("initialStateLoader", initialStateLoader)
-    builder.add_node("speechGrammarWorker", lambda state, config: speechGrammarWorker(state, config, llm))
-    builder.add_node("speechComprehensionWorker", lambda state, config: speechComprehensionWorker(state, config, llm))
-    builder.add_node("sprachhandlungsAnalyseWorker", lambda state, config: sprachhandlungsAnalyseWorker(state, config, llm))
-    builder.add_node("speechVocabularyWorker", lambda state, config: speechVocabularyWorker(state, config, llm))
-    builder.add_node("boredomWorker", lambda state, config: boredomWorker(state, config, llm))
+    builder.add_node("speechGrammarWorker", _worker_node("speechGrammarWorker", speechGrammarWorker, llm))
+    builder.add_node("speechComprehensionWorker", _worker_node("speechComprehensionWorker", speechComprehensionWorker, llm))
+    builder.add_node("sprachhandlungsAnalyseWorker", _worker_node("sprachhandlungsAnalyseWorker", sprachhandlungsAnalyseWorker, llm))
+    builder.add_node("speechVocabularyWorker", _worker_node("speechVocabularyWorker", speechVocabularyWorker, llm))
+    builder.add_node("boredomWorker", _worker_node("boredomWorker", boredomWorker, llm))
+
+    builder.add_node("foerderfokusWorker", _worker_node("foerderfokusWorker", foerderfokusWorker, llm))
+    builder.add_node("aufgabenWorker", _worker_node("aufgabenWorker", aufgabenWorker, llm))
 
-    builder.add_node("foerderfokusWorker", lambda state, config: foerderfokusWorker(state, config, llm))
-    builder.add_node("aufgabenWorker", lambda state, config: aufgabenWorker(state, config, llm))
+    builder.add_node("satzbauAnalyseWorker", _worker_node("satzbauAnalyseWorker", satzbauAnalyseWorker, llm))
+    builder.add_node("satzbauBegrenzungsWorker", _worker_node("satzbauBegrenzungsWorker", satzbauBegrenzungsWorker, llm))
 
-    builder.add_node("satzbauAnalyseWorker", lambda state, config: satzbauAnalyseWorker(state, config, llm))
-    builder.add_node("satzbauBegrenzungsWorker", lambda state, config: satzbauBegrenzungsWorker(state, config, llm))
+    builder.add_node("historySummaryWorker", _worker_node("historySummaryWorker", historySummaryWorker, llm))
 
     # Add edges
-    builder.add_conditional_edges(START, background_graph_needs_initial_state)
+    builder.add_edge(START, "loadTranscript")
+    builder.add_edge("loadTranscript", "scheduleWorkers")
+    builder.add_conditional_edges("scheduleWorkers", background_graph_needs_initial_state)
     builder.add_edge("initialStateLoader", "speechGrammarWorker")
     builder.add_edge("initialStateLoader", "speechComprehensionWorker")
     builder.add_edge("initialStateLoader", "sprachhandlungsAnalyseWorker")
     builder.add_edge("initialStateLoader", "speechVocabularyWorker")
     builder.add_edge("initialStateLoader", "boredomWorker")
     builder.add_edge("initialStateLoader", "satzbauAnalyseWorker")
+    builder.add_edge("initialStateLoader", "historySummaryWorker")
 
     builder.add_edge("speechGrammarWorker", "foerderfokusWorker")
     builder.add_edge("speechComprehensionWorker", "foerderfokusWorker")
@@ -62,5 +158,29 @@ def create_background_analysis_graph(llm, memory):
 
     builder.add_edge("aufgabenWorker", END)
     builder.add_edge("satzbauBegrenzungsWorker", END)
+    builder.add_edge("historySummaryWorker", END)
+
+    return builder.compile(checkpointer=memory)
+
+
+def _create_fused_graph(llm, memory):
+    """Background graph in fused mode: two fused calls in sequence, the history summary in parallel."""
+    builder = StateGraph(BackgroundState)
+
+    builder.add_node("loadTranscript", loadTranscript)
+    builder.add_node("scheduleWorkers", scheduleWorkers)
+    builder.add_node("initialStateLoader", initialStateLoader)
+    builder.add_node("fusedAnalysisWorker", _fused_node("fusedAnalysisWorker", llm))
+    builder.add_node("fusedPlanningWorker", _fused_node("fusedPlanningWorker", llm))
+    builder.add_node("historySummaryWorker", _worker_node("historySummaryWorker", historySummaryWorker, llm))
+
+    builder.add_edge(START, "loadTranscript")
+    builder.add_edge("loadTranscript", "scheduleWorkers")
+    builder.add_conditional_edges("scheduleWorkers", fused_background_graph_needs_initial_state)
+    builder.add_edge("initialStateLoader", "fusedAnalysisWorker")
+    builder.add_edge("initialStateLoader", "historySummaryWorker")
+    builder.add_edge("fusedAnalysisWorker", "fusedPlanningWorker")
+    builder.add_edge("fusedPlanningWorker", END)
+    builder.add_edge("historySummaryWorker", END)
 
     return builder.compile(checkpointer=memory)
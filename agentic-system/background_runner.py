@@ -0,0 +1,169 @@
+"""
+Bounded worker pool for background analysis runs.
+
+Runs are keyed by conversation. For each key at most one run is in flight
+and at most one is pending; submitting again while a run is pending replaces
+it (latest wins), so a child typing quickly does not start overlapping runs
+of the background graph on the same _analysis thread.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundRunner:
+    """
+    Thread pool with per-key coalescing, a queue-depth cap and run metrics.
+
+    submit() returns one of:
+        "started"   - the run was handed to the pool
+        "pending"   - a run for the key is in flight; this one runs after it
+        "coalesced" - replaced an already pending run for the key
+        "rejected"  - the queue is full (counted and logged)
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue_depth: int = 500, name: str = "background"):
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        # Keys with a run handed to the pool (waiting for a worker or running)
+        self._active: set[str] = set()
+        # Key -> run to start once the active run for that key has finished
+        self._pending: dict[str, Callable[[], object]] = {}
+        self._running = 0
+
+        self._started = 0
+        self._completed = 0
+        self._failed = 0
+        self._coalesced = 0
+        self._rejected = 0
+        self._run_seconds = 0.0
+        self._last_error: Optional[str] = None
+
+    def submit(self, key: str, fn: Callable[[], object]) -> str:
+        """
+        Schedule fn for key.
+
+        Args:
+            key: Coalescing key (e.g. the conversation thread_id)
+            fn: Callable doing the work; exceptions are logged and counted
+
+        Returns:
+            "started", "pending", "coalesced" or "rejected"
+        """
+        with self._lock:
+            if key in self._active:
+                if key in self._pending:
+                    self._pending[key] = fn
+                    self._coalesced += 1
+                    return "coalesced"
+                if self._queue_depth() >= self.max_queue_depth:
+                    return self._reject(key)
+                self._pending[key] = fn
+                return "pending"
+
+            if self._queue_depth() >= self.max_queue_depth:
+                return self._reject(key)
+            self._active.add(key)
+            self._started += 1
+
+        self._executor.submit(self._run, key, fn)
+        return "started"
+
+    def discard_pending(self, key: str) -> bool:
+        """
+        Drop the pending run for key (an in-flight run is not interrupted).
+
+        Returns:
+            True if a pending run was dropped
+        """
+        with self._lock:
+            return self._pending.pop(key, None) is not None
+
+    def get_stats(self) -> dict:
+        """
+        Get runner metrics.
+
+        Returns:
+            Dictionary with pool size, queue depths and run counters
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_depth": self.max_queue_depth,
+                "running": self._running,
+                "queued": len(self._active) - self._running,
+                "pending": len(self._pending),
+                "queue_depth": self._queue_depth(),
+                "started": self._started,
+                "completed": self._completed,
+                "failed": self._failed,
+                "coalesced": self._coalesced,
+                "rejected": self._rejected,
+                "run_seconds_total": round(self._run_seconds, 3),
+                "last_error": self._last_error,
+            }
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until no run is active or pending.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            True if idle, False on timeout
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._active, timeout=timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Drop pending runs and shut down the pool."""
+        with self._lock:
+            self._pending.clear()
+        self._executor.shutdown(wait=wait)
+
+    def _queue_depth(self) -> int:
+        # Runs waiting for a worker plus runs waiting behind an in-flight run
+        return len(self._active) - self._running + len(self._pending)
+
+    def _reject(self, key: str) -> str:
+        self._rejected += 1
+        logger.warning(f"{self.name}: Queue full ({self.max_queue_depth}), rejected run for {key}")
+        return "rejected"
+
+    def _run(self, key: str, fn: Callable[[], object]) -> None:
+        with self._lock:
+            self._running += 1
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            logger.exception(f"{self.name}: Run for {key} failed")
+            with self._lock:
+                self._failed += 1
+                self._last_error = f"{key}: {type(e).__name__}: {e}"
+        else:
+            with self._lock:
+                self._completed += 1
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._run_seconds += time.perf_counter() - start
+                next_fn = self._pending.pop(key, None)
+                if next_fn is None:
+                    self._active.discard(key)
+                    self._idle.notify_all()
+                else:
+                    self._started += 1
+
+        if next_fn is not None:
+            self._executor.submit(self._run, key, next_fn)
@@ -16,7 +16,12 @@ from dataclasses import dataclass, field, asdict
 from pathlib import Path
 from datetime import datetime
 import hashlib
+import heapq
+import math
 import re
+import threading
+import time
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
@@ -199,31 +204,72 @@ def compute_text_hash(text: str) -> str:
 class BeatRetriever:
     """Runtime retrieval of beats for dialogue system integration."""
 
+    # BM25F parameters. Entities get their own field so that a query naming a
+    # character or place ranks the beats featuring it above incidental mentions.
+    BM25_K1 = 1.2
+    FIELD_WEIGHTS = {"text": 1.0, "entities": 2.0}
+    FIELD_LENGTH_NORM = {"text": 0.75, "entities": 0.5}
+
     def __init__(self, beatpack: BeatPack):
         self.beatpack = beatpack
         self._build_search_index()
         logger.info(f"Initialized BeatRetriever for {beatpack.story_id}/{beatpack.chapter_id} with {len(beatpack.beats)} beats")
 
     def _build_search_index(self) -> None:
-        """Build simple keyword index for BM25-style retrieval."""
-        self._inverted_index: Dict[str, List[int]] = {}
-
-        for beat in self.beatpack.beats:
-            # Tokenize beat text
-            tokens = self._tokenize(beat.text)
-            for token in tokens:
-                if token not in self._inverted_index:
-                    self._inverted_index[token] = []
-                self._inverted_index[token].append(beat.beat_id)
-
-            # Also index entities
-            for entity in beat.entities:
-                entity_lower = entity.lower()
-                if entity_lower not in self._inverted_index:
-                    self._inverted_index[entity_lower] = []
-                self._inverted_index[entity_lower].append(beat.beat_id)
-
-        logger.debug(f"Built search index with {len(self._inverted_index)} terms")
+        """
+        Build the BM25F index.
+
+        All query-independent work happens here: per-field term frequencies,
+        field lengths, IDF and length normalisation are folded into one
+        precomputed weight per (term, beat), so scoring a query is a sum over
+        the postings of its terms.
+        """
+        beats = self.beatpack.beats
+        self._beats_by_id: Dict[int, Beat] = {beat.beat_id: beat for beat in beats}
+        self._beats_in_order: List[Beat] = sorted(beats, key=lambda b: b.order)
+
+        # Per-field term frequencies and lengths
+        field_tfs: Dict[str, List[Dict[str, int]]] = {field_name: [] for field_name in self.FIELD_WEIGHTS}
+        for beat in beats:
+            entity_tokens = [token for entity in beat.entities for token in self._tokenize(entity)]
+            for field_name, tokens in (("text", self._tokenize(beat.text)), ("entities", entity_tokens)):
+                tf: Dict[str, int] = {}
+                for token in tokens:
+                    tf[token] = tf.get(token, 0) + 1
+                field_tfs[field_name].append(tf)
+
+        field_lengths = {
+            field_name: [sum(tf.values()) for tf in tfs] for field_name, tfs in field_tfs.items()
+        }
+        avg_lengths = {
+            field_name: (sum(lengths) / len(lengths) if lengths and sum(lengths) else 1.0)
+            for field_name, lengths in field_lengths.items()
+        }
+
+        # Length-normalised, field-weighted term frequency per (term, beat)
+        pseudo_tf: Dict[str, Dict[int, float]] = {}
+        for field_name, tfs in field_tfs.items():
+            weight = self.FIELD_WEIGHTS[field_name]
+            b = self.FIELD_LENGTH_NORM[field_name]
+            avg_length = avg_lengths[field_name]
+            for beat, tf, length in zip(beats, tfs, field_lengths[field_name]):
+                norm = 1.0 - b + b * (length / avg_length)
+                for token, count in tf.items():
+                    postings = pseudo_tf.setdefault(token, {})
+                    postings[beat.beat_id] = postings.get(beat.beat_id, 0.0) + weight * count / norm
+
+        # Fold IDF and BM25 saturation into the postings
+        num_beats = len(beats)
+        k1 = self.BM25_K1
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        for token, postings in pseudo_tf.items():
+            df = len(postings)
+            idf = math.log(1.0 + (num_beats - df + 0.5) / (df + 0.5))
+            self._postings[token] = [
+                (beat_id, idf * ptf / (k1 + ptf)) for beat_id, ptf in postings.items()
+            ]
+
+        logger.debug(f"Built BM25F search index with {len(self._postings)} terms")
 
     def _tokenize(self, text: str) -> List[str]:
         """Simple tokenization for German text."""
@@ -231,46 +277,64 @@ class BeatRetriever:
         tokens = re.findall(r'[a-zäöüß0-9]+', text.lower())
         return tokens
 
+    def get_beat(self, beat_id: int) -> Optional[Beat]:
+        """Get a beat by ID in constant time."""
+        return self._beats_by_id.get(beat_id)
+
     def get_all_beats(self) -> List[Beat]:
         """Get all beats in order."""
-        return sorted(self.beatpack.beats, key=lambda b: b.order)
+        return list(self._beats_in_order)
+
+    def score_beats(self, query: str) -> Dict[int, float]:
+        """
+        Compute BM25F scores for all beats matching at least one query term.
+
+        :param query: Search query
+        :return: Mapping of beat_id to score (beats without any hit are omitted)
+        """
+        beat_scores: Dict[int, float] = {}
+        query_tfs: Dict[str, int] = {}
+        for token in self._tokenize(query):
+            query_tfs[token] = query_tfs.get(token, 0) + 1
+
+        for token, query_tf in query_tfs.items():
+            for beat_id, weight in self._postings.get(token, ()):
+                beat_scores[beat_id] = beat_scores.get(beat_id, 0.0) + query_tf * weight
+        return beat_scores
 
     def retrieve_beats(self, query: str, top_k: int = 5) -> List[Beat]:
         """
-        Retrieve top-k most relevant beats for a query using BM25-style scoring.
+        Retrieve top-k most relevant beats for a query using BM25F scoring.
 
         :param query: Search query (typically the child's last message)
         :param top_k: Number of beats to return
-        :return: List of beats sorted by relevance
+        :return: List of beats sorted by story order
         """
         if not query:
             # Return first k beats if no query
             return self.beatpack.beats[:top_k]
 
-        query_tokens = self._tokenize(query)
-        beat_scores: Dict[int, float] = {}
+        beat_scores = self.score_beats(query)
 
-        # Simple term frequency scoring
-        for token in query_tokens:
-            if token in self._inverted_index:
-                for beat_id in self._inverted_index[token]:
-                    beat_scores[beat_id] = beat_scores.get(beat_id, 0) + 1
-
-        # Sort beats by score
-        sorted_beat_ids = sorted(beat_scores.keys(), key=lambda x: beat_scores[x], reverse=True)
-        top_beat_ids = sorted_beat_ids[:top_k]
+        # Top-k by score; ties go to the earlier beat in the story
+        top_scored = heapq.nlargest(
+            top_k,
+            beat_scores.items(),
+            key=lambda item: (item[1], -self._beats_by_id[item[0]].order)
+        )
+        top_beat_ids = [beat_id for beat_id, _ in top_scored]
 
         # If we don't have enough scored beats, add some in order
         if len(top_beat_ids) < top_k:
+            selected = set(top_beat_ids)
             for beat in self.beatpack.beats:
-                if beat.beat_id not in top_beat_ids:
+                if beat.beat_id not in selected:
                     top_beat_ids.append(beat.beat_id)
                     if len(top_beat_ids) >= top_k:
                         break
 
-        # Retrieve beats and sort by order for narrative consistency
-        beats = [self.beatpack.get_beat_by_id(bid) for bid in top_beat_ids]
-        beats = [b for b in beats if b is not None]
+        # Sort by order for narrative consistency
+        beats = [self._beats_by_id[bid] for bid in top_beat_ids]
         beats.sort(key=lambda x: x.order)
 
         logger.debug(f"Retrieved {len(beats)} beats for query: {query[:50]}...")
@@ -338,12 +402,30 @@ class BeatRetriever:
 
 
 class BeatPackManager:
-    """Manager for loading and caching beat packs."""
+    """Manager for loading and caching beat packs and their retrievers."""
 
-    def __init__(self, content_dir: Path):
+    def __init__(self, content_dir: Path, retriever_cache_size: int = 32):
+        """
+        Initialize the manager.
+
+        :param content_dir: Directory containing stories/<story_id>/<chapter_id>/beatpack.v1.json
+        :param retriever_cache_size: Maximum number of compiled BeatRetrievers kept (LRU)
+        """
         self.content_dir = content_dir
         self._cache: Dict[Tuple[str, str], BeatPack] = {}
-        logger.info(f"Initialized BeatPackManager with content_dir: {content_dir}")
+
+        # Compiled retrievers keyed by (story_id, chapter_id, chapter_hash) so a
+        # reloaded beatpack with different content never reuses a stale index.
+        self._retriever_cache: "OrderedDict[Tuple[str, str, str], BeatRetriever]" = OrderedDict()
+        self._retriever_cache_size = max(1, retriever_cache_size)
+        self._retriever_lock = threading.Lock()
+        self._retriever_hits = 0
+        self._retriever_misses = 0
+        self._retriever_evictions = 0
+        self._retriever_build_seconds = 0.0
+
+        logger.info(f"Initialized BeatPackManager with content_dir: {content_dir}, "
+                    f"retriever_cache_size: {self._retriever_cache_size}")
 
     def get_beatpack(self, story_id: str, chapter_id: str, force_reload: bool = False) -> Optional[BeatPack]:
         """
@@ -360,6 +442,9 @@ class BeatPackManager:
             logger.debug(f"BeatPack cache hit for {story_id}/{chapter_id}")
             return self._cache[cache_key]
 
+        if force_reload:
+            self._invalidate_retrievers(story_id, chapter_id)
+
         # Try to load from disk
         beatpack_path = self.content_dir / "stories" / story_id / chapter_id / "beatpack.v1.json"
 
@@ -384,17 +469,98 @@ class BeatPackManager:
             logger.error(f"Failed to load beatpack from {beatpack_path}: {e}")
             return None
 
-    def get_retriever(self, story_id: str, chapter_id: str) -> Optional[BeatRetriever]:
-        """Get a beat retriever for a specific story/chapter."""
-        beatpack = self.get_beatpack(story_id, chapter_id)
-        if beatpack:
-            return BeatRetriever(beatpack)
-        return None
+    def get_retriever(self, story_id: str, chapter_id: str, force_reload: bool = False) -> Optional[BeatRetriever]:
+        """
+        Get a beat retriever for a specific story/chapter.
+
+        Retrievers are compiled once per (story_id, chapter_id, chapter_hash) and
+        kept in an LRU cache, so the search index is not rebuilt on every turn.
+
+        :param story_id: Story identifier
+        :param chapter_id: Chapter identifier
+        :param force_reload: Reload the beatpack from disk and rebuild the retriever
+        :return: BeatRetriever or None if the beatpack was not found
+        """
+        beatpack = self.get_beatpack(story_id, chapter_id, force_reload=force_reload)
+        if not beatpack:
+            return None
+
+        cache_key = (story_id, chapter_id, beatpack.chapter_hash)
+        with self._retriever_lock:
+            retriever = self._retriever_cache.get(cache_key)
+            if retriever is not None and retriever.beatpack is beatpack:
+                self._retriever_cache.move_to_end(cache_key)
+                self._retriever_hits += 1
+                return retriever
+
+            self._retriever_misses += 1
+            start = time.perf_counter()
+            retriever = BeatRetriever(beatpack)
+            self._retriever_build_seconds += time.perf_counter() - start
+
+            self._retriever_cache[cache_key] = retriever
+            self._retriever_cache.move_to_end(cache_key)
+            while len(self._retriever_cache) > self._retriever_cache_size:
+                evicted_key, _ = self._retriever_cache.popitem(last=False)
+                self._retriever_evictions += 1
+                logger.debug(f"Evicted BeatRetriever for {evicted_key[0]}/{evicted_key[1]}")
+
+        return retriever
+
+    def _invalidate_retrievers(self, story_id: str, chapter_id: str) -> None:
+        """Drop all cached retrievers for a story/chapter, regardless of content hash."""
+        with self._retriever_lock:
+            stale_keys = [key for key in self._retriever_cache if key[:2] == (story_id, chapter_id)]
+            for key in stale_keys:
+                del self._retriever_cache[key]
+        if stale_keys:
+            logger.debug(f"Invalidated {len(stale_keys)} cached retriever(s) for {story_id}/{chapter_id}")
+
+    def get_retriever_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get retriever cache counters.
+
+        :return: Dict with hits, misses, evictions, cumulative build time and current size
+        """
+        with self._retriever_lock:
+            return {
+                "hits": self._retriever_hits,
+                "misses": self._retriever_misses,
+                "evictions": self._retriever_evictions,
+                "build_time_seconds": self._retriever_build_seconds,
+                "size": len(self._retriever_cache),
+                "capacity": self._retriever_cache_size,
+            }
 
     def clear_cache(self) -> None:
-        """Clear the beatpack cache."""
+        """Clear the beatpack cache and all compiled retrievers."""
         self._cache.clear()
-        logger.info("Cleared BeatPack cache")
+        with self._retriever_lock:
+            self._retriever_cache.clear()
+        logger.info("Cleared BeatPack and BeatRetriever caches")
+
+    def preload(self) -> Dict[str, int]:
+        """Load every available beatpack and compile retrievers for them (up to the retriever cache size).
+
+        Called at startup so the first conversation of a chapter does not pay
+        for parsing the beatpack and building its search index.
+
+        Returns:
+            Dict with the number of beatpacks loaded and retrievers compiled.
+        """
+        loaded = [
+            (story_id, chapter_id)
+            for story_id, chapter_ids in self.list_available_stories().items()
+            for chapter_id in chapter_ids
+            if self.get_beatpack(story_id, chapter_id) is not None
+        ]
+        # Compiling more retrievers than the cache holds would only evict the first ones again
+        retrievers = 0
+        for story_id, chapter_id in loaded[:self._retriever_cache_size]:
+            if self.get_retriever(story_id, chapter_id) is not None:
+                retrievers += 1
+        logger.info(f"Preloaded {len(loaded)} beatpacks, {retrievers} retrievers")
+        return {"beatpacks": len(loaded), "retrievers": retrievers}
 
     def get_chapter_text(self, story_id: str, chapter_id: str) -> Optional[str]:
         """Get the full chapter text from a loaded beatpack.
@@ -11,9 +11,7 @@ from langgraph.checkpoint.memory import MemorySaver
 from immediate_graph import create_immediate_response_graph
 from background_graph import create_background_analysis_graph
 from nodes import set_background_graph
-from immediate_graph import set_config
-
-import threading
+from background_runner import BackgroundRunner
 
 
 def start_chat():
@@ -29,7 +27,8 @@ def start_chat():
     # Create the graphs
     background_graph = create_background_analysis_graph(llm, memory)
     set_background_graph(background_graph)
-    immediate_graph = create_immediate_response_graph(llm, memory, background_graph)
+    immediate_graph = create_immediate_response_graph(llm, memory, background_graph, stream_tokens=True)
+    background_runner = BackgroundRunner(max_workers=1, name="background-analysis")
 
     print("✅ System ready!\n", flush=True)
 
@@ -45,7 +44,6 @@ def start_chat():
     config = {
         "configurable": {"thread_id": thread_id}
     }
-    set_config(config)
 
     print(f"\n🎮 Session started (ID: {session_id})")
     print("💡 Type 'quit' or 'exit' to end the conversation\n")
@@ -69,59 +67,26 @@ def start_chat():
 
             print("\n🤖 Lino: ", end="", flush=True)
 
-            # Track seen message IDs to avoid printing the same message twice
-            seen_message_ids = set()
-            seen_content = ""
-
-            for event in immediate_graph.stream(
+            # masterChatbot writes the corrected answer to the custom stream sentence by sentence
+            for chunk in immediate_graph.stream(
                 {"messages": [user_message]},
                 config,
-                stream_mode="messages"
+                stream_mode="custom"
             ):
-                # event is a tuple: (message, metadata)
-                if isinstance(event, tuple):
-                    message, metadata = event
-
-                    # Only process messages from format_response node
-                    node = metadata.get('langgraph_node', '')
-                    if node == 'format_response':
-                        # Skip if we've already processed this exact message
-                        msg_id = getattr(message, 'id', None)
-                        if msg_id and msg_id in seen_message_ids:
-                            continue
-
-                        if hasattr(message, 'content') and message.content:
-                            # Print only the NEW content (difference from what we've seen)
-                            if len(message.content) > len(seen_content):
-                                new_content = message.content[len(seen_content):]
-                                print(new_content, end="", flush=True)
-                                seen_content = message.content
-
-                            # Mark this message ID as seen
-                            if msg_id:
-                                seen_message_ids.add(msg_id)
+                if isinstance(chunk, dict) and chunk.get("spoken_text"):
+                    print(chunk["spoken_text"], end="", flush=True)
 
             print()  # New line after complete message
 
-            # Trigger background analysis asynchronously (non-blocking)
-            # Use threading to truly run in background without waiting
-            def run_background_analysis():
-                bg_thread_id = thread_id + "_analysis"
-                bg_config = {
-                    "configurable": {"thread_id": bg_thread_id}
-                }
-                try:
-                    # Invoke the background graph (don't need to consume stream)
-                    background_graph.invoke(
-                        {"child_id": child_id},
-                        bg_config
-                    )
-                except Exception:
-                    pass  # Suppress background errors for better UX
-
-            # Start background analysis in separate thread (fire-and-forget)
-            analysis_thread = threading.Thread(target=run_background_analysis, daemon=True)
-            analysis_thread.start()
+            # Trigger background analysis (non-blocking); while a run is in flight
+            # only the latest request is kept
+            bg_config = {
+                "configurable": {"thread_id": thread_id + "_analysis"}
+            }
+            background_runner.submit(
+                thread_id,
+                lambda: background_graph.invoke({"child_id": child_id}, bg_config)
+            )
 
         except KeyboardInterrupt:
             print("\n\n👋 Chat interrupted. Goodbye!")
@@ -3,8 +3,11 @@ Data loading functions for games and child profiles.
 """
 from langgraph.prebuilt import InjectedState
 import logging
+import threading
 import time
-from typing import Annotated, Optional, Dict
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, Optional, Dict, Iterable, Tuple
 from pathlib import Path
 import sys
 
@@ -18,30 +21,69 @@ sys.path.append(str(Path(__file__).parent.parent))
 from backend.core.config import get_settings
 from states import State
 
+# Marks an item that does not exist in S3 (cached as a negative entry)
+_NOT_FOUND = object()
+
+
 class DataCache:
-    """Simple in-memory cache with TTL support."""
+    """
+    Thread-safe LRU cache keyed by (data_key, item_id) with TTL support.
 
-    def __init__(self, ttl: int = 300):
-        self._cache: Dict[str, tuple[str, float]] = {}
-        self._ttl = ttl
+    Misses (items that do not exist in S3) are cached as negative entries with
+    their own, shorter TTL so unknown ids do not cost an S3 request per lookup.
+    """
 
-    def get(self, key: str) -> Optional[str]:
-        if key in self._cache:
-            value, timestamp = self._cache[key]
-            if time.time() - timestamp < self._ttl:
-                logger.debug(f"Cache HIT for key: {key}")
-                return value
-            else:
+    def __init__(self, ttl: int = 300, negative_ttl: int = 60, max_entries: int = 5000):
+        self._cache: "OrderedDict[Tuple[str, str], tuple[Optional[str], float]]" = OrderedDict()
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: Tuple[str, str]):
+        """
+        Get a cached value.
+
+        :param key: (data_key, item_id)
+        :return: Cached content, _NOT_FOUND for a cached miss, or None if missing/expired
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            value, timestamp = entry
+            ttl = self._ttl if value is not None else self._negative_ttl
+            if time.monotonic() - timestamp >= ttl:
                 logger.debug(f"Cache EXPIRED for key: {key}")
                 del self._cache[key]
-        return None
-
-    def set(self, key: str, value: str) -> None:
-        self._cache[key] = (value, time.time())
+                return None
+            self._cache.move_to_end(key)
+            logger.debug(f"Cache HIT for key: {key}")
+            return _NOT_FOUND if value is None else value
+
+    def set(self, key: Tuple[str, str], value: Optional[str]) -> None:
+        """
+        Cache a value; None records that the item does not exist.
+
+        :param key: (data_key, item_id)
+        :param value: Content, or None for a negative entry
+        """
+        with self._lock:
+            self._cache[key] = (value, time.monotonic())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+                self.evictions += 1
         logger.debug(f"Cache SET for key: {key}")
 
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
     def clear(self) -> None:
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
         logger.info("Cache cleared")
 
 
@@ -50,10 +92,10 @@ class DataRepository:
 
     _instance: Optional['DataRepository'] = None
 
-    # Data file names mapping
+    # S3 object name per data key, relative to the prompts prefix
     DATA_FILES = {
-        'audio_book': 'audio_book.txt',
-        'child_profile': 'child_profile.txt',
+        'audio_book': 'audio_books/{item_id}.txt',
+        'child_profile': 'child_profiles/{item_id}.txt',
     }
 
     def __new__(cls):
@@ -67,8 +109,22 @@ class DataRepository:
             return
 
         self._settings = get_settings()
-        self._cache = DataCache(ttl=self._settings.prompts_cache_ttl)
+        self._cache = DataCache(
+            ttl=self._settings.data_cache_ttl,
+            negative_ttl=self._settings.data_cache_negative_ttl,
+            max_entries=self._settings.data_cache_max_entries,
+        )
         self._s3_client = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "s3_requests": 0,
+            "s3_not_found": 0,
+            "s3_errors": 0,
+            "prefetched": 0,
+        }
         self._initialized = True
 
         logger.info(f"DataRepository initialized with USE_S3_PROMPTS={self._settings.use_s3_prompts}")
@@ -104,8 +160,16 @@ class DataRepository:
             logger.error(f"Failed to initialize S3 client: {e}")
             return None
 
+    def _count(self, stat: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[stat] += amount
+
+    def _fetch_from_s3(self, data_key: str, item_id: str):
+        """
+        Fetch one item from S3.
 
-    def _fetch_from_s3(self, data_key: str, item_id: str) -> Optional[str]:
+        :return: Content, _NOT_FOUND if the object does not exist, or None on error
+        """
         s3_client = self._get_s3_client()
         if s3_client is None:
             return None
@@ -114,12 +178,12 @@ class DataRepository:
             logger.error(f"Unknown data key: {data_key}")
             return None
 
-        file_name = self.DATA_FILES[data_key]
-        # Changed: removed item_id from path
+        file_name = self.DATA_FILES[data_key].format(item_id=item_id)
         s3_key = f"{self._settings.aws_s3_prompts_prefix}{file_name}"
 
         try:
             logger.info(f"Fetching data from S3: s3://{self._settings.aws_s3_bucket_name}/{s3_key}")
+            self._count("s3_requests")
 
             response = s3_client.get_object(
                 Bucket=self._settings.aws_s3_bucket_name,
@@ -127,44 +191,116 @@ class DataRepository:
             )
 
             content = response['Body'].read().decode('utf-8')
-            logger.info(f"Successfully fetched data from S3: {data_key} ({len(content)} bytes)")
+            logger.info(f"Successfully fetched data from S3: {data_key}/{item_id} ({len(content)} bytes)")
             return content
 
         except s3_client.exceptions.NoSuchKey:
-            logger.error(f"Data file not found in S3: {s3_key}")
-            return None
+            logger.warning(f"Data file not found in S3: {s3_key}")
+            self._count("s3_not_found")
+            return _NOT_FOUND
         except Exception as e:
             logger.error(f"Error fetching data from S3: {e}")
+            self._count("s3_errors")
             return None
 
+    def _load(self, data_key: str, item_id: str):
+        """Fetch an item and cache the result (errors are not cached, so S3 recovery is picked up)."""
+        result = self._fetch_from_s3(data_key, item_id)
+        if result is _NOT_FOUND:
+            self._cache.set((data_key, item_id), None)
+        elif result is not None:
+            self._cache.set((data_key, item_id), result)
+        return result
 
     def get_data(self, data_key: str, item_id: str, fallback: str) -> str:
-        cache_key = f"{data_key}"
+        """
+        Get an item (e.g. a child profile by child_id), trying cache, then S3, then fallback.
 
-        # Try cache first
-        cached = self._cache.get(cache_key)
-        if cached is not None:
-            return cached
+        :param data_key: Kind of data ('audio_book' or 'child_profile')
+        :param item_id: Id of the item
+        :param fallback: Content used when the item is not available from S3
+        :return: Item content
+        """
+        cache_key = (data_key, item_id)
 
-        # Try S3 if enabled
         if self._settings.use_s3_prompts:
-            s3_content = self._fetch_from_s3(data_key, item_id)
-            if s3_content is not None:
-                self._cache.set(cache_key, s3_content)
-                return s3_content
-            logger.warning(f"Failed to fetch from S3, using fallback for: {cache_key}")
+            # Try cache first
+            cached = self._cache.get(cache_key)
+            if cached is _NOT_FOUND:
+                self._count("negative_hits")
+            elif cached is not None:
+                self._count("hits")
+                return cached
+            else:
+                self._count("misses")
+                s3_content = self._load(data_key, item_id)
+                if isinstance(s3_content, str):
+                    return s3_content
+                logger.warning(f"Failed to fetch from S3, using fallback for: {data_key}/{item_id}")
 
         # Return fallback
-        logger.info(f"Using fallback data for: {cache_key}")
+        logger.info(f"Using fallback data for: {data_key}/{item_id}")
         return fallback
 
+    def prefetch(self, data_key: str, item_ids: Iterable[str], max_workers: int = 8) -> Dict[str, int]:
+        """
+        Warm the cache for many items in one pass (e.g. all children of a classroom).
+
+        Items that are already cached are skipped; the rest are fetched concurrently.
+
+        :param data_key: Kind of data ('audio_book' or 'child_profile')
+        :param item_ids: Ids to warm
+        :param max_workers: Concurrent S3 requests
+        :return: Counts of requested, already cached, fetched, not found and failed items
+        """
+        item_ids = list(dict.fromkeys(item_ids))
+        result = {"requested": len(item_ids), "already_cached": 0, "fetched": 0, "not_found": 0, "failed": 0}
+        if not self._settings.use_s3_prompts:
+            return result
+
+        to_fetch = [item_id for item_id in item_ids if self._cache.get((data_key, item_id)) is None]
+        result["already_cached"] = len(item_ids) - len(to_fetch)
+        if to_fetch:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(to_fetch)), thread_name_prefix="data-prefetch") as pool:
+                for loaded in pool.map(lambda item_id: self._load(data_key, item_id), to_fetch):
+                    if loaded is _NOT_FOUND:
+                        result["not_found"] += 1
+                    elif loaded is None:
+                        result["failed"] += 1
+                    else:
+                        result["fetched"] += 1
+        self._count("prefetched", result["fetched"] + result["not_found"])
+        logger.info(f"Prefetched {data_key}: {result}")
+        return result
+
+    def get_stats(self) -> dict:
+        """
+        Get cache counters.
+
+        :return: Dict with hits, negative hits, misses, S3 request/not-found/error counts,
+            S3 round trips saved by the cache, evictions and current size
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["s3_round_trips_saved"] = stats["hits"] + stats["negative_hits"]
+        stats["evictions"] = self._cache.evictions
+        stats["size"] = len(self._cache)
+        return stats
+
+    def clear_cache(self) -> None:
+        """Drop all cached items."""
+        self._cache.clear()
+
 
-# Global repository instance
-_data_repository = DataRepository()
+# Global repository instance, created on first use
+_data_repository: Optional[DataRepository] = None
 
 
 def get_data_repository() -> DataRepository:
     """Get the global data repository instance."""
+    global _data_repository
+    if _data_repository is None:
+        _data_repository = DataRepository()
     return _data_repository
 
 def get_audio_book_by_id(state: Annotated[State, InjectedState]) -> str:
@@ -228,3 +364,14 @@ def get_child_profile(state: Annotated[State, InjectedState]) -> str:
     }.get(child_id, "This is a child with no specific profile.")
     repository = get_data_repository()
     return repository.get_data('child_profile', child_id, fallback_profile)
+
+
+def prefetch_child_profiles(child_ids: Iterable[str], max_workers: int = 8) -> Dict[str, int]:
+    """
+    Warm the profile cache for a group of children (e.g. a classroom) before their conversations start.
+
+    :param child_ids: Ids of the children
+    :param max_workers: Concurrent S3 requests
+    :return: Prefetch counts, see DataRepository.prefetch
+    """
+    return get_data_repository().prefetch('child_profile', child_ids, max_workers=max_workers)
@@ -0,0 +1,182 @@
+"""
+Deferred output-contract construction.
+
+In deferred mode masterChatbot does not build the ResponseContract itself.
+It hands a build job for the reply to this module and finishes the turn. The
+job only starts once the turn has been checkpointed (start() is called by the
+service after the graph run), so the contract can be written onto the state
+that holds the reply. Readers wait for a pending contract with wait().
+
+Each conversation has at most one contract in progress: the contract of the
+latest reply. A job whose reply is no longer the last message when it is
+written is stale: the writer keeps its per-turn entry but does not replace
+the latest contract.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# (conversation_id, message_id, contract) -> whether it was stored as the latest contract
+ContractWriter = Callable[[str, str, object], bool]
+
+
+class _Job:
+    __slots__ = ("message_id", "build", "future", "done")
+
+    def __init__(self, message_id: str, build: Callable[[], object]):
+        self.message_id = message_id
+        self.build = build
+        self.future: Optional[Future] = None
+        self.done = threading.Event()
+
+
+class DeferredContracts:
+    """
+    Worker pool building response contracts after the reply has been sent.
+
+    Usage:
+        contracts.prepare("conv_1", message_id, build)   # in masterChatbot
+        contracts.start("conv_1")                         # after the turn is checkpointed
+        contracts.wait("conv_1", timeout=2.0)             # before reading the contract
+    """
+
+    def __init__(self, max_workers: int = 2, writer: Optional[ContractWriter] = None):
+        self.max_workers = max(1, max_workers)
+        self._writer = writer
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="contracts")
+        self._lock = threading.Lock()
+        self._jobs: dict[str, _Job] = {}
+
+        self._prepared = 0
+        self._built = 0
+        self._stored = 0
+        self._stale = 0
+        self._failed = 0
+        self._build_seconds = 0.0
+
+    def set_writer(self, writer: ContractWriter) -> None:
+        """Set the callback that stores a finished contract on the conversation state."""
+        self._writer = writer
+
+    def prepare(self, conversation_id: str, message_id: str, build: Callable[[], object]) -> None:
+        """
+        Register the contract build for a conversation's newest reply (replaces an unstarted one).
+
+        :param conversation_id: Immediate graph thread_id
+        :param message_id: Id of the AIMessage the contract belongs to
+        :param build: Callable returning the ResponseContract
+        """
+        job = _Job(message_id, build)
+        with self._lock:
+            self._jobs[conversation_id] = job
+            self._prepared += 1
+
+    def start(self, conversation_id: str) -> bool:
+        """
+        Start building the prepared contract of a conversation.
+
+        :return: True if a job was started, False if none was prepared or it already runs
+        """
+        with self._lock:
+            job = self._jobs.get(conversation_id)
+            if job is None or job.future is not None:
+                return False
+            job.future = self._executor.submit(self._run, conversation_id, job)
+            return True
+
+    def is_pending(self, conversation_id: str) -> bool:
+        """Whether a contract for the conversation's latest reply is not stored yet."""
+        with self._lock:
+            job = self._jobs.get(conversation_id)
+        return job is not None and not job.done.is_set()
+
+    def wait(self, conversation_id: str, timeout: float) -> bool:
+        """
+        Wait until the conversation's pending contract is stored (or dropped).
+
+        A prepared job that was never started (e.g. the stream was cancelled
+        before the turn finished) is started here.
+
+        :param conversation_id: Immediate graph thread_id
+        :param timeout: Seconds to wait at most
+        :return: True if nothing is pending anymore, False on timeout
+        """
+        with self._lock:
+            job = self._jobs.get(conversation_id)
+        if job is None:
+            return True
+        self.start(conversation_id)
+        return job.done.wait(timeout)
+
+    def discard(self, conversation_id: str) -> None:
+        """Forget a conversation's job (e.g. when the conversation is deleted)."""
+        with self._lock:
+            job = self._jobs.pop(conversation_id, None)
+        if job is not None and job.future is not None:
+            job.future.cancel()
+
+    def _run(self, conversation_id: str, job: _Job) -> None:
+        try:
+            start = time.perf_counter()
+            contract = job.build()
+            with self._lock:
+                self._built += 1
+                self._build_seconds += time.perf_counter() - start
+
+            stored = self._writer(conversation_id, job.message_id, contract) if self._writer else False
+            with self._lock:
+                if stored:
+                    self._stored += 1
+                else:
+                    self._stale += 1
+            if not stored:
+                logger.info(f"Stale response contract for {conversation_id}: not stored as the latest contract")
+        except Exception as e:
+            with self._lock:
+                self._failed += 1
+            logger.error(f"Building response contract for {conversation_id} failed: {e}", exc_info=True)
+        finally:
+            job.done.set()
+            with self._lock:
+                if self._jobs.get(conversation_id) is job:
+                    del self._jobs[conversation_id]
+
+    def get_stats(self) -> dict:
+        """
+        Get contract job counters.
+
+        :return: Dict with prepared/built/stored/stale/failed counts, build time and pending jobs
+        """
+        with self._lock:
+            return {
+                "prepared": self._prepared,
+                "built": self._built,
+                "stored": self._stored,
+                "stale": self._stale,
+                "failed": self._failed,
+                "build_seconds": round(self._build_seconds, 3),
+                "pending": len(self._jobs),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+_contracts = DeferredContracts()
+
+
+def configure_deferred_contracts(max_workers: int, writer: Optional[ContractWriter] = None) -> DeferredContracts:
+    """Replace the process-wide contract pool (call once at startup, before graphs run)."""
+    global _contracts
+    _contracts = DeferredContracts(max_workers, writer)
+    logger.info(f"Deferred contracts configured: max_workers={max_workers}")
+    return _contracts
+
+
+def get_deferred_contracts() -> DeferredContracts:
+    """Get the process-wide contract pool."""
+    return _contracts
@@ -70,3 +70,60 @@ def correct_common_german_errors(text: str) -> tuple[str, list[str]]:
         text = pattern.sub(_make_replacer(name, replacement_fn), text)
 
     return text, corrections
+
+
+# End of a sentence (optionally followed by closing quotes/brackets) plus the
+# whitespace after it, or a line break. Text is only released at these points.
+_SENTENCE_BOUNDARY = re.compile(r"[.!?…]+[\"'»«“”)\]]*\s+|\n+")
+
+
+class StreamingGrammarCorrector:
+    """Apply correct_common_german_errors to streamed LLM output.
+
+    Tokens are buffered until a sentence boundary so that no pattern is split
+    across two chunks. Each released segment is corrected on its own; the
+    patterns never span sentences, so the result matches correcting the full text
+    (minus leading whitespace).
+
+    Usage:
+        corrector = StreamingGrammarCorrector()
+        for token in tokens:
+            emit(corrector.feed(token))
+        emit(corrector.flush())
+        full_text, corrections = corrector.text, corrector.corrections
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._released: list[str] = []
+        self.corrections: list[str] = []
+
+    def feed(self, token: str) -> str:
+        """Add a token and return the corrected text of all completed sentences (may be empty)."""
+        self._buffer += token
+        if not self._released:
+            # Drop leading whitespace of the answer
+            self._buffer = self._buffer.lstrip()
+        end = 0
+        for match in _SENTENCE_BOUNDARY.finditer(self._buffer):
+            end = match.end()
+        if not end:
+            return ""
+        segment, self._buffer = self._buffer[:end], self._buffer[end:]
+        return self._release(segment)
+
+    def flush(self) -> str:
+        """Return the corrected remainder of the buffer once the stream has ended."""
+        segment, self._buffer = self._buffer, ""
+        return self._release(segment) if segment else ""
+
+    @property
+    def text(self) -> str:
+        """All corrected text released so far."""
+        return "".join(self._released)
+
+    def _release(self, segment: str) -> str:
+        corrected, corrections = correct_common_german_errors(segment)
+        self.corrections.extend(corrections)
+        self._released.append(corrected)
+        return corrected
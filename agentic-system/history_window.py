@@ -0,0 +1,178 @@
+"""
+Conversation history window for masterChatbot.
+
+masterChatbot used to send the whole message history on every turn, so its
+prompt grew with every turn. The window keeps the last keep_turns turns
+verbatim and caps the verbatim history at token_budget tokens. Older turns
+are represented by a rolling summary that the background graph extends after
+each turn (historySummaryWorker), off the reply path: each run folds only the
+messages that have left the window since the previous run.
+
+Until the summary has caught up, messages that left the window but are not
+summarized yet stay verbatim (within the token budget), so nothing is
+silently skipped between turns.
+
+Tokens are estimated from the text length (about four characters per token);
+the estimate is used for budgeting and metrics, where it only has to be stable.
+"""
+import logging
+import threading
+from typing import Optional
+
+from langchain_core.messages import HumanMessage
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+# Per-message overhead (role markers etc.)
+MESSAGE_TOKEN_OVERHEAD = 4
+# Turns for which the per-turn prompt size is tracked
+MAX_TRACKED_TURNS = 200
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def message_tokens(message) -> int:
+    """Estimate the tokens a message adds to a prompt."""
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    return estimate_tokens(content) + MESSAGE_TOKEN_OVERHEAD
+
+
+class HistoryWindow:
+    """
+    Selects the verbatim history for masterChatbot and tracks prompt sizes per turn.
+
+    Usage:
+        window.select(messages, summarized_count)   # history to send verbatim
+        window.window_start(messages)               # where the summary should reach
+        window.record(turn, prompt_messages)        # prompt size metrics
+    """
+
+    def __init__(self, keep_turns: int = 8, token_budget: int = 3000):
+        self.keep_turns = keep_turns
+        self.token_budget = token_budget
+
+        self._lock = threading.Lock()
+        self._turn_tokens: dict[int, list[int]] = {}
+        self._recorded = 0
+        self._estimated_total = 0
+        self._reported_total = 0
+        self._reported_count = 0
+        self._max_tokens = 0
+        self._dropped_messages = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.keep_turns > 0
+
+    def window_start(self, messages: list) -> int:
+        """
+        Index of the first message of the last keep_turns turns (a turn starts with a child message).
+
+        :param messages: Full message history
+        :return: 0 if the whole history fits in the window or the window is disabled
+        """
+        return self.window_start_for_turns([i for i, msg in enumerate(messages) if isinstance(msg, HumanMessage)])
+
+    def window_start_for_turns(self, turn_starts) -> int:
+        """window_start for a history given by the indexes of its child messages."""
+        if not self.enabled or len(turn_starts) <= self.keep_turns:
+            return 0
+        return turn_starts[-self.keep_turns]
+
+    def select(self, messages: list, summarized_count: int = 0) -> list:
+        """
+        Messages to send verbatim: everything not covered by the summary from the
+        window start on, with the oldest turns dropped while over the token budget.
+        The latest turn is always kept.
+
+        :param messages: Full message history
+        :param summarized_count: Number of leading messages folded into the summary
+        :return: Verbatim history
+        """
+        if not self.enabled:
+            return list(messages)
+
+        start = min(max(summarized_count, 0), self.window_start(messages))
+        selected = messages[start:]
+        tokens = sum(message_tokens(msg) for msg in selected)
+
+        dropped = 0
+        while tokens > self.token_budget:
+            # Drop the oldest turn (up to the next child message), keeping the latest one
+            next_turn = next((i for i, msg in enumerate(selected) if i > 0 and isinstance(msg, HumanMessage)), None)
+            if next_turn is None:
+                break
+            tokens -= sum(message_tokens(msg) for msg in selected[:next_turn])
+            dropped += next_turn
+            selected = selected[next_turn:]
+
+        if dropped:
+            with self._lock:
+                self._dropped_messages += dropped
+            logger.info(f"HistoryWindow: Dropped {dropped} messages over the {self.token_budget} token budget")
+        return selected
+
+    def record(self, turn: int, prompt_messages: list, reported_tokens: Optional[int] = None) -> int:
+        """
+        Record the prompt size of a masterChatbot call.
+
+        :param turn: 1-based turn number of the conversation
+        :param prompt_messages: Messages sent to the LLM
+        :param reported_tokens: Input tokens reported by the model, if available
+        :return: Estimated prompt tokens
+        """
+        tokens = sum(message_tokens(msg) for msg in prompt_messages)
+        with self._lock:
+            self._recorded += 1
+            self._estimated_total += tokens
+            self._max_tokens = max(self._max_tokens, tokens)
+            if reported_tokens:
+                self._reported_total += reported_tokens
+                self._reported_count += 1
+            if turn <= MAX_TRACKED_TURNS:
+                bucket = self._turn_tokens.setdefault(turn, [0, 0])
+                bucket[0] += 1
+                bucket[1] += tokens
+        return tokens
+
+    def get_stats(self) -> dict:
+        """
+        Get prompt size metrics.
+
+        :return: Dict with the window settings, average/max estimated prompt tokens,
+            average reported input tokens, dropped messages and the average prompt
+            tokens per turn number
+        """
+        with self._lock:
+            return {
+                "keep_turns": self.keep_turns,
+                "token_budget": self.token_budget,
+                "prompts": self._recorded,
+                "avg_prompt_tokens": round(self._estimated_total / self._recorded, 1) if self._recorded else 0.0,
+                "max_prompt_tokens": self._max_tokens,
+                "avg_reported_input_tokens": round(self._reported_total / self._reported_count, 1) if self._reported_count else None,
+                "dropped_messages": self._dropped_messages,
+                "prompt_tokens_by_turn": {
+                    turn: round(total / count, 1) for turn, (count, total) in sorted(self._turn_tokens.items())
+                },
+            }
+
+
+_window = HistoryWindow()
+
+
+def configure_history_window(keep_turns: int, token_budget: int) -> HistoryWindow:
+    """Replace the process-wide history window (call once at startup, before graphs run)."""
+    global _window
+    _window = HistoryWindow(keep_turns, token_budget)
+    logger.info(f"History window configured: keep_turns={keep_turns}, token_budget={token_budget}")
+    return _window
+
+
+def get_history_window() -> HistoryWindow:
+    """Get the process-wide history window."""
+    return _window
@@ -1,33 +1,50 @@
 """
 Immediate response graph for real-time interaction with the child.
 """
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
+from model_registry import get_model_registry
 from states import State
 from nodes import (
     initialStateLoader,
     masterChatbot,
+    amasterChatbot,
     immediate_graph_needs_initial_state,
     load_analysis,
     load_beat_context
 )
 
 
-def create_immediate_response_graph(llm, memory, background_graph_instance):
+def create_immediate_response_graph(llm, memory, background_graph_instance, stream_tokens: bool = False):
     """
     Create and compile the immediate response graph.
 
-    :param llm: Language model instance
+    The spoken answer is written to the custom stream as {"spoken_text": ...} chunks;
+    consume it with stream_mode="custom".
+
+    :param llm: Language model instance (masterChatbot's default; see model_registry.py)
     :param memory: Memory checkpointer
     :param background_graph_instance: Instance of background graph for loading analysis
+    :param stream_tokens: Stream the answer sentence by sentence instead of as one chunk
     :return: Compiled graph
     """
     builder = StateGraph(State)
+    llm = get_model_registry().get("masterChatbot", llm)
 
     # Add nodes with LLM binding
     builder.add_node("initialStateLoader", initialStateLoader)
-    builder.add_node("load_analysis", lambda state: load_analysis(state, config, background_graph_instance))
+    builder.add_node("load_analysis", lambda state, config: load_analysis(state, config, background_graph_instance))
     builder.add_node("load_beat_context", load_beat_context)
-    builder.add_node("masterChatbot", lambda state: masterChatbot(state, llm))
+
+    async def _amaster_chatbot(state, config):
+        return await amasterChatbot(state, llm, stream_tokens, config)
+
+    # Sync graph.stream() uses masterChatbot, graph.astream() awaits amasterChatbot
+    builder.add_node("masterChatbot", RunnableLambda(
+        lambda state, config: masterChatbot(state, llm, stream_tokens, config),
+        afunc=_amaster_chatbot,
+        name="masterChatbot",
+    ).with_config(callbacks=get_model_registry().callbacks("masterChatbot")))
 
     # Add edges
     builder.add_conditional_edges(START, immediate_graph_needs_initial_state)
@@ -37,13 +54,3 @@ def create_immediate_response_graph(llm, memory, background_graph_instance):
     builder.add_edge("masterChatbot", END)  # masterChatbot now goes directly to END
 
     return builder.compile(checkpointer=memory)
-
-
-# Global config reference (will be set during execution)
-config = None
-
-
-def set_config(cfg):
-    """Set the config for the graph."""
-    global config
-    config = cfg
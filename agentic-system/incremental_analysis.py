@@ -0,0 +1,127 @@
+"""
+Incremental (delta) analysis for the background workers.
+
+The transcript-reading background workers re-send the whole conversation on
+every run ("full", the default), although only the latest child/AI exchange is
+new. In delta mode (opt-in) each worker gets its previous analysis plus only the messages
+since its previous run and returns the updated analysis. Every full_every-th
+run is a full re-analysis of the whole transcript, so errors that crept into
+the rolling analyses do not accumulate. Delta analyses are lossy: a worker
+only sees its own previous summary of the older messages.
+
+The watermarks live in the BackgroundState checkpoint (analysis_watermarks,
+one entry per worker, since the scheduler may skip workers). scheduleWorkers
+plans each scheduled worker's run from its entry (analysis_plans), and a worker
+writes its planned entry to analysis_watermarks only once it succeeded, so a
+failed run is covered again by the worker's next run:
+
+    watermark        messages covered once this run completes
+    delta_start      first new message of this run (None: full analysis)
+    runs_since_full  delta runs since the worker's last full analysis
+
+A run falls back to a full analysis when there is no watermark yet, the
+history got shorter than the watermark (history replaced), or a worker has no
+previous analysis to extend.
+"""
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+FULL = "full"
+DELTA = "delta"
+
+
+class IncrementalAnalysis:
+    """
+    Plans worker runs as full or delta analyses and counts the transcript sent.
+
+    Usage:
+        entry = analysis.plan(message_count, previous_entry)   # in scheduleWorkers
+        analysis.record(incremental, chars_sent, chars_full)   # per worker call
+    """
+
+    def __init__(self, mode: str = FULL, full_every: int = 5):
+        if mode not in (FULL, DELTA):
+            raise ValueError(f"Unknown background analysis mode: {mode!r} (expected '{FULL}' or '{DELTA}')")
+        self.mode = mode
+        self.full_every = max(1, full_every)
+
+        self._lock = threading.Lock()
+        self._full_calls = 0
+        self._delta_calls = 0
+        self._chars_sent = 0
+        self._chars_full = 0
+
+    def plan(self, message_count: int, previous: Optional[dict]) -> dict:
+        """
+        Decide whether a worker's run analyzes the whole transcript or only the new messages.
+
+        :param message_count: Messages in the current transcript
+        :param previous: The worker's watermark entry from its previous run (None before its first run)
+        :return: Watermark entry with watermark, delta_start and runs_since_full
+        """
+        previous = previous or {}
+        watermark = previous.get("watermark")
+        runs = (previous.get("runs_since_full") or 0) + 1
+        incremental = (
+            self.mode == DELTA
+            and watermark is not None
+            and 0 < watermark <= message_count
+            and runs < self.full_every
+        )
+        return {
+            "watermark": message_count,
+            "delta_start": watermark if incremental else None,
+            "runs_since_full": runs if incremental else 0,
+        }
+
+    def record(self, incremental: bool, chars_sent: int, chars_full: int) -> None:
+        """
+        Record the transcript a worker call sent.
+
+        :param incremental: Whether the call sent only the new messages
+        :param chars_sent: Transcript (and previous analysis) characters sent
+        :param chars_full: Characters the full transcript would have taken
+        """
+        with self._lock:
+            if incremental:
+                self._delta_calls += 1
+            else:
+                self._full_calls += 1
+            self._chars_sent += chars_sent
+            self._chars_full += chars_full
+
+    def get_stats(self) -> dict:
+        """
+        Get worker call and transcript counters.
+
+        :return: Dict with the mode, full/delta worker calls, and transcript characters
+            sent versus what full analyses would have sent
+        """
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "full_every": self.full_every,
+                "full_calls": self._full_calls,
+                "delta_calls": self._delta_calls,
+                "transcript_chars_sent": self._chars_sent,
+                "transcript_chars_full": self._chars_full,
+            }
+
+
+_analysis = IncrementalAnalysis()
+
+
+def configure_incremental_analysis(mode: str, full_every: int) -> IncrementalAnalysis:
+    """Replace the process-wide incremental analysis settings (call once at startup, before graphs run)."""
+    global _analysis
+    _analysis = IncrementalAnalysis(mode, full_every)
+    logger.info(f"Background analysis configured: mode={mode}, full_every={full_every}")
+    return _analysis
+
+
+def get_incremental_analysis() -> IncrementalAnalysis:
+    """Get the process-wide incremental analysis settings."""
+    return _analysis
@@ -0,0 +1,214 @@
+"""
+Process-wide limiter for in-flight LLM calls.
+
+All graph nodes share one limiter so background analysis cannot use up the
+API quota while a child is waiting for an answer:
+
+- at most max_concurrent calls are in flight across all conversations
+- reserved_for_immediate of those slots are only available to immediate calls
+- when a slot frees up, waiting immediate calls are served before background calls
+
+Both threads (sync graph runs) and coroutines (async graph runs) can wait for
+a slot; async waiters do not block the event loop.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+IMMEDIATE = "immediate"
+BACKGROUND = "background"
+
+
+class _Waiter:
+    """A caller waiting for a slot: either a thread (event) or a coroutine (future)."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+
+
+class LLMConcurrencyLimiter:
+    """
+    Priority-aware counting semaphore for LLM calls.
+
+    Usage:
+        with limiter.slot(IMMEDIATE):
+            llm.invoke(...)
+
+        async with limiter.aslot(IMMEDIATE):
+            await llm.ainvoke(...)
+    """
+
+    def __init__(self, max_concurrent: int = 16, reserved_for_immediate: int = 4):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        if not 0 <= reserved_for_immediate < max_concurrent:
+            raise ValueError("reserved_for_immediate must be between 0 and max_concurrent - 1")
+        self.max_concurrent = max_concurrent
+        self.reserved_for_immediate = reserved_for_immediate
+
+        self._lock = threading.Lock()
+        self._in_flight = {IMMEDIATE: 0, BACKGROUND: 0}
+        self._waiters = {IMMEDIATE: deque(), BACKGROUND: deque()}
+        self._acquired = {IMMEDIATE: 0, BACKGROUND: 0}
+        self._wait_seconds = {IMMEDIATE: 0.0, BACKGROUND: 0.0}
+        self._max_wait_seconds = {IMMEDIATE: 0.0, BACKGROUND: 0.0}
+
+    # ------------------------------------------------------------------
+    # Acquire / release
+    # ------------------------------------------------------------------
+
+    def acquire(self, priority: str = BACKGROUND) -> None:
+        """Block the calling thread until a slot is granted."""
+        start = time.perf_counter()
+        with self._lock:
+            if self._try_grant(priority):
+                self._record_wait(priority, start)
+                return
+            waiter = _Waiter()
+            self._waiters[priority].append(waiter)
+        waiter.event.wait()
+        with self._lock:
+            self._record_wait(priority, start)
+
+    async def aacquire(self, priority: str = BACKGROUND) -> None:
+        """Wait for a slot without blocking the event loop."""
+        start = time.perf_counter()
+        with self._lock:
+            if self._try_grant(priority):
+                self._record_wait(priority, start)
+                return
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters[priority].append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters[priority]:
+                    self._waiters[priority].remove(waiter)
+                    raise
+            # The slot was granted concurrently; hand it back (a grant that lands on an
+            # already cancelled future is released by _resolve instead)
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(priority)
+            raise
+        with self._lock:
+            self._record_wait(priority, start)
+
+    def release(self, priority: str = BACKGROUND) -> None:
+        """Return a slot and hand it to the next eligible waiter."""
+        with self._lock:
+            self._in_flight[priority] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, priority: str = BACKGROUND):
+        """Hold a slot for the duration of the block (threads)."""
+        self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    @asynccontextmanager
+    async def aslot(self, priority: str = BACKGROUND):
+        """Hold a slot for the duration of the block (coroutines)."""
+        await self.aacquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    # ------------------------------------------------------------------
+    # Observability
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> dict:
+        """
+        Get limiter statistics.
+
+        Returns:
+            Dictionary with limits, in-flight and waiting calls, and per-priority wait times
+        """
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "reserved_for_immediate": self.reserved_for_immediate,
+                "in_flight": dict(self._in_flight),
+                "waiting": {p: len(w) for p, w in self._waiters.items()},
+                "acquired": dict(self._acquired),
+                "wait_seconds_total": {p: round(s, 3) for p, s in self._wait_seconds.items()},
+                "max_wait_seconds": {p: round(s, 3) for p, s in self._max_wait_seconds.items()},
+            }
+
+    # ------------------------------------------------------------------
+    # Internals (called with self._lock held)
+    # ------------------------------------------------------------------
+
+    def _total_in_flight(self) -> int:
+        return self._in_flight[IMMEDIATE] + self._in_flight[BACKGROUND]
+
+    def _has_capacity(self, priority: str) -> bool:
+        if priority == IMMEDIATE:
+            return self._total_in_flight() < self.max_concurrent
+        return (
+            self._total_in_flight() < self.max_concurrent - self.reserved_for_immediate
+            and not self._waiters[IMMEDIATE]
+        )
+
+    def _try_grant(self, priority: str) -> bool:
+        # Respect FIFO order within a priority
+        if self._waiters[priority] or not self._has_capacity(priority):
+            return False
+        self._in_flight[priority] += 1
+        return True
+
+    def _dispatch(self) -> None:
+        for priority in (IMMEDIATE, BACKGROUND):
+            waiters = self._waiters[priority]
+            while waiters and self._has_capacity(priority):
+                waiter = waiters.popleft()
+                self._in_flight[priority] += 1
+                if waiter.event is not None:
+                    waiter.event.set()
+                else:
+                    waiter.loop.call_soon_threadsafe(self._resolve, waiter, priority)
+
+    def _resolve(self, waiter: _Waiter, priority: str) -> None:
+        # Runs on the waiter's event loop
+        if waiter.future.cancelled():
+            self.release(priority)
+        else:
+            waiter.future.set_result(None)
+
+    def _record_wait(self, priority: str, start: float) -> None:
+        waited = time.perf_counter() - start
+        self._acquired[priority] += 1
+        self._wait_seconds[priority] += waited
+        self._max_wait_seconds[priority] = max(self._max_wait_seconds[priority], waited)
+
+
+_limiter = LLMConcurrencyLimiter()
+
+
+def configure_llm_limiter(max_concurrent: int, reserved_for_immediate: int) -> LLMConcurrencyLimiter:
+    """Replace the process-wide limiter (call once at startup, before graphs run)."""
+    global _limiter
+    _limiter = LLMConcurrencyLimiter(max_concurrent, reserved_for_immediate)
+    logger.info(
+        f"LLM limiter configured: max_concurrent={max_concurrent}, "
+        f"reserved_for_immediate={reserved_for_immediate}"
+    )
+    return _limiter
+
+
+def get_llm_limiter() -> LLMConcurrencyLimiter:
+    """Get the process-wide LLM limiter."""
+    return _limiter
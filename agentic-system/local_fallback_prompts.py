@@ -343,6 +343,27 @@ Einfache Nebensätze mit Konnektoren wie „weil", „wenn", „dass" sind erlau
 Bei zu wenigen Daten: Gib die Sprachbeschreibung für Stufe 1 aus.
 """
 
+history_summary_worker_prompt = """
+Du fasst ein Gespräch zwischen einer KI und einem Kind (5 Jahre, Deutsch als Zweitsprache) über eine Geschichte fortlaufend zusammen.
+Die Zusammenfassung ersetzt die älteren Gesprächsteile im Kontext der KI. Du sprichst nicht mit dem Kind.
+
+Eingaben
+- die bisherige Zusammenfassung (kann leer sein)
+- neue Gesprächsausschnitte, die an die Zusammenfassung angehängt werden sollen
+
+Halte fest
+- welche Teile der Geschichte bereits besprochen wurden
+- welche Aufgaben und Fragen gestellt wurden und wie das Kind geantwortet hat
+- Namen, Vorlieben und persönliche Erzählungen des Kindes
+- Vereinbarungen oder Spiele, auf die sich die KI und das Kind geeinigt haben
+
+Regeln
+- Übernimm alle Inhalte der bisherigen Zusammenfassung, die weiterhin wichtig sind.
+- Schreibe knapp in Stichpunkten, höchstens 12 Stichpunkte.
+- Erfinde nichts, was nicht im Gespräch vorkommt.
+- Gib nur die neue Zusammenfassung aus.
+"""
+
 # ---------------------------------------------------------------------------
 # Master Prompts — refined through iterative prompt engineering
 # ---------------------------------------------------------------------------
@@ -0,0 +1,200 @@
+"""
+Per-node model routing for the graphs.
+
+Every node used to get the one chat model the service builds from llm_model,
+so cheap classification-style workers (boredomWorker) paid the same price and
+latency as the child-facing masterChatbot. The registry maps node names to
+model specs:
+
+    {"boredomWorker": "google_genai:gemini-2.0-flash-lite",
+     "aufgabenWorker": {"model": "google_genai:gemini-2.0-flash", "temperature": 0.2, "timeout": 20}}
+
+A spec is a model string or a dict with model (default: the default model),
+temperature and timeout. Nodes without a spec use the default model instance.
+Nodes with the same spec share one client instance, created on first use.
+
+The graph builders resolve each node's model with get(node, default_llm) and
+attach callbacks(node) to the node, which count the node's LLM calls, latency
+and tokens, so cheaper tiers can be checked against the default model.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional, Union
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+SPEC_KEYS = ("model", "temperature", "timeout")
+
+
+def _init_chat_model(model: str, **kwargs):
+    # Imports the provider package only when a tiered model is built
+    from langchain.chat_models import init_chat_model
+    return init_chat_model(model, **kwargs)
+
+
+class _NodeMetrics(BaseCallbackHandler):
+    """Callback handler counting one node's LLM calls, latency and tokens."""
+
+    run_inline = True
+    ignore_chain = True
+    ignore_agent = True
+    ignore_retriever = True
+
+    def __init__(self, registry: "ModelRegistry", node: str):
+        self.registry = registry
+        self.node = node
+        self._started: dict = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        started = self._started.pop(run_id, None)
+        usage = {}
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or usage
+        self.registry.record_call(
+            self.node,
+            time.perf_counter() - started if started is not None else 0.0,
+            usage.get("input_tokens", 0),
+            usage.get("output_tokens", 0),
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        self._started.pop(run_id, None)
+        self.registry.record_error(self.node)
+
+
+class ModelRegistry:
+    """
+    Resolves the model of each graph node and collects per-node LLM metrics.
+
+    Usage:
+        llm = registry.get("boredomWorker", default_llm)      # in the graph builders
+        node.with_config(callbacks=registry.callbacks("boredomWorker"))
+    """
+
+    def __init__(self, default_model: str = "", node_models: Optional[dict[str, Union[str, dict]]] = None,
+                 factory: Optional[Callable[..., Any]] = None):
+        self.default_model = default_model
+        self.factory = factory or _init_chat_model
+        self.node_models = {node: self._spec(node, spec) for node, spec in (node_models or {}).items()}
+
+        self._lock = threading.Lock()
+        self._instances: dict[tuple, Any] = {}
+        self._resolved: dict[str, str] = {}
+        self._handlers: dict[str, _NodeMetrics] = {}
+        self._metrics: dict[str, dict] = {}
+
+    def _spec(self, node: str, spec: Union[str, dict]) -> dict:
+        if isinstance(spec, str):
+            spec = {"model": spec}
+        unknown = set(spec) - set(SPEC_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown model spec keys for {node}: {sorted(unknown)} (expected {', '.join(SPEC_KEYS)})")
+        if not (spec.get("model") or self.default_model):
+            raise ValueError(f"Model spec for {node} has no model and there is no default model")
+        return {"model": spec.get("model") or self.default_model,
+                "temperature": spec.get("temperature"), "timeout": spec.get("timeout")}
+
+    def get(self, node: str, default_llm):
+        """
+        Get the model a node runs with.
+
+        :param node: Graph node name
+        :param default_llm: Model instance for nodes without a spec
+        :return: The node's model; nodes with the same spec share one instance
+        """
+        spec = self.node_models.get(node)
+        if spec is None or spec == {"model": self.default_model, "temperature": None, "timeout": None}:
+            with self._lock:
+                self._resolved[node] = self.default_model or "default"
+            return default_llm
+
+        key = (spec["model"], spec["temperature"], spec["timeout"])
+        with self._lock:
+            self._resolved[node] = spec["model"]
+            if key not in self._instances:
+                kwargs = {name: spec[name] for name in ("temperature", "timeout") if spec[name] is not None}
+                self._instances[key] = self.factory(spec["model"], **kwargs)
+                logger.info(f"ModelRegistry: Created {spec['model']} {kwargs or ''} for {node}")
+            return self._instances[key]
+
+    def callbacks(self, node: str) -> list:
+        """Callbacks to attach to a node so its LLM calls are counted."""
+        with self._lock:
+            if node not in self._handlers:
+                self._handlers[node] = _NodeMetrics(self, node)
+            return [self._handlers[node]]
+
+    def unused_specs(self) -> list[str]:
+        """Nodes with a model spec that no graph builder resolved (e.g. misspelled node names)."""
+        with self._lock:
+            return [node for node in self.node_models if node not in self._resolved]
+
+    def record_call(self, node: str, seconds: float, input_tokens: int, output_tokens: int) -> None:
+        """Count one LLM call of a node."""
+        with self._lock:
+            metrics = self._node_metrics(node)
+            metrics["calls"] += 1
+            metrics["seconds"] += seconds
+            metrics["input_tokens"] += input_tokens
+            metrics["output_tokens"] += output_tokens
+
+    def record_error(self, node: str) -> None:
+        """Count a failed LLM call of a node."""
+        with self._lock:
+            self._node_metrics(node)["errors"] += 1
+
+    def _node_metrics(self, node: str) -> dict:
+        return self._metrics.setdefault(node, {"calls": 0, "errors": 0, "seconds": 0.0,
+                                               "input_tokens": 0, "output_tokens": 0})
+
+    def get_stats(self) -> dict:
+        """
+        Get per-node model routing and LLM metrics.
+
+        :return: Dict with the default model, the client instances created for specs, and per node
+            its model, calls, errors, average latency and input/output tokens
+        """
+        with self._lock:
+            nodes = {}
+            for node, model in self._resolved.items():
+                metrics = self._node_metrics(node)
+                nodes[node] = {
+                    "model": model,
+                    "calls": metrics["calls"],
+                    "errors": metrics["errors"],
+                    "avg_seconds": round(metrics["seconds"] / metrics["calls"], 3) if metrics["calls"] else None,
+                    "input_tokens": metrics["input_tokens"],
+                    "output_tokens": metrics["output_tokens"],
+                }
+            return {
+                "default_model": self.default_model,
+                "tiered_clients": len(self._instances),
+                "nodes": nodes,
+            }
+
+
+_registry = ModelRegistry()
+
+
+def configure_model_registry(default_model: str, node_models: Optional[dict[str, Union[str, dict]]] = None,
+                             factory: Optional[Callable[..., Any]] = None) -> ModelRegistry:
+    """Replace the process-wide model registry (call once at startup, before the graphs are built)."""
+    global _registry
+    _registry = ModelRegistry(default_model, node_models, factory)
+    logger.info(f"Model registry configured: default={default_model}, tiered nodes={sorted(node_models or {})}")
+    return _registry
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get the process-wide model registry."""
+    return _registry
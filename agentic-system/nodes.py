@@ -1,10 +1,14 @@
 """
 Node functions for the Lingolino graphs.
 """
+import json
 import logging
 import os
+import uuid
 from pathlib import Path
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, BaseMessage
+from langchain_core.utils.json import parse_json_markdown
+from langgraph.config import get_stream_writer
 from langgraph.types import Command
 from states import State, BackgroundState
 from data_loaders import get_audio_book_by_id, get_child_profile
@@ -13,13 +17,21 @@ from prompts import (getSpeechGrammarWorker_prompt, \
                      getSpeechVocabularyWorker_prompt,
                      getBoredomWorker_prompt, getFoerderfokusWorker_prompt, getAufgabenWorker_prompt,
                      getSatzbauAnalyseWorker_prompt,
-                     getSatzbauBegrenzungsWorker_prompt, getMasterPrompt, getMasterFirstMessagePrompt)
-from output_contract_builder import build_output_contract
-from german_grammar_postprocess import correct_common_german_errors
+                     getSatzbauBegrenzungsWorker_prompt, getHistorySummaryWorker_prompt,
+                     getMasterPrompt, getMasterFirstMessagePrompt)
+from output_contract_builder import build_output_contract, compact_contract
+from prompt_repository import get_prompt_repository
+from german_grammar_postprocess import StreamingGrammarCorrector, correct_common_german_errors
 from typing import Any, Optional
 from config.conversation_termination_policy import get_termination_prompt, is_normal_phase, is_soft_termination_phase, \
     is_conversation_ended
 from beats import BeatPackManager, BeatRetriever
+from deferred_contracts import get_deferred_contracts
+from history_window import get_history_window
+from incremental_analysis import get_incremental_analysis
+from llm_limiter import BACKGROUND, IMMEDIATE, get_llm_limiter
+from transcript_cache import Transcript, get_transcript_cache
+from worker_scheduler import get_worker_scheduler
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -41,11 +53,12 @@ def set_background_graph(graph):
     background_graph = graph
 
 
-def initialize_beat_manager(content_dir: Path):
+def initialize_beat_manager(content_dir: Path, retriever_cache_size: int = 32) -> BeatPackManager:
     """Initialize the global beat pack manager."""
     global beat_manager
-    beat_manager = BeatPackManager(content_dir)
+    beat_manager = BeatPackManager(content_dir, retriever_cache_size=retriever_cache_size)
     logger.info(f"Initialized beat manager with content_dir: {content_dir}")
+    return beat_manager
 
 def _detect_repetitive_starters(messages: list, window: int = 5) -> str | None:
     """
@@ -264,14 +277,37 @@ def _detect_missing_transition_recap(messages: list, threshold: int = 24) -> str
     )
 
 
-def masterChatbot(state: State, llm):
+def _pinned_prompt(config, prompt_key: str, load_prompt) -> str:
     """
-    Main chatbot node that generates responses to the child.
-    Now automatically constructs output contract from the response and context.
+    Get a prompt from the conversation's pinned snapshot (config["configurable"]["prompt_snapshot"]),
+    or from the prompt repository when the run has no snapshot (chat.py, feature tests).
+
+    :param config: Run config (may be None)
+    :param prompt_key: Repository key of the prompt
+    :param load_prompt: prompts.py getter used without a snapshot
+    :return: Prompt content
+    """
+    snapshot = ((config or {}).get("configurable") or {}).get("prompt_snapshot")
+    if snapshot is not None and prompt_key in snapshot:
+        return snapshot[prompt_key]
+    return load_prompt()
+
+
+def _prompt_version(config) -> str:
+    """Version of the prompts a run uses: the pinned snapshot's, else the repository's current one."""
+    snapshot = ((config or {}).get("configurable") or {}).get("prompt_snapshot")
+    if snapshot is not None:
+        return snapshot.version
+    return get_prompt_repository().get_bundle_version()
+
+
+def _build_master_messages(state: State, config=None) -> list:
+    """
+    Build the full message list sent to the LLM by masterChatbot.
 
     :param state: Current state with messages and analysis
-    :param llm: Language model instance
-    :return: Updated state with new message and response_contract
+    :param config: Run config; prompts come from its pinned prompt snapshot when present
+    :return: System, meta and nudge messages followed by the conversation history
     """
     logger.info("masterChatbot: Starting to generate response")
     is_first_message = not any(isinstance(msg, AIMessage) for msg in state["messages"])
@@ -283,7 +319,7 @@ def masterChatbot(state: State, llm):
     # rules (clarity, empathy, verification, etc.) remain active even during
     # termination phases.  Termination guidance is layered on top separately.
     system_context = f"""
-    {getMasterPrompt()}
+    {_pinned_prompt(config, 'master', getMasterPrompt)}
     """
 
     # Inject child profile so the LLM knows the child's name, age, and gender
@@ -297,7 +333,7 @@ def masterChatbot(state: State, llm):
     """
 
     if is_first_message:
-        system_context += f"\n{getMasterFirstMessagePrompt()}"
+        system_context += f"\n{_pinned_prompt(config, 'master_first_message', getMasterFirstMessagePrompt)}"
 
     # Use beat context if available, otherwise fall back to full audio_book
     content_context = state.get('beat_context')
@@ -320,6 +356,16 @@ def masterChatbot(state: State, llm):
     Verwende ausschließlich den expliziten Buchkontext sowie Inhalte, die sich eindeutig daraus ableiten lassen, als einzige inhaltliche Quelle für Figuren, Orte, Gegenstände und Ereignisse : {state.get('audio_book', '')}\n\n
     """
 
+    # Turns that left the history window are represented by the rolling summary
+    history_window = get_history_window()
+    history_summary = state.get('history_summary')
+    if history_window.enabled and history_summary:
+        system_context += f"""
+
+    [BISHERIGER GESPRÄCHSVERLAUF — ZUSAMMENFASSUNG DER ÄLTEREN NACHRICHTEN]
+    {history_summary}
+    """
+
     system_message = SystemMessage(content=system_context)
 
     meta_system = SystemMessage(content=f"""
@@ -365,7 +411,7 @@ def masterChatbot(state: State, llm):
         messages.append(termination_system)
         logger.info(f"masterChatbot: Added termination prompt for message count: {message_count}")
 
-    messages += state["messages"]
+    messages += history_window.select(state["messages"], state.get('history_summarized_count') or 0)
 
     # Detect repetitive sentence starters and inject a targeted nudge
     starter_nudge = _detect_repetitive_starters(state["messages"])
@@ -403,18 +449,39 @@ def masterChatbot(state: State, llm):
         messages.append(SystemMessage(content=recap_nudge))
         logger.info("masterChatbot: Injected transition-recap nudge")
 
-    # Get natural language response (no JSON formatting)
-    logger.info("masterChatbot: Starting LLM invocation for natural response")
-    response = llm.invoke(messages)
-    spoken_text = response.content.strip()
+    return messages
 
-    # Apply grammar post-processing before output contract
-    spoken_text, grammar_corrections = correct_common_german_errors(spoken_text)
-    if grammar_corrections:
-        logger.info(f"masterChatbot: Grammar corrections applied: {grammar_corrections}")
 
-    logger.info(f"masterChatbot: Generated response with length: {len(spoken_text)}")
+def _record_prompt_size(state: State, messages: list, usage_metadata: Optional[dict] = None) -> None:
+    """Record the size of masterChatbot's prompt for this turn (history window metrics)."""
+    turn = sum(1 for msg in state["messages"] if isinstance(msg, HumanMessage))
+    reported = usage_metadata.get("input_tokens") if usage_metadata else None
+    tokens = get_history_window().record(turn, messages, reported)
+    logger.info(f"masterChatbot: Prompt for turn {turn}: ~{tokens} tokens in {len(messages)} messages")
+
+
+def _spoken_text_writer():
+    """
+    Return the graph's custom stream writer, or a no-op when called outside a graph run
+    (e.g. feature tests calling masterChatbot directly).
 
+    Consumers read the spoken text with stream_mode="custom" as {"spoken_text": ...} chunks.
+    """
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return lambda chunk: None
+
+
+def _build_response_contract(state: State, spoken_text: str, prompt_version: Optional[str]):
+    """
+    Build the output contract for an answer from the state it was generated for.
+
+    :param state: State the answer was generated for
+    :param spoken_text: Corrected text that was spoken to the child
+    :param prompt_version: Version of the prompts the answer was generated with
+    :return: ResponseContract
+    """
     # Get last user message for context
     last_user_message = None
     for msg in reversed(state["messages"]):
@@ -443,7 +510,8 @@ def masterChatbot(state: State, llm):
         story_id=state.get('story_id'),
         chapter_id=state.get('chapter_id'),
         aufgaben=state.get('aufgaben'),
-        last_user_message=last_user_message
+        last_user_message=last_user_message,
+        prompt_version=prompt_version
     )
 
     logger.info(f"masterChatbot: Built contract with {len(response_contract.grounding.evidence)} evidence items")
@@ -453,13 +521,131 @@ def masterChatbot(state: State, llm):
         claims = response_contract.grounding.claims if response_contract.grounding.claims else []
         logger.info(f"masterChatbot: Grounding: {len(claims)} claims from {len(active_beats)} beats")
 
-    # Return both the spoken text as message and the full contract in state
+    return response_contract
+
+
+def _finalize_master_response(state: State, spoken_text: str, grammar_corrections: list[str], config=None) -> dict:
+    """
+    Build the output contract for the final, grammar-corrected answer.
+
+    With "defer_contract" set in the run config the contract is not built
+    here: a build job is registered with the deferred contract pool and
+    response_contract is cleared until the job has stored the new one.
+
+    :param state: Current state the answer was generated for
+    :param spoken_text: Corrected text that was (or will be) spoken to the child
+    :param grammar_corrections: Corrections applied by the grammar post-processing
+    :param config: Run config; its prompt version is recorded in the contract
+    :return: Updated state with new message and response_contract
+    """
+    if grammar_corrections:
+        logger.info(f"masterChatbot: Grammar corrections applied: {grammar_corrections}")
+
+    logger.info(f"masterChatbot: Generated response with length: {len(spoken_text)}")
+    prompt_version = _prompt_version(config)
+
+    message = AIMessage(content=spoken_text, id=str(uuid.uuid4()))
+    if ((config or {}).get("configurable") or {}).get("defer_contract"):
+        contract_state = {key: state.get(key) for key in ("messages", "story_id", "chapter_id", "aufgaben", "active_beat_ids")}
+        get_deferred_contracts().prepare(
+            config["configurable"]["thread_id"],
+            message.id,
+            lambda: _build_response_contract(contract_state, spoken_text, prompt_version),
+        )
+        return {"messages": [message], "response_contract": None}
+
+    response_contract = _build_response_contract(state, spoken_text, prompt_version)
+
+    # Return both the spoken text as message and the full contract in state;
+    # the compact copy is kept for every turn
     return {
-        "messages": [AIMessage(content=spoken_text)],
-        "response_contract": response_contract
+        "messages": [message],
+        "response_contract": response_contract,
+        "response_contracts": [compact_contract(response_contract, message.id)]
     }
 
 
+def masterChatbot(state: State, llm, stream_tokens: bool = False, config=None):
+    """
+    Main chatbot node that generates responses to the child.
+    Now automatically constructs output contract from the response and context.
+
+    With stream_tokens the answer is streamed from the LLM and released to the
+    custom stream sentence by sentence, after grammar post-processing. The output
+    contract is built once the final token has arrived.
+
+    :param state: Current state with messages and analysis
+    :param llm: Language model instance
+    :param stream_tokens: Stream the answer instead of waiting for the full response
+    :param config: Run config with the conversation's pinned prompt snapshot (optional)
+    :return: Updated state with new message and response_contract
+    """
+    messages = _build_master_messages(state, config)
+    writer = _spoken_text_writer()
+
+    # Get natural language response (no JSON formatting)
+    logger.info("masterChatbot: Starting LLM invocation for natural response")
+    if stream_tokens:
+        corrector = StreamingGrammarCorrector()
+        usage_metadata = None
+        with get_llm_limiter().slot(IMMEDIATE):
+            for chunk in llm.stream(messages):
+                usage_metadata = chunk.usage_metadata or usage_metadata
+                piece = corrector.feed(chunk.text())
+                if piece:
+                    writer({"spoken_text": piece})
+        _record_prompt_size(state, messages, usage_metadata)
+        tail = corrector.flush()
+        if tail:
+            writer({"spoken_text": tail})
+        return _finalize_master_response(state, corrector.text.strip(), corrector.corrections, config)
+
+    with get_llm_limiter().slot(IMMEDIATE):
+        response = llm.invoke(messages)
+    _record_prompt_size(state, messages, response.usage_metadata)
+    spoken_text, grammar_corrections = correct_common_german_errors(response.content.strip())
+    writer({"spoken_text": spoken_text})
+    return _finalize_master_response(state, spoken_text, grammar_corrections, config)
+
+
+async def amasterChatbot(state: State, llm, stream_tokens: bool = False, config=None):
+    """
+    Async variant of masterChatbot used when the graph runs via ainvoke/astream.
+    Awaits the LLM so a slow response does not block the event loop.
+
+    :param state: Current state with messages and analysis
+    :param llm: Language model instance
+    :param stream_tokens: Stream the answer instead of waiting for the full response
+    :param config: Run config with the conversation's pinned prompt snapshot (optional)
+    :return: Updated state with new message and response_contract
+    """
+    messages = _build_master_messages(state, config)
+    writer = _spoken_text_writer()
+
+    logger.info("masterChatbot: Starting async LLM invocation for natural response")
+    if stream_tokens:
+        corrector = StreamingGrammarCorrector()
+        usage_metadata = None
+        async with get_llm_limiter().aslot(IMMEDIATE):
+            async for chunk in llm.astream(messages):
+                usage_metadata = chunk.usage_metadata or usage_metadata
+                piece = corrector.feed(chunk.text())
+                if piece:
+                    writer({"spoken_text": piece})
+        _record_prompt_size(state, messages, usage_metadata)
+        tail = corrector.flush()
+        if tail:
+            writer({"spoken_text": tail})
+        return _finalize_master_response(state, corrector.text.strip(), corrector.corrections, config)
+
+    async with get_llm_limiter().aslot(IMMEDIATE):
+        response = await llm.ainvoke(messages)
+    _record_prompt_size(state, messages, response.usage_metadata)
+    spoken_text, grammar_corrections = correct_common_german_errors(response.content.strip())
+    writer({"spoken_text": spoken_text})
+    return _finalize_master_response(state, spoken_text, grammar_corrections, config)
+
+
 def get_messages_history_from_immediate_graph_state(config) -> list:
     """
     Retrieve the message history from the immediate response graph's state.
@@ -469,7 +655,7 @@ def get_messages_history_from_immediate_graph_state(config) -> list:
     :return: List of messages from the immediate graph's state
     """
     # Fetch the immediate-thread snapshot
-    base_id = config["configurable"]["thread_id"].rsplit("_", 1)[0]
+    base_id = _conversation_id(config)
     # If the background graph hasn't been set yet, return an empty history
     if background_graph is None:
         return []
@@ -481,202 +667,331 @@ def get_messages_history_from_immediate_graph_state(config) -> list:
     return messages
 
 
-def speechGrammarWorker(state: BackgroundState, config, llm):
+def _conversation_id(config) -> str:
+    """Immediate graph thread_id for a background (``<thread_id>_analysis``) config."""
+    return config["configurable"]["thread_id"].rsplit("_", 1)[0]
+
+
+def loadTranscript(state: BackgroundState, config) -> dict:
     """
-    Analyzes the speech and grammar aspects of the conversation, based on that analysis creates possible task and interactions that teaches the child grammar playfully..
+    Snapshot the immediate conversation into the transcript cache once per background run,
+    so the workers share one transcript instead of each fetching and joining the history.
+
+    Also evaluates the conversation heuristics the worker scheduler reacts to.
 
     :param state: Background state
     :param config: Configuration with thread_id
+    :return: Update with the conversation signals (the transcript lives in the cache, not in the checkpoint)
+    """
+    messages = get_messages_history_from_immediate_graph_state(config)
+    transcript = get_transcript_cache().update(_conversation_id(config), messages)
+    if VERBOSE_WORKER_LOGGING:
+        logger.info(f"loadTranscript: {transcript.message_count} messages, {len(transcript.text)} chars")
+    return {"analysis_signals": _analysis_signals(messages)}
+
+
+def _analysis_signals(messages: list) -> list[str]:
+    """Conversation signals for signal-triggered worker rules (same heuristics as masterChatbot's nudges)."""
+    signals = []
+    if _detect_repeated_disengagement(messages):
+        signals.append("disengagement")
+    if _detect_repeated_errors(messages):
+        signals.append("repeated_errors")
+    return signals
+
+
+def scheduleWorkers(state: BackgroundState, config) -> dict:
+    """
+    Decide which background workers run in this run and plan each one's full or incremental analysis.
+    Workers that are not scheduled are skipped and keep their last analysis.
+
+    :param state: Background state
+    :param config: Configuration with thread_id
+    :return: Update with scheduled_workers and the per-worker analysis_plans (each worker records its
+        plan in analysis_watermarks only once it succeeded; see completed_workers_update)
+    """
+    transcript = get_conversation_transcript(config)
+    turn = len(transcript.turn_starts)
+    previous = state.get("analysis_watermarks") or {}
+    scheduled = get_worker_scheduler().schedule(
+        turn, {worker: entry.get("turn") for worker, entry in previous.items()}, state.get("analysis_signals") or []
+    )
+    plans = {
+        worker: {"turn": turn, **get_incremental_analysis().plan(transcript.message_count, previous.get(worker))}
+        for worker in scheduled
+    }
+    logger.info(f"scheduleWorkers: Turn {turn}, running {len(scheduled)} workers: {', '.join(scheduled)}")
+    return {"scheduled_workers": scheduled, "analysis_plans": plans}
+
+
+def completed_workers_update(workers: list[str], state: BackgroundState) -> dict:
+    """
+    Update recording that workers finished their run: their planned entries become their last run.
+    A worker that fails keeps its previous entry, so its next run re-covers the messages it missed.
+
+    :param workers: Workers whose analysis was written
+    :param state: Background state (planned by scheduleWorkers)
+    :return: Update merging the workers' entries into analysis_watermarks
+    """
+    plans = state.get("analysis_plans") or {}
+    return {"analysis_watermarks": {worker: plans[worker] for worker in workers if worker in plans}}
+
+
+def is_worker_scheduled(worker_name: str, state: BackgroundState) -> bool:
+    """Whether a worker runs in this background run (runs without a schedule run every worker)."""
+    scheduled = state.get("scheduled_workers")
+    return scheduled is None or worker_name in scheduled
+
+
+def get_conversation_transcript(config) -> Transcript:
+    """
+    Get the conversation transcript for a background worker.
+
+    Served from the transcript cache; when a worker runs without loadTranscript
+    (or the entry was evicted) the history is fetched and cached here.
+
+    :param config: Configuration with thread_id
+    :return: Transcript with "type: content" lines and the message count
+    """
+    transcript = get_transcript_cache().get(_conversation_id(config))
+    if transcript is None:
+        messages = get_messages_history_from_immediate_graph_state(config)
+        transcript = get_transcript_cache().update(_conversation_id(config), messages)
+    return transcript
+
+
+def _worker_conversation(state: BackgroundState, transcript: Transcript, worker_name: str,
+                         output_key: str) -> tuple[str, str]:
+    """
+    Conversation input for a transcript-reading worker.
+
+    In an incremental run the worker gets only the messages since the previous run plus its
+    previous analysis to update; otherwise the whole transcript. Incremental runs also fall back
+    to the whole transcript when the worker has no previous analysis or the transcript is no
+    longer than previous analysis and new messages together (early in a conversation).
+
+    :param state: Background state (planned by scheduleWorkers)
+    :param transcript: Conversation transcript
+    :param worker_name: Name of the worker (key of its watermark entry)
+    :param output_key: BackgroundState key holding the worker's previous analysis
+    :return: (conversation text, previous analysis section to put before it; empty for full analyses)
+    """
+    delta_start = ((state.get("analysis_plans") or {}).get(worker_name) or {}).get("delta_start")
+    previous_analysis = state.get(output_key) or ""
+    new_messages = transcript.lines(delta_start, transcript.message_count) if delta_start is not None else ""
+    if (delta_start is None or not previous_analysis.strip()
+            or len(new_messages) + len(previous_analysis) >= len(transcript.text)):
+        get_incremental_analysis().record(False, len(transcript.text), len(transcript.text))
+        return transcript.text, ""
+
+    new_messages = new_messages or "(no new messages)"
+    previous_section = (
+        f"Previous analysis (covers the conversation before the new messages below; update it and "
+        f"return the complete updated analysis):\n{previous_analysis}\n\n"
+    )
+    get_incremental_analysis().record(True, len(new_messages) + len(previous_analysis), len(transcript.text))
+    return f"(only the new messages since the previous analysis)\n{new_messages}", previous_section
+
+
+def _invoke_worker_llm(worker_name: str, output_key: str, messages: list, llm) -> Command:
+    """
+    Invoke the LLM for a background worker while holding a background limiter slot.
+
+    :param worker_name: Name of the worker (for logging)
+    :param output_key: BackgroundState key the response is stored under
+    :param messages: Messages built by the worker
     :param llm: Language model instance
-    :return: Command with grammar analysis update
+    :return: Command with the worker's state update
     """
+    with get_llm_limiter().slot(BACKGROUND):
+        response = llm.invoke(messages)
+    if VERBOSE_WORKER_LOGGING:
+        logger.info(f"{worker_name}: Output → {output_key} ({len(response.content)} chars): {response.content[:200]}...")
+    # Store analysis separately from conversation
+    return Command(update={output_key: response.content})
+
+
+def _speechGrammarWorker_messages(state: BackgroundState, config) -> list:
+    """Build the system and analysis messages for speechGrammarWorker."""
     logger.info("speechGrammarWorker: Starting grammar analysis")
-    prompt_content = getSpeechGrammarWorker_prompt()
+    prompt_content = _pinned_prompt(config, 'speech_grammar_worker', getSpeechGrammarWorker_prompt)
     system_message = SystemMessage(content=prompt_content)
     if VERBOSE_WORKER_LOGGING:
         logger.info(f"speechGrammarWorker: Prompt length: {len(prompt_content)} chars (empty: {not prompt_content.strip()})")
 
     # Analyze the conversation without participating in it
-    messages_history = get_messages_history_from_immediate_graph_state(config)
-    conversation_summary = "\n".join([
-        f"{msg.type}: {msg.content}" for msg in messages_history
-    ])
+    transcript = get_conversation_transcript(config)
+    conversation_summary, previous_analysis = _worker_conversation(state, transcript, 'speechGrammarWorker', 'grammar_analysis')
     child_profile = state.get('child_profile', '')
     if VERBOSE_WORKER_LOGGING:
-        logger.info(f"speechGrammarWorker: Input — {len(messages_history)} messages, child_profile: '{child_profile[:60]}...' " if child_profile else "speechGrammarWorker: Input — no child_profile")
+        logger.info(f"speechGrammarWorker: Input — {transcript.message_count} messages, child_profile: '{child_profile[:60]}...' " if child_profile else "speechGrammarWorker: Input — no child_profile")
     analysis_message = HumanMessage(
         content=f"Child profile: {child_profile}\n\n"
-                f"Conversation: {conversation_summary}. "
+                f"{previous_analysis}Conversation: {conversation_summary}. "
     )
 
-    response = llm.invoke([system_message, analysis_message])
-    if VERBOSE_WORKER_LOGGING:
-        logger.info(f"speechGrammarWorker: Output → grammar_analysis ({len(response.content)} chars): {response.content[:200]}...")
-    # Store analysis separately from conversation
-    return Command(update={"grammar_analysis": response.content})
+    return [system_message, analysis_message]
 
 
-def speechComprehensionWorker(state: BackgroundState, config, llm):
+def speechGrammarWorker(state: BackgroundState, config, llm):
     """
-    Analyzes the comprehension aspects of the conversation and creates  impulses that support the child's understanding.
+    Analyzes the speech and grammar aspects of the conversation, based on that analysis creates possible task and interactions that teaches the child grammar playfully..
 
     :param state: Background state
     :param config: Configuration with thread_id
     :param llm: Language model instance
-    :return: Command with speech comprehension analysis update
+    :return: Command with grammar analysis update
     """
+    return _invoke_worker_llm("speechGrammarWorker", "grammar_analysis", _speechGrammarWorker_messages(state, config), llm)
+
+
+def _speechComprehensionWorker_messages(state: BackgroundState, config) -> list:
+    """Build the system and analysis messages for speechComprehensionWorker."""
     logger.info("speechComprehensionWorker: Starting comprehension analysis")
-    prompt_content = getSpeechComprehensionWorker_prompt()
+    prompt_content = _pinned_prompt(config, 'speech_comprehension_worker', getSpeechComprehensionWorker_prompt)
     system_message = SystemMessage(content=prompt_content)
     if VERBOSE_WORKER_LOGGING:
         logger.info(f"speechComprehensionWorker: Prompt length: {len(prompt_content)} chars (empty: {not prompt_content.strip()})")
 
     # Analyze the conversation without participating in it
-    messages_history = get_messages_history_from_immediate_graph_state(config)
-    conversation_summary = "\n".join([
-        f"{msg.type}: {msg.content}" for msg in messages_history
-    ])
+    transcript = get_conversation_transcript(config)
+    conversation_summary, previous_analysis = _worker_conversation(state, transcript, 'speechComprehensionWorker', 'speech_comprehension_analysis')
     child_profile = state.get('child_profile', '')
     if VERBOSE_WORKER_LOGGING:
-        logger.info(f"speechComprehensionWorker: Input — {len(messages_history)} messages, child_profile: '{child_profile[:60]}...'" if child_profile else "speechComprehensionWorker: Input — no child_profile")
+        logger.info(f"speechComprehensionWorker: Input — {transcript.message_count} messages, child_profile: '{child_profile[:60]}...'" if child_profile else "speechComprehensionWorker: Input — no child_profile")
     analysis_message = HumanMessage(
         content=f"Child profile: {child_profile}\n\n"
-                f"Conversation: {conversation_summary}. "
+                f"{previous_analysis}Conversation: {conversation_summary}. "
     )
 
-    response = llm.invoke([system_message, analysis_message])
-    if VERBOSE_WORKER_LOGGING:
-        logger.info(f"speechComprehensionWorker: Output → speech_comprehension_analysis ({len(response.content)} chars): {response.content[:200]}...")
-    # Store analysis separately from conversation
-    return Command(update={"speech_comprehension_analysis": response.content})
+    return [system_message, analysis_message]
 
 
-def sprachhandlungsAnalyseWorker(state: BackgroundState, config, llm):
+def speechComprehensionWorker(state: BackgroundState, config, llm):
     """
-    Analyzes the interaction aspects of the conversation, based on that creates task that encourage the child's interaction.
+    Analyzes the comprehension aspects of the conversation and creates  impulses that support the child's understanding.
 
     :param state: Background state
     :param config: Configuration with thread_id
     :param llm: Language model instance
-    :return: Command with interaction analysis update
+    :return: Command with speech comprehension analysis update
     """
+    return _invoke_worker_llm("speechComprehensionWorker", "speech_comprehension_analysis", _speechComprehensionWorker_messages(state, config), llm)
+
+
+def _sprachhandlungsAnalyseWorker_messages(state: BackgroundState, config) -> list:
+    """Build the system and analysis messages for sprachhandlungsAnalyseWorker."""
     logger.info("sprachhandlungsAnalyseWorker: Starting interaction analysis")
-    prompt_content = getSprachhandlungAnalyseWorker_prompt()
+    prompt_content = _pinned_prompt(config, 'sprachhandlung_analyse_worker', getSprachhandlungAnalyseWorker_prompt)
     system_message = SystemMessage(content=prompt_content)
     if VERBOSE_WORKER_LOGGING:
         logger.info(f"sprachhandlungsAnalyseWorker: Prompt length: {len(prompt_content)} chars (empty: {not prompt_content.strip()})")
 
     # Analyze the conversation without participating in it
-    messages_history = get_messages_history_from_immediate_graph_state(config)
-    conversation_summary = "\n".join([
-        f"{msg.type}: {msg.content}" for msg in messages_history
-    ])
+    transcript = get_conversation_transcript(config)
+    conversation_summary, previous_analysis = _worker_conversation(state, transcript, 'sprachhandlungsAnalyseWorker', 'sprachhandlung_analysis')
     child_profile = state.get('child_profile', '')
     if VERBOSE_WORKER_LOGGING:
-        logger.info(f"sprachhandlungsAnalyseWorker: Input — {len(messages_history)} messages, child_profile: '{child_profile[:60]}...'" if child_profile else "sprachhandlungsAnalyseWorker: Input — no child_profile")
+        logger.info(f"sprachhandlungsAnalyseWorker: Input — {transcript.message_count} messages, child_profile: '{child_profile[:60]}...'" if child_profile else "sprachhandlungsAnalyseWorker: Input — no child_profile")
     analysis_message = HumanMessage(
         content=f"Child profile: {child_profile}\n\n"
-                f"Conversation: {conversation_summary}"
+                f"{previous_analysis}Conversation: {conversation_summary}"
     )
 
-    response = llm.invoke([system_message, analysis_message])
-    if VERBOSE_WORKER_LOGGING:
-        logger.info(f"sprachhandlungsAnalyseWorker: Output → sprachhandlung_analysis ({len(response.content)} chars): {response.content[:200]}...")
-    # Store analysis separately from conversation
-    return Command(update={"sprachhandlung_analysis": response.content})
+    return [system_message, analysis_message]
 
 
-def speechVocabularyWorker(state: BackgroundState, config, llm):
+def sprachhandlungsAnalyseWorker(state: BackgroundState, config, llm):
     """
-    Analyzes the speech and vocabulary aspects of the conversation. Based on that analysis creates possible tasks and interactions to support vocabulary development.
+    Analyzes the interaction aspects of the conversation, based on that creates task that encourage the child's interaction.
 
     :param state: Background state
     :param config: Configuration with thread_id
     :param llm: Language model instance
-    :return: Command with vocabulary analysis update
+    :return: Command with interaction analysis update
     """
+    return _invoke_worker_llm("sprachhandlungsAnalyseWorker", "sprachhandlung_analysis", _sprachhandlungsAnalyseWorker_messages(state, config), llm)
+
+
+def _speechVocabularyWorker_messages(state: BackgroundState, config) -> list:
+    """Build the system and analysis messages for speechVocabularyWorker."""
     logger.info("speechVocabularyWorker: Starting vocabulary analysis")
-    prompt_content = getSpeechVocabularyWorker_prompt()
+    prompt_content = _pinned_prompt(config, 'speech_vocabulary_worker', getSpeechVocabularyWorker_prompt)
     system_message = SystemMessage(content=prompt_content)
     if VERBOSE_WORKER_LOGGING:
         logger.info(f"speechVocabularyWorker: Prompt length: {len(prompt_content)} chars (empty: {not prompt_content.strip()})")
 
     # Analyze the conversation without participating in it
-    messages_history = get_messages_history_from_immediate_graph_state(config)
-    conversation_summary = "\n".join([
-        f"{msg.type}: {msg.content}" for msg in messages_history
-    ])
+    transcript = get_conversation_transcript(config)
+    conversation_summary, previous_analysis = _worker_conversation(state, transcript, 'speechVocabularyWorker', 'vocabulary_analysis')
     child_profile = state.get('child_profile', '')
     if VERBOSE_WORKER_LOGGING:
-        logger.info(f"speechVocabularyWorker: Input — {len(messages_history)} messages, child_profile: '{child_profile[:60]}...'" if child_profile else "speechVocabularyWorker: Input — no child_profile")
+        logger.info(f"speechVocabularyWorker: Input — {transcript.message_count} messages, child_profile: '{child_profile[:60]}...'" if child_profile else "speechVocabularyWorker: Input — no child_profile")
     analysis_message = HumanMessage(
         content=f"Child profile: {child_profile}\n\n"
-                f"Conversation: {conversation_summary}."
+                f"{previous_analysis}Conversation: {conversation_summary}."
     )
 
-    response = llm.invoke([system_message, analysis_message])
-    if VERBOSE_WORKER_LOGGING:
-        logger.info(f"speechVocabularyWorker: Output → vocabulary_analysis ({len(response.content)} chars): {response.content[:200]}...")
-    # Store analysis separately from conversation
-    return Command(update={"vocabulary_analysis": response.content})
+    return [system_message, analysis_message]
 
 
-def boredomWorker(state: BackgroundState, config, llm):
+def speechVocabularyWorker(state: BackgroundState, config, llm):
     """
-    Analyzes the overall conversation to provide boredom analysis and suggestions.
+    Analyzes the speech and vocabulary aspects of the conversation. Based on that analysis creates possible tasks and interactions to support vocabulary development.
 
     :param state: Background state
     :param config: Configuration with thread_id
     :param llm: Language model instance
-    :return: Command with boredom analysis update
+    :return: Command with vocabulary analysis update
     """
+    return _invoke_worker_llm("speechVocabularyWorker", "vocabulary_analysis", _speechVocabularyWorker_messages(state, config), llm)
+
+
+def _boredomWorker_messages(state: BackgroundState, config) -> list:
+    """Build the system and analysis messages for boredomWorker."""
     logger.info("boredomWorker: Starting boredom analysis")
-    prompt_content = getBoredomWorker_prompt()
+    prompt_content = _pinned_prompt(config, 'boredom_worker', getBoredomWorker_prompt)
     system_message = SystemMessage(content=prompt_content)
     if VERBOSE_WORKER_LOGGING:
         logger.info(f"boredomWorker: Prompt length: {len(prompt_content)} chars (empty: {not prompt_content.strip()})")
 
     # Analyze the conversation without participating in it
-    messages_history = get_messages_history_from_immediate_graph_state(config)
-    conversation_summary = "\n".join([
-        f"{msg.type}: {msg.content}" for msg in messages_history
-    ])
+    transcript = get_conversation_transcript(config)
+    conversation_summary, previous_analysis = _worker_conversation(state, transcript, 'boredomWorker', 'boredom_analysis')
     child_profile = state.get('child_profile', '')
     if VERBOSE_WORKER_LOGGING:
-        logger.info(f"boredomWorker: Input — {len(messages_history)} messages, child_profile: '{child_profile[:60]}...'" if child_profile else "boredomWorker: Input — no child_profile")
+        logger.info(f"boredomWorker: Input — {transcript.message_count} messages, child_profile: '{child_profile[:60]}...'" if child_profile else "boredomWorker: Input — no child_profile")
     analysis_message = HumanMessage(
         content=f"Child profile: {child_profile}\n\n"
-                f"Conversation: {conversation_summary}"
+                f"{previous_analysis}Conversation: {conversation_summary}"
     )
 
-    response = llm.invoke([system_message, analysis_message])
-    if VERBOSE_WORKER_LOGGING:
-        logger.info(f"boredomWorker: Output → boredom_analysis ({len(response.content)} chars): {response.content[:200]}...")
-    # Store analysis separately from conversation
-    return Command(update={"boredom_analysis": response.content})
+    return [system_message, analysis_message]
 
 
-def foerderfokusWorker(state: BackgroundState, config, llm):
+def boredomWorker(state: BackgroundState, config, llm):
     """
-    Analyzes the overall Förderfokus of the interaction to provide advice and suggestion for higher educational value of the total interaction.
-    This worker uses the context of the grammer, comprehension, interaction, vocabulary analysis, boredom analysis to give an overall recommendation.
+    Analyzes the overall conversation to provide boredom analysis and suggestions.
 
     :param state: Background state
     :param config: Configuration with thread_id
     :param llm: Language model instance
-    :return: Command with förderfokus analysis update
+    :return: Command with boredom analysis update
     """
+    return _invoke_worker_llm("boredomWorker", "boredom_analysis", _boredomWorker_messages(state, config), llm)
+
+
+def _foerderfokusWorker_messages(state: BackgroundState, config) -> list:
+    """Build the system and analysis messages for foerderfokusWorker."""
     logger.info("foerderfokusWorker: Starting overall educational value analysis")
-    prompt_content = getFoerderfokusWorker_prompt()
+    prompt_content = _pinned_prompt(config, 'foerderfokus_worker', getFoerderfokusWorker_prompt)
     system_message = SystemMessage(content=prompt_content)
     if VERBOSE_WORKER_LOGGING:
         logger.info(f"foerderfokusWorker: Prompt length: {len(prompt_content)} chars (empty: {not prompt_content.strip()})")
 
     # Analyze the conversation without participating in it
-    messages_history = get_messages_history_from_immediate_graph_state(config)
-    conversation_summary = "\n".join([
-        f"{msg.type}: {msg.content}" for msg in messages_history
-    ])
+    transcript = get_conversation_transcript(config)
+    conversation_summary, previous_analysis = _worker_conversation(state, transcript, 'foerderfokusWorker', 'foerderfokus')
     child_profile = state.get('child_profile', '')
     grammar_analysis = state.get('grammar_analysis', '')
     speech_comprehension_analysis = state.get('speech_comprehension_analysis', '')
@@ -700,99 +1015,99 @@ def foerderfokusWorker(state: BackgroundState, config, llm):
                 f"Sprachhandlung analysis:\n{sprachhandlung_analysis}.\n\n"
                 f"Vocabulary analysis:\n{vocabulary_analysis}.\n\n"
                 f"Boredom analysis:\n{boredom_analysis}.\n\n"
-                f"Conversation:\n{conversation_summary}."
+                f"{previous_analysis}Conversation:\n{conversation_summary}."
     )
 
-    response = llm.invoke([system_message, analysis_message])
-    if VERBOSE_WORKER_LOGGING:
-        logger.info(f"foerderfokusWorker: Output → foerderfokus ({len(response.content)} chars): {response.content[:200]}...")
-    # Store analysis separately from conversation
-    return Command(update={"foerderfokus": response.content})
+    return [system_message, analysis_message]
 
 
-def aufgabenWorker(state: BackgroundState, config, llm):
+def foerderfokusWorker(state: BackgroundState, config, llm):
     """
-    This worker suggest possible Aufgaben (tasks) based on the analysis of the Förderfokus worker to support the child's learning process.
+    Analyzes the overall Förderfokus of the interaction to provide advice and suggestion for higher educational value of the total interaction.
+    This worker uses the context of the grammer, comprehension, interaction, vocabulary analysis, boredom analysis to give an overall recommendation.
 
     :param state: Background state
     :param config: Configuration with thread_id
     :param llm: Language model instance
-    :return: Command with task suggestions update
+    :return: Command with förderfokus analysis update
     """
+    return _invoke_worker_llm("foerderfokusWorker", "foerderfokus", _foerderfokusWorker_messages(state, config), llm)
+
+
+def _aufgabenWorker_messages(state: BackgroundState, config) -> list:
+    """Build the system and analysis messages for aufgabenWorker."""
     logger.info("aufgabenWorker: Starting task suggestions generation")
-    prompt_content = getAufgabenWorker_prompt()
+    prompt_content = _pinned_prompt(config, 'aufgaben_worker', getAufgabenWorker_prompt)
     system_message = SystemMessage(content=prompt_content)
     if VERBOSE_WORKER_LOGGING:
         logger.info(f"aufgabenWorker: Prompt length: {len(prompt_content)} chars (empty: {not prompt_content.strip()})")
 
     # Analyze the conversation without participating in it
-    messages_history = get_messages_history_from_immediate_graph_state(config)
-    conversation_summary = "\n".join([
-        f"{msg.type}: {msg.content}" for msg in messages_history
-    ])
+    transcript = get_conversation_transcript(config)
+    conversation_summary, previous_analysis = _worker_conversation(state, transcript, 'aufgabenWorker', 'aufgaben')
     child_profile = state.get('child_profile', '')
     foerderfokus = state.get('foerderfokus', '')
     if VERBOSE_WORKER_LOGGING:
-        logger.info(f"aufgabenWorker: Input — foerderfokus: {len(foerderfokus)} chars (empty: {not foerderfokus.strip()}), {len(messages_history)} messages")
+        logger.info(f"aufgabenWorker: Input — foerderfokus: {len(foerderfokus)} chars (empty: {not foerderfokus.strip()}), {transcript.message_count} messages")
     analysis_message = HumanMessage(
         content=f"Förderfokus analysis:\n{foerderfokus}\n\n"
                 f"Child profile:\n{child_profile}\n\n"
-                f" Conversation:\n{conversation_summary}. "
+                f"{previous_analysis}Conversation:\n{conversation_summary}. "
     )
 
-    response = llm.invoke([system_message, analysis_message])
-    if VERBOSE_WORKER_LOGGING:
-        logger.info(f"aufgabenWorker: Output → aufgaben ({len(response.content)} chars): {response.content[:200]}...")
-    # Store analysis separately from conversation
-    return Command(update={"aufgaben": response.content})
+    return [system_message, analysis_message]
 
 
-def satzbauAnalyseWorker(state: BackgroundState, config, llm):
+def aufgabenWorker(state: BackgroundState, config, llm):
     """
-    Analyzes the overall conversation to analyze sentence structure and provide suggestions.
+    This worker suggest possible Aufgaben (tasks) based on the analysis of the Förderfokus worker to support the child's learning process.
 
     :param state: Background state
     :param config: Configuration with thread_id
     :param llm: Language model instance
-    :return: Command with satzbau analysis update
+    :return: Command with task suggestions update
     """
+    return _invoke_worker_llm("aufgabenWorker", "aufgaben", _aufgabenWorker_messages(state, config), llm)
+
+
+def _satzbauAnalyseWorker_messages(state: BackgroundState, config) -> list:
+    """Build the system and analysis messages for satzbauAnalyseWorker."""
     logger.info("satzbauAnalyseWorker: Starting sentence structure analysis")
-    prompt_content = getSatzbauAnalyseWorker_prompt()
+    prompt_content = _pinned_prompt(config, 'satzbau_analyse_worker', getSatzbauAnalyseWorker_prompt)
     system_message = SystemMessage(content=prompt_content)
     if VERBOSE_WORKER_LOGGING:
         logger.info(f"satzbauAnalyseWorker: Prompt length: {len(prompt_content)} chars (empty: {not prompt_content.strip()})")
 
     # Analyze the conversation without participating in it
-    messages_history = get_messages_history_from_immediate_graph_state(config)
-    conversation_summary = "\n".join([
-        f"{msg.type}: {msg.content}" for msg in messages_history
-    ])
+    transcript = get_conversation_transcript(config)
+    conversation_summary, previous_analysis = _worker_conversation(state, transcript, 'satzbauAnalyseWorker', 'satzbau_analysis')
     child_profile = state.get('child_profile', '')
     if VERBOSE_WORKER_LOGGING:
-        logger.info(f"satzbauAnalyseWorker: Input — {len(messages_history)} messages, child_profile: '{child_profile[:60]}...'" if child_profile else "satzbauAnalyseWorker: Input — no child_profile")
+        logger.info(f"satzbauAnalyseWorker: Input — {transcript.message_count} messages, child_profile: '{child_profile[:60]}...'" if child_profile else "satzbauAnalyseWorker: Input — no child_profile")
     analysis_message = HumanMessage(
         content=f"Child profile: {child_profile}\n\n"
-                f"Conversation: {conversation_summary}"
+                f"{previous_analysis}Conversation: {conversation_summary}"
     )
 
-    response = llm.invoke([system_message, analysis_message])
-    if VERBOSE_WORKER_LOGGING:
-        logger.info(f"satzbauAnalyseWorker: Output → satzbau_analysis ({len(response.content)} chars): {response.content[:200]}...")
-    # Store analysis separately from conversation
-    return Command(update={"satzbau_analysis": response.content})
+    return [system_message, analysis_message]
 
 
-def satzbauBegrenzungsWorker(state: BackgroundState, config, llm):
+def satzbauAnalyseWorker(state: BackgroundState, config, llm):
     """
-    Uses the Satzbau-Analyse-Worker's results to create constraints for sentence structure in future interactions.
+    Analyzes the overall conversation to analyze sentence structure and provide suggestions.
 
     :param state: Background state
     :param config: Configuration with thread_id
     :param llm: Language model instance
-    :return: Command with satzbaubegrenzung update
+    :return: Command with satzbau analysis update
     """
+    return _invoke_worker_llm("satzbauAnalyseWorker", "satzbau_analysis", _satzbauAnalyseWorker_messages(state, config), llm)
+
+
+def _satzbauBegrenzungsWorker_messages(state: BackgroundState, config) -> list:
+    """Build the system and analysis messages for satzbauBegrenzungsWorker."""
     logger.info("satzbauBegrenzungsWorker: Starting sentence structure constraints generation")
-    prompt_content = getSatzbauBegrenzungsWorker_prompt()
+    prompt_content = _pinned_prompt(config, 'satzbau_begrenzungs_worker', getSatzbauBegrenzungsWorker_prompt)
     system_message = SystemMessage(content=prompt_content)
     if VERBOSE_WORKER_LOGGING:
         logger.info(f"satzbauBegrenzungsWorker: Prompt length: {len(prompt_content)} chars (empty: {not prompt_content.strip()})")
@@ -804,11 +1119,212 @@ def satzbauBegrenzungsWorker(state: BackgroundState, config, llm):
         content=f"Satzbauanalyse: {satzbau_analyse}"
     )
 
-    response = llm.invoke([system_message, analysis_message])
+    return [system_message, analysis_message]
+
+
+def satzbauBegrenzungsWorker(state: BackgroundState, config, llm):
+    """
+    Uses the Satzbau-Analyse-Worker's results to create constraints for sentence structure in future interactions.
+
+    :param state: Background state
+    :param config: Configuration with thread_id
+    :param llm: Language model instance
+    :return: Command with satzbaubegrenzung update
+    """
+    return _invoke_worker_llm("satzbauBegrenzungsWorker", "satzbaubegrenzung", _satzbauBegrenzungsWorker_messages(state, config), llm)
+
+
+# Background workers: name -> (message builder, BackgroundState output key)
+BACKGROUND_WORKERS = {
+    "speechGrammarWorker": (_speechGrammarWorker_messages, "grammar_analysis"),
+    "speechComprehensionWorker": (_speechComprehensionWorker_messages, "speech_comprehension_analysis"),
+    "sprachhandlungsAnalyseWorker": (_sprachhandlungsAnalyseWorker_messages, "sprachhandlung_analysis"),
+    "speechVocabularyWorker": (_speechVocabularyWorker_messages, "vocabulary_analysis"),
+    "boredomWorker": (_boredomWorker_messages, "boredom_analysis"),
+    "foerderfokusWorker": (_foerderfokusWorker_messages, "foerderfokus"),
+    "aufgabenWorker": (_aufgabenWorker_messages, "aufgaben"),
+    "satzbauAnalyseWorker": (_satzbauAnalyseWorker_messages, "satzbau_analysis"),
+    "satzbauBegrenzungsWorker": (_satzbauBegrenzungsWorker_messages, "satzbaubegrenzung"),
+}
+
+
+# Fused background mode: the workers' analyses produced by two structured-output calls.
+# First the independent analyses, then the workers that build on them.
+FUSED_WORKER_GROUPS = {
+    "fusedAnalysisWorker": ("speechGrammarWorker", "speechComprehensionWorker", "sprachhandlungsAnalyseWorker",
+                            "speechVocabularyWorker", "boredomWorker", "satzbauAnalyseWorker"),
+    "fusedPlanningWorker": ("foerderfokusWorker", "aufgabenWorker", "satzbauBegrenzungsWorker"),
+}
+
+# Worker name -> (prompt repository key, prompts.py getter)
+_WORKER_PROMPTS = {
+    "speechGrammarWorker": ('speech_grammar_worker', getSpeechGrammarWorker_prompt),
+    "speechComprehensionWorker": ('speech_comprehension_worker', getSpeechComprehensionWorker_prompt),
+    "sprachhandlungsAnalyseWorker": ('sprachhandlung_analyse_worker', getSprachhandlungAnalyseWorker_prompt),
+    "speechVocabularyWorker": ('speech_vocabulary_worker', getSpeechVocabularyWorker_prompt),
+    "boredomWorker": ('boredom_worker', getBoredomWorker_prompt),
+    "foerderfokusWorker": ('foerderfokus_worker', getFoerderfokusWorker_prompt),
+    "aufgabenWorker": ('aufgaben_worker', getAufgabenWorker_prompt),
+    "satzbauAnalyseWorker": ('satzbau_analyse_worker', getSatzbauAnalyseWorker_prompt),
+    "satzbauBegrenzungsWorker": ('satzbau_begrenzungs_worker', getSatzbauBegrenzungsWorker_prompt),
+}
+
+# Worker name -> BackgroundState analyses it reads besides the conversation
+_WORKER_INPUTS = {
+    "foerderfokusWorker": ("grammar_analysis", "speech_comprehension_analysis", "sprachhandlung_analysis",
+                           "vocabulary_analysis", "boredom_analysis"),
+    "aufgabenWorker": ("foerderfokus",),
+    "satzbauBegrenzungsWorker": ("satzbau_analysis",),
+}
+
+
+def scheduled_fused_workers(group_name: str, state: BackgroundState) -> list[str]:
+    """Workers of a fused call that run in this background run (see scheduleWorkers)."""
+    return [worker for worker in FUSED_WORKER_GROUPS[group_name] if is_worker_scheduled(worker, state)]
+
+
+def _fused_messages(state: BackgroundState, config, workers: list[str]) -> list:
+    """
+    Build the messages of a fused call: every worker's prompt as one section of the system
+    message, and the child profile, the analyses the workers read and the conversation once.
+
+    Fused calls always read the whole transcript; it is sent once for all workers of the call.
+    """
+    keys = [BACKGROUND_WORKERS[worker][1] for worker in workers]
+    sections = "\n\n".join(
+        f"=== {BACKGROUND_WORKERS[worker][1]} ===\n{_pinned_prompt(config, *_WORKER_PROMPTS[worker])}"
+        for worker in workers
+    )
+    system_message = SystemMessage(
+        content=f"You write several analyses of the same conversation in one answer. Each section below holds "
+                f"the instructions of one analysis; follow them as if it were your only task. Where an analysis "
+                f"reads another analysis of this answer, use the one you wrote.\n"
+                f"Answer with a single JSON object with exactly these keys, in this order: {', '.join(keys)}. "
+                f"Each value is the complete text of that analysis as a string.\n\n{sections}"
+    )
+
+    inputs = []
+    for worker in workers:
+        inputs.extend(key for key in _WORKER_INPUTS.get(worker, ()) if key not in keys and key not in inputs)
+    transcript = get_conversation_transcript(config)
+    get_incremental_analysis().record(False, len(transcript.text), len(transcript.text))
+    analyses = "".join(f"{key}:\n{state.get(key, '')}\n\n" for key in inputs)
+    analysis_message = HumanMessage(
+        content=f"Child profile:\n{state.get('child_profile', '')}\n\n"
+                f"{analyses}Conversation:\n{transcript.text}"
+    )
+    return [system_message, analysis_message]
+
+
+def _fused_llm(llm, keys: list[str]):
+    """The LLM with structured output for the given keys; models without tool calling answer in JSON text."""
+    schema = {
+        "title": "background_analyses",
+        "description": "One analysis of the conversation per key",
+        "type": "object",
+        "properties": {key: {"type": "string"} for key in keys},
+        "required": keys,
+    }
+    try:
+        return llm.with_structured_output(schema)
+    except NotImplementedError:
+        return llm
+
+
+def _fused_result(group_name: str, workers: list[str], response) -> Command:
+    """
+    Turn a fused call's answer into the workers' state updates.
+    Analyses missing from the answer (or an unparsable answer) keep their previous value.
+    """
+    if isinstance(response, BaseMessage):
+        try:
+            response = parse_json_markdown(response.content)
+        except ValueError:
+            response = None
+    if not isinstance(response, dict):
+        logger.warning(f"{group_name}: Answer is not a JSON object; keeping the previous analyses")
+        return Command(update={})
+
+    update = {}
+    for worker in workers:
+        output_key = BACKGROUND_WORKERS[worker][1]
+        value = response.get(output_key)
+        if isinstance(value, str):
+            value = value.strip()
+        elif value:
+            value = json.dumps(value, ensure_ascii=False)
+        if value:
+            update[output_key] = value
+    missing = [BACKGROUND_WORKERS[worker][1] for worker in workers if BACKGROUND_WORKERS[worker][1] not in update]
+    if missing:
+        logger.warning(f"{group_name}: No {', '.join(missing)} in the answer; keeping the previous analysis")
     if VERBOSE_WORKER_LOGGING:
-        logger.info(f"satzbauBegrenzungsWorker: Output → satzbaubegrenzung ({len(response.content)} chars): {response.content[:200]}...")
-    # Store analysis separately from conversation
-    return Command(update={"satzbaubegrenzung": response.content})
+        logger.info(f"{group_name}: Output → {', '.join(f'{key} ({len(value)} chars)' for key, value in update.items())}")
+    return Command(update=update)
+
+
+def fused_background_worker(group_name: str, state: BackgroundState, config, llm) -> Command:
+    """
+    Produce the analyses of all scheduled workers of a fused group with one LLM call.
+    Each analysis is written to the same BackgroundState key as the worker's own node.
+
+    :param group_name: Key of FUSED_WORKER_GROUPS
+    :param state: Background state
+    :param config: Configuration with thread_id
+    :param llm: Language model instance
+    :return: Command with the analyses' state updates
+    """
+    workers = scheduled_fused_workers(group_name, state)
+    if not workers:
+        return Command(update={})
+    logger.info(f"{group_name}: Starting {', '.join(workers)}")
+    messages = _fused_messages(state, config, workers)
+    with get_llm_limiter().slot(BACKGROUND):
+        response = _fused_llm(llm, [BACKGROUND_WORKERS[worker][1] for worker in workers]).invoke(messages)
+    return _fused_result(group_name, workers, response)
+
+
+def _historySummaryWorker_messages(state: BackgroundState, config) -> tuple[Optional[list], int]:
+    """
+    Build the messages that fold the turns which left the history window into the summary.
+
+    :return: (messages, new summarized count); messages is None when nothing new left the window
+    """
+    transcript = get_conversation_transcript(config)
+    window_start = get_history_window().window_start_for_turns(transcript.turn_starts)
+    summarized_count = state.get('history_summarized_count') or 0
+    if summarized_count > transcript.message_count:
+        # History was replaced; start the summary over
+        summarized_count = 0
+    if window_start <= summarized_count:
+        return None, summarized_count
+
+    folded = transcript.lines(summarized_count, window_start)
+    logger.info(f"historySummaryWorker: Folding messages {summarized_count}-{window_start} into the summary")
+    system_message = SystemMessage(content=_pinned_prompt(config, 'history_summary_worker', getHistorySummaryWorker_prompt))
+    summary_message = HumanMessage(
+        content=f"Bisherige Zusammenfassung:\n{state.get('history_summary') or '(noch keine)'}\n\n"
+                f"Neue Gesprächsausschnitte:\n{folded}"
+    )
+    return [system_message, summary_message], window_start
+
+
+def historySummaryWorker(state: BackgroundState, config, llm):
+    """
+    Extends the rolling summary of the conversation with the turns that left masterChatbot's
+    history window since the last run. Runs in the background graph, off the reply path.
+
+    :param state: Background state
+    :param config: Configuration with thread_id
+    :param llm: Language model instance
+    :return: Command with history_summary and history_summarized_count updates
+    """
+    messages, summarized_count = _historySummaryWorker_messages(state, config)
+    if messages is None:
+        return Command(update={})
+    with get_llm_limiter().slot(BACKGROUND):
+        response = llm.invoke(messages)
+    return Command(update={"history_summary": response.content, "history_summarized_count": summarized_count})
 
 
 def initialStateLoader(state: State) -> dict:
@@ -855,7 +1371,14 @@ def background_graph_needs_initial_state(state: State):
         return "initialStateLoader"
     return ["speechGrammarWorker", "speechComprehensionWorker", "sprachhandlungsAnalyseWorker",
             "speechVocabularyWorker",
-            "boredomWorker", "satzbauAnalyseWorker"]
+            "boredomWorker", "satzbauAnalyseWorker", "historySummaryWorker"]
+
+
+def fused_background_graph_needs_initial_state(state: State):
+    """Check if the fused background graph needs to load initial state."""
+    if not (state.get("audio_book") and state.get("child_profile")):
+        return "initialStateLoader"
+    return ["fusedAnalysisWorker", "historySummaryWorker"]
 
 
 def load_analysis(state: State, config, background_graph_instance) -> dict:
@@ -867,7 +1390,8 @@ def load_analysis(state: State, config, background_graph_instance) -> dict:
     :param background_graph_instance: Instance of the background graph
     :return: updated state with analysis results
     """
-    # TODO LNG: Make this conditional executed e.g. every third interaction.
+    # Which background workers run per turn is decided by the background graph's scheduleWorkers
+    # node (worker_scheduler.py); skipped workers keep their last results, read here as usual.
     # TODO LNG: Add conditional edge if this node takes to much time.
     logger.info("load_analysis: Reading analysis results from background graph")
     bg_thread_id = config["configurable"]["thread_id"] + "_analysis"
@@ -889,6 +1413,8 @@ def load_analysis(state: State, config, background_graph_instance) -> dict:
     analyses = {
         "aufgaben": aufgaben,
         "satzbaubegrenzung": satzbaubegrenzung,
+        "history_summary": snapshot.values.get("history_summary"),
+        "history_summarized_count": snapshot.values.get("history_summarized_count") or 0,
     }
     return analyses
 
@@ -6,10 +6,14 @@ the LLM to generate it. It uses the available context (beats, state) to construc
 evidence and claims automatically.
 """
 import logging
+import math
 import re
 import sys
 import os
-from typing import Optional, List, Tuple
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, List, Tuple
 from difflib import SequenceMatcher
 from beats import Beat
 
@@ -32,7 +36,127 @@ from backend.models.output_contract import (
 
 logger = logging.getLogger(__name__)
 
-def _sliding_window_score(quote_words: List[str], beat_words: List[str]) -> Tuple[float, int]:
+_NON_WORD = re.compile(r"[^\w]")
+
+
+class _BeatText:
+    """Normalized forms of one beat text, computed once and shared by all quotes."""
+
+    __slots__ = ("normalized", "words", "content_words", "sorted_text", "char_counts")
+
+    def __init__(self, text: str):
+        self.normalized = " ".join(text.lower().split())
+        self.words = self.normalized.split()
+        # Punctuation-stripped words, for the token coverage score
+        stripped = {_NON_WORD.sub("", w) for w in self.words}
+        stripped.discard("")
+        self.content_words = frozenset(stripped)
+        self.sorted_text = " ".join(sorted(self.words))
+        self.char_counts = Counter(self.normalized)
+
+
+@lru_cache(maxsize=4096)
+def _beat_text(text: str) -> _BeatText:
+    return _BeatText(text)
+
+
+class BeatMatchIndex:
+    """
+    Matching index over a list of beats (a beatpack or the active beats of a turn).
+
+    Holds the normalized text of every beat, an inverted index from content
+    word to beat positions (token coverage of a quote for all beats in one
+    pass) and the cross-beat entity frequencies used by the entity-anchor
+    guard. Only derived data is stored, never the Beat objects, so an index
+    can be shared by equal beat lists.
+    """
+
+    def __init__(self, beats: List[Beat]):
+        self.texts = [_beat_text(beat.text) for beat in beats]
+        self.postings: Dict[str, List[int]] = {}
+        for position, text in enumerate(self.texts):
+            for word in text.content_words:
+                self.postings.setdefault(word, []).append(position)
+        # Entities that appear in more than one beat are too generic to anchor
+        # grounding (e.g. 'Himmel', 'Beeren', 'Morgens' appear in multiple beats).
+        self.entity_frequency: Counter = Counter(
+            e.lower()
+            for b in beats
+            for e in (b.entities or [])
+            if len(e) >= 5
+        )
+
+    def coverage(self, quote_content: List[str]) -> List[float]:
+        """Fraction of the quote's content words found in each beat."""
+        hits = [0] * len(self.texts)
+        for word in quote_content:
+            for position in self.postings.get(word, ()):
+                hits[position] += 1
+        return [hit / len(quote_content) for hit in hits]
+
+
+_INDEX_CACHE_SIZE = 64
+_index_cache: "OrderedDict[tuple, BeatMatchIndex]" = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def get_match_index(beats: List[Beat]) -> BeatMatchIndex:
+    """
+    Get the (cached) matching index for a list of beats.
+
+    Keyed by beat texts and entities, so the index is rebuilt when a
+    beatpack changes and reused across turns and conversations otherwise.
+    """
+    key = tuple((beat.text, tuple(beat.entities or ())) for beat in beats)
+    with _index_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+    index = BeatMatchIndex(beats)
+    with _index_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def _shared_chars(quote_counts: Counter, text_counts: Counter) -> int:
+    """Size of the character multiset intersection (upper bound on SequenceMatcher matches)."""
+    return sum(min(count, text_counts[char]) for char, count in quote_counts.items())
+
+
+def _char_masks(text: str) -> Dict[str, int]:
+    """Bit mask of the positions of each character, for _lcs_length."""
+    masks: Dict[str, int] = {}
+    for i, char in enumerate(text):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def _lcs_length(masks: Dict[str, int], length: int, text: str) -> int:
+    """
+    Length of the longest common subsequence of a string (given as _char_masks
+    and its length) and text, computed bit-parallel in O(len(text)) big-int steps.
+
+    SequenceMatcher's matching blocks form a common subsequence, so this is an
+    upper bound on their total size M.
+    """
+    full = (1 << length) - 1
+    v = full
+    for char in text:
+        u = v & masks.get(char, 0)
+        if u:
+            v = ((v + u) | (v - u)) & full
+    return length - v.bit_count()
+
+
+def _sliding_window_score(
+    quote_words: List[str],
+    beat_words: List[str],
+    floor: float = 0.0,
+    quote_masks: Optional[Dict[str, int]] = None,
+) -> Tuple[float, int]:
     """
     Slide windows of varying sizes across beat_words and return the best
     SequenceMatcher ratio and the index of the best-matching window start.
@@ -42,9 +166,17 @@ def _sliding_window_score(quote_words: List[str], beat_words: List[str]) -> Tupl
       - n+1, n+2  words       – catches paraphrases with extra filler words
       - n-1 words             – catches paraphrases that drop a word
 
+    Windows whose ratio cannot exceed max(floor, best so far) are skipped
+    without running SequenceMatcher: the ratio 2*M/T is bounded by the
+    window length and by the longest common subsequence with the quote.
+    Whenever the true best score is above floor the result is the same as
+    without pruning; otherwise only "<= floor" is guaranteed.
+
     Args:
         quote_words: Tokenised (lowercased) quote
         beat_words:  Tokenised (lowercased) beat text
+        floor:       Scores up to this value are not of interest to the caller
+        quote_masks: _char_masks of the joined quote (computed if omitted)
 
     Returns:
         (best_score, best_start_index)
@@ -55,16 +187,33 @@ def _sliding_window_score(quote_words: List[str], beat_words: List[str]) -> Tupl
         return 0.0, 0
 
     quote_str = " ".join(quote_words)
+    quote_len = len(quote_str)
+    if quote_masks is None:
+        quote_masks = _char_masks(quote_str)
+    # Character offsets of word starts (plus the end) for O(1) window lengths
+    offsets = [0]
+    for word in beat_words:
+        offsets.append(offsets[-1] + len(word) + 1)
+
     best_score = 0.0
     best_start = 0
+    matcher = SequenceMatcher(None, quote_str)
 
     # Try window sizes: exact n, then n±1, n+2
     for window_size in [n, n + 1, n + 2, max(1, n - 1)]:
         if window_size > m:
             window_size = m
         for i in range(m - window_size + 1):
+            bar = max(floor, best_score)
+            window_len = offsets[i + window_size] - offsets[i] - 1
+            total = quote_len + window_len
+            if 2.0 * min(quote_len, window_len) / total <= bar:
+                continue
             window = " ".join(beat_words[i:i + window_size])
-            score = SequenceMatcher(None, quote_str, window).ratio()
+            if 2.0 * _lcs_length(quote_masks, quote_len, window) / total <= bar:
+                continue
+            matcher.set_seq2(window)
+            score = matcher.ratio()
             if score > best_score:
                 best_score = score
                 best_start = i
@@ -95,6 +244,11 @@ def fuzzy_match_quote_to_beat(
        (recall-oriented; robust to paraphrases with inserted/dropped words).
     5. Whole-text ratio fallback – kept for short beats.
 
+    The beat texts come pre-normalized from a cached BeatMatchIndex. Beats
+    (and windows) whose upper-bound score cannot beat the current best or
+    reach the threshold are pruned before any SequenceMatcher work; the
+    result is the same as scoring every beat in full.
+
     The overlap guard (min_overlap) is a secondary precision check: after a
     candidate beat passes the similarity threshold, at least min_overlap
     fraction of the quote's content words (≥4 chars, punctuation stripped)
@@ -118,104 +272,133 @@ def fuzzy_match_quote_to_beat(
     # Guard: reject queries shorter than 2 words – single words (e.g. "Mia")
     # are verbatim substrings of almost every beat and would bypass the
     # threshold via the exact-match fast path without meaningful signal.
-    if len(quote_words) < 2:
+    if len(quote_words) < 2 or not beats:
         return None
 
-    best_match = None
-    best_score = 0.0
-    best_quote = None
+    index = get_match_index(beats)
 
-    for beat in beats:
-        content_normalized = " ".join(beat.text.lower().split())
-        beat_words = content_normalized.split()
-
-        # ── 1. Exact substring match ──────────────────────────────────────
-        if quote_normalized in content_normalized:
-            pattern = re.compile(re.escape(quote), re.IGNORECASE)
-            match = pattern.search(beat.text)
+    # ── 1. Exact substring match ──────────────────────────────────────────
+    for beat, text in zip(beats, index.texts):
+        if quote_normalized in text.normalized:
+            match = re.search(re.escape(quote), beat.text, re.IGNORECASE)
             if match:
                 return beat, match.group(0)
 
+    # ── 4. Token coverage score (all beats at once, via the inverted index) ─
+    # Recall-oriented: what fraction of the quote's content words (≥4
+    # chars) appear anywhere in the beat?  Punctuation is stripped from
+    # both sides so "davon," → "davon" and "sammeln." → "sammeln" match
+    # correctly.  The length filter is applied after stripping.
+    quote_content = [_NON_WORD.sub("", w) for w in quote_words]
+    quote_content = [w for w in quote_content if len(w) >= 4]
+    coverage = index.coverage(quote_content) if quote_content else [0.0] * len(beats)
+
+    quote_counts = Counter(quote_normalized)
+    quote_masks = _char_masks(quote_normalized)
+    quote_len = len(quote_normalized)
+    sorted_quote = " ".join(sorted(quote_words))
+    sorted_masks = None
+
+    best_position = None
+    best_score = 0.0
+    best_window_start = 0
+
+    def can_win(score: float, position: int) -> bool:
+        # Same winner as scoring beats in order and keeping the first strictly
+        # better one: highest score, ties go to the earlier beat
+        if score < threshold or score <= 0.0:
+            return False
+        return best_position is None or score > best_score or (score == best_score and position < best_position)
+
+    # Likely winners first (highest token coverage), so a high best score
+    # prunes most of the remaining beats and windows early
+    for position in sorted(range(len(beats)), key=lambda p: -coverage[p]):
+        text = index.texts[position]
+        total = quote_len + len(text.normalized)
+
+        # Upper bounds (SequenceMatcher ratio = 2*M/T, M <= common characters
+        # <= longest common subsequence). Windows are substrings of the beat,
+        # so they share at most `common` characters with the quote.
+        common = _shared_chars(quote_counts, text.char_counts)
+        if not can_win(max(coverage[position], 2.0 * common / (quote_len + common) if common else 0.0), position):
+            continue
+        common = _lcs_length(quote_masks, quote_len, text.normalized)
+        full_bound = 2.0 * common / total
+        window_bound = 2.0 * common / (quote_len + common) if common else 0.0
+        if not can_win(max(coverage[position], window_bound), position):
+            continue
+
         # ── 2. Sliding-window score ───────────────────────────────────────
         # Compares the quote against consecutive same-length windows of the
         # beat, avoiding score dilution from the rest of the beat text.
-        window_score, window_start = _sliding_window_score(quote_words, beat_words)
+        # Windows scoring at most `floor` cannot make this beat win.
+        floor = math.nextafter(threshold, -1.0)
+        if best_position is not None:
+            floor = max(floor, best_score if position > best_position else math.nextafter(best_score, -1.0))
+        window_score, window_start = _sliding_window_score(quote_words, text.words, floor, quote_masks)
+        score = max(coverage[position], window_score)
 
         # ── 3. Token-set score ────────────────────────────────────────────
         # Sort both token lists and compare – captures vocabulary overlap
         # even when the LLM reorders or rephrases words (e.g. paraphrases
         # where key nouns appear far apart in the beat text).
-        sorted_quote = " ".join(sorted(quote_words))
-        sorted_beat = " ".join(sorted(beat_words))
-        token_set_score = SequenceMatcher(None, sorted_quote, sorted_beat).ratio()
-
-        # ── 4. Token coverage score ───────────────────────────────────────
-        # Recall-oriented: what fraction of the quote's content words (≥4
-        # chars) appear anywhere in the beat?  Punctuation is stripped from
-        # both sides so "davon," → "davon" and "sammeln." → "sammeln" match
-        # correctly.  The length filter is applied after stripping.
-        quote_content = [re.sub(r"[^\w]", "", w) for w in quote_words]
-        quote_content = [w for w in quote_content if len(w) >= 4]
-        if quote_content:
-            beat_word_set = {re.sub(r"[^\w]", "", w) for w in beat_words}
-            beat_word_set = {w for w in beat_word_set if w}  # remove empty strings
-            matched_content = sum(1 for w in quote_content if w in beat_word_set)
-            token_coverage_score = matched_content / len(quote_content)
-        else:
-            token_coverage_score = 0.0
+        # Same characters and lengths as the whole-text comparison.
+        token_set_bound = 2.0 * _shared_chars(quote_counts, text.char_counts) / total
+        if can_win(token_set_bound, position) and token_set_bound > score:
+            if sorted_masks is None:
+                sorted_masks = _char_masks(sorted_quote)
+            token_set_bound = 2.0 * _lcs_length(sorted_masks, quote_len, text.sorted_text) / total
+            if can_win(token_set_bound, position) and token_set_bound > score:
+                score = max(score, SequenceMatcher(None, sorted_quote, text.sorted_text).ratio())
 
         # ── 5. Whole-text ratio (fallback for short beats) ────────────────
-        full_score = SequenceMatcher(None, quote_normalized, content_normalized).ratio()
-
-        score = max(window_score, token_set_score, token_coverage_score, full_score)
-
-        if score > best_score:
+        if can_win(full_bound, position) and full_bound > score:
+            score = max(score, SequenceMatcher(None, quote_normalized, text.normalized).ratio())
+
+        if can_win(score, position):
+            if not can_win(window_score, position):
+                # The window search was pruned below the winning score; the
+                # snippet still needs the exact best window position
+                window_score, window_start = _sliding_window_score(quote_words, text.words, 0.0, quote_masks)
+            best_position = position
             best_score = score
-            best_match = beat
-
-            # Build the matched-quote snippet from the best window position
-            n = len(quote_words)
-            end = min(window_start + n, len(beat_words))
-            window_text = " ".join(beat_words[window_start:end])
-
-            # Map back to original (non-lowercased) beat text via char offset
-            char_start = len(" ".join(beat_words[:window_start]))
-            if window_start > 0:
-                char_start += 1  # account for the space before the window
-            char_end = char_start + len(window_text)
-            best_quote = beat.text[char_start:char_end] or beat.text[:100]
-
-    # Pre-compute cross-beat entity frequency: entities that appear in more
-    # than one beat are too generic to anchor grounding (e.g. 'Himmel',
-    # 'Beeren', 'Morgens' appear in multiple beats).
-    from collections import Counter as _Counter
-    entity_frequency: _Counter = _Counter(
-        e.lower()
-        for b in beats
-        for e in (b.entities or [])
-        if len(e) >= 5
-    )
+            best_window_start = window_start
 
-    if best_score >= threshold and best_match:
-        # Entity-anchor guard: the winning beat must contain at least one
-        # entity (≥5 chars) that (a) is UNIQUE to that beat (appears in
-        # exactly 1 beat) and (b) appears in the quote text.
-        # Cross-beat entities like 'Himmel', 'Beeren', 'Morgens' are excluded
-        # because they are too generic to prove the response originated from
-        # this particular beat.
-        unique_beat_entities = {
-            e.lower()
-            for e in (best_match.entities or [])
-            if len(e) >= 5 and entity_frequency[e.lower()] == 1
-        }
-        quote_word_set = set(re.sub(r"[^\w]", " ", quote_normalized).split())
-        entity_hit = any(entity in quote_word_set for entity in unique_beat_entities)
-        if not entity_hit:
-            return None
+    if best_position is None:
+        return None
 
-        return best_match, best_quote or best_match.text[:100]
+    best_match = beats[best_position]
+    beat_words = index.texts[best_position].words
 
-    return None
+    # Build the matched-quote snippet from the best window position
+    n = len(quote_words)
+    end = min(best_window_start + n, len(beat_words))
+    window_text = " ".join(beat_words[best_window_start:end])
+
+    # Map back to original (non-lowercased) beat text via char offset
+    char_start = len(" ".join(beat_words[:best_window_start]))
+    if best_window_start > 0:
+        char_start += 1  # account for the space before the window
+    char_end = char_start + len(window_text)
+    best_quote = best_match.text[char_start:char_end] or best_match.text[:100]
+
+    # Entity-anchor guard: the winning beat must contain at least one
+    # entity (≥5 chars) that (a) is UNIQUE to that beat (appears in
+    # exactly 1 beat) and (b) appears in the quote text.
+    # Cross-beat entities like 'Himmel', 'Beeren', 'Morgens' are excluded
+    # because they are too generic to prove the response originated from
+    # this particular beat.
+    unique_beat_entities = {
+        e.lower()
+        for e in (best_match.entities or [])
+        if len(e) >= 5 and index.entity_frequency[e.lower()] == 1
+    }
+    quote_word_set = set(re.sub(r"[^\w]", " ", quote_normalized).split())
+    entity_hit = any(entity in quote_word_set for entity in unique_beat_entities)
+    if not entity_hit:
+        return None
+
+    return best_match, best_quote or best_match.text[:100]
 
 
 def extract_sentences(text: str) -> List[str]:
@@ -299,7 +482,8 @@ def build_output_contract(
     story_id: Optional[str] = None,
     chapter_id: Optional[str] = None,
     aufgaben: Optional[str] = None,
-    last_user_message: Optional[str] = None
+    last_user_message: Optional[str] = None,
+    prompt_version: Optional[str] = None
 ) -> ResponseContract:
     """
     Build an output contract from the response and available context.
@@ -314,6 +498,7 @@ def build_output_contract(
         chapter_id: Chapter identifier
         aufgaben: Task information from state
         last_user_message: The user's last message
+        prompt_version: Version of the prompts the response was generated with
 
     Returns:
         A validated ResponseContract Pydantic object.
@@ -413,9 +598,30 @@ def build_output_contract(
         task=task,
         grounding=grounding,
         confidence=round(confidence, 2),
+        prompt_version=prompt_version,
     )
 
     logger.info(f"Built output contract: {len(evidence_list)} evidence items, {len(claims_list)} claims, confidence={confidence:.2f}")
 
     return contract
 
+
+
+def compact_contract(contract: ResponseContract, message_id: Optional[str] = None) -> dict:
+    """
+    Compact, JSON-serializable form of a contract retained per turn in the state.
+
+    Keeps what batch validation needs (spoken text, grounding, answer type and
+    prompt version) and drops the task and unset fields.
+
+    Args:
+        contract: The built ResponseContract
+        message_id: Id of the AI message the contract belongs to
+
+    Returns:
+        Dict accepted by OutputContractValidator.validate_contract
+    """
+    compact = contract.model_dump(mode="json", exclude={"task", "confidence"}, exclude_none=True)
+    if message_id:
+        compact["message_id"] = message_id
+    return compact
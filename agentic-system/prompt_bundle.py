@@ -0,0 +1,116 @@
+"""
+Content-addressed prompt bundles.
+
+All prompts are published to S3 together as one gzip-compressed JSON object
+whose key contains the SHA-256 of its content, plus a small manifest that
+points at the current bundle:
+
+    <prefix>manifest.json                    {"version": ..., "bundle_key": ..., "prompt_keys": [...]}
+    <prefix>bundles/<version>.json.gz        {"format": 1, "prompts": {key: text, ...}}
+
+Bundle objects are immutable. Publishing uploads the new bundle first and
+then replaces the manifest in a single PUT, so a reader sees either the old
+or the new set of prompts, never a mix.
+"""
+import gzip
+import hashlib
+import json
+import time
+from typing import Dict, Optional
+
+BUNDLE_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def _canonical_json(prompts: Dict[str, str]) -> bytes:
+    return json.dumps(
+        {"format": BUNDLE_FORMAT, "prompts": prompts},
+        ensure_ascii=False, sort_keys=True, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def bundle_version(prompts: Dict[str, str]) -> str:
+    """Content hash identifying a set of prompts (first 16 hex chars of SHA-256)."""
+    return hashlib.sha256(_canonical_json(prompts)).hexdigest()[:16]
+
+
+def manifest_key(prefix: str) -> str:
+    """S3 key of the manifest under a prompts prefix."""
+    return f"{prefix}{MANIFEST_NAME}"
+
+
+def bundle_key(prefix: str, version: str) -> str:
+    """S3 key of the bundle object for a version."""
+    return f"{prefix}bundles/{version}.json.gz"
+
+
+def build_bundle(prompts: Dict[str, str], prefix: str) -> tuple[dict, bytes]:
+    """
+    Build the manifest and compressed bundle body for a set of prompts.
+
+    :param prompts: Prompt texts by repository key
+    :param prefix: S3 prompts prefix
+    :return: (manifest, gzip-compressed bundle body)
+    """
+    version = bundle_version(prompts)
+    # mtime=0 keeps the compressed bytes identical for identical prompts
+    body = gzip.compress(_canonical_json(prompts), mtime=0)
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": version,
+        "bundle_key": bundle_key(prefix, version),
+        "prompt_keys": sorted(prompts),
+        "published_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    return manifest, body
+
+
+def parse_manifest(data: bytes) -> dict:
+    """
+    Parse a manifest object.
+
+    :raises ValueError: If the manifest is malformed or has an unsupported format
+    """
+    manifest = json.loads(data.decode("utf-8"))
+    if manifest.get("format") != BUNDLE_FORMAT or not manifest.get("version") or not manifest.get("bundle_key"):
+        raise ValueError(f"Unsupported prompt manifest: {manifest!r:.200}")
+    return manifest
+
+
+def parse_bundle(data: bytes, expected_version: str) -> Dict[str, str]:
+    """
+    Decompress a bundle object and check it against its version.
+
+    :param data: Compressed bundle body
+    :param expected_version: Version from the manifest
+    :return: Prompt texts by repository key
+    :raises ValueError: If the content does not hash to expected_version
+    """
+    payload = json.loads(gzip.decompress(data).decode("utf-8"))
+    prompts = payload.get("prompts")
+    if payload.get("format") != BUNDLE_FORMAT or not isinstance(prompts, dict):
+        raise ValueError("Unsupported prompt bundle format")
+    if bundle_version(prompts) != expected_version:
+        raise ValueError(f"Prompt bundle content does not match version {expected_version}")
+    return prompts
+
+
+class PromptBundle:
+    """An active set of prompts loaded from S3, swapped in as a unit."""
+
+    __slots__ = ("version", "prompts", "manifest_etag", "fetched_at")
+
+    def __init__(self, version: str, prompts: Dict[str, str], manifest_etag: Optional[str], fetched_at: float):
+        self.version = version
+        self.prompts = prompts
+        self.manifest_etag = manifest_etag
+        self.fetched_at = fetched_at
+
+    @property
+    def age(self) -> float:
+        """Seconds since the manifest was last fetched or revalidated."""
+        return time.monotonic() - self.fetched_at
+
+    def revalidated(self, manifest_etag: Optional[str]) -> "PromptBundle":
+        """Same prompts, fresh timestamp (the manifest still points at this version)."""
+        return PromptBundle(self.version, self.prompts, manifest_etag or self.manifest_etag, time.monotonic())
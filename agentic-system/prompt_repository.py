@@ -4,10 +4,17 @@ Prompt Repository for managing dynamic prompt loading from AWS S3.
 This module implements the Repository pattern with caching for efficient
 and reliable prompt management. It supports both S3-based dynamic prompts
 and fallback to local hardcoded prompts.
+
+Prompts are published to S3 as one content-addressed bundle (see
+prompt_bundle.py); the repository loads the whole bundle and swaps it in as a
+unit, so all prompts served at any moment come from the same version.
 """
 import logging
+import threading
 import time
-from typing import Optional, Dict, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Optional, Dict, Callable, Tuple
 from pathlib import Path
 import sys
 
@@ -15,55 +22,36 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from backend.core.config import get_settings
+from prompt_bundle import PromptBundle, bundle_key, bundle_version, manifest_key, parse_bundle, parse_manifest
 
 # Use centralized logging configuration (will be setup by main.py)
 # This ensures logs go to CloudWatch when running in ECS
 logger = logging.getLogger(__name__)
 
 
-class PromptCache:
-    """Simple in-memory cache with TTL support."""
-
-    def __init__(self, ttl: int = 300):
-        """
-        Initialize the cache.
+class PromptSnapshot:
+    """
+    Immutable set of prompts pinned to a conversation.
 
-        :param ttl: Time-to-live in seconds (default: 5 minutes)
-        """
-        self._cache: Dict[str, tuple[str, float]] = {}
-        self._ttl = ttl
+    Captured once when the conversation is created, so every turn and every
+    background run of that conversation uses the same prompts, whatever is
+    published to S3 in the meantime.
+    """
 
-    def get(self, key: str) -> Optional[str]:
-        """
-        Get a value from cache if not expired.
+    __slots__ = ("version", "_prompts")
 
-        :param key: Cache key
-        :return: Cached value or None if expired/missing
-        """
-        if key in self._cache:
-            value, timestamp = self._cache[key]
-            if time.time() - timestamp < self._ttl:
-                logger.debug(f"Cache HIT for key: {key}")
-                return value
-            else:
-                logger.debug(f"Cache EXPIRED for key: {key}")
-                del self._cache[key]
-        return None
+    def __init__(self, version: str, prompts: Dict[str, str]):
+        self.version = version
+        self._prompts = MappingProxyType(dict(prompts))
 
-    def set(self, key: str, value: str) -> None:
-        """
-        Set a value in cache with current timestamp.
+    def __getitem__(self, prompt_key: str) -> str:
+        return self._prompts[prompt_key]
 
-        :param key: Cache key
-        :param value: Value to cache
-        """
-        self._cache[key] = (value, time.time())
-        logger.debug(f"Cache SET for key: {key}")
+    def __contains__(self, prompt_key: str) -> bool:
+        return prompt_key in self._prompts
 
-    def clear(self) -> None:
-        """Clear all cached values."""
-        self._cache.clear()
-        logger.info("Cache cleared")
+    def get(self, prompt_key: str, default: Optional[str] = None) -> Optional[str]:
+        return self._prompts.get(prompt_key, default)
 
 
 class PromptRepository:
@@ -71,28 +59,33 @@ class PromptRepository:
     Repository for managing prompt loading from S3 with fallback support.
 
     This class implements a singleton pattern and provides:
-    - Lazy loading from S3
-    - In-memory caching with TTL
-    - Automatic fallback to local prompts on errors
+    - Lazy loading of the prompt bundle from S3
+    - In-memory caching with TTL and stale-while-revalidate: once the bundle is
+      older than the TTL it is still served while one background refresh runs
+    - Conditional refreshes (If-None-Match on the manifest) so an unchanged
+      bundle costs a single 304 response
+    - Automatic fallback to local prompts on errors; a failed load (e.g. no bundle
+      published yet) is not retried for one TTL, so S3 is asked once per TTL
     - Graceful error handling
     """
 
     _instance: Optional['PromptRepository'] = None
 
-    # Prompt file names mapping
-    PROMPT_FILES = {
-        'speech_grammar_worker': 'speech_grammar_worker.txt',
-        'speech_comprehension_worker': 'speech_comprehension_worker.txt',
-        'sprachhandlung_analyse_worker': 'sprachhandlung_analyse_worker.txt',
-        'speech_vocabulary_worker': 'speech_vocabulary_worker.txt',
-        'boredom_worker': 'boredom_worker.txt',
-        'foerderfokus_worker': 'foerderfokus_worker.txt',
-        'aufgaben_worker': 'aufgaben_worker.txt',
-        'satzbau_analyse_worker': 'satzbau_analyse_worker.txt',
-        'satzbau_begrenzungs_worker': 'satzbau_begrenzungs_worker.txt',
-        'master_first_message': 'master_first_message.txt',
-        'master': 'master.txt',
-    }
+    # Prompts that are published in the S3 bundle
+    PROMPT_KEYS = (
+        'speech_grammar_worker',
+        'speech_comprehension_worker',
+        'sprachhandlung_analyse_worker',
+        'speech_vocabulary_worker',
+        'boredom_worker',
+        'foerderfokus_worker',
+        'aufgaben_worker',
+        'satzbau_analyse_worker',
+        'satzbau_begrenzungs_worker',
+        'history_summary_worker',
+        'master_first_message',
+        'master',
+    )
 
     def __new__(cls):
         """Implement singleton pattern."""
@@ -107,9 +100,34 @@ class PromptRepository:
             return
 
         self._settings = get_settings()
-        self._cache = PromptCache(ttl=self._settings.prompts_cache_ttl)
+        self._ttl = self._settings.prompts_cache_ttl
         self._s3_client = None
-        self._fallback_prompts: Dict[str, Callable[[], str]] = {}
+        self._fallback_prompts: Dict[str, Callable[[], str]] = dict(_fallbacks)
+        self._local_version: Optional[str] = None
+        # Snapshots handed out by version (versions are content hashes, so there are few)
+        self._snapshots: Dict[str, PromptSnapshot] = {}
+
+        # Active bundle; replaced as a whole, never mutated
+        self._bundle: Optional[PromptBundle] = None
+        # time.monotonic() of the last failed bundle load; no new load is attempted for one TTL
+        self._failed_at: Optional[float] = None
+        # Single-flight: at most one bundle load at a time
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._refresh: Optional[Future] = None
+        self._refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prompt-refresh")
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "s3_requests": 0,
+            "not_modified": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "bundle_swaps": 0,
+            "failed_loads": 0,
+            "skipped_loads": 0,
+        }
         self._initialized = True
 
         logger.info(f"PromptRepository initialized with USE_S3_PROMPTS={self._settings.use_s3_prompts}")
@@ -152,43 +170,128 @@ class PromptRepository:
             logger.error(f"Failed to initialize S3 client: {e}")
             return None
 
-    def _fetch_from_s3(self, prompt_key: str) -> Optional[str]:
+    def _get_object(self, s3_key: str, etag: Optional[str] = None) -> Optional[Tuple[Optional[bytes], Optional[str]]]:
         """
-        Fetch a prompt from S3.
+        GET an object from the prompts bucket.
 
-        :param prompt_key: Key identifying the prompt
-        :return: Prompt content or None on error
+        :param s3_key: Object key
+        :param etag: ETag of the cached copy; S3 answers 304 if the object is unchanged
+        :return: (body, etag), (None, etag) if not modified, or None on error
         """
         s3_client = self._get_s3_client()
         if s3_client is None:
             return None
 
-        if prompt_key not in self.PROMPT_FILES:
-            logger.error(f"Unknown prompt key: {prompt_key}")
+        request = {"Bucket": self._settings.aws_s3_bucket_name, "Key": s3_key}
+        if etag:
+            request["IfNoneMatch"] = etag
+
+        try:
+            logger.info(f"Fetching from S3: s3://{self._settings.aws_s3_bucket_name}/{s3_key}")
+            self._count("s3_requests")
+            response = s3_client.get_object(**request)
+            return response['Body'].read(), response.get('ETag')
+
+        except s3_client.exceptions.NoSuchKey:
+            logger.error(f"Object not found in S3: {s3_key}")
+            return None
+        except Exception as e:
+            if _is_not_modified(e):
+                logger.debug(f"Unchanged in S3: {s3_key}")
+                self._count("not_modified")
+                return None, etag
+            logger.error(f"Error fetching from S3: {e}")
             return None
 
-        file_name = self.PROMPT_FILES[prompt_key]
-        s3_key = f"{self._settings.aws_s3_prompts_prefix}{file_name}"
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self._stats[stat] += 1
 
-        try:
-            logger.info(f"Fetching prompt from S3: s3://{self._settings.aws_s3_bucket_name}/{s3_key}")
+    def _load_bundle(self, conditional: bool = True) -> Optional[PromptBundle]:
+        """
+        Load the current prompt bundle from S3 and make it the active bundle.
 
-            response = s3_client.get_object(
-                Bucket=self._settings.aws_s3_bucket_name,
-                Key=s3_key
-            )
+        Reads the manifest (conditionally, with the cached ETag) and downloads
+        the bundle object only when the manifest points at a new version.
 
-            content = response['Body'].read().decode('utf-8')
-            logger.info(f"Successfully fetched prompt from S3: {prompt_key} ({len(content)} bytes)")
-            return content
+        :param conditional: Skip the load if the active bundle is fresh and revalidate via ETag;
+            also skip it within one TTL of a failed load
+        :return: The active bundle, or None if S3 failed
+        """
+        with self._load_lock:
+            current = self._bundle
+            # Another thread loaded the bundle while we waited for the lock
+            if conditional and current is not None and current.age < self._ttl:
+                return current
+            if conditional and self._in_backoff():
+                self._count("skipped_loads")
+                return current
+
+            bundle = self._fetch_bundle(current if conditional else None)
+            if bundle is None:
+                self._failed_at = time.monotonic()
+                self._count("failed_loads")
+                return None
+            self._failed_at = None
+            self._bundle = bundle
+            return bundle
 
-        except s3_client.exceptions.NoSuchKey:
-            logger.error(f"Prompt file not found in S3: {s3_key}")
+    def _in_backoff(self) -> bool:
+        """Whether the last bundle load failed less than one TTL ago."""
+        failed_at = self._failed_at
+        return failed_at is not None and time.monotonic() - failed_at < self._ttl
+
+    def _fetch_bundle(self, current: Optional[PromptBundle]) -> Optional[PromptBundle]:
+        """
+        Fetch the bundle the manifest points at.
+
+        :param current: Active bundle to revalidate via ETag, or None to fetch unconditionally
+        :return: The new or revalidated bundle, or None if S3 failed
+        """
+        prefix = self._settings.aws_s3_prompts_prefix
+        etag = current.manifest_etag if current is not None else None
+        result = self._get_object(manifest_key(prefix), etag=etag)
+        if result is None:
             return None
-        except Exception as e:
-            logger.error(f"Error fetching prompt from S3: {e}")
+        manifest_data, manifest_etag = result
+        if manifest_data is None:
+            return current.revalidated(manifest_etag)
+
+        try:
+            manifest = parse_manifest(manifest_data)
+            if current is not None and manifest["version"] == current.version:
+                return current.revalidated(manifest_etag)
+
+            bundle_result = self._get_object(manifest["bundle_key"])
+            if bundle_result is None:
+                return None
+            prompts = parse_bundle(bundle_result[0], manifest["version"])
+        except ValueError as e:
+            logger.error(f"Invalid prompt bundle in S3: {e}")
             return None
 
+        self._count("bundle_swaps")
+        logger.info(f"Activated prompt bundle {manifest['version']} ({len(prompts)} prompts)")
+        return PromptBundle(manifest["version"], prompts, manifest_etag, time.monotonic())
+
+    def _schedule_refresh(self) -> None:
+        """Refresh the stale bundle in the background unless a refresh is already running."""
+        with self._stats_lock:
+            if self._refresh is not None or self._in_backoff():
+                return
+            self._stats["refreshes"] += 1
+            self._refresh = self._refresh_executor.submit(self._run_refresh)
+
+    def _run_refresh(self) -> None:
+        try:
+            if self._load_bundle() is None:
+                # Keep serving the stale bundle; the next request schedules another refresh
+                logger.warning("Background refresh failed, serving stale prompt bundle")
+                self._count("refresh_failures")
+        finally:
+            with self._stats_lock:
+                self._refresh = None
+
     def register_fallback(self, prompt_key: str, fallback_func: Callable[[], str]) -> None:
         """
         Register a fallback function for a prompt.
@@ -197,56 +300,155 @@ class PromptRepository:
         :param fallback_func: Function that returns the fallback prompt
         """
         self._fallback_prompts[prompt_key] = fallback_func
+        self._local_version = None
         logger.debug(f"Registered fallback for: {prompt_key}")
 
     def get_prompt(self, prompt_key: str) -> str:
         """
-        Get a prompt, trying S3 first, then cache, then fallback.
+        Get a prompt, trying the cached bundle first, then S3, then fallback.
+
+        A bundle past its TTL is used as is and refreshed in the background,
+        so only the first request waits for S3.
 
         :param prompt_key: Key identifying the prompt
         :return: Prompt content
         :raises ValueError: If prompt not found and no fallback registered
         """
-        # Try cache first
-        cached = self._cache.get(prompt_key)
-        if cached is not None:
-            return cached
+        bundle = self._bundle
+        if bundle is not None:
+            if bundle.age < self._ttl:
+                self._count("hits")
+            else:
+                self._count("stale_hits")
+                self._schedule_refresh()
+        elif self._settings.use_s3_prompts:
+            self._count("misses")
+            bundle = self._load_bundle()
+            if bundle is None:
+                logger.warning(f"Failed to fetch from S3, trying fallback for: {prompt_key}")
 
-        # Try S3 if enabled
-        if self._settings.use_s3_prompts:
-            s3_content = self._fetch_from_s3(prompt_key)
-            if s3_content is not None:
-                self._cache.set(prompt_key, s3_content)
-                return s3_content
-            logger.warning(f"Failed to fetch from S3, trying fallback for: {prompt_key}")
+        if bundle is not None and prompt_key in bundle.prompts:
+            return bundle.prompts[prompt_key]
 
         # Fall back to local prompt
         if prompt_key in self._fallback_prompts:
             logger.info(f"Using fallback prompt for: {prompt_key}")
-            fallback_content = self._fallback_prompts[prompt_key]()
-            # Don't cache fallback to allow S3 recovery on next request
-            return fallback_content
+            # Not cached, so S3 recovery is picked up on the next request
+            return self._fallback_prompts[prompt_key]()
 
         raise ValueError(f"Prompt not found and no fallback registered: {prompt_key}")
 
+    def get_bundle_version(self) -> str:
+        """
+        Get the version of the prompts currently served.
+
+        :return: The active S3 bundle version, or "local-<hash>" when serving local fallbacks
+        """
+        bundle = self._bundle
+        if bundle is not None:
+            return bundle.version
+        if self._local_version is None:
+            self._local_version = f"local-{bundle_version(self.get_local_prompts())}"
+        return self._local_version
+
+    def get_snapshot(self, version: Optional[str] = None) -> PromptSnapshot:
+        """
+        Get an immutable snapshot of all bundled prompts.
+
+        :param version: Pin to this version (e.g. when restoring a conversation); a
+            published S3 bundle version is fetched by its content-addressed key if
+            needed. When None or no longer available, the current prompts are used.
+        :return: PromptSnapshot with every key in PROMPT_KEYS that has content
+        """
+        if version is not None:
+            snapshot = self._snapshots.get(version) or self._load_snapshot_version(version)
+            if snapshot is not None:
+                return snapshot
+            logger.warning(f"Prompt version {version} is not available, pinning the current prompts")
+
+        bundle = self._bundle
+        if bundle is None and self._settings.use_s3_prompts:
+            self._count("misses")
+            bundle = self._load_bundle()
+        elif bundle is not None and bundle.age >= self._ttl:
+            self._schedule_refresh()
+
+        prompts = dict(bundle.prompts) if bundle is not None else {}
+        prompts = {key: prompts[key] for key in self.PROMPT_KEYS if key in prompts}
+        from_bundle = len(prompts)
+        for key in self.PROMPT_KEYS:
+            if key not in prompts and key in self._fallback_prompts:
+                prompts[key] = self._fallback_prompts[key]()
+
+        if bundle is None:
+            version = f"local-{bundle_version(prompts)}"
+        elif from_bundle == len(self.PROMPT_KEYS):
+            version = bundle.version
+        else:
+            # Bundle without some prompts; the rest comes from the local fallbacks
+            version = f"{bundle.version}+local-{bundle_version(prompts)}"
+        return self._register_snapshot(PromptSnapshot(version, prompts))
+
+    def _load_snapshot_version(self, version: str) -> Optional[PromptSnapshot]:
+        """Fetch a published bundle by version (bundles are immutable, so old versions stay loadable)."""
+        if not self._settings.use_s3_prompts or version.startswith("local-") or "+" in version:
+            return None
+        result = self._get_object(bundle_key(self._settings.aws_s3_prompts_prefix, version))
+        if result is None or result[0] is None:
+            return None
+        try:
+            prompts = parse_bundle(result[0], version)
+        except ValueError as e:
+            logger.error(f"Invalid prompt bundle {version} in S3: {e}")
+            return None
+        return self._register_snapshot(PromptSnapshot(version, prompts))
+
+    def _register_snapshot(self, snapshot: PromptSnapshot) -> PromptSnapshot:
+        with self._stats_lock:
+            return self._snapshots.setdefault(snapshot.version, snapshot)
+
+    def get_local_prompts(self) -> Dict[str, str]:
+        """
+        Get the local fallback texts of all bundled prompts (what upload_prompts_to_s3.py publishes).
+
+        :return: Prompt texts by key, for every key in PROMPT_KEYS with a registered fallback
+        """
+        return {key: self._fallback_prompts[key]() for key in self.PROMPT_KEYS if key in self._fallback_prompts}
+
+    def get_stats(self) -> dict:
+        """
+        Get prompt cache counters.
+
+        :return: Dict with fresh/stale hits, misses, S3 requests, 304 responses, refreshes, failed and
+            skipped (backoff) loads and the active version
+        """
+        with self._stats_lock:
+            return {
+                **self._stats,
+                "refreshing": self._refresh is not None,
+                "bundle_version": self.get_bundle_version(),
+            }
+
     def clear_cache(self) -> None:
-        """Clear the prompt cache."""
-        self._cache.clear()
+        """Drop the active bundle; the next request loads it again."""
+        with self._load_lock:
+            self._bundle = None
+            self._failed_at = None
+        logger.info("Prompt bundle cache cleared")
 
     def reload_prompt(self, prompt_key: str) -> str:
         """
-        Force reload a prompt from S3, bypassing cache.
+        Force reload the prompt bundle from S3, bypassing cache.
 
         :param prompt_key: Key identifying the prompt
         :return: Fresh prompt content
         """
-        logger.info(f"Force reloading prompt: {prompt_key}")
+        logger.info(f"Force reloading prompt bundle for: {prompt_key}")
 
         if self._settings.use_s3_prompts:
-            s3_content = self._fetch_from_s3(prompt_key)
-            if s3_content is not None:
-                self._cache.set(prompt_key, s3_content)
-                return s3_content
+            bundle = self._load_bundle(conditional=False)
+            if bundle is not None and prompt_key in bundle.prompts:
+                return bundle.prompts[prompt_key]
 
         # Fall back if S3 fails
         if prompt_key in self._fallback_prompts:
@@ -255,10 +457,36 @@ class PromptRepository:
         raise ValueError(f"Prompt not found: {prompt_key}")
 
 
-# Global repository instance
-_repository = PromptRepository()
+def _is_not_modified(error: Exception) -> bool:
+    """Whether a botocore error is S3's 304 answer to a conditional GET."""
+    response = getattr(error, "response", None) or {}
+    code = str(response.get("Error", {}).get("Code", ""))
+    status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return code in ("304", "NotModified") or status == 304
+
+
+# Global repository instance, created on first use
+_repository: Optional[PromptRepository] = None
+
+# Fallback prompts registered by prompts.py at import; copied into the repository when it is created
+_fallbacks: Dict[str, Callable[[], str]] = {}
+
+
+def register_fallback(prompt_key: str, fallback_func: Callable[[], str]) -> None:
+    """
+    Register a fallback prompt without creating the repository.
+
+    :param prompt_key: Key identifying the prompt
+    :param fallback_func: Function that returns the fallback prompt
+    """
+    _fallbacks[prompt_key] = fallback_func
+    if PromptRepository._instance is not None and PromptRepository._instance._initialized:
+        PromptRepository._instance.register_fallback(prompt_key, fallback_func)
 
 
 def get_prompt_repository() -> PromptRepository:
     """Get the global prompt repository instance."""
+    global _repository
+    if _repository is None:
+        _repository = PromptRepository()
     return _repository
@@ -2,46 +2,40 @@
 Worker prompts for the agentic system.
 This module now supports dynamic loading from AWS S3 with fallback to local prompts.
 """
-from prompt_repository import get_prompt_repository
-from local_fallback_prompts import (
-    audio_book,
-    child_profile,
-    speechGrammarWorker_prompt,
-    speech_comprehension_worker_prompt,
-    sprachhandlung_analyse_worker_prompt,
-    speechVocabularyWorker_prompt,
-    boredomWorker_prompt,
-    foerderfokusWorker_prompt,
-    aufgabenWorker_prompt,
-    satzbau_analyse_worker_prompt,
-    satzbau_begrenzungs_worker_prompt,
-    master_prompt,
-    master_first_message_prompt
-)
+import importlib
 
+from prompt_repository import get_prompt_repository, register_fallback
+
+
+def _local(name: str):
+    """
+    Fallback for one prompt from local_fallback_prompts.
+
+    The module (large prompt texts) is imported on first use only, so processes
+    that serve prompts from the S3 bundle never load it.
+    """
+    return lambda: getattr(importlib.import_module("local_fallback_prompts"), name)
 
 
 # ============================================================================
-# REPOSITORY INITIALIZATION
-# Register fallback prompts with the repository
+# FALLBACK REGISTRATION
+# Registered without creating the repository; it is created on the first prompt lookup
 # ============================================================================
 
-_repository = get_prompt_repository()
-
-# Register all fallback prompts
-_repository.register_fallback('audio_book', lambda: audio_book)
-_repository.register_fallback('child_profile', lambda: child_profile)
-_repository.register_fallback('speech_grammar_worker', lambda: speechGrammarWorker_prompt)
-_repository.register_fallback('speech_comprehension_worker', lambda: speech_comprehension_worker_prompt)
-_repository.register_fallback('sprachhandlung_analyse_worker', lambda: sprachhandlung_analyse_worker_prompt)
-_repository.register_fallback('speech_vocabulary_worker', lambda: speechVocabularyWorker_prompt)
-_repository.register_fallback('boredom_worker', lambda: boredomWorker_prompt)
-_repository.register_fallback('foerderfokus_worker', lambda: foerderfokusWorker_prompt)
-_repository.register_fallback('aufgaben_worker', lambda: aufgabenWorker_prompt)
-_repository.register_fallback('satzbau_analyse_worker', lambda: satzbau_analyse_worker_prompt)
-_repository.register_fallback('satzbau_begrenzungs_worker', lambda: satzbau_begrenzungs_worker_prompt)
-_repository.register_fallback('master', lambda: master_prompt)
-_repository.register_fallback('master_first_message', lambda: master_first_message_prompt)
+register_fallback('audio_book', _local('audio_book'))
+register_fallback('child_profile', _local('child_profile'))
+register_fallback('speech_grammar_worker', _local('speechGrammarWorker_prompt'))
+register_fallback('speech_comprehension_worker', _local('speech_comprehension_worker_prompt'))
+register_fallback('sprachhandlung_analyse_worker', _local('sprachhandlung_analyse_worker_prompt'))
+register_fallback('speech_vocabulary_worker', _local('speechVocabularyWorker_prompt'))
+register_fallback('boredom_worker', _local('boredomWorker_prompt'))
+register_fallback('foerderfokus_worker', _local('foerderfokusWorker_prompt'))
+register_fallback('aufgaben_worker', _local('aufgabenWorker_prompt'))
+register_fallback('satzbau_analyse_worker', _local('satzbau_analyse_worker_prompt'))
+register_fallback('satzbau_begrenzungs_worker', _local('satzbau_begrenzungs_worker_prompt'))
+register_fallback('history_summary_worker', _local('history_summary_worker_prompt'))
+register_fallback('master', _local('master_prompt'))
+register_fallback('master_first_message', _local('master_first_message_prompt'))
 
 
 # ============================================================================
@@ -55,7 +49,7 @@ def getAudioBook() -> str:
 
     :return: Prompt content
     """
-    return _repository.get_prompt('audio_book')
+    return get_prompt_repository().get_prompt('audio_book')
 
 def getChildProfile() -> str:
     """
@@ -64,7 +58,7 @@ def getChildProfile() -> str:
 
     :return: Prompt content
     """
-    return _repository.get_prompt('child_profile')
+    return get_prompt_repository().get_prompt('child_profile')
 
 def getSpeechGrammarWorker_prompt() -> str:
     """
@@ -73,7 +67,7 @@ def getSpeechGrammarWorker_prompt() -> str:
 
     :return: Prompt content
     """
-    return _repository.get_prompt('speech_grammar_worker')
+    return get_prompt_repository().get_prompt('speech_grammar_worker')
 
 def getSpeechComprehensionWorker_prompt() -> str:
     """
@@ -82,7 +76,7 @@ def getSpeechComprehensionWorker_prompt() -> str:
 
     :return: Prompt content
     """
-    return _repository.get_prompt('speech_comprehension_worker')
+    return get_prompt_repository().get_prompt('speech_comprehension_worker')
 
 def getSprachhandlungAnalyseWorker_prompt() -> str:
     """
@@ -91,7 +85,7 @@ def getSprachhandlungAnalyseWorker_prompt() -> str:
 
     :return: Prompt content
     """
-    return _repository.get_prompt('sprachhandlung_analyse_worker')
+    return get_prompt_repository().get_prompt('sprachhandlung_analyse_worker')
 
 def getSpeechVocabularyWorker_prompt() -> str:
     """
@@ -100,7 +94,7 @@ def getSpeechVocabularyWorker_prompt() -> str:
 
     :return: Prompt content
     """
-    return _repository.get_prompt('speech_vocabulary_worker')
+    return get_prompt_repository().get_prompt('speech_vocabulary_worker')
 
 def getBoredomWorker_prompt() -> str:
     """
@@ -109,7 +103,7 @@ def getBoredomWorker_prompt() -> str:
 
     :return: Prompt content
     """
-    return _repository.get_prompt('boredom_worker')
+    return get_prompt_repository().get_prompt('boredom_worker')
 
 def getFoerderfokusWorker_prompt() -> str:
     """
@@ -118,7 +112,7 @@ def getFoerderfokusWorker_prompt() -> str:
 
     :return: Prompt content
     """
-    return _repository.get_prompt('foerderfokus_worker')
+    return get_prompt_repository().get_prompt('foerderfokus_worker')
 
 def getAufgabenWorker_prompt() -> str:
     """
@@ -127,7 +121,7 @@ def getAufgabenWorker_prompt() -> str:
 
     :return: Prompt content
     """
-    return _repository.get_prompt('aufgaben_worker')
+    return get_prompt_repository().get_prompt('aufgaben_worker')
 
 def getSatzbauAnalyseWorker_prompt() -> str:
     """
@@ -136,7 +130,7 @@ def getSatzbauAnalyseWorker_prompt() -> str:
 
     :return: Prompt content
     """
-    return _repository.get_prompt('satzbau_analyse_worker')
+    return get_prompt_repository().get_prompt('satzbau_analyse_worker')
 
 def getSatzbauBegrenzungsWorker_prompt() -> str:
     """
@@ -145,7 +139,16 @@ def getSatzbauBegrenzungsWorker_prompt() -> str:
 
     :return: Prompt content
     """
-    return _repository.get_prompt('satzbau_begrenzungs_worker')
+    return get_prompt_repository().get_prompt('satzbau_begrenzungs_worker')
+
+def getHistorySummaryWorker_prompt() -> str:
+    """
+    Get the History Summary Worker prompt.
+    Tries S3 first, falls back to local prompt if unavailable.
+
+    :return: Prompt content
+    """
+    return get_prompt_repository().get_prompt('history_summary_worker')
 
 
 def getMasterPrompt() -> str:
@@ -155,7 +158,7 @@ def getMasterPrompt() -> str:
 
     :return: Prompt content
     """
-    return _repository.get_prompt('master')
+    return get_prompt_repository().get_prompt('master')
 
 
 def getMasterFirstMessagePrompt() -> str:
@@ -165,5 +168,5 @@ def getMasterFirstMessagePrompt() -> str:
 
     :return: Prompt content
     """
-    return _repository.get_prompt('master_first_message')
+    return get_prompt_repository().get_prompt('master_first_message')
 
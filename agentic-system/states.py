@@ -1,6 +1,7 @@
 """
 State definitions for the Lingolino application.
 """
+import operator
 import sys
 import os
 from typing import Annotated, Optional
@@ -15,6 +16,11 @@ if _project_root not in sys.path:
 from backend.models.output_contract import ResponseContract
 
 
+def _merge_dicts(current: Optional[dict], update: Optional[dict]) -> dict:
+    """Reducer merging per-key entries written by parallel nodes."""
+    return {**(current or {}), **(update or {})}
+
+
 class State(TypedDict):
     """Main state for the immediate response graph."""
     # Messages have the type "list". The `add_messages` function
@@ -47,8 +53,13 @@ class State(TypedDict):
     covered_beat_ids: Optional[list]  # Cumulative set of beat IDs discussed so far
     story_near_end: Optional[bool]  # Whether conversation has reached final beats
 
+    # Rolling summary of the messages before masterChatbot's history window (from the background graph)
+    history_summary: Optional[str]
+    history_summarized_count: Optional[int]  # Number of leading messages folded into history_summary
+
     # Output Contract fields
     response_contract: Optional[ResponseContract]  # Structured output contract for validation
+    response_contracts: Annotated[list, operator.add]  # Compact contract of every turn (batch validation)
 
 
 class BackgroundState(TypedDict):
@@ -81,3 +92,15 @@ class BackgroundState(TypedDict):
     covered_beat_ids: Optional[list]
     story_near_end: Optional[bool]
 
+    # Rolling summary of the immediate conversation before masterChatbot's history window
+    history_summary: Optional[str]
+    history_summarized_count: Optional[int]
+
+    # Worker scheduling (see worker_scheduler.py and incremental_analysis.py)
+    analysis_signals: Optional[list]  # Conversation heuristics that fired (set by loadTranscript)
+    scheduled_workers: Optional[list]  # Workers running in the current run (set by scheduleWorkers)
+    # Per scheduled worker: its planned entry for the current run (set by scheduleWorkers)
+    analysis_plans: Optional[dict]
+    # Per worker: turn, watermark, delta_start and runs_since_full of its last successful run.
+    # Each worker merges in its own entry once its analysis is written
+    analysis_watermarks: Annotated[Optional[dict], _merge_dicts]
@@ -0,0 +1,196 @@
+"""
+Per-conversation transcript cache for the background workers.
+
+The background workers all put the same "type: content" transcript of the
+immediate conversation into their prompts. Instead of fetching the immediate
+graph's checkpoint and joining the whole history in every worker, the
+background graph snapshots the history once per run (loadTranscript node) and
+the cache appends only the messages that arrived since the previous run. The
+workers then read the cached transcript.
+
+If the history no longer extends the cached one (messages removed or
+rewritten), the transcript is rebuilt from scratch.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def format_transcript_line(message) -> str:
+    """Format one message the way the worker prompts expect it."""
+    return f"{message.type}: {message.content}"
+
+
+def _fingerprint(message) -> tuple:
+    return (getattr(message, "id", None), message.type, message.content)
+
+
+class Transcript:
+    """
+    Immutable transcript snapshot of a conversation.
+
+    line_starts holds the offset of each message's line in text and turn_starts
+    the indexes of the human messages, so parts of the transcript can be cut out
+    without the messages.
+    """
+
+    __slots__ = ("text", "message_count", "last_fingerprint", "line_starts", "turn_starts")
+
+    def __init__(
+        self,
+        text: str,
+        message_count: int,
+        last_fingerprint: Optional[tuple],
+        line_starts: tuple = (),
+        turn_starts: tuple = (),
+    ):
+        self.text = text
+        self.message_count = message_count
+        self.last_fingerprint = last_fingerprint
+        self.line_starts = line_starts
+        self.turn_starts = turn_starts
+
+    def lines(self, start: int, end: int) -> str:
+        """Transcript lines of messages[start:end]."""
+        end = min(end, self.message_count)
+        if start >= end:
+            return ""
+        text_end = self.line_starts[end] - 1 if end < self.message_count else len(self.text)
+        return self.text[self.line_starts[start]:text_end]
+
+
+EMPTY_TRANSCRIPT = Transcript("", 0, None)
+
+
+class TranscriptCache:
+    """
+    LRU cache of conversation transcripts, keyed by the immediate thread_id.
+
+    Usage:
+        cache.update("conv_1", messages)   # once per background run
+        cache.get("conv_1").text           # in every worker
+    """
+
+    def __init__(self, max_conversations: int = 2000):
+        self.max_conversations = max(1, max_conversations)
+        self._transcripts: "OrderedDict[str, Transcript]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._updates = 0
+        self._appended_messages = 0
+        self._rebuilds = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def update(self, conversation_id: str, messages: list) -> Transcript:
+        """
+        Bring the cached transcript in line with the current message history.
+
+        :param conversation_id: Immediate graph thread_id
+        :param messages: Full message history of the conversation
+        :return: The updated transcript snapshot
+        """
+        with self._lock:
+            self._updates += 1
+            cached = self._transcripts.get(conversation_id)
+            if cached is not None and self._extends(cached, messages):
+                transcript = self._append(cached, messages)
+            else:
+                if cached is not None:
+                    self._rebuilds += 1
+                transcript = self._append(EMPTY_TRANSCRIPT, messages)
+
+            self._transcripts[conversation_id] = transcript
+            self._transcripts.move_to_end(conversation_id)
+            while len(self._transcripts) > self.max_conversations:
+                evicted_id, _ = self._transcripts.popitem(last=False)
+                self._evictions += 1
+                logger.debug(f"Evicted transcript for {evicted_id}")
+            return transcript
+
+    def get(self, conversation_id: str) -> Optional[Transcript]:
+        """
+        Get the cached transcript snapshot.
+
+        :param conversation_id: Immediate graph thread_id
+        :return: Transcript, or None if the conversation is not cached
+        """
+        with self._lock:
+            transcript = self._transcripts.get(conversation_id)
+            if transcript is None:
+                self._misses += 1
+                return None
+            self._transcripts.move_to_end(conversation_id)
+            self._hits += 1
+            return transcript
+
+    def discard(self, conversation_id: str) -> bool:
+        """Drop a conversation's transcript (e.g. when the conversation is deleted)."""
+        with self._lock:
+            return self._transcripts.pop(conversation_id, None) is not None
+
+    def get_stats(self) -> dict:
+        """
+        Get cache counters.
+
+        :return: Dict with update/append/rebuild counts, read hits and misses, and current size
+        """
+        with self._lock:
+            return {
+                "updates": self._updates,
+                "appended_messages": self._appended_messages,
+                "rebuilds": self._rebuilds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "size": len(self._transcripts),
+                "capacity": self.max_conversations,
+            }
+
+    @staticmethod
+    def _extends(cached: Transcript, messages: list) -> bool:
+        # The new history must start with the messages the cached transcript was built from
+        if cached.message_count > len(messages):
+            return False
+        if cached.message_count == 0:
+            return True
+        return _fingerprint(messages[cached.message_count - 1]) == cached.last_fingerprint
+
+    def _append(self, cached: Transcript, messages: list) -> Transcript:
+        new_messages = messages[cached.message_count:]
+        if not new_messages:
+            return cached
+        self._appended_messages += len(new_messages)
+        lines = [format_transcript_line(msg) for msg in new_messages]
+        new_text = "\n".join(lines)
+        offset = len(cached.text) + 1 if cached.message_count else 0
+        line_starts = []
+        for line in lines:
+            line_starts.append(offset)
+            offset += len(line) + 1
+        text = f"{cached.text}\n{new_text}" if cached.message_count else new_text
+        turn_starts = tuple(i for i, msg in enumerate(new_messages, start=cached.message_count) if msg.type == "human")
+        return Transcript(
+            text, len(messages), _fingerprint(messages[-1]),
+            cached.line_starts + tuple(line_starts), cached.turn_starts + turn_starts,
+        )
+
+
+_cache = TranscriptCache()
+
+
+def configure_transcript_cache(max_conversations: int) -> TranscriptCache:
+    """Replace the process-wide transcript cache (call once at startup, before graphs run)."""
+    global _cache
+    _cache = TranscriptCache(max_conversations)
+    logger.info(f"Transcript cache configured: max_conversations={max_conversations}")
+    return _cache
+
+
+def get_transcript_cache() -> TranscriptCache:
+    """Get the process-wide transcript cache."""
+    return _cache
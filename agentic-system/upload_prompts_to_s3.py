@@ -1,28 +1,31 @@
 #!/usr/bin/env python3
 """
-Utility script for uploading worker prompts to AWS S3.
+Utility script for publishing the prompts to AWS S3.
 
-This script can be used by administrators to upload or update prompt files
-in the S3 bucket. It can be integrated into an admin UI for prompt management.
+This script can be used by administrators to upload or update the prompts
+in the S3 bucket. All prompts are published together as one versioned bundle
+(see prompt_bundle.py). It can be integrated into an admin UI for prompt management.
 
 Usage:
-    python upload_prompts_to_s3.py [--prompt-type TYPE] [--dry-run]
+    python upload_prompts_to_s3.py [--dry-run] [--list]
 
 Examples:
-    # Upload all prompts
+    # Publish all prompts as a new bundle
     python upload_prompts_to_s3.py
 
-    # Upload specific prompt
-    python upload_prompts_to_s3.py --prompt-type speech_vocabulary_worker
-
     # Dry run to see what would be uploaded
     python upload_prompts_to_s3.py --dry-run
 """
 import sys
 import argparse
+import json
 import logging
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from prompt_bundle import build_bundle, manifest_key
 
 # Configure logging
 logging.basicConfig(
@@ -41,27 +44,7 @@ S3_REGION = "eu-central-1"
 
 
 class PromptUploader:
-    """Handles uploading prompts to S3."""
-
-    # Map prompt types to their local content
-    PROMPTS = {
-        'speech_vocabulary_worker': None,
-        'speech_grammar_worker': None,
-        'speech_interaction_worker': None,
-        'speech_comprehension_worker': None,
-        'boredom_worker': None,
-        'master_prompt': None,
-    }
-
-    # File names for S3
-    FILE_NAMES = {
-        'speech_vocabulary_worker': 'speech_vocabulary_worker.txt',
-        'speech_grammar_worker': 'speech_grammar_worker.txt',
-        'speech_interaction_worker': 'speech_interaction_worker.txt',
-        'speech_comprehension_worker': 'speech_comprehension_worker.txt',
-        'boredom_worker': 'boredom_worker.txt',
-        'master_prompt': 'master_prompt.txt',
-    }
+    """Publishes all prompts to S3 as one content-addressed bundle."""
 
     def __init__(self, dry_run: bool = False):
         """
@@ -71,31 +54,23 @@ class PromptUploader:
         """
         self.dry_run = dry_run
         self.s3_client = None
+        self.prompts: Dict[str, str] = {}
         self._load_prompts()
 
     def _load_prompts(self):
-        """Load prompts from worker_prompts.py and master_prompts.py."""
+        """Load the local prompts for every key the PromptRepository serves."""
         try:
-            # Import the local prompt constants
-            import sys
             sys.path.insert(0, str(Path(__file__).parent))
-            from prompts import (
-                speechVocabularyWorker_prompt,
-                speechGrammarWorker_prompt,
-                speechInteractionWorker_prompt,
-                speechComprehensionWorker_prompt,
-                boredomWorker_prompt
-            )
-            from master_prompts import master_prompt
+            # Importing prompts registers the local prompts with the repository
+            import prompts  # noqa: F401
+            from prompt_repository import PromptRepository, get_prompt_repository
 
-            self.PROMPTS['speech_vocabulary_worker'] = speechVocabularyWorker_prompt
-            self.PROMPTS['speech_grammar_worker'] = speechGrammarWorker_prompt
-            self.PROMPTS['speech_interaction_worker'] = speechInteractionWorker_prompt
-            self.PROMPTS['speech_comprehension_worker'] = speechComprehensionWorker_prompt
-            self.PROMPTS['boredom_worker'] = boredomWorker_prompt
-            self.PROMPTS['master_prompt'] = master_prompt
+            self.prompts = get_prompt_repository().get_local_prompts()
+            missing = set(PromptRepository.PROMPT_KEYS) - set(self.prompts)
+            if missing:
+                raise ValueError(f"No local prompt for: {', '.join(sorted(missing))}")
 
-            logger.info("Successfully loaded all prompts from worker_prompts.py and master_prompts.py")
+            logger.info(f"Successfully loaded {len(self.prompts)} local prompts")
         except Exception as e:
             logger.error(f"Failed to load prompts: {e}")
             raise
@@ -126,77 +101,58 @@ class PromptUploader:
             logger.error(f"Failed to initialize S3 client: {e}")
             raise
 
-    def upload_prompt(self, prompt_type: str) -> bool:
+    def publish_bundle(self) -> Optional[str]:
         """
-        Upload a specific prompt to S3.
+        Publish all prompts as one bundle.
+
+        The immutable bundle object is uploaded first; the manifest is only
+        replaced once the bundle exists, so readers switch versions atomically.
 
-        :param prompt_type: Type of prompt to upload
-        :return: True if successful, False otherwise
+        :return: Published bundle version, or None on failure
         """
-        if prompt_type not in self.PROMPTS:
-            logger.error(f"Unknown prompt type: {prompt_type}")
-            return False
+        manifest, body = build_bundle(self.prompts, S3_PROMPTS_PREFIX)
+        version = manifest["version"]
 
-        prompt_content = self.PROMPTS[prompt_type]
-        file_name = self.FILE_NAMES[prompt_type]
-        s3_key = f"{S3_PROMPTS_PREFIX}{file_name}"
+        logger.info("=" * 70)
+        logger.info(f"Publishing prompt bundle {version} ({len(self.prompts)} prompts, {len(body)} bytes compressed)")
+        logger.info(f"Bucket: {S3_BUCKET_NAME}")
+        logger.info(f"Prefix: {S3_PROMPTS_PREFIX}")
+        logger.info(f"Region: {S3_REGION}")
+        logger.info("=" * 70)
 
         if self.dry_run:
-            logger.info(f"[DRY RUN] Would upload {len(prompt_content)} bytes to s3://{S3_BUCKET_NAME}/{s3_key}")
-            return True
+            logger.info(f"[DRY RUN] Would upload s3://{S3_BUCKET_NAME}/{manifest['bundle_key']}")
+            logger.info(f"[DRY RUN] Would point s3://{S3_BUCKET_NAME}/{manifest_key(S3_PROMPTS_PREFIX)} at {version}")
+            return version
 
         try:
             self._init_s3_client()
 
-            logger.info(f"Uploading {prompt_type} to s3://{S3_BUCKET_NAME}/{s3_key}")
-
             self.s3_client.put_object(
                 Bucket=S3_BUCKET_NAME,
-                Key=s3_key,
-                Body=prompt_content.encode('utf-8'),
-                ContentType='text/plain',
+                Key=manifest["bundle_key"],
+                Body=body,
+                ContentType='application/gzip',
                 Metadata={
-                    'prompt-type': prompt_type,
+                    'bundle-version': version,
                     'uploaded-by': 'upload_prompts_to_s3.py'
                 }
             )
+            logger.info(f"✓ Uploaded bundle {manifest['bundle_key']}")
 
-            logger.info(f"✓ Successfully uploaded {prompt_type} ({len(prompt_content)} bytes)")
-            return True
+            self.s3_client.put_object(
+                Bucket=S3_BUCKET_NAME,
+                Key=manifest_key(S3_PROMPTS_PREFIX),
+                Body=json.dumps(manifest, indent=2).encode('utf-8'),
+                ContentType='application/json',
+                CacheControl='no-cache',
+            )
+            logger.info(f"✓ Manifest now points at {version}")
+            return version
 
         except Exception as e:
-            logger.error(f"✗ Failed to upload {prompt_type}: {e}")
-            return False
-
-    def upload_all(self) -> Dict[str, bool]:
-        """
-        Upload all prompts to S3.
-
-        :return: Dictionary mapping prompt types to success status
-        """
-        results = {}
-
-        logger.info("=" * 70)
-        logger.info("Starting upload of all prompts to S3")
-        logger.info(f"Bucket: {S3_BUCKET_NAME}")
-        logger.info(f"Prefix: {S3_PROMPTS_PREFIX}")
-        logger.info(f"Region: {S3_REGION}")
-        logger.info(f"Dry run: {self.dry_run}")
-        logger.info("=" * 70)
-
-        for prompt_type in self.PROMPTS.keys():
-            results[prompt_type] = self.upload_prompt(prompt_type)
-
-        # Print summary
-        logger.info("=" * 70)
-        logger.info("Upload Summary:")
-        successful = sum(1 for success in results.values() if success)
-        failed = len(results) - successful
-        logger.info(f"  Successful: {successful}")
-        logger.info(f"  Failed: {failed}")
-        logger.info("=" * 70)
-
-        return results
+            logger.error(f"✗ Failed to publish prompt bundle: {e}")
+            return None
 
     def list_s3_prompts(self) -> list:
         """
@@ -236,7 +192,7 @@ class PromptUploader:
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
-        description='Upload worker prompts to AWS S3',
+        description='Publish the prompts to AWS S3 as one versioned bundle',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog=f"""
 S3 Configuration (hardcoded):
@@ -245,29 +201,17 @@ S3 Configuration (hardcoded):
   Region: {S3_REGION}
 
 Examples:
-  # Upload all prompts
+  # Publish all prompts as a new bundle
   python upload_prompts_to_s3.py
-  
-  # Upload specific prompt
-  python upload_prompts_to_s3.py --prompt-type speech_vocabulary_worker
-  
+
   # Dry run to see what would be uploaded
   python upload_prompts_to_s3.py --dry-run
-  
-  # List current prompts in S3
+
+  # List current prompt objects in S3
   python upload_prompts_to_s3.py --list
         """
     )
 
-    parser.add_argument(
-        '--prompt-type',
-        type=str,
-        choices=['speech_vocabulary_worker', 'speech_grammar_worker',
-                 'speech_interaction_worker', 'speech_comprehension_worker',
-                 'boredom_worker', 'master_prompt'],
-        help='Specific prompt type to upload (if not specified, uploads all)'
-    )
-
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -277,7 +221,7 @@ Examples:
     parser.add_argument(
         '--list',
         action='store_true',
-        help='List current prompts in S3'
+        help='List current prompt objects in S3'
     )
 
     args = parser.parse_args()
@@ -289,15 +233,8 @@ Examples:
             uploader.list_s3_prompts()
             return
 
-        if args.prompt_type:
-            # Upload specific prompt
-            success = uploader.upload_prompt(args.prompt_type)
-            sys.exit(0 if success else 1)
-        else:
-            # Upload all prompts
-            results = uploader.upload_all()
-            all_success = all(results.values())
-            sys.exit(0 if all_success else 1)
+        version = uploader.publish_bundle()
+        sys.exit(0 if version else 1)
 
     except Exception as e:
         logger.error(f"Fatal error: {e}")
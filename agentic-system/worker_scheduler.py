@@ -0,0 +1,197 @@
+"""
+Adaptive scheduling of the background analysis workers.
+
+Running every background worker after every child message is most of the
+LLM spend of a conversation, although most analyses change slowly. The
+scheduleWorkers node asks the scheduler which workers run in a background
+run; the others are skipped and keep their last analysis in the background
+state.
+
+Each worker has a WorkerRule:
+
+    every_n_turns   run when at least N turns passed since the worker's last run
+    signals         run when one of these conversation signals fired in this run
+                    (heuristics computed by loadTranscript, e.g. "disengagement")
+    after           run whenever one of these workers runs (their output is its input)
+
+A worker that never ran is always due. Due workers are picked in policy order.
+With a time budget (estimated LLM seconds per run, from a moving average of
+each worker's run time), a due worker whose run - including the workers that
+run after it - does not fit is deferred: it stays due and is picked up by a
+later run. At least one due worker runs per run.
+
+The default mode is "always" (every worker every run, no skips). "adaptive"
+is opt-in until the per-worker skip counters show that the skipped analyses
+do not go stale.
+"""
+import logging
+import threading
+from dataclasses import dataclass, replace
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+ADAPTIVE = "adaptive"
+ALWAYS = "always"
+
+# Weight of the latest run time in a worker's estimated run time
+DURATION_SMOOTHING = 0.3
+
+
+@dataclass(frozen=True)
+class WorkerRule:
+    """When a background worker runs (see module docstring)."""
+    every_n_turns: Optional[int] = None
+    signals: tuple = ()
+    after: tuple = ()
+
+
+_FIRST_LAYER = ("speechGrammarWorker", "speechComprehensionWorker", "sprachhandlungsAnalyseWorker",
+                "speechVocabularyWorker", "boredomWorker")
+
+# Policy order is the priority under a time budget
+DEFAULT_POLICY = {
+    # No LLM call unless turns left masterChatbot's history window
+    "historySummaryWorker": WorkerRule(every_n_turns=1),
+    "speechComprehensionWorker": WorkerRule(every_n_turns=2, signals=("repeated_errors",)),
+    "sprachhandlungsAnalyseWorker": WorkerRule(every_n_turns=2),
+    "speechGrammarWorker": WorkerRule(every_n_turns=2),
+    "boredomWorker": WorkerRule(every_n_turns=6, signals=("disengagement",)),
+    "speechVocabularyWorker": WorkerRule(every_n_turns=3),
+    "satzbauAnalyseWorker": WorkerRule(every_n_turns=3),
+    "foerderfokusWorker": WorkerRule(after=_FIRST_LAYER),
+    "aufgabenWorker": WorkerRule(after=("foerderfokusWorker",), signals=("repeated_errors", "disengagement")),
+    "satzbauBegrenzungsWorker": WorkerRule(after=("satzbauAnalyseWorker",)),
+}
+
+
+class WorkerScheduler:
+    """
+    Decides which background workers run per background run and counts runs and skips.
+
+    Usage:
+        scheduler.schedule(turn, last_run_turns, signals)   # in scheduleWorkers
+        scheduler.record_run(worker, seconds)               # by the worker nodes
+        scheduler.record_skip(worker)
+    """
+
+    def __init__(self, mode: str = ALWAYS, time_budget: float = 0.0,
+                 every_n_turns: Optional[dict[str, int]] = None, policy: Optional[dict[str, WorkerRule]] = None):
+        if mode not in (ADAPTIVE, ALWAYS):
+            raise ValueError(f"Unknown background schedule: {mode!r} (expected '{ADAPTIVE}' or '{ALWAYS}')")
+        self.mode = mode
+        self.time_budget = max(0.0, time_budget)
+        self.policy = dict(policy or DEFAULT_POLICY)
+        for worker, n in (every_n_turns or {}).items():
+            if worker not in self.policy:
+                raise ValueError(f"Unknown background worker in schedule overrides: {worker!r}")
+            self.policy[worker] = replace(self.policy[worker], every_n_turns=n)
+
+        self._lock = threading.Lock()
+        self._runs = {worker: 0 for worker in self.policy}
+        self._skips = {worker: 0 for worker in self.policy}
+        self._seconds: dict[str, float] = {}
+        self._deferred = 0
+
+    def schedule(self, turn: int, last_run_turns: dict, signals: list) -> list[str]:
+        """
+        Pick the workers that run in this background run.
+
+        :param turn: Number of child messages in the conversation
+        :param last_run_turns: Worker -> turn of its last run (missing: never ran)
+        :param signals: Conversation signals that fired for this run
+        :return: Scheduled workers in policy order
+        """
+        if self.mode == ALWAYS:
+            return list(self.policy)
+
+        chosen: set[str] = set()
+        spent = 0.0
+        for worker in self.policy:
+            if worker in chosen or not self._is_due(worker, turn, last_run_turns.get(worker), signals):
+                continue
+            group = [w for w in self._with_dependents(worker) if w not in chosen]
+            cost = sum(self._estimate(w) for w in group)
+            if self.time_budget and chosen and spent + cost > self.time_budget:
+                with self._lock:
+                    self._deferred += 1
+                logger.info(f"WorkerScheduler: Deferred {worker} ({cost:.1f}s over the {self.time_budget:.1f}s budget)")
+                continue
+            chosen.update(group)
+            spent += cost
+        return [worker for worker in self.policy if worker in chosen]
+
+    def record_run(self, worker: str, seconds: float) -> None:
+        """Count a worker run and update its estimated run time."""
+        with self._lock:
+            self._runs[worker] = self._runs.get(worker, 0) + 1
+            previous = self._seconds.get(worker)
+            self._seconds[worker] = seconds if previous is None else (
+                DURATION_SMOOTHING * seconds + (1 - DURATION_SMOOTHING) * previous
+            )
+
+    def record_skip(self, worker: str) -> None:
+        """Count a skipped worker (it kept its last analysis)."""
+        with self._lock:
+            self._skips[worker] = self._skips.get(worker, 0) + 1
+
+    def get_stats(self) -> dict:
+        """
+        Get scheduling counters.
+
+        :return: Dict with the mode, time budget, deferred workers and per-worker
+            runs, skips and estimated run time
+        """
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "time_budget": self.time_budget,
+                "deferred": self._deferred,
+                "workers": {
+                    worker: {
+                        "runs": self._runs.get(worker, 0),
+                        "skips": self._skips.get(worker, 0),
+                        "avg_seconds": round(self._seconds[worker], 3) if worker in self._seconds else None,
+                    }
+                    for worker in self.policy
+                },
+            }
+
+    def _is_due(self, worker: str, turn: int, last_run_turn: Optional[int], signals: list) -> bool:
+        rule = self.policy[worker]
+        if last_run_turn is None or last_run_turn > turn:
+            return True
+        if rule.every_n_turns and turn - last_run_turn >= rule.every_n_turns:
+            return True
+        return any(signal in signals for signal in rule.signals)
+
+    def _with_dependents(self, worker: str) -> list[str]:
+        """The worker and every worker that (transitively) runs after it."""
+        group = [worker]
+        for current in group:
+            group.extend(w for w, rule in self.policy.items() if current in rule.after and w not in group)
+        return group
+
+    def _estimate(self, worker: str) -> float:
+        with self._lock:
+            if worker in self._seconds:
+                return self._seconds[worker]
+            # Unknown workers are assumed to take as long as the average known one
+            return sum(self._seconds.values()) / len(self._seconds) if self._seconds else 0.0
+
+
+_scheduler = WorkerScheduler()
+
+
+def configure_worker_scheduler(mode: str, time_budget: float = 0.0,
+                               every_n_turns: Optional[dict[str, int]] = None) -> WorkerScheduler:
+    """Replace the process-wide worker scheduler (call once at startup, before graphs run)."""
+    global _scheduler
+    _scheduler = WorkerScheduler(mode, time_budget, every_n_turns)
+    logger.info(f"Worker scheduler configured: mode={mode}, time_budget={time_budget}, overrides={every_n_turns or {}}")
+    return _scheduler
+
+
+def get_worker_scheduler() -> WorkerScheduler:
+    """Get the process-wide worker scheduler."""
+    return _scheduler
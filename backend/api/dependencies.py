@@ -1,10 +1,18 @@
 """
 Dependency injection for FastAPI routes.
 """
-from functools import lru_cache
-from backend.services.conversation_service import ConversationService
+import threading
+from typing import TYPE_CHECKING, Optional
+
 from backend.core.config import get_settings
 
+if TYPE_CHECKING:
+    # Imported lazily: the service pulls in langchain/langgraph, which dominates cold start
+    from backend.services.conversation_service import ConversationService
+
+_service: Optional["ConversationService"] = None
+_service_lock = threading.Lock()
+
 
 def get_beat_manager():
     """Get the global BeatPackManager instance from nodes."""
@@ -12,14 +20,21 @@ def get_beat_manager():
     return beat_manager
 
 
-@lru_cache()
-def get_conversation_service() -> ConversationService:
+def get_conversation_service() -> "ConversationService":
     """
     Get or create a singleton conversation service.
 
     This is cached to ensure we use the same service instance
-    across all requests, maintaining conversation state.
+    across all requests, maintaining conversation state. The startup
+    warm-up and early requests may race here; only one service is built.
     """
-    settings = get_settings()
-    return ConversationService(llm_model=settings.llm_model)
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                from backend.services.conversation_service import ConversationService
+
+                settings = get_settings()
+                _service = ConversationService(llm_model=settings.llm_model)
+    return _service
 
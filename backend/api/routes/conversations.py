@@ -1,18 +1,24 @@
 """
 Conversation endpoints for managing chat sessions.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 from backend.models.schemas import (
     ConversationCreate,
     ConversationResponse,
     MessageRequest,
     ConversationHistory,
+    ContractBatchRequest,
     ErrorResponse
 )
-from backend.services.conversation_service import ConversationService
 from backend.api.dependencies import get_conversation_service
-from typing import AsyncIterator
+from typing import AsyncIterator, Iterator, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from backend.services.conversation_service import ConversationService
 
 router = APIRouter(prefix="/conversations", tags=["Conversations"])
 
@@ -28,7 +34,7 @@ router = APIRouter(prefix="/conversations", tags=["Conversations"])
 )
 async def create_conversation(
     request: ConversationCreate,
-    service: ConversationService = Depends(get_conversation_service)
+    service: "ConversationService" = Depends(get_conversation_service)
 ):
     """
     Create a new conversation session.
@@ -68,7 +74,7 @@ async def create_conversation(
 async def send_message(
     thread_id: str,
     request: MessageRequest,
-    service: ConversationService = Depends(get_conversation_service)
+    service: "ConversationService" = Depends(get_conversation_service)
 ):
     """
     Send a message to a conversation and receive streaming response via SSE.
@@ -134,7 +140,7 @@ async def send_message(
 )
 async def get_conversation_history(
     thread_id: str,
-    service: ConversationService = Depends(get_conversation_service)
+    service: "ConversationService" = Depends(get_conversation_service)
 ):
     """
     Get conversation history by thread ID.
@@ -170,7 +176,7 @@ async def get_conversation_history(
 )
 async def delete_conversation(
     thread_id: str,
-    service: ConversationService = Depends(get_conversation_service)
+    service: "ConversationService" = Depends(get_conversation_service)
 ):
     """
     Delete a conversation and clean up its state.
@@ -203,11 +209,17 @@ async def delete_conversation(
 async def get_output_contract(
     thread_id: str,
     validate: bool = False,
-    service: ConversationService = Depends(get_conversation_service)
+    wait: Optional[float] = Query(None, ge=0, le=30),
+    service: "ConversationService" = Depends(get_conversation_service)
 ):
     """
     Get the output contract for the last response with optional validation.
 
+    In deferred contract mode the contract is built after the reply was sent.
+    A contract still being built is waited for up to ``wait`` seconds (default:
+    contract_wait_timeout); if it is not ready by then the response has
+    ``"pending": true`` and no contract.
+
     The output contract includes:
     - The spoken text
     - Answer type classification
@@ -218,6 +230,7 @@ async def get_output_contract(
     Args:
         thread_id: Unique conversation thread ID
         validate: Whether to validate evidence against source content
+        wait: Seconds to wait for a contract that is still being built
         service: Injected conversation service
 
     Returns:
@@ -226,7 +239,10 @@ async def get_output_contract(
     Raises:
         HTTPException: If conversation not found
     """
-    contract_data = service.get_last_response_contract(thread_id, validate=validate)
+    # Waiting blocks on the contract pool, so keep it off the event loop
+    contract_data = await asyncio.to_thread(
+        service.get_last_response_contract, thread_id, validate=validate, wait_timeout=wait
+    )
 
     if not contract_data:
         raise HTTPException(
@@ -236,3 +252,37 @@ async def get_output_contract(
 
     return contract_data
 
+
+@router.post(
+    "/contracts/validate",
+    responses={
+        200: {
+            "description": "Validation results, one JSON object per line",
+            "content": {"application/x-ndjson": {}}
+        }
+    }
+)
+async def validate_conversation_contracts(
+    request: ContractBatchRequest,
+    service: "ConversationService" = Depends(get_conversation_service)
+):
+    """
+    Validate the output contract of every turn of many conversations.
+
+    Conversations are grouped by chapter so each chapter's source index is
+    built once. Results are streamed as NDJSON: one line per turn, one line
+    per unknown conversation and a final ``{"summary": {...}}`` line.
+
+    Args:
+        request: ContractBatchRequest with the thread IDs
+        service: Injected conversation service
+
+    Returns:
+        StreamingResponse with application/x-ndjson content type
+    """
+    def ndjson_lines() -> Iterator[str]:
+        # Sync iterator: Starlette runs it in the threadpool, off the event loop
+        for result in service.validate_conversation_contracts(request.thread_ids):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
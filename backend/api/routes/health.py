@@ -2,9 +2,11 @@
 Health check endpoint.
 """
 from fastapi import APIRouter
-from datetime import datetime
-from backend.models.schemas import HealthResponse
+from fastapi.responses import JSONResponse
+from datetime import datetime, timezone
+from backend.models.schemas import HealthResponse, ReadinessResponse
 from backend.core.config import get_settings
+from backend.core.readiness import get_readiness
 
 router = APIRouter()
 
@@ -22,6 +24,36 @@ async def health_check():
         status="healthy",
         app_name=settings.app_name,
         version=settings.app_version,
-        timestamp=datetime.utcnow()
+        timestamp=datetime.now(timezone.utc)
     )
 
+
+
+@router.get(
+    "/ready",
+    response_model=ReadinessResponse,
+    responses={503: {"model": ReadinessResponse, "description": "Still warming up or warm-up failed"}},
+    tags=["Health"]
+)
+async def readiness_check():
+    """
+    Readiness check used by the load balancer.
+
+    Returns 200 once the conversation service is built and its caches are warm,
+    503 before that or if the warm-up failed.
+
+    Returns:
+        ReadinessResponse with per-component warm-up timings
+    """
+    state = get_readiness().snapshot()
+    if state["ready"]:
+        status = "ready"
+    else:
+        status = "failed" if state["error"] else "warming_up"
+    response = ReadinessResponse(
+        status=status,
+        components=state["components"],
+        total_seconds=state["total_seconds"],
+        error=state["error"],
+    )
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=response.model_dump())
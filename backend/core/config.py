@@ -49,6 +49,11 @@ class Settings(BaseSettings):
     # LLM Settings
     llm_model: str = "google_genai:gemini-2.0-flash"
 
+    # Per-node model routing (model_registry.py): node name -> model spec string or
+    # {"model", "temperature", "timeout"}. Nodes without an entry use llm_model; nodes with the
+    # same spec share one client, e.g. {"boredomWorker": "google_genai:gemini-2.0-flash-lite"}
+    llm_node_models: dict[str, Union[str, dict]] = {}
+
     # AWS S3 Settings for Dynamic Prompts (Public Bucket)
     aws_s3_bucket_name: str = "conversational-ai-prompts-bucket/"
     aws_s3_prompts_prefix: str = "prompts/"
@@ -56,8 +61,70 @@ class Settings(BaseSettings):
 
     # Prompt Configuration
     use_s3_prompts: bool = False
+    # Seconds a prompt counts as fresh; older prompts are served while refreshed in the background
     prompts_cache_ttl: int = 15
 
+    # Child profiles / audio books loaded from S3: LRU cache keyed by id, misses cached separately
+    data_cache_ttl: int = 300
+    data_cache_negative_ttl: int = 60
+    data_cache_max_entries: int = 5000
+
+    # Build the conversation service and warm caches before accepting traffic (reported by /ready)
+    warm_up_on_startup: bool = True
+
+    # Beat System
+    beat_retriever_cache_size: int = 32
+
+    # Streaming: release the answer sentence by sentence instead of after full generation
+    stream_master_response: bool = True
+
+    # masterChatbot history: last N turns verbatim (0 sends the full history), capped at a token
+    # budget; older turns are folded into a rolling summary by the background graph
+    history_keep_turns: int = 8
+    history_token_budget: int = 3000
+
+    # Output contract: "deferred" builds it on a worker pool after the reply, "inline" inside masterChatbot.
+    # GET /contract waits up to contract_wait_timeout seconds for a contract still being built
+    contract_mode: str = "deferred"
+    contract_max_workers: int = 2
+    contract_wait_timeout: float = 2.0
+
+    # Process-wide cap on in-flight LLM calls; reserved slots are only used by child-facing replies
+    llm_max_concurrent_calls: int = 16
+    llm_reserved_immediate_slots: int = 4
+
+    # Background analysis pool: concurrent runs across conversations and max waiting runs
+    background_max_workers: int = 4
+    background_max_queue_depth: int = 500
+
+    # Background workers: "full" re-sends the transcript every run; "delta" (opt-in, lossy) sends each worker
+    # its previous analysis plus the new messages only, with a full re-analysis every background_full_analysis_every runs
+    background_analysis_mode: str = "full"
+    background_full_analysis_every: int = 5
+
+    # Background scheduling: "always" runs every worker every turn; "adaptive" (opt-in, skips workers) runs
+    # each worker by its rule in worker_scheduler.py (every N turns, on conversation signals, after its inputs).
+    # Optional budget of estimated LLM seconds per run (0: none) and per-worker every-N-turns overrides
+    background_schedule: str = "always"
+    background_time_budget: float = 0.0
+    background_worker_every_n_turns: dict[str, int] = {}
+
+    # Background graph: "workers" runs one LLM call per worker, "fused" produces the independent
+    # analyses with one structured-output call and foerderfokus/aufgaben/satzbaubegrenzung with a second
+    background_graph_mode: str = "workers"
+
+    # Conversations whose worker transcript is kept between background runs (LRU)
+    transcript_cache_max_conversations: int = 2000
+
+    # Checkpoint store: "memory" (per process) or "sqlite" (shared file, survives restarts)
+    checkpoint_backend: str = "memory"
+    checkpoint_sqlite_path: str = str(Path(__file__).parent.parent.parent / "data" / "checkpoints.sqlite")
+
+    # Checkpoint store limits (0 disables a limit; the SQLite backend only uses max_per_thread)
+    checkpoint_max_threads: int = 2000
+    checkpoint_idle_ttl_seconds: int = 3600
+    checkpoint_max_per_thread: int = 3
+
     model_config = SettingsConfigDict(
         env_file=str(Path(__file__).parent.parent.parent / ".env"),
         env_file_encoding="utf-8",
@@ -0,0 +1,78 @@
+"""
+Startup warm-up state reported by the /ready endpoint.
+
+/health only says the process is up. /ready says the conversation service has
+been built and its caches warmed, so the load balancer only routes children to
+tasks that can answer without a cold start.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Tracks which startup components are warm and how long each took."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started_at = time.perf_counter()
+        self._components: dict[str, dict] = {}
+        self._ready = False
+        self._error: Optional[str] = None
+
+    def record(self, component: str, seconds: float, **details) -> None:
+        """Record a warmed component with its duration and details (e.g. counts)."""
+        with self._lock:
+            self._components[component] = {"seconds": round(seconds, 3), **details}
+        logger.info(f"Warm-up: {component} ready in {seconds:.3f}s {details or ''}")
+
+    def measure(self, component: str, func: Callable):
+        """Run func, record its duration under component and return its result."""
+        start = time.perf_counter()
+        result = func()
+        self.record(component, time.perf_counter() - start)
+        return result
+
+    def mark_ready(self) -> None:
+        with self._lock:
+            self._ready = True
+            total = time.perf_counter() - self._started_at
+        logger.info(f"Warm-up complete in {total:.3f}s, accepting traffic")
+
+    def mark_failed(self, error: str) -> None:
+        with self._lock:
+            self._error = error
+        logger.error(f"Warm-up failed: {error}")
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def snapshot(self) -> dict:
+        """Current state: ready flag, per-component timings, total warm-up time and any error."""
+        with self._lock:
+            components = {name: dict(info) for name, info in self._components.items()}
+            return {
+                "ready": self._ready,
+                "components": components,
+                "total_seconds": round(sum(info["seconds"] for info in components.values()), 3),
+                "error": self._error,
+            }
+
+
+_readiness = Readiness()
+
+
+def get_readiness() -> Readiness:
+    """Get the process-wide readiness state."""
+    return _readiness
+
+
+def reset_readiness() -> Readiness:
+    """Start a fresh readiness state (on application startup)."""
+    global _readiness
+    _readiness = Readiness()
+    return _readiness
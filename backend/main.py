@@ -1,6 +1,7 @@
 """
 FastAPI application entry point for Lingolino API.
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -8,11 +9,13 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
+import asyncio
 import time
 import logging
 
 from backend.core.config import get_settings
 from backend.core.logging_config import setup_logging
+from backend.core.readiness import reset_readiness
 from backend.api.routes import conversations, health, stories
 
 # Setup logging before creating the app
@@ -28,13 +31,49 @@ settings = get_settings()
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
 
+
+
+def warm_up() -> None:
+    """Build the conversation service and warm its caches, recording per-component timings."""
+    from backend.api.dependencies import get_conversation_service
+
+    readiness = reset_readiness()
+    try:
+        service = readiness.measure("conversation_service", get_conversation_service)
+        for component, timing in service.warm_up().items():
+            readiness.record(component, timing.pop("seconds"), **timing)
+    except Exception as e:
+        # Stay up for /health, but /ready keeps failing so no traffic is routed here
+        logger.error(f"Warm-up failed: {e}", exc_info=True)
+        readiness.mark_failed(str(e))
+        return
+    readiness.mark_ready()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start the warm-up in the background.
+
+    The server binds right away (so /health answers while langchain/langgraph
+    are still being imported) and /ready turns 200 once the warm-up is done;
+    the load balancer only routes traffic to ready tasks.
+    """
+    if settings.warm_up_on_startup:
+        app.state.warm_up = asyncio.create_task(asyncio.to_thread(warm_up))
+    else:
+        reset_readiness().mark_ready()
+    yield
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="API for Lingolino agentic learning system with streaming chat capabilities",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add rate limiting middleware
@@ -77,7 +116,8 @@ async def root():
         "app": settings.app_name,
         "version": settings.app_version,
         "docs": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "ready": "/ready"
     }
 
 
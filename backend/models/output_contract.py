@@ -138,6 +138,10 @@ class ResponseContract(BaseModel):
         le=1.0,
         description="Model's confidence in this response (0.0-1.0)"
     )
+    prompt_version: Optional[str] = Field(
+        None,
+        description="Version of the prompt snapshot the response was generated with"
+    )
 
     class Config:
         use_enum_values = True
@@ -82,6 +82,18 @@ class ConversationHistory(BaseModel):
         }
 
 
+class ContractBatchRequest(BaseModel):
+    """Schema for validating the contracts of many conversations."""
+    thread_ids: list[str] = Field(..., min_length=1, max_length=10000, description="Conversations to validate")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "thread_ids": ["conv_abc123def456", "conv_789xyz"]
+            }
+        }
+
+
 class ErrorResponse(BaseModel):
     """Schema for error responses."""
     detail: str
@@ -104,6 +116,16 @@ class HealthResponse(BaseModel):
     timestamp: datetime
 
 
+class ReadinessResponse(BaseModel):
+    """Schema for readiness check response."""
+    status: str = Field(..., description="'ready', 'warming_up' or 'failed'")
+    components: dict[str, dict] = Field(
+        default_factory=dict, description="Warm-up duration (seconds) and details per component"
+    )
+    total_seconds: float = Field(..., description="Sum of the component warm-up durations")
+    error: Optional[str] = None
+
+
 class StoryListResponse(BaseModel):
     """Schema for available stories endpoint."""
     stories: dict[str, list[str]] = Field(
@@ -0,0 +1,291 @@
+"""
+Bounded in-memory checkpoint store for the conversation graphs.
+
+LangGraph's MemorySaver keeps every checkpoint of every thread forever. Each
+checkpoint version of the "messages" channel is a full copy of the history,
+so memory grows with every turn of every conversation. BoundedMemorySaver
+keeps the MemorySaver storage layout but bounds it:
+
+- only the latest N checkpoints per thread (and the blobs they reference) are kept
+- threads idle for longer than a TTL are evicted
+- at most max_threads threads are kept (least recently used are evicted first)
+
+create_checkpoint_store() picks this store or the SQLite store based on Settings.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+
+from ..core.config import Settings
+from .sqlite_checkpoint_store import SQLiteSaver
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    MemorySaver with checkpoint retention, idle-TTL and max-threads eviction.
+
+    A limit of None or 0 disables it. Evicted thread ids are passed to on_evict
+    (called with the store lock held; it may call delete_thread).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_threads: Optional[int] = None,
+        idle_ttl_seconds: Optional[float] = None,
+        max_checkpoints_per_thread: Optional[int] = None,
+        on_evict: Optional[Callable[[str], None]] = None,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.max_threads = max_threads or None
+        self.idle_ttl_seconds = idle_ttl_seconds or None
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread or None
+        self.on_evict = on_evict
+
+        self._lock = threading.RLock()
+        # thread_id -> last access time, least recently used first
+        self._last_access: OrderedDict[str, float] = OrderedDict()
+        # (thread_id, checkpoint_ns, checkpoint_id) -> channel_versions of that checkpoint
+        self._checkpoint_versions: dict[tuple[str, str, str], dict[str, Any]] = {}
+        # (thread_id, checkpoint_ns) -> {(channel, version)} stored in self.blobs
+        self._blob_keys: dict[tuple[str, str], set[tuple[str, Any]]] = defaultdict(set)
+
+        self._evictions = {"idle": 0, "capacity": 0}
+        self._pruned_checkpoints = 0
+
+    # ------------------------------------------------------------------
+    # BaseCheckpointSaver API (async variants delegate to these)
+    # ------------------------------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self.evict_idle()
+            result = super().get_tuple(config)
+            if result is None:
+                # MemorySaver's defaultdicts create empty entries on read
+                if thread_id in self.storage and not any(self.storage[thread_id].values()):
+                    del self.storage[thread_id]
+            else:
+                self._touch(thread_id)
+            return result
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            self._checkpoint_versions[(thread_id, checkpoint_ns, checkpoint["id"])] = dict(
+                checkpoint["channel_versions"]
+            )
+            self._blob_keys[(thread_id, checkpoint_ns)].update(new_versions.items())
+            self._touch(thread_id)
+            self._prune_checkpoints(thread_id, checkpoint_ns)
+            self.evict_idle()
+            self._enforce_max_threads()
+            return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            self._touch(config["configurable"]["thread_id"])
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._last_access.pop(thread_id, None)
+            for key in [k for k in self._checkpoint_versions if k[0] == thread_id]:
+                del self._checkpoint_versions[key]
+            for key in [k for k in self._blob_keys if k[0] == thread_id]:
+                del self._blob_keys[key]
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def evict_idle(self, now: Optional[float] = None) -> list[str]:
+        """
+        Evict all threads that have not been accessed within idle_ttl_seconds.
+
+        Args:
+            now: Current time (defaults to time.monotonic())
+
+        Returns:
+            List of evicted thread IDs
+        """
+        if not self.idle_ttl_seconds:
+            return []
+        now = time.monotonic() if now is None else now
+        evicted = []
+        with self._lock:
+            while self._last_access:
+                thread_id, last_access = next(iter(self._last_access.items()))
+                if now - last_access < self.idle_ttl_seconds:
+                    break
+                self._evict(thread_id, "idle")
+                evicted.append(thread_id)
+        return evicted
+
+    def _enforce_max_threads(self) -> None:
+        if not self.max_threads:
+            return
+        while len(self._last_access) > self.max_threads:
+            thread_id = next(iter(self._last_access))
+            self._evict(thread_id, "capacity")
+
+    def _evict(self, thread_id: str, reason: str) -> None:
+        self.delete_thread(thread_id)
+        self._evictions[reason] += 1
+        logger.info(f"BoundedMemorySaver: Evicted thread {thread_id} ({reason})")
+        if self.on_evict:
+            try:
+                self.on_evict(thread_id)
+            except Exception as e:
+                logger.error(f"BoundedMemorySaver: on_evict failed for {thread_id}: {e}")
+
+    def _touch(self, thread_id: str) -> None:
+        self._last_access[thread_id] = time.monotonic()
+        self._last_access.move_to_end(thread_id)
+
+    # ------------------------------------------------------------------
+    # Checkpoint retention
+    # ------------------------------------------------------------------
+
+    def _prune_checkpoints(self, thread_id: str, checkpoint_ns: str) -> None:
+        """Keep only the latest max_checkpoints_per_thread checkpoints and the blobs they reference."""
+        if not self.max_checkpoints_per_thread:
+            return
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.max_checkpoints_per_thread:
+            return
+
+        # Checkpoint ids are monotonically increasing (the latest is max(ids))
+        ordered = sorted(checkpoints)
+        for checkpoint_id in ordered[:-self.max_checkpoints_per_thread]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            self._checkpoint_versions.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            self._pruned_checkpoints += 1
+
+        referenced = set()
+        for checkpoint_id in checkpoints:
+            versions = self._checkpoint_versions.get((thread_id, checkpoint_ns, checkpoint_id), {})
+            referenced.update(versions.items())
+        blob_keys = self._blob_keys[(thread_id, checkpoint_ns)]
+        for channel, version in blob_keys - referenced:
+            self.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+        blob_keys &= referenced
+
+    # ------------------------------------------------------------------
+    # Observability
+    # ------------------------------------------------------------------
+
+    def get_thread_bytes(self) -> dict[str, int]:
+        """
+        Get the serialized bytes held per thread (checkpoints, pending writes and blobs).
+
+        Returns:
+            Dictionary mapping thread_id to bytes
+        """
+        sizes: dict[str, int] = defaultdict(int)
+        with self._lock:
+            for thread_id, namespaces in self.storage.items():
+                for checkpoints in namespaces.values():
+                    for checkpoint, metadata, _ in checkpoints.values():
+                        sizes[thread_id] += len(checkpoint[1]) + len(metadata[1])
+            for (thread_id, _, _), writes in self.writes.items():
+                for _, _, value, _ in writes.values():
+                    sizes[thread_id] += len(value[1])
+            for (thread_id, _, _, _), value in self.blobs.items():
+                sizes[thread_id] += len(value[1])
+        return dict(sizes)
+
+    def get_stats(self) -> dict:
+        """
+        Get store statistics.
+
+        Returns:
+            Dictionary with thread/checkpoint counts, bytes held and eviction counters
+        """
+        thread_bytes = self.get_thread_bytes()
+        with self._lock:
+            checkpoints = sum(
+                len(c) for namespaces in self.storage.values() for c in namespaces.values()
+            )
+            return {
+                "backend": "memory",
+                "threads": len(self._last_access),
+                "checkpoints": checkpoints,
+                "bytes": sum(thread_bytes.values()),
+                "evictions": dict(self._evictions),
+                "pruned_checkpoints": self._pruned_checkpoints,
+                "limits": {
+                    "max_threads": self.max_threads,
+                    "idle_ttl_seconds": self.idle_ttl_seconds,
+                    "max_checkpoints_per_thread": self.max_checkpoints_per_thread,
+                },
+            }
+
+    # Defined last: inside the class body the name shadows the builtin used in annotations above
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        # Materialize under the lock so pruning cannot mutate the dicts mid-iteration
+        with self._lock:
+            items = list(super().list(config, filter=filter, before=before, limit=limit))
+        yield from items
+
+
+def create_checkpoint_store(settings: Settings, on_evict: Optional[Callable[[str], None]] = None):
+    """
+    Create the checkpointer selected by settings.checkpoint_backend.
+
+    Args:
+        settings: Application settings
+        on_evict: Called with the thread_id of evicted threads (memory backend only)
+
+    Returns:
+        BoundedMemorySaver or SQLiteSaver
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if settings.checkpoint_backend == "memory":
+        return BoundedMemorySaver(
+            max_threads=settings.checkpoint_max_threads,
+            idle_ttl_seconds=settings.checkpoint_idle_ttl_seconds,
+            max_checkpoints_per_thread=settings.checkpoint_max_per_thread,
+            on_evict=on_evict,
+        )
+    if settings.checkpoint_backend == "sqlite":
+        return SQLiteSaver(
+            settings.checkpoint_sqlite_path,
+            max_checkpoints_per_thread=settings.checkpoint_max_per_thread,
+        )
+    raise ValueError(f"Unknown checkpoint backend: {settings.checkpoint_backend}")
@@ -1,13 +1,14 @@
 """
 Service layer for conversation management and interaction with agentic system.
 """
-import uuid
+import asyncio
 import threading
-from datetime import datetime
-from typing import Optional, AsyncIterator
-from langchain.chat_models import init_chat_model
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional, AsyncIterator
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import HumanMessage
-from langgraph.checkpoint.memory import MemorySaver
 from dotenv import load_dotenv
 
 import sys
@@ -17,10 +18,24 @@ from pathlib import Path
 agentic_path = Path(__file__).parent.parent.parent / "agentic-system"
 sys.path.insert(0, str(agentic_path))
 
-from immediate_graph import create_immediate_response_graph, set_config
+from immediate_graph import create_immediate_response_graph
 from background_graph import create_background_analysis_graph
+from background_runner import BackgroundRunner
+from deferred_contracts import configure_deferred_contracts
+from history_window import configure_history_window, get_history_window
+from incremental_analysis import configure_incremental_analysis, get_incremental_analysis
+from llm_limiter import configure_llm_limiter, get_llm_limiter
+from model_registry import configure_model_registry, get_model_registry
+from data_loaders import get_data_repository
 from nodes import set_background_graph, initialize_beat_manager
-from ..services.output_contract_validator import validate_response_contract
+from output_contract_builder import compact_contract
+from prompt_repository import PromptSnapshot, get_prompt_repository
+from transcript_cache import configure_transcript_cache, get_transcript_cache
+from worker_scheduler import configure_worker_scheduler, get_worker_scheduler
+from ..core.config import Settings, get_settings
+from ..services.output_contract_validator import validate_contract_batch, validate_response_contract
+from .checkpoint_store import create_checkpoint_store
+from .sqlite_checkpoint_store import SQLiteSaver
 
 
 class ConversationMetadata:
@@ -32,45 +47,125 @@ class ConversationMetadata:
         child_id: str,
         story_id: Optional[str] = None,
         chapter_id: Optional[str] = None,
-        num_planned_tasks: Optional[int] = 5
+        num_planned_tasks: Optional[int] = 5,
+        prompt_snapshot: Optional[PromptSnapshot] = None
     ):
         self.thread_id = thread_id
         self.child_id = child_id
         self.story_id = story_id
         self.chapter_id = chapter_id
         self.num_planned_tasks = num_planned_tasks
-        self.created_at = datetime.utcnow()
+        # Prompts pinned for the whole conversation (immediate and background graphs)
+        self.prompt_snapshot = prompt_snapshot
+        self.created_at = datetime.now(timezone.utc)
+
+    @property
+    def prompt_version(self) -> Optional[str]:
+        """Version of the pinned prompt snapshot."""
+        return self.prompt_snapshot.version if self.prompt_snapshot else None
+
+    def to_dict(self) -> dict:
+        """Serialize to a JSON-compatible dict."""
+        return {
+            "thread_id": self.thread_id,
+            "child_id": self.child_id,
+            "story_id": self.story_id,
+            "chapter_id": self.chapter_id,
+            "num_planned_tasks": self.num_planned_tasks,
+            "prompt_version": self.prompt_version,
+            "created_at": self.created_at.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ConversationMetadata":
+        """Restore metadata serialized with to_dict, re-pinning the recorded prompt version."""
+        metadata = cls(
+            data["thread_id"],
+            data["child_id"],
+            data.get("story_id"),
+            data.get("chapter_id"),
+            data.get("num_planned_tasks", 5),
+            get_prompt_repository().get_snapshot(data.get("prompt_version")),
+        )
+        metadata.created_at = datetime.fromisoformat(data["created_at"])
+        return metadata
 
 
 class ConversationService:
     """Service for managing conversations with the agentic system."""
 
-    def __init__(self, llm_model: str):
-        """Initialize the conversation service."""
+    def __init__(self, llm_model: str, settings: Optional[Settings] = None, llm: Optional[BaseChatModel] = None):
+        """
+        Initialize the conversation service.
+
+        Args:
+            llm_model: Model identifier passed to init_chat_model
+            settings: Optional settings override (defaults to get_settings())
+            llm: Optional pre-built chat model; skips init_chat_model when given
+        """
         load_dotenv()
+        self.settings = settings or get_settings()
 
         # Initialize LLM and memory
-        self.llm = init_chat_model(llm_model)
-        self.memory = MemorySaver()
+        if llm is None:
+            # Imports the provider package (e.g. langchain_google_genai) only when a real model is built
+            from langchain.chat_models import init_chat_model
+            llm = init_chat_model(llm_model)
+        self.llm = llm
+        configure_llm_limiter(
+            self.settings.llm_max_concurrent_calls,
+            self.settings.llm_reserved_immediate_slots,
+        )
+        configure_transcript_cache(self.settings.transcript_cache_max_conversations)
+        configure_history_window(self.settings.history_keep_turns, self.settings.history_token_budget)
+        configure_incremental_analysis(self.settings.background_analysis_mode, self.settings.background_full_analysis_every)
+        configure_worker_scheduler(
+            self.settings.background_schedule,
+            self.settings.background_time_budget,
+            self.settings.background_worker_every_n_turns,
+        )
+        self.contracts = configure_deferred_contracts(self.settings.contract_max_workers, writer=self._store_contract)
+        self.memory = create_checkpoint_store(self.settings, on_evict=self._on_thread_evicted)
+        # The SQLite store also persists conversation metadata so any worker can resume a thread
+        self._metadata_store = self.memory if isinstance(self.memory, SQLiteSaver) else None
 
         # Initialize beat manager for closed-world content management
         content_dir = Path(__file__).parent.parent.parent / "agentic-system" / "content"
-        initialize_beat_manager(content_dir)
+        self.beat_manager = initialize_beat_manager(content_dir, retriever_cache_size=self.settings.beat_retriever_cache_size)
         print(f"✓ Beat Manager initialized with content_dir: {content_dir}")
 
-        # Create graphs
-        self.background_graph = create_background_analysis_graph(self.llm, self.memory)
+        # Create graphs; each node resolves its model through the model registry
+        model_registry = configure_model_registry(llm_model, self.settings.llm_node_models)
+        self.background_graph = create_background_analysis_graph(
+            self.llm, self.memory, mode=self.settings.background_graph_mode
+        )
         set_background_graph(self.background_graph)
         self.immediate_graph = create_immediate_response_graph(
             self.llm,
             self.memory,
-            self.background_graph
+            self.background_graph,
+            stream_tokens=self.settings.stream_master_response
+        )
+        for node in model_registry.unused_specs():
+            print(f"⚠ llm_node_models: no graph node named {node} (in background graph mode "
+                  f"{self.settings.background_graph_mode!r}); its model spec is unused")
+
+        # Background analysis: one run in flight and one pending per conversation
+        self.background_runner = BackgroundRunner(
+            max_workers=self.settings.background_max_workers,
+            max_queue_depth=self.settings.background_max_queue_depth,
+            name="background-analysis",
         )
 
         # In-memory storage for conversation metadata
         # Key: thread_id, Value: ConversationMetadata
         self._conversations: dict[str, ConversationMetadata] = {}
 
+        # Per-conversation lock held by a turn and by deferred contract writes, so a contract
+        # write never lands between the checkpoints of a running turn
+        self._turn_locks: dict[str, threading.Lock] = {}
+        self._turn_locks_guard = threading.Lock()
+
     def create_conversation(
         self,
         child_id: str,
@@ -94,15 +189,18 @@ class ConversationService:
         session_id = str(uuid.uuid4())
         thread_id = f"conv_{session_id}"
 
-        # Store metadata
+        # Store metadata; the prompts are pinned once here and used for every turn
         metadata = ConversationMetadata(
             thread_id,
             child_id,
             story_id,
             chapter_id,
-            num_planned_tasks
+            num_planned_tasks,
+            get_prompt_repository().get_snapshot()
         )
         self._conversations[thread_id] = metadata
+        if self._metadata_store:
+            self._metadata_store.save_conversation(thread_id, metadata.to_dict())
 
         # Log beat system activation
         if story_id and chapter_id:
@@ -114,7 +212,14 @@ class ConversationService:
 
     def get_conversation(self, thread_id: str) -> Optional[ConversationMetadata]:
         """Get conversation metadata by thread ID."""
-        return self._conversations.get(thread_id)
+        conversation = self._conversations.get(thread_id)
+        if conversation is None and self._metadata_store:
+            # Created by another worker or before a restart
+            data = self._metadata_store.load_conversation(thread_id)
+            if data:
+                conversation = ConversationMetadata.from_dict(data)
+                self._conversations[thread_id] = conversation
+        return conversation
 
     def delete_conversation(self, thread_id: str) -> bool:
         """
@@ -126,18 +231,46 @@ class ConversationService:
         Returns:
             True if deleted, False if not found
         """
-        if thread_id not in self._conversations:
+        if not self.get_conversation(thread_id):
             return False
 
-        # Remove from conversations dict
+        # Remove from conversations dict (and the persistent store)
         del self._conversations[thread_id]
-
-        # TODO: Clean up from MemorySaver when LangGraph provides deletion API
-        # For now, MemorySaver doesn't have a built-in delete method
-        # The state will remain in memory but won't be accessible via API
+        if self._metadata_store:
+            self._metadata_store.delete_conversation(thread_id)
+
+        # Free the checkpoints of both the immediate and the analysis thread
+        self.background_runner.discard_pending(thread_id)
+        self.memory.delete_thread(thread_id)
+        self.memory.delete_thread(thread_id + "_analysis")
+        get_transcript_cache().discard(thread_id)
+        self.contracts.discard(thread_id)
+        with self._turn_locks_guard:
+            self._turn_locks.pop(thread_id, None)
 
         return True
 
+    def _on_thread_evicted(self, thread_id: str):
+        """
+        Drop a conversation whose immediate thread was evicted from the checkpoint store.
+
+        An evicted analysis thread only loses its analysis; it is rebuilt on the next turn.
+        """
+        if thread_id.endswith("_analysis"):
+            return
+        self._conversations.pop(thread_id, None)
+        self.memory.delete_thread(thread_id + "_analysis")
+        get_transcript_cache().discard(thread_id)
+        self.contracts.discard(thread_id)
+        with self._turn_locks_guard:
+            self._turn_locks.pop(thread_id, None)
+
+    def get_checkpoint_stats(self) -> dict:
+        """Get checkpoint store statistics including bytes held per thread."""
+        stats = self.memory.get_stats()
+        stats["thread_bytes"] = self.memory.get_thread_bytes()
+        return stats
+
     async def send_message_stream(
         self,
         thread_id: str,
@@ -165,11 +298,43 @@ class ConversationService:
         if not conversation:
             raise ValueError(f"Conversation not found: {thread_id}")
 
-        # Create config
+        # The previous reply's contract is written onto the state as an extra checkpoint;
+        # give it up to contract_wait_timeout to land before this turn starts. A contract that is
+        # still being built waits for the turn lock and is dropped as outdated after the turn
+        if self.contracts.is_pending(thread_id):
+            await asyncio.to_thread(self.contracts.wait, thread_id, self.settings.contract_wait_timeout)
+        turn_lock = self._turn_lock(thread_id)
+        # Contract writes hold the lock only for a state read and write, so polling is cheap
+        # and, unlike a blocking acquire in a thread, cannot leak the lock when the client disconnects
+        while not turn_lock.acquire(blocking=False):
+            await asyncio.sleep(0.005)
+        try:
+            async for chunk in self._stream_turn(thread_id, conversation, message):
+                yield chunk
+        finally:
+            turn_lock.release()
+
+        # The reply is checkpointed now; build its contract off the critical path
+        self.contracts.start(thread_id)
+
+        # Trigger background analysis asynchronously
+        self._run_background_analysis(thread_id, conversation.child_id)
+
+    def _turn_lock(self, thread_id: str) -> threading.Lock:
+        """Get the lock serializing a conversation's turns and deferred contract writes."""
+        with self._turn_locks_guard:
+            return self._turn_locks.setdefault(thread_id, threading.Lock())
+
+    async def _stream_turn(self, thread_id: str, conversation: ConversationMetadata, message: str) -> AsyncIterator[str]:
+        """Run one turn of the immediate graph and yield the formatted spoken text chunks."""
+
+        # Create config (passed per invocation; nodes receive it via LangGraph)
         config = {
-            "configurable": {"thread_id": thread_id}
+            "configurable": {"thread_id": thread_id, "prompt_snapshot": conversation.prompt_snapshot}
         }
-        set_config(config)
+        if self.settings.contract_mode == "deferred":
+            # masterChatbot leaves the contract to the deferred pool; the turn ends with the reply
+            config["configurable"]["defer_contract"] = True
 
         # Create user message
         user_message = HumanMessage(content=message)
@@ -187,47 +352,21 @@ class ConversationService:
             initial_state["num_planned_tasks"] = conversation.num_planned_tasks
             print(f"✓ Using beat system: {conversation.story_id}/{conversation.chapter_id}")
 
-        # Track streaming state
-        seen_message_ids = set()
-        last_chunk_content = ""
-
-        # Stream response from immediate graph
-        for event in self.immediate_graph.stream(
+        # Stream response from immediate graph. astream keeps the event loop free:
+        # masterChatbot awaits the LLM and sync nodes run in the default executor.
+        # The spoken (grammar-corrected) text arrives on the custom stream; with
+        # stream_master_response it comes sentence by sentence as tokens are generated.
+        async for chunk in self.immediate_graph.astream(
             initial_state,
             config,
-            stream_mode="messages"
+            stream_mode="custom"
         ):
-            # event is a tuple: (message, metadata)
-            if isinstance(event, tuple):
-                msg, metadata = event
-
-                # Process messages from masterChatbot node (before format_response)
-                node = metadata.get('langgraph_node', '')
-                if node == 'masterChatbot':
-                    # Skip if we've already processed this exact message
-                    msg_id = getattr(msg, 'id', None)
-                    if msg_id and msg_id in seen_message_ids:
-                        continue
-
-                    if hasattr(msg, 'content') and msg.content:
-                        # Get only the NEW content since last chunk
-                        current_content = msg.content
-                        if len(current_content) > len(last_chunk_content):
-                            new_chunk = current_content[len(last_chunk_content):]
-                            last_chunk_content = current_content
-
-                            # Format the chunk in real-time
-                            formatted_chunk = ConversationService._format_chunk(new_chunk)
-
-                            if formatted_chunk:
-                                yield formatted_chunk
-
-                        # Mark this message ID as seen
-                        if msg_id:
-                            seen_message_ids.add(msg_id)
-
-        # Trigger background analysis asynchronously
-        self._run_background_analysis(thread_id, conversation.child_id)
+            spoken_text = chunk.get("spoken_text") if isinstance(chunk, dict) else None
+            if spoken_text:
+                # Format the chunk in real-time
+                formatted_chunk = ConversationService._format_chunk(spoken_text)
+                if formatted_chunk:
+                    yield formatted_chunk
 
     @staticmethod
     def _format_chunk(chunk: str) -> str:
@@ -290,17 +429,57 @@ class ConversationService:
 
         return formatted
 
-    def _run_background_analysis(self, thread_id: str, child_id: str):
-        """Run background analysis in a separate thread."""
+    def _store_contract(self, thread_id: str, message_id: str, contract) -> bool:
+        """
+        Write a deferred response contract onto the conversation state.
+
+        Args:
+            thread_id: Thread ID of the conversation
+            message_id: Id of the AI message the contract was built for
+            contract: The built ResponseContract
+
+        Returns:
+            True if stored as the latest contract, False if the message is no longer the latest
+            reply (only its per-turn entry in response_contracts is kept)
+        """
+        config = {"configurable": {"thread_id": thread_id}}
+        # Check and write under the turn lock: a turn starting in between would make the write
+        # land on the new turn's checkpoints
+        with self._turn_lock(thread_id):
+            state = self.immediate_graph.get_state(config)
+            messages = state.values.get("messages") if state and state.values else None
+            if not messages or all(message.id != message_id for message in messages):
+                return False
+            # The per-turn entry is keyed by message_id, so batch validation keeps every turn even
+            # when the contract arrives after the next turn; only the latest contract is replaced
+            latest = messages[-1].id == message_id
+            update = {"response_contracts": [compact_contract(contract, message_id)]}
+            if latest:
+                update["response_contract"] = contract
+            self.immediate_graph.update_state(config, update, as_node="masterChatbot")
+        return latest
+
+    def _run_background_analysis(self, thread_id: str, child_id: str) -> str:
+        """
+        Schedule background analysis for a conversation on the background runner.
+
+        Runs for the same conversation are coalesced: while one is in flight, only the
+        latest request is kept and it analyzes the transcript as of when it starts.
+
+        Returns:
+            Runner status ("started", "pending", "coalesced" or "rejected")
+        """
         def run_analysis():
             bg_thread_id = thread_id + "_analysis"
-            print("running analysis: ", bg_thread_id)
-            bg_config = {
-                "configurable": {"thread_id": bg_thread_id}
-            }
 
-            # Get conversation metadata for beat system fields
+            # Get conversation metadata for beat system fields and pinned prompts
             conversation = self.get_conversation(thread_id)
+            bg_config = {
+                "configurable": {
+                    "thread_id": bg_thread_id,
+                    "prompt_snapshot": conversation.prompt_snapshot if conversation else None,
+                }
+            }
             bg_state = {"child_id": child_id}
 
             # Include beat system fields if available
@@ -309,15 +488,49 @@ class ConversationService:
                 bg_state["chapter_id"] = conversation.chapter_id
                 bg_state["num_planned_tasks"] = conversation.num_planned_tasks
 
-            try:
-                self.background_graph.invoke(bg_state, bg_config)
-            except Exception:
-                # Suppress background errors
-                pass
+            # Sync invoke: the chat model instances are shared with amasterChatbot on the server's
+            # event loop, and async provider clients are tied to the loop that first used them, so
+            # a fresh loop per run would break later async calls. Failures are logged and counted
+            # by the runner
+            self.background_graph.invoke(bg_state, bg_config)
+
+        return self.background_runner.submit(thread_id, run_analysis)
+
+    def get_background_stats(self) -> dict:
+        """Get background analysis runner metrics (queue depth, run and failure counts), LLM limiter usage, transcript cache hits, child/audio book cache hits, deferred contract builds, masterChatbot prompt sizes, full/incremental background analyses, the background graph mode, per-worker runs and skips and per-node model calls, latency and tokens."""
+        return {
+            **self.background_runner.get_stats(),
+            "graph_mode": self.settings.background_graph_mode,
+            "llm_limiter": get_llm_limiter().get_stats(),
+            "transcript_cache": get_transcript_cache().get_stats(),
+            "data_cache": get_data_repository().get_stats(),
+            "contracts": self.contracts.get_stats(),
+            "history_window": get_history_window().get_stats(),
+            "incremental_analysis": get_incremental_analysis().get_stats(),
+            "scheduler": get_worker_scheduler().get_stats(),
+            "models": get_model_registry().get_stats(),
+        }
+
+    def warm_up(self) -> dict[str, dict]:
+        """
+        Load everything the first conversation would otherwise pay for.
+
+        Parses all beatpacks, compiles their retrievers and loads the prompt bundle.
+
+        Returns:
+            Per-component dict with the warm-up duration in seconds and what was loaded
+        """
+        timings = {}
+
+        start = time.perf_counter()
+        loaded = self.beat_manager.preload()
+        timings["beatpacks"] = {"seconds": round(time.perf_counter() - start, 3), **loaded}
+
+        start = time.perf_counter()
+        snapshot = get_prompt_repository().get_snapshot()
+        timings["prompts"] = {"seconds": round(time.perf_counter() - start, 3), "version": snapshot.version}
 
-        # Start background analysis in separate thread (fire-and-forget)
-        analysis_thread = threading.Thread(target=run_analysis, daemon=True)
-        analysis_thread.start()
+        return timings
 
     def get_conversation_history(self, thread_id: str) -> Optional[dict]:
         """
@@ -358,13 +571,22 @@ class ConversationService:
             }
         except Exception:
             return None
-    def get_last_response_contract(self, thread_id: str, validate: bool = False) -> Optional[dict]:
+    def get_last_response_contract(
+        self,
+        thread_id: str,
+        validate: bool = False,
+        wait_timeout: Optional[float] = None
+    ) -> Optional[dict]:
         """
         Get the last response contract from the conversation state.
 
+        A contract still being built in deferred mode is waited for; if it is not
+        ready within the deadline the result has no contract and "pending" set.
+
         Args:
             thread_id: Thread ID of the conversation
             validate: Whether to validate the contract against source content
+            wait_timeout: Seconds to wait for a pending contract (defaults to contract_wait_timeout)
 
         Returns:
             Dictionary with contract and optional validation results, or None if not found
@@ -373,6 +595,16 @@ class ConversationService:
         if not conversation:
             return None
 
+        if wait_timeout is None:
+            wait_timeout = self.settings.contract_wait_timeout
+        if not self.contracts.wait(thread_id, wait_timeout):
+            return {
+                "thread_id": thread_id,
+                "contract": None,
+                "pending": True,
+                "message": f"Response contract is still being built (waited {wait_timeout}s)"
+            }
+
         # Get state from memory
         config = {"configurable": {"thread_id": thread_id}}
 
@@ -419,3 +651,27 @@ class ConversationService:
             print(f"Error getting response contract: {e}")
             return None
 
+    def validate_conversation_contracts(self, thread_ids: Iterable[str]) -> Iterator[dict]:
+        """
+        Validate the contract of every turn of the given conversations.
+
+        Args:
+            thread_ids: Thread IDs of the conversations (duplicates are validated once)
+
+        Yields:
+            Per-turn validation results, {"thread_id", "error"} for unknown
+            conversations and a final {"summary": {...}} (see validate_contract_batch)
+        """
+        conversations = []
+        for thread_id in dict.fromkeys(thread_ids):
+            conversation = self.get_conversation(thread_id)
+            if not conversation:
+                yield {"thread_id": thread_id, "error": "Conversation not found"}
+                continue
+            conversations.append((thread_id, conversation.story_id, conversation.chapter_id))
+
+        def load_state(thread_id: str) -> Optional[dict]:
+            state = self.immediate_graph.get_state({"configurable": {"thread_id": thread_id}})
+            return state.values if state and state.values else None
+
+        yield from validate_contract_batch(conversations, load_state, beat_manager=self.beat_manager)
@@ -6,8 +6,12 @@ This module validates response contracts by checking:
 2. Claims are supported by evidence
 3. No unsupported factual claims are made
 """
+import hashlib
 import logging
-from typing import Optional, Dict, List, Tuple
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Callable, Iterable, Iterator, Optional, Dict, List, Tuple
 from pathlib import Path
 import sys
 
@@ -20,6 +24,115 @@ from beats import BeatPackManager
 logger = logging.getLogger(__name__)
 
 
+class SubstringIndex:
+    """
+    q-gram position index over a text for substring lookups.
+
+    A quote is located through the rarest of its q-grams, so a lookup costs
+    O(len(quote)) plus one comparison per occurrence of that q-gram, instead of a
+    scan over the whole text.
+    """
+
+    def __init__(self, text: str, q: int = 8):
+        self.text = text
+        self.q = q
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for pos in range(len(text) - q + 1):
+            postings[text[pos:pos + q]].append(pos)
+        self._postings = dict(postings)
+
+    def __contains__(self, quote: str) -> bool:
+        q = self.q
+        if len(quote) < q:
+            return quote in self.text
+
+        # Non-overlapping q-grams plus the last one cover the whole quote
+        offsets = list(range(0, len(quote) - q + 1, q))
+        if offsets[-1] != len(quote) - q:
+            offsets.append(len(quote) - q)
+
+        anchor, positions = 0, None
+        for offset in offsets:
+            candidates = self._postings.get(quote[offset:offset + q])
+            if candidates is None:
+                return False
+            if positions is None or len(candidates) < len(positions):
+                anchor, positions = offset, candidates
+
+        return any(pos >= anchor and self.text.startswith(quote, pos - anchor) for pos in positions)
+
+
+class SourceCorpus:
+    """Source content prepared once for evidence validation: raw and whitespace-normalized, both indexed."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.normalized = " ".join(text.split())
+        self._exact = SubstringIndex(text)
+        self._normalized = SubstringIndex(self.normalized)
+
+    def find(self, quote: str) -> Optional[str]:
+        """
+        Look up a (stripped) quote.
+
+        Returns:
+            "exact", "normalized" (found after collapsing whitespace) or None
+        """
+        if quote in self._exact:
+            return "exact"
+        if " ".join(quote.split()) in self._normalized:
+            return "normalized"
+        return None
+
+
+class SourceCorpusCache:
+    """LRU cache of SourceCorpus objects keyed by (story_id, chapter_id, content hash)."""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._corpora: "OrderedDict[Tuple[str, str, str], SourceCorpus]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str, str], build: Callable[[], Optional[str]]) -> Optional[SourceCorpus]:
+        """Get the corpus for key, building it from build() (source text or None) on a miss."""
+        with self._lock:
+            corpus = self._corpora.get(key)
+            if corpus is not None:
+                self._corpora.move_to_end(key)
+                self.hits += 1
+                return corpus
+            self.misses += 1
+
+        text = build()
+        if not text:
+            return None
+        corpus = SourceCorpus(text)
+        with self._lock:
+            self._corpora[key] = corpus
+            self._corpora.move_to_end(key)
+            while len(self._corpora) > self.max_entries:
+                self._corpora.popitem(last=False)
+        return corpus
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._corpora), "capacity": self.max_entries}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._corpora.clear()
+
+
+_corpus_cache = SourceCorpusCache()
+
+
+def get_corpus_cache() -> SourceCorpusCache:
+    """Get the process-wide source corpus cache."""
+    return _corpus_cache
+
+
 class ValidationResult:
     """Result of contract validation."""
 
@@ -83,6 +196,10 @@ class OutputContractValidator:
         """
         result = ValidationResult()
 
+        # The conversation state holds ResponseContract models
+        if hasattr(contract, "model_dump"):
+            contract = contract.model_dump()
+
         # Validate required fields
         if not contract:
             result.add_error("Contract is empty or None")
@@ -135,22 +252,8 @@ class OutputContractValidator:
     ):
         """Validate that evidence quotes exist in source content."""
 
-        # Get source content
-        source_content = None
-        if self.beat_manager and story_id and chapter_id:
-            # Use beat system
-            retriever = self.beat_manager.get_retriever(story_id, chapter_id)
-            if retriever:
-                # Get all beats as source content
-                all_beats = retriever.get_all_beats()
-                source_content = "\n".join([beat.content for beat in all_beats])
-                logger.info(f"Using beat-based content for validation ({len(all_beats)} beats)")
-
-        if not source_content and full_content:
-            source_content = full_content
-            logger.info("Using full content for validation")
-
-        if not source_content:
+        corpus = self._get_corpus(story_id, chapter_id, full_content)
+        if corpus is None:
             result.add_warning("No source content available for evidence validation")
             return
 
@@ -168,25 +271,49 @@ class OutputContractValidator:
                 result.add_error(f"Evidence {idx}: Empty quote")
                 evidence_result["error"] = "Empty quote"
             else:
-                # Check if quote exists exactly in source content
-                if quote in source_content:
+                # Exact match first, then with normalized whitespace
+                match_type = corpus.find(quote)
+                if match_type == "exact":
                     evidence_result["found"] = True
                     logger.info(f"✓ Evidence {idx}: Quote verified in source")
+                elif match_type == "normalized":
+                    evidence_result["found"] = True
+                    evidence_result["match_type"] = "normalized"
+                    result.add_warning(f"Evidence {idx}: Quote found with normalized whitespace")
                 else:
-                    # Try fuzzy matching (normalize whitespace)
-                    normalized_quote = " ".join(quote.split())
-                    normalized_source = " ".join(source_content.split())
-
-                    if normalized_quote in normalized_source:
-                        evidence_result["found"] = True
-                        evidence_result["match_type"] = "normalized"
-                        result.add_warning(f"Evidence {idx}: Quote found with normalized whitespace")
-                    else:
-                        result.add_error(f"Evidence {idx}: Quote not found in source content: '{quote[:50]}...'")
-                        evidence_result["error"] = "Quote not found in source"
+                    result.add_error(f"Evidence {idx}: Quote not found in source content: '{quote[:50]}...'")
+                    evidence_result["error"] = "Quote not found in source"
 
             result.evidence_validation.append(evidence_result)
 
+    def _get_corpus(
+        self,
+        story_id: Optional[str],
+        chapter_id: Optional[str],
+        full_content: Optional[str]
+    ) -> Optional[SourceCorpus]:
+        """Get the cached source corpus: the chapter's beats if available, else full_content."""
+        if self.beat_manager and story_id and chapter_id:
+            beatpack = self.beat_manager.get_beatpack(story_id, chapter_id)
+            if beatpack:
+                def build_from_beats() -> Optional[str]:
+                    retriever = self.beat_manager.get_retriever(story_id, chapter_id)
+                    if not retriever:
+                        return None
+                    all_beats = retriever.get_all_beats()
+                    logger.info(f"Building beat-based validation corpus ({len(all_beats)} beats)")
+                    return "\n".join(beat.text for beat in all_beats)
+
+                corpus = _corpus_cache.get((story_id, chapter_id, beatpack.chapter_hash), build_from_beats)
+                if corpus:
+                    return corpus
+
+        if full_content:
+            content_hash = hashlib.sha256(full_content.encode("utf-8")).hexdigest()
+            return _corpus_cache.get(("", "full_content", content_hash), lambda: full_content)
+
+        return None
+
     def _validate_claims(
         self,
         claims_list: List[dict],
@@ -253,3 +380,60 @@ def validate_response_contract(
     validator = OutputContractValidator(beat_manager)
     return validator.validate_contract(contract, story_id, chapter_id, full_content)
 
+
+
+def validate_contract_batch(
+    conversations: Iterable[Tuple[str, Optional[str], Optional[str]]],
+    load_state: Callable[[str], Optional[dict]],
+    beat_manager: Optional[BeatPackManager] = None
+) -> Iterator[dict]:
+    """
+    Validate the retained contract of every turn of many conversations.
+
+    Conversations are grouped by chapter, so each chapter corpus is built once
+    and stays cached while all of its conversations are validated. States are
+    loaded one conversation at a time.
+
+    Args:
+        conversations: (thread_id, story_id, chapter_id) per conversation
+        load_state: Returns the state values of a thread (None if it has none)
+        beat_manager: BeatPackManager instance (optional)
+
+    Yields:
+        One result per turn (thread_id, turn, message_id, story_id, chapter_id and the
+        ValidationResult fields), {"thread_id", "error"} for a conversation without
+        state, and finally {"summary": {...}} with the totals
+    """
+    start = time.perf_counter()
+    by_chapter: Dict[Tuple[Optional[str], Optional[str]], List[str]] = {}
+    for thread_id, story_id, chapter_id in conversations:
+        by_chapter.setdefault((story_id, chapter_id), []).append(thread_id)
+
+    validator = OutputContractValidator(beat_manager)
+    summary = {"conversations": 0, "turns": 0, "valid": 0, "invalid": 0, "missing": 0, "chapters": len(by_chapter)}
+
+    for (story_id, chapter_id), thread_ids in by_chapter.items():
+        for thread_id in thread_ids:
+            state = load_state(thread_id)
+            if state is None:
+                summary["missing"] += 1
+                yield {"thread_id": thread_id, "error": "No conversation state found"}
+                continue
+
+            summary["conversations"] += 1
+            full_content = state.get("audio_book")
+            for turn, contract in enumerate(state.get("response_contracts") or []):
+                result = validator.validate_contract(contract, story_id, chapter_id, full_content)
+                summary["turns"] += 1
+                summary["valid" if result.is_valid else "invalid"] += 1
+                yield {
+                    "thread_id": thread_id,
+                    "turn": turn,
+                    "message_id": contract.get("message_id"),
+                    "story_id": story_id,
+                    "chapter_id": chapter_id,
+                    **result.to_dict()
+                }
+
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    yield {"summary": summary}
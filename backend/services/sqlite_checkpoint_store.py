@@ -0,0 +1,474 @@
+"""
+SQLite checkpoint store for the conversation graphs.
+
+Checkpoints, pending writes, channel blobs and conversation metadata live in a
+single SQLite file in WAL mode. Any process that opens the same file can
+resume any thread_id, so the API can run several workers on a shared volume
+and restart without losing sessions.
+
+The blobs and checkpoint of a put() are committed in one transaction, and so
+are the writes of each put_writes() (one finished task). A task's writes are
+visible to every process and survive a crash as soon as the task completes,
+not only once the superstep's checkpoint is written.
+"""
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+logger = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    checkpoint_type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    channel_versions TEXT NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    value_type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    value_type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS conversations (
+    thread_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+class SQLiteSaver(BaseCheckpointSaver[str]):
+    """
+    LangGraph checkpoint saver backed by a SQLite file (WAL mode).
+
+    Args:
+        path: Database file (created with its parent directory if missing)
+        max_checkpoints_per_thread: Keep only the latest N checkpoints per thread (None/0 keeps all)
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_checkpoints_per_thread: Optional[int] = None,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread or None
+
+        self._lock = threading.RLock()
+        # Autocommit mode; transactions are opened explicitly with BEGIN
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+
+        logger.info(f"SQLiteSaver initialized at {self.path}")
+
+    # ------------------------------------------------------------------
+    # BaseCheckpointSaver API
+    # ------------------------------------------------------------------
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        # Same format as MemorySaver: sortable counter plus a random suffix
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        with self._lock:
+            if checkpoint_id:
+                row = self._conn.execute(
+                    "SELECT * FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT * FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+            return self._row_to_tuple(row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        results = []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM checkpoints {where} ORDER BY checkpoint_id DESC", params
+            ).fetchall()
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                if filter:
+                    metadata = self.serde.loads_typed((row[6], row[7]))
+                    if not all(metadata.get(k) == v for k, v in filter.items()):
+                        continue
+                results.append(self._row_to_tuple(row))
+        yield from results
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        c = checkpoint.copy()
+        values: dict[str, Any] = c.pop("channel_values")
+        blob_rows = [
+            (thread_id, checkpoint_ns, channel, str(version),
+             *(self.serde.dumps_typed(values[channel]) if channel in values else ("empty", b"")))
+            for channel, version in new_versions.items()
+        ]
+        checkpoint_type, checkpoint_bytes = self.serde.dumps_typed(c)
+        metadata_type, metadata_bytes = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blob_rows)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                     checkpoint_type, checkpoint_bytes, metadata_type, metadata_bytes,
+                     json.dumps({k: str(v) for k, v in checkpoint["channel_versions"].items()})),
+                )
+                self._prune_checkpoints(thread_id, checkpoint_ns)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # Special channels (errors, interrupts, ...) replace, regular writes are idempotent
+        replace, ignore = [], []
+        for idx, (channel, value) in enumerate(writes):
+            (replace if channel in WRITES_IDX_MAP else ignore).append((
+                thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx),
+                channel, *self.serde.dumps_typed(value), task_path,
+            ))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", replace)
+                self._conn.executemany("INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", ignore)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for table in ("checkpoints", "writes", "blobs"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: [*self.list(config, filter=filter, before=before, limit=limit)]
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.put_writes, config, writes, task_id, task_path
+        )
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.delete_thread, thread_id)
+
+    # ------------------------------------------------------------------
+    # Conversation metadata
+    # ------------------------------------------------------------------
+
+    def save_conversation(self, thread_id: str, data: dict) -> None:
+        """Persist conversation metadata (JSON-serializable dict) for thread_id."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO conversations VALUES (?, ?, ?)",
+                (thread_id, json.dumps(data), datetime.now(timezone.utc).isoformat()),
+            )
+
+    def load_conversation(self, thread_id: str) -> Optional[dict]:
+        """Load conversation metadata for thread_id, or None if unknown."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM conversations WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_conversations(self) -> Sequence[str]:
+        """Thread IDs of all conversations with stored metadata."""
+        with self._lock:
+            rows = self._conn.execute("SELECT thread_id FROM conversations ORDER BY thread_id").fetchall()
+        return [row[0] for row in rows]
+
+    def delete_conversation(self, thread_id: str) -> None:
+        """Delete conversation metadata for thread_id."""
+        with self._lock:
+            self._conn.execute("DELETE FROM conversations WHERE thread_id = ?", (thread_id,))
+
+    # ------------------------------------------------------------------
+    # Maintenance and observability
+    # ------------------------------------------------------------------
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def get_thread_bytes(self) -> dict[str, int]:
+        """
+        Get the serialized bytes stored per thread (checkpoints, pending writes and blobs).
+
+        Returns:
+            Dictionary mapping thread_id to bytes
+        """
+        sizes: dict[str, int] = {}
+        with self._lock:
+            for query in (
+                "SELECT thread_id, SUM(LENGTH(checkpoint) + LENGTH(metadata)) FROM checkpoints GROUP BY thread_id",
+                "SELECT thread_id, SUM(LENGTH(value)) FROM writes GROUP BY thread_id",
+                "SELECT thread_id, SUM(LENGTH(value)) FROM blobs GROUP BY thread_id",
+            ):
+                for thread_id, size in self._conn.execute(query):
+                    sizes[thread_id] = sizes.get(thread_id, 0) + (size or 0)
+        return sizes
+
+    def get_stats(self) -> dict:
+        """
+        Get store statistics.
+
+        Returns:
+            Dictionary with thread/checkpoint counts, bytes held and the database path
+        """
+        thread_bytes = self.get_thread_bytes()
+        with self._lock:
+            threads, checkpoints = self._conn.execute(
+                "SELECT COUNT(DISTINCT thread_id), COUNT(*) FROM checkpoints"
+            ).fetchone()
+        return {
+            "backend": "sqlite",
+            "path": str(self.path),
+            "threads": threads,
+            "checkpoints": checkpoints,
+            "bytes": sum(thread_bytes.values()),
+            "limits": {"max_checkpoints_per_thread": self.max_checkpoints_per_thread},
+        }
+
+    # ------------------------------------------------------------------
+    # Internals (called with self._lock held)
+    # ------------------------------------------------------------------
+
+    def _prune_checkpoints(self, thread_id: str, checkpoint_ns: str) -> None:
+        """Keep only the latest max_checkpoints_per_thread checkpoints and the blobs they reference."""
+        if not self.max_checkpoints_per_thread:
+            return
+        stale = [row[0] for row in self._conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.max_checkpoints_per_thread),
+        )]
+        if not stale:
+            return
+        stale_rows = [(thread_id, checkpoint_ns, checkpoint_id) for checkpoint_id in stale]
+        self._conn.executemany(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", stale_rows
+        )
+        self._conn.executemany(
+            "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", stale_rows
+        )
+
+        referenced = set()
+        for (versions,) in self._conn.execute(
+            "SELECT channel_versions FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?",
+            (thread_id, checkpoint_ns),
+        ):
+            referenced.update(json.loads(versions).items())
+        unreferenced = [
+            (thread_id, checkpoint_ns, channel, version)
+            for channel, version in self._conn.execute(
+                "SELECT channel, version FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?",
+                (thread_id, checkpoint_ns),
+            ).fetchall()
+            if (channel, version) not in referenced
+        ]
+        self._conn.executemany(
+            "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+            unreferenced,
+        )
+
+    def _row_to_tuple(self, row) -> CheckpointTuple:
+        (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,
+         checkpoint_type, checkpoint_bytes, metadata_type, metadata_bytes, _) = row
+        checkpoint: Checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_bytes))
+
+        channel_values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            blob = self._conn.execute(
+                "SELECT value_type, value FROM blobs "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if blob and blob[0] != "empty":
+                channel_values[channel] = self.serde.loads_typed(blob)
+
+        writes = self._conn.execute(
+            "SELECT task_id, channel, value_type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed((metadata_type, metadata_bytes)),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value in writes
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+        )
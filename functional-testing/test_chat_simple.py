@@ -7,7 +7,6 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agentic-system
 from immediate_graph import create_immediate_response_graph
 from background_graph import create_background_analysis_graph
 from nodes import set_background_graph
-from immediate_graph import set_config
 from langchain.chat_models import init_chat_model
 from langchain_core.messages import HumanMessage
 from langgraph.checkpoint.memory import MemorySaver
@@ -21,7 +20,6 @@ set_background_graph(bg_graph)
 im_graph = create_immediate_response_graph(llm, memory, bg_graph)
 
 config = {'configurable': {'thread_id': 'test_final'}}
-set_config(config)
 
 print('🧪 Testing chat functionality...\n')
 msg = HumanMessage(content='Say hi in 5 words')
@@ -0,0 +1,172 @@
+"""
+A/B comparison of the background graph modes: "workers" vs "fused".
+
+"workers" runs one LLM call per background worker (six in parallel, then
+foerderfokus -> aufgaben and satzbauAnalyse -> satzbauBegrenzung). "fused"
+produces the same analyses with two structured-output calls (FUSED_WORKER_GROUPS
+in nodes.py).
+
+Latency and tokens: runs the background graph after every turn of a simulated
+session with the repo's worker prompts and a fake chat model whose answer time
+is --latency plus --seconds-per-token for every output token (tokens estimated
+as in history_window, about four characters each). Reports the wall-clock time
+per background run (the critical path), LLM calls, and input/output tokens.
+
+Feature tests (--feature-tests): runs the feature-testing suite once per mode
+with BACKGROUND_GRAPH_MODE set (see tests/feature-testing/ft_config.py) and
+reports the pass rate of each. This calls the real LLMs and needs their API keys.
+
+Usage:
+    cd <project-root>
+    python scripts/ab_background_mode.py [--turns 5] [--schedule always] [--analysis-words 150]
+    python scripts/ab_background_mode.py --feature-tests [--pytest-args "-k grammar"]
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+_project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(_project_root))
+sys.path.insert(0, str(_project_root / "agentic-system"))
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+import nodes
+from background_graph import FUSED, WORKERS, create_background_analysis_graph
+from history_window import configure_history_window, estimate_tokens
+from incremental_analysis import configure_incremental_analysis
+from transcript_cache import configure_transcript_cache
+from worker_scheduler import configure_worker_scheduler
+
+logging.disable(logging.WARNING)
+
+CHILD = ["Im Haus!", "Ich weiß nicht.", "Vielleicht hinter dem Busch?", "Der Hund hat ihn!", "Ja, weiter!"]
+REPLY = ("Oh, das ist eine tolle Idee! Mia und Leo laufen zusammen in den Garten und suchen den roten Ball. "
+         "Leo schaut unter dem großen Baum nach, aber da ist er nicht. Wo könnte der Ball wohl sein?")
+FUSED_KEYS = re.compile(r"exactly these keys, in this order: ([^.]+)\.")
+
+
+class TimedChatModel(BaseChatModel):
+    """Fake chat model with a per-call latency plus a per-output-token generation time; answers fused calls in JSON."""
+
+    analysis_words: int = 150
+    latency: float = 0.4
+    seconds_per_token: float = 0.002
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "timed-fake"
+
+    def _answer(self, messages) -> str:
+        self.calls += 1
+        self.input_tokens += sum(estimate_tokens(str(msg.content)) for msg in messages)
+        analysis = " ".join(["Beobachtung"] * self.analysis_words)
+        keys = FUSED_KEYS.search(str(messages[0].content))
+        text = json.dumps({key: analysis for key in keys.group(1).split(", ")}) if keys else analysis
+        self.output_tokens += estimate_tokens(text)
+        return text
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text = self._answer(messages)
+        time.sleep(self.latency + estimate_tokens(text) * self.seconds_per_token)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+def run_session(mode: str, schedule: str, turns: int, llm: TimedChatModel) -> list[float]:
+    """Run the background graph after every turn of a simulated session; return the seconds per run."""
+    # Full transcripts in both modes (fused calls always read the whole transcript)
+    configure_incremental_analysis("full", 1)
+    configure_worker_scheduler(schedule)
+    configure_transcript_cache(100)
+    configure_history_window(keep_turns=0, token_budget=3000)
+
+    memory = MemorySaver()
+    builder = StateGraph(MessagesState)
+    builder.add_node("noop", lambda state: {})
+    builder.add_edge(START, "noop")
+    builder.add_edge("noop", END)
+    immediate = builder.compile(checkpointer=memory)
+    nodes.background_graph = immediate
+
+    graph = create_background_analysis_graph(llm, memory, mode=mode)
+    state = {"child_id": "1", "audio_book": "Buch", "child_profile": "Lena, 5 Jahre, mag Hunde"}
+    seconds = []
+    for turn in range(turns):
+        immediate.invoke(
+            {"messages": [HumanMessage(content=CHILD[turn % len(CHILD)]), AIMessage(content=REPLY)]},
+            {"configurable": {"thread_id": f"ab_{mode}"}},
+        )
+        start = time.perf_counter()
+        graph.invoke(state, {"configurable": {"thread_id": f"ab_{mode}_analysis"}})
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def run_feature_tests(mode: str, pytest_args: str) -> dict:
+    """Run the feature-testing suite with the given background graph mode; return the junit counts."""
+    with tempfile.TemporaryDirectory() as tmp:
+        report = Path(tmp) / "report.xml"
+        subprocess.run(
+            [sys.executable, "-m", "pytest", "tests/feature-testing", "-q", f"--junitxml={report}",
+             *shlex.split(pytest_args)],
+            cwd=_project_root, env={**os.environ, "BACKGROUND_GRAPH_MODE": mode},
+        )
+        if not report.exists():
+            return {"tests": 0, "failed": 0, "skipped": 0}
+        suite = ET.parse(report).getroot()
+        suite = suite if suite.tag == "testsuite" else suite.find("testsuite")
+        return {
+            "tests": int(suite.get("tests", 0)),
+            "failed": int(suite.get("failures", 0)) + int(suite.get("errors", 0)),
+            "skipped": int(suite.get("skipped", 0)),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--schedule", choices=["always", "adaptive"], default="always")
+    parser.add_argument("--analysis-words", type=int, default=150)
+    parser.add_argument("--latency", type=float, default=0.4, help="Seconds per LLM call before the first token")
+    parser.add_argument("--seconds-per-token", type=float, default=0.002, help="Seconds per output token")
+    parser.add_argument("--feature-tests", action="store_true", help="Also compare the feature-test pass rates")
+    parser.add_argument("--pytest-args", default="", help="Extra pytest arguments for --feature-tests")
+    args = parser.parse_args()
+
+    print(f"\nBackground graph modes ({args.turns} turns, schedule={args.schedule}, "
+          f"{args.analysis_words}-word analyses, {args.latency}s + {args.seconds_per_token}s/token)")
+    print(f"{'mode':<9}{'s/run':>8}{'max s':>8}{'calls':>7}{'input tok':>11}{'output tok':>12}")
+    for mode in (WORKERS, FUSED):
+        llm = TimedChatModel(analysis_words=args.analysis_words, latency=args.latency,
+                             seconds_per_token=args.seconds_per_token)
+        seconds = run_session(mode, args.schedule, args.turns, llm)
+        print(f"{mode:<9}{sum(seconds) / len(seconds):>8.2f}{max(seconds):>8.2f}{llm.calls:>7}"
+              f"{llm.input_tokens:>11}{llm.output_tokens:>12}")
+
+    if args.feature_tests:
+        print()
+        for mode in (WORKERS, FUSED):
+            counts = run_feature_tests(mode, args.pytest_args)
+            ran = counts["tests"] - counts["skipped"]
+            rate = (ran - counts["failed"]) / ran * 100 if ran else 0.0
+            print(f"{mode:<9} feature tests: {ran - counts['failed']}/{ran} passed ({rate:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark checkpoint write/read latency per conversation turn.
+
+Runs a graph shaped like the immediate graph (four nodes per turn, an
+audio_book-sized text channel and a growing message history) against each
+checkpoint backend and reports per-turn latency of graph.invoke (checkpoint
+writes) and graph.get_state (checkpoint read), plus the bytes held.
+
+Usage:
+    cd <project-root>
+    python scripts/benchmark_checkpoint_store.py [--conversations 20] [--turns 15]
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Annotated, TypedDict
+
+_project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(_project_root))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from backend.services.checkpoint_store import BoundedMemorySaver
+from backend.services.sqlite_checkpoint_store import SQLiteSaver
+
+AUDIO_BOOK = "Es war einmal ein kleiner Drache, der im Klippenwald wohnte. " * 300
+
+
+class BenchState(TypedDict, total=False):
+    messages: Annotated[list, add_messages]
+    audio_book: str
+    aufgaben: str
+    beat_context: str
+
+
+def _build_graph(checkpointer):
+    builder = StateGraph(BenchState)
+    builder.add_node("initialStateLoader", lambda state: {"audio_book": state.get("audio_book") or AUDIO_BOOK})
+    builder.add_node("load_analysis", lambda state: {"aufgaben": "Stelle eine offene Frage. " * 10})
+    builder.add_node("load_beat_context", lambda state: {"beat_context": "Beat: Der Drache fliegt. " * 40})
+    builder.add_node("masterChatbot", lambda state: {"messages": [AIMessage(content="Was glaubst du, wohin fliegt der Drache? " * 3)]})
+    builder.add_edge(START, "initialStateLoader")
+    builder.add_edge("initialStateLoader", "load_analysis")
+    builder.add_edge("load_analysis", "load_beat_context")
+    builder.add_edge("load_beat_context", "masterChatbot")
+    builder.add_edge("masterChatbot", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_backend(name: str, checkpointer, conversations: int, turns: int) -> None:
+    graph = _build_graph(checkpointer)
+    write_times, read_times = [], []
+    for turn in range(turns):
+        for c in range(conversations):
+            config = {"configurable": {"thread_id": f"conv_{c}"}}
+            start = time.perf_counter()
+            graph.invoke({"messages": [HumanMessage(content=f"Antwort {turn}")]}, config)
+            write_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            graph.get_state(config)
+            read_times.append(time.perf_counter() - start)
+
+    held = checkpointer.get_thread_bytes() if hasattr(checkpointer, "get_thread_bytes") else {
+        "all": sum(len(v[1]) for v in checkpointer.blobs.values())
+    }
+    print(
+        f"{name:<22} turn p50 {statistics.median(write_times) * 1000:6.2f}ms  "
+        f"p95 {_percentile(write_times, 0.95) * 1000:6.2f}ms  |  "
+        f"get_state p50 {statistics.median(read_times) * 1000:6.2f}ms  "
+        f"p95 {_percentile(read_times, 0.95) * 1000:6.2f}ms  |  "
+        f"{sum(held.values()) / 1024 / 1024:7.2f} MiB held"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=15)
+    parser.add_argument("--max-per-thread", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.conversations} conversations x {args.turns} turns\n")
+    run_backend("MemorySaver (baseline)", MemorySaver(), args.conversations, args.turns)
+    run_backend(
+        "BoundedMemorySaver",
+        BoundedMemorySaver(max_checkpoints_per_thread=args.max_per_thread),
+        args.conversations, args.turns,
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        saver = SQLiteSaver(Path(tmp) / "checkpoints.sqlite", max_checkpoints_per_thread=args.max_per_thread)
+        run_backend("SQLiteSaver (WAL)", saver, args.conversations, args.turns)
+        saver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Load benchmark for ConversationService.send_message_stream.
+
+Runs N conversations concurrently against a fake chat model with a fixed
+latency and reports wall time and event-loop lag. With the async streaming
+path the wall time stays close to a single LLM call; a blocking path grows
+linearly with N and the event loop stalls for the whole run.
+
+Usage:
+    cd <project-root>
+    python scripts/benchmark_concurrent_streams.py [--conversations 20] [--latency 1.0]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+_project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(_project_root))
+sys.path.insert(0, str(_project_root / "agentic-system"))
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from backend.core.config import Settings
+from backend.services.conversation_service import ConversationService
+
+logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+
+
+class FixedLatencyChatModel(BaseChatModel):
+    """Fake chat model that answers after a fixed latency (sync and async)."""
+
+    latency: float = 1.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fixed-latency-fake"
+
+    def _result(self) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="Hallo! Was möchtest du wissen?"))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return self._result()
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._result()
+
+
+async def _consume(service: ConversationService, thread_id: str) -> float:
+    start = time.perf_counter()
+    async for _ in service.send_message_stream(thread_id, "Erzähl mir von der Geschichte"):
+        pass
+    return time.perf_counter() - start
+
+
+async def run_benchmark(conversations: int, latency: float) -> None:
+    service = ConversationService(
+        llm_model="unused",
+        settings=Settings(use_s3_prompts=False),
+        llm=FixedLatencyChatModel(latency=latency),
+    )
+    # Only the immediate path is measured
+    service._run_background_analysis = lambda *args, **kwargs: None
+
+    # Warm-up so imports and caches do not skew the first measurement
+    await _consume(service, service.create_conversation(child_id="1").thread_id)
+
+    max_lag = 0.0
+    stop = asyncio.Event()
+
+    async def heartbeat():
+        nonlocal max_lag
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.01)
+            max_lag = max(max_lag, time.perf_counter() - t0 - 0.01)
+
+    thread_ids = [service.create_conversation(child_id="1").thread_id for _ in range(conversations)]
+    ticker = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    durations = await asyncio.gather(*(_consume(service, t) for t in thread_ids))
+    wall = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    durations.sort()
+    print(f"\nConcurrent conversations: {conversations}")
+    print(f"LLM latency:              {latency:.2f}s")
+    print(f"Wall time:                {wall:.2f}s (serialized would be >= {conversations * latency:.2f}s)")
+    print(f"Per-stream p50 / max:     {durations[len(durations) // 2]:.2f}s / {durations[-1]:.2f}s")
+    print(f"Max event-loop lag:       {max_lag * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.conversations, args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Per-turn latency benchmark: inline vs deferred output contracts.
+
+Runs the same turns through ConversationService.send_message_stream with
+contract_mode="inline" (contract built inside masterChatbot) and
+contract_mode="deferred" (contract built on the contract pool after the
+reply). The fake chat model answers instantly with a long reply quoting the
+story, so the measured turn time is dominated by the service itself and the
+contract's sentence splitting and grounding against the active beats.
+
+For deferred mode the time until the contract is readable is reported too.
+
+Usage:
+    cd <project-root>
+    python scripts/benchmark_contract_latency.py [--turns 30] [--story mia_und_leo] [--chapter chapter_01]
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+_project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(_project_root))
+sys.path.insert(0, str(_project_root / "agentic-system"))
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from backend.core.config import Settings
+from backend.services.conversation_service import ConversationService
+
+logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+
+
+class QuotingChatModel(BaseChatModel):
+    """Fake chat model that answers instantly with a fixed (story-quoting) reply."""
+
+    reply: str = ""
+
+    @property
+    def _llm_type(self) -> str:
+        return "quoting-fake"
+
+    def _result(self) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return self._result()
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return self._result()
+
+
+def _story_reply(service: ConversationService, story_id: str, chapter_id: str, sentences: int) -> str:
+    """A reply quoting (and slightly paraphrasing) sentences of the chapter's beats."""
+    beats = service.beat_manager.get_retriever(story_id, chapter_id).get_all_beats()
+    quoted = []
+    for beat in beats:
+        for sentence in beat.text.replace("!", ".").replace("?", ".").split("."):
+            words = sentence.split()
+            if len(words) >= 5:
+                # Drop a word so grounding has to fall back to fuzzy matching
+                quoted.append(" ".join(words[:2] + words[3:]))
+    return ". ".join(quoted[:sentences]) + ". Was glaubst du, was als Nächstes passiert?"
+
+
+async def _turn(service: ConversationService, thread_id: str) -> float:
+    start = time.perf_counter()
+    async for _ in service.send_message_stream(thread_id, "Erzähl mir von der Geschichte"):
+        pass
+    return time.perf_counter() - start
+
+
+async def run_mode(mode: str, turns: int, story_id: str, chapter_id: str, sentences: int) -> dict:
+    llm = QuotingChatModel()
+    service = ConversationService(
+        llm_model="unused",
+        settings=Settings(use_s3_prompts=False, contract_mode=mode, stream_master_response=False),
+        llm=llm,
+    )
+    # Only the immediate path is measured
+    service._run_background_analysis = lambda *args, **kwargs: None
+    llm.reply = _story_reply(service, story_id, chapter_id, sentences)
+
+    # Warm-up so imports and caches do not skew the first measurement
+    warm = service.create_conversation(child_id="1", story_id=story_id, chapter_id=chapter_id)
+    await _turn(service, warm.thread_id)
+    service.get_last_response_contract(warm.thread_id)
+
+    turn_times, ready_times, evidence = [], [], []
+    for _ in range(turns):
+        conversation = service.create_conversation(child_id="1", story_id=story_id, chapter_id=chapter_id)
+        start = time.perf_counter()
+        turn_times.append(await _turn(service, conversation.thread_id))
+        contract = await asyncio.to_thread(service.get_last_response_contract, conversation.thread_id, wait_timeout=30)
+        ready_times.append(time.perf_counter() - start)
+        evidence.append(len(contract["contract"].grounding.evidence))
+
+    service.contracts.shutdown()
+    return {
+        "turn_p50": statistics.median(turn_times),
+        "turn_max": max(turn_times),
+        "ready_p50": statistics.median(ready_times),
+        "evidence": statistics.mean(evidence),
+    }
+
+
+async def run_benchmark(turns: int, story_id: str, chapter_id: str, sentences: int) -> None:
+    results = {mode: await run_mode(mode, turns, story_id, chapter_id, sentences) for mode in ("inline", "deferred")}
+
+    print(f"\nTurns per mode:  {turns} ({story_id}/{chapter_id}, {sentences} quoted sentences per reply)")
+    print(f"{'mode':<10}{'turn p50':>12}{'turn max':>12}{'contract p50':>15}{'evidence':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<10}{r['turn_p50'] * 1000:>10.1f}ms{r['turn_max'] * 1000:>10.1f}ms"
+              f"{r['ready_p50'] * 1000:>13.1f}ms{r['evidence']:>10.1f}")
+    saved = results["inline"]["turn_p50"] - results["deferred"]["turn_p50"]
+    print(f"\nPer-turn reduction (p50): {saved * 1000:.1f}ms "
+          f"({saved / results['inline']['turn_p50'] * 100:.0f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--story", default="mia_und_leo")
+    parser.add_argument("--chapter", default="chapter_01")
+    parser.add_argument("--sentences", type=int, default=12)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.turns, args.story, args.chapter, args.sentences))
+
+
+if __name__ == "__main__":
+    main()
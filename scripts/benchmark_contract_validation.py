@@ -0,0 +1,100 @@
+"""
+Benchmark evidence validation cost against the number of evidence items.
+
+Validates contracts with 1..N evidence quotes (taken verbatim, with extra
+whitespace and made up) against a chapter with the current validator and
+with the previous per-item implementation (kept below as the reference):
+that one rebuilt the chapter source on every call and re-normalized the
+whole source for every quote not found verbatim. Reports the per-call and
+per-item cost and fails if any evidence result differs.
+
+Usage:
+    cd <project-root>
+    python scripts/benchmark_contract_validation.py [--story pia_muss_nicht_perfekt_sein] [--chapter chapter_01]
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+_project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(_project_root))
+sys.path.insert(0, str(_project_root / "agentic-system"))
+
+from beats import BeatPackManager
+from backend.services.output_contract_validator import OutputContractValidator
+
+logging.disable(logging.WARNING)
+
+CONTENT_DIR = _project_root / "agentic-system" / "content"
+
+
+def legacy_validate_evidence(beat_manager, evidence_list, story_id, chapter_id):
+    """Previous _validate_evidence (with beat.text instead of the missing beat.content)."""
+    retriever = beat_manager.get_retriever(story_id, chapter_id)
+    source_content = "\n".join([beat.text for beat in retriever.get_all_beats()])
+    results = []
+    for evidence in evidence_list:
+        quote = evidence.get("quote", "").strip()
+        if quote in source_content:
+            results.append((True, None))
+        else:
+            normalized_quote = " ".join(quote.split())
+            normalized_source = " ".join(source_content.split())
+            results.append((True, "normalized") if normalized_quote in normalized_source else (False, None))
+    return results
+
+
+def build_evidence(beat_manager, story_id, chapter_id, count):
+    sentences = []
+    for beat in beat_manager.get_retriever(story_id, chapter_id).get_all_beats():
+        sentences += [s.strip() for s in beat.text.split(".") if len(s.split()) >= 3]
+    evidence = []
+    for i in range(count):
+        sentence = sentences[i % len(sentences)]
+        if i % 3 == 1:
+            sentence = sentence.replace(" ", "  ", 1)
+        elif i % 3 == 2:
+            sentence = f"{sentence} und dann flog ein Drache vorbei"
+        evidence.append({"quote": sentence, "beat_id": None})
+    return evidence
+
+
+def _time(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--story", default="pia_muss_nicht_perfekt_sein")
+    parser.add_argument("--chapter", default="chapter_01")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    beat_manager = BeatPackManager(CONTENT_DIR)
+    validator = OutputContractValidator(beat_manager)
+    story_id, chapter_id = args.story, args.chapter
+
+    print(f"\n{story_id}/{chapter_id}, {args.repeat} calls per size")
+    print(f"{'evidence':>9}{'legacy/call':>14}{'legacy/item':>14}{'indexed/call':>15}{'indexed/item':>15}")
+    for count in (1, 5, 20, 50, 200):
+        evidence = build_evidence(beat_manager, story_id, chapter_id, count)
+        contract = {"spoken_text": "", "grounding": {"evidence": evidence, "claims": []}}
+
+        legacy = legacy_validate_evidence(beat_manager, evidence, story_id, chapter_id)
+        current = validator.validate_contract(contract, story_id, chapter_id).evidence_validation
+        if legacy != [(item["found"], item.get("match_type")) for item in current]:
+            raise SystemExit(f"Results differ for {count} evidence items")
+
+        legacy_time = _time(lambda: legacy_validate_evidence(beat_manager, evidence, story_id, chapter_id), args.repeat)
+        indexed_time = _time(lambda: validator.validate_contract(contract, story_id, chapter_id), args.repeat)
+        print(f"{count:>9}{legacy_time * 1e3:>12.3f}ms{legacy_time / count * 1e6:>12.1f}us"
+              f"{indexed_time * 1e3:>13.3f}ms{indexed_time / count * 1e6:>13.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Prompt size per turn with and without masterChatbot's history window.
+
+Runs one long conversation through ConversationService.send_message_stream
+(background analysis included, so the rolling summary is maintained) once
+with the full history (history_keep_turns=0) and once with the window. The
+fake chat model answers instantly with a reply of realistic length, so the
+numbers show how the prompt grows per turn, not model latency.
+
+Usage:
+    cd <project-root>
+    python scripts/benchmark_history_window.py [--turns 40] [--keep-turns 8] [--budget 3000]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+_project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(_project_root))
+sys.path.insert(0, str(_project_root / "agentic-system"))
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from backend.core.config import Settings
+from backend.services.conversation_service import ConversationService
+from history_window import get_history_window
+
+logging.disable(logging.WARNING)
+
+REPLY = ("Oh, das ist eine tolle Idee! Mia und Leo laufen zusammen in den Garten und suchen den roten Ball. "
+         "Leo schaut unter dem großen Baum nach, aber da ist er nicht. Wo könnte der Ball wohl sein? "
+         "Was glaubst du, wo sollen die beiden als Nächstes suchen?")
+CHILD = ["Im Haus!", "Ich weiß nicht.", "Vielleicht hinter dem Busch?", "Der Hund hat ihn!", "Ja, weiter!"]
+
+
+class InstantChatModel(BaseChatModel):
+    """Fake chat model that answers every call instantly with the same reply."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "instant-fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=REPLY))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return self._generate(messages)
+
+
+async def run_conversation(turns: int, keep_turns: int, budget: int) -> tuple[dict, list[float]]:
+    service = ConversationService(
+        llm_model="unused",
+        settings=Settings(use_s3_prompts=False, history_keep_turns=keep_turns, history_token_budget=budget),
+        llm=InstantChatModel(),
+    )
+    conversation = service.create_conversation(child_id="1", story_id="mia_und_leo", chapter_id="chapter_01")
+
+    durations = []
+    for turn in range(turns):
+        start = time.perf_counter()
+        async for _ in service.send_message_stream(conversation.thread_id, CHILD[turn % len(CHILD)]):
+            pass
+        durations.append(time.perf_counter() - start)
+        # Let the background analysis (and the summary) finish like it would between two child turns
+        await asyncio.to_thread(service.background_runner.wait_idle, 30)
+
+    stats = get_history_window().get_stats()
+    service.background_runner.shutdown()
+    return stats["prompt_tokens_by_turn"], durations
+
+
+async def run_benchmark(turns: int, keep_turns: int, budget: int) -> None:
+    full, full_durations = await run_conversation(turns, 0, budget)
+    windowed, windowed_durations = await run_conversation(turns, keep_turns, budget)
+
+    print(f"\nEstimated masterChatbot prompt tokens per turn ({turns} turns, keep_turns={keep_turns}, budget={budget})")
+    print(f"{'turn':>6}{'full history':>15}{'window':>10}")
+    for turn in sorted(full):
+        if turn in (1, 2, turns) or turn % 5 == 0:
+            print(f"{turn:>6}{full[turn]:>15.0f}{windowed.get(turn, 0):>10.0f}")
+
+    total_full, total_windowed = sum(full.values()), sum(windowed.values())
+    print(f"\nTotal prompt tokens: {total_full:.0f} -> {total_windowed:.0f} "
+          f"({(1 - total_windowed / total_full) * 100:.0f}% less)")
+    print(f"Last turn latency (fake model): {full_durations[-1] * 1000:.1f}ms -> {windowed_durations[-1] * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--keep-turns", type=int, default=8)
+    parser.add_argument("--budget", type=int, default=3000)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.turns, args.keep_turns, args.budget))
+
+
+if __name__ == "__main__":
+    main()
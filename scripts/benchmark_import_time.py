@@ -0,0 +1,91 @@
+"""
+Check the cold-start import budget of the API.
+
+Imports the API module in fresh interpreters with `python -X importtime` and
+compares the median cumulative import time against the budget checked in at
+scripts/import_time_budget.json. Also fails if a module that should be loaded
+lazily (langchain, langgraph, boto3, the fallback prompt texts, ...) is
+imported by the API module itself; those are loaded by the startup warm-up.
+
+Usage:
+    cd <project-root>
+    python scripts/benchmark_import_time.py [--runs 5] [--top 15]
+
+Exits with status 1 when the budget is exceeded.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+_project_root = Path(__file__).parent.parent
+BUDGET_FILE = Path(__file__).parent / "import_time_budget.json"
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _import_times(module: str) -> list[tuple[str, int, int, int]]:
+    """Import module in a fresh interpreter; return (name, self_us, cumulative_us, depth) per import."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(_project_root), str(_project_root / "agentic-system")])}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_project_root, env=env, capture_output=True, text=True, check=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return imports
+
+
+def _is_deferred(name: str, deferred: list[str]) -> bool:
+    return any(name == module or name.startswith(module + ".") for module in deferred)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Show the N slowest imports by self time")
+    args = parser.parse_args()
+
+    budget = json.loads(BUDGET_FILE.read_text())
+    module = budget["module"]
+
+    # First run fills the bytecode cache and is not counted
+    _import_times(module)
+    runs = [_import_times(module) for _ in range(args.runs)]
+    totals_ms = [
+        next(cumulative for name, _, cumulative, depth in imports if name == module and depth == 0) / 1000
+        for imports in runs
+    ]
+    median_ms = statistics.median(totals_ms)
+
+    print(f"import {module}: median {median_ms:.0f} ms over {args.runs} runs "
+          f"(min {min(totals_ms):.0f}, max {max(totals_ms):.0f}), budget {budget['max_ms']} ms")
+    print(f"\nSlowest imports by self time (last run):")
+    for name, self_us, cumulative_us, _ in sorted(runs[-1], key=lambda item: -item[1])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+
+    failures = []
+    if median_ms > budget["max_ms"]:
+        failures.append(f"median import time {median_ms:.0f} ms exceeds budget of {budget['max_ms']} ms")
+    eager = sorted({name for name, *_ in runs[-1] if _is_deferred(name, budget["deferred_modules"])})
+    if eager:
+        failures.append(f"modules that should load lazily were imported: {', '.join(eager[:10])}")
+
+    print()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: within the import budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
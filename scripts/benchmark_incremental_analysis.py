@@ -0,0 +1,130 @@
+"""
+Background analysis tokens per session: full vs incremental (delta) analysis.
+
+Runs the background analysis graph after every turn of a simulated session
+(the same transcript for every mode) with the repo's worker prompts and a
+fake chat model that answers instantly with an analysis of realistic length.
+Every worker call's input is counted with the estimate history_window uses
+(about four characters per token).
+
+"full" is the previous behaviour: every transcript-reading worker gets the
+whole conversation on every run. "delta" sends each worker its previous
+analysis plus the new messages, with a full re-analysis every --full-every runs.
+Both run every worker every turn; "adaptive" is delta with the default worker
+schedule (worker_scheduler.py), which skips workers that are not due.
+
+Usage:
+    cd <project-root>
+    python scripts/benchmark_incremental_analysis.py [--turns 20] [--full-every 5] [--analysis-words 150]
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+_project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(_project_root))
+sys.path.insert(0, str(_project_root / "agentic-system"))
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+import nodes
+from background_graph import create_background_analysis_graph
+from history_window import configure_history_window, estimate_tokens
+from incremental_analysis import configure_incremental_analysis
+from transcript_cache import configure_transcript_cache
+from worker_scheduler import configure_worker_scheduler
+
+logging.disable(logging.WARNING)
+
+CHILD = ["Im Haus!", "Ich weiß nicht.", "Vielleicht hinter dem Busch?", "Der Hund hat ihn!", "Ja, weiter!"]
+REPLY = ("Oh, das ist eine tolle Idee! Mia und Leo laufen zusammen in den Garten und suchen den roten Ball. "
+         "Leo schaut unter dem großen Baum nach, aber da ist er nicht. Wo könnte der Ball wohl sein?")
+
+
+class CountingChatModel(BaseChatModel):
+    """Fake chat model that answers instantly and counts the estimated input tokens of every call."""
+
+    analysis_words: int = 150
+    calls: int = 0
+    input_tokens: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "counting-fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        self.input_tokens += sum(estimate_tokens(str(msg.content)) for msg in messages)
+        text = " ".join(["Beobachtung"] * self.analysis_words)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return self._generate(messages)
+
+
+def run_session(mode: str, schedule: str, turns: int, full_every: int,
+                analysis_words: int) -> tuple[CountingChatModel, list[int]]:
+    configure_incremental_analysis(mode, full_every)
+    configure_worker_scheduler(schedule)
+    configure_transcript_cache(100)
+    # Full history window so the rolling summary does not add calls to either mode
+    configure_history_window(keep_turns=0, token_budget=3000)
+
+    memory = MemorySaver()
+    builder = StateGraph(MessagesState)
+    builder.add_node("noop", lambda state: {})
+    builder.add_edge(START, "noop")
+    builder.add_edge("noop", END)
+    immediate = builder.compile(checkpointer=memory)
+    nodes.background_graph = immediate
+
+    llm = CountingChatModel(analysis_words=analysis_words)
+    graph = create_background_analysis_graph(llm, memory)
+    state = {"child_id": "1", "audio_book": "Buch", "child_profile": "Lena, 5 Jahre, mag Hunde"}
+
+    per_turn = []
+    for turn in range(turns):
+        immediate.invoke(
+            {"messages": [HumanMessage(content=CHILD[turn % len(CHILD)]), AIMessage(content=REPLY)]},
+            {"configurable": {"thread_id": f"bench_{mode}_{schedule}"}},
+        )
+        before = llm.input_tokens
+        graph.invoke(state, {"configurable": {"thread_id": f"bench_{mode}_{schedule}_analysis"}})
+        per_turn.append(llm.input_tokens - before)
+    return llm, per_turn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--full-every", type=int, default=5)
+    parser.add_argument("--analysis-words", type=int, default=150)
+    args = parser.parse_args()
+
+    runs = {
+        "full": run_session("full", "always", args.turns, args.full_every, args.analysis_words),
+        "delta": run_session("delta", "always", args.turns, args.full_every, args.analysis_words),
+        "adaptive": run_session("delta", "adaptive", args.turns, args.full_every, args.analysis_words),
+    }
+
+    print(f"\nBackground input tokens per run ({args.turns} turns, full_every={args.full_every}, "
+          f"{args.analysis_words}-word analyses)")
+    print(f"{'turn':>6}" + "".join(f"{name:>10}" for name in runs))
+    for turn in range(1, args.turns + 1):
+        if turn in (1, 2, args.turns) or turn % 5 == 0:
+            print(f"{turn:>6}" + "".join(f"{per_turn[turn - 1]:>10}" for _, per_turn in runs.values()))
+
+    full = runs["full"][0]
+    print()
+    for name, (llm, _) in runs.items():
+        print(f"{name:<9} {llm.calls:>4} LLM calls, {llm.input_tokens:>7} input tokens per session "
+              f"({(1 - llm.input_tokens / full.input_tokens) * 100:.0f}% less than full)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+Benchmark fuzzy_match_quote_to_beat on large beatpacks.
+
+Builds a synthetic beatpack of --beats beats from the sentences of the real
+beatpacks in agentic-system/content (shuffled and recombined, entities kept),
+then matches verbatim, paraphrased and unrelated sentences against it with
+the indexed implementation and with the previous scan-everything
+implementation (kept below as the reference). Reports per-call latency and
+fails if any result differs.
+
+Usage:
+    cd <project-root>
+    python scripts/benchmark_quote_matching.py [--beats 200] [--queries 300] [--active 12]
+"""
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+_project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(_project_root))
+sys.path.insert(0, str(_project_root / "agentic-system"))
+
+from beats import Beat, TextSpan
+from output_contract_builder import extract_sentences, fuzzy_match_quote_to_beat
+
+CONTENT_DIR = _project_root / "agentic-system" / "content" / "stories"
+
+UNRELATED = [
+    "Weißt du, wie viele Beine eine Spinne hat",
+    "Das hast du wirklich toll gemacht, mein Freund",
+    "Kannst du mir sagen, welche Farbe der Himmel heute hat",
+    "Ich freue mich schon auf unser nächstes Abenteuer",
+    "Was würdest du an seiner Stelle jetzt tun",
+]
+
+
+# ---------------------------------------------------------------------------
+# Reference implementation (before the matching index)
+# ---------------------------------------------------------------------------
+
+def _legacy_sliding_window_score(quote_words: List[str], beat_words: List[str]) -> Tuple[float, int]:
+    """
+    Slide windows of varying sizes across beat_words and return the best
+    SequenceMatcher ratio and the index of the best-matching window start.
+
+    Windows tried (in order of preference):
+      - exact size (n words)  – highest signal for paraphrases
+      - n+1, n+2  words       – catches paraphrases with extra filler words
+      - n-1 words             – catches paraphrases that drop a word
+
+    Args:
+        quote_words: Tokenised (lowercased) quote
+        beat_words:  Tokenised (lowercased) beat text
+
+    Returns:
+        (best_score, best_start_index)
+    """
+    n = len(quote_words)
+    m = len(beat_words)
+    if n == 0 or m == 0:
+        return 0.0, 0
+
+    quote_str = " ".join(quote_words)
+    best_score = 0.0
+    best_start = 0
+
+    # Try window sizes: exact n, then n±1, n+2
+    for window_size in [n, n + 1, n + 2, max(1, n - 1)]:
+        if window_size > m:
+            window_size = m
+        for i in range(m - window_size + 1):
+            window = " ".join(beat_words[i:i + window_size])
+            score = SequenceMatcher(None, quote_str, window).ratio()
+            if score > best_score:
+                best_score = score
+                best_start = i
+            if best_score >= 1.0:
+                return best_score, best_start
+
+    return best_score, best_start
+
+
+def legacy_fuzzy_match_quote_to_beat(
+    quote: str,
+    beats: List[Beat],
+    threshold: float = 0.6,
+    min_overlap: float = 0.50,
+) -> Optional[Tuple[Beat, str]]:
+    """
+    Find which beat contains a quote using fuzzy matching.
+
+    Strategy
+    --------
+    1. Exact substring match (case-insensitive) – fastest path.
+    2. Word-level sliding window comparison – scores a window of the same
+       length as the quote against a sliding segment of the beat.  This
+       prevents the ratio from being diluted by the rest of the beat text and
+       correctly handles paraphrases / tense changes.
+    3. Token-set score – sorted-token comparison for word-order independence.
+    4. Token coverage score – fraction of quote content words found in beat
+       (recall-oriented; robust to paraphrases with inserted/dropped words).
+    5. Whole-text ratio fallback – kept for short beats.
+
+    The overlap guard (min_overlap) is a secondary precision check: after a
+    candidate beat passes the similarity threshold, at least min_overlap
+    fraction of the quote's content words (≥4 chars, punctuation stripped)
+    must appear in the beat.  Lower it (e.g. 0.20) for referential sentences
+    like "Mia, die am Waldrand wohnt" that mention story entities without
+    quoting the beat verbatim.
+
+    Args:
+        quote: The quote to search for
+        beats: List of beats to search in
+        threshold: Similarity threshold (0.0 to 1.0)
+        min_overlap: Minimum fraction of quote content words that must appear
+                     in the winning beat (secondary precision guard).
+
+    Returns:
+        Tuple of (matching_beat, exact_quote_found) or None if no match
+    """
+    quote_normalized = " ".join(quote.lower().split())
+    quote_words = quote_normalized.split()
+
+    # Guard: reject queries shorter than 2 words – single words (e.g. "Mia")
+    # are verbatim substrings of almost every beat and would bypass the
+    # threshold via the exact-match fast path without meaningful signal.
+    if len(quote_words) < 2:
+        return None
+
+    best_match = None
+    best_score = 0.0
+    best_quote = None
+
+    for beat in beats:
+        content_normalized = " ".join(beat.text.lower().split())
+        beat_words = content_normalized.split()
+
+        # ── 1. Exact substring match ──────────────────────────────────────
+        if quote_normalized in content_normalized:
+            pattern = re.compile(re.escape(quote), re.IGNORECASE)
+            match = pattern.search(beat.text)
+            if match:
+                return beat, match.group(0)
+
+        # ── 2. Sliding-window score ───────────────────────────────────────
+        # Compares the quote against consecutive same-length windows of the
+        # beat, avoiding score dilution from the rest of the beat text.
+        window_score, window_start = _legacy_sliding_window_score(quote_words, beat_words)
+
+        # ── 3. Token-set score ────────────────────────────────────────────
+        # Sort both token lists and compare – captures vocabulary overlap
+        # even when the LLM reorders or rephrases words (e.g. paraphrases
+        # where key nouns appear far apart in the beat text).
+        sorted_quote = " ".join(sorted(quote_words))
+        sorted_beat = " ".join(sorted(beat_words))
+        token_set_score = SequenceMatcher(None, sorted_quote, sorted_beat).ratio()
+
+        # ── 4. Token coverage score ───────────────────────────────────────
+        # Recall-oriented: what fraction of the quote's content words (≥4
+        # chars) appear anywhere in the beat?  Punctuation is stripped from
+        # both sides so "davon," → "davon" and "sammeln." → "sammeln" match
+        # correctly.  The length filter is applied after stripping.
+        quote_content = [re.sub(r"[^\w]", "", w) for w in quote_words]
+        quote_content = [w for w in quote_content if len(w) >= 4]
+        if quote_content:
+            beat_word_set = {re.sub(r"[^\w]", "", w) for w in beat_words}
+            beat_word_set = {w for w in beat_word_set if w}  # remove empty strings
+            matched_content = sum(1 for w in quote_content if w in beat_word_set)
+            token_coverage_score = matched_content / len(quote_content)
+        else:
+            token_coverage_score = 0.0
+
+        # ── 5. Whole-text ratio (fallback for short beats) ────────────────
+        full_score = SequenceMatcher(None, quote_normalized, content_normalized).ratio()
+
+        score = max(window_score, token_set_score, token_coverage_score, full_score)
+
+        if score > best_score:
+            best_score = score
+            best_match = beat
+
+            # Build the matched-quote snippet from the best window position
+            n = len(quote_words)
+            end = min(window_start + n, len(beat_words))
+            window_text = " ".join(beat_words[window_start:end])
+
+            # Map back to original (non-lowercased) beat text via char offset
+            char_start = len(" ".join(beat_words[:window_start]))
+            if window_start > 0:
+                char_start += 1  # account for the space before the window
+            char_end = char_start + len(window_text)
+            best_quote = beat.text[char_start:char_end] or beat.text[:100]
+
+    # Pre-compute cross-beat entity frequency: entities that appear in more
+    # than one beat are too generic to anchor grounding (e.g. 'Himmel',
+    # 'Beeren', 'Morgens' appear in multiple beats).
+    from collections import Counter as _Counter
+    entity_frequency: _Counter = _Counter(
+        e.lower()
+        for b in beats
+        for e in (b.entities or [])
+        if len(e) >= 5
+    )
+
+    if best_score >= threshold and best_match:
+        # Entity-anchor guard: the winning beat must contain at least one
+        # entity (≥5 chars) that (a) is UNIQUE to that beat (appears in
+        # exactly 1 beat) and (b) appears in the quote text.
+        # Cross-beat entities like 'Himmel', 'Beeren', 'Morgens' are excluded
+        # because they are too generic to prove the response originated from
+        # this particular beat.
+        unique_beat_entities = {
+            e.lower()
+            for e in (best_match.entities or [])
+            if len(e) >= 5 and entity_frequency[e.lower()] == 1
+        }
+        quote_word_set = set(re.sub(r"[^\w]", " ", quote_normalized).split())
+        entity_hit = any(entity in quote_word_set for entity in unique_beat_entities)
+        if not entity_hit:
+            return None
+
+        return best_match, best_quote or best_match.text[:100]
+
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _source_beats() -> List[Beat]:
+    beats = []
+    for path in sorted(CONTENT_DIR.glob("*/*/beatpack.v1.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        beats.extend(Beat.from_dict(beat) for beat in data["beats"])
+    return beats
+
+
+def build_beatpack(num_beats: int, seed: int = 7) -> List[Beat]:
+    """Recombine the sentences of the real beatpacks into num_beats beats."""
+    rng = random.Random(seed)
+    sources = _source_beats()
+    beats = []
+    for beat_id in range(1, num_beats + 1):
+        picked = rng.sample(sources, 2)
+        sentences = [s + "." for beat in picked for s in extract_sentences(beat.text)]
+        rng.shuffle(sentences)
+        text = " ".join(sentences[:rng.randint(2, 6)])
+        entities = sorted({e for beat in picked for e in beat.entities})
+        beats.append(Beat(beat_id=beat_id, order=beat_id, span=TextSpan(0, len(text)), text=text, entities=entities))
+    return beats
+
+
+def build_queries(beats: List[Beat], num_queries: int, seed: int = 11) -> List[str]:
+    """Verbatim sentences, paraphrases (dropped/swapped words, lowercased) and unrelated sentences."""
+    rng = random.Random(seed)
+    queries = []
+    while len(queries) < num_queries:
+        sentence = rng.choice(extract_sentences(rng.choice(beats).text))
+        words = sentence.split()
+        kind = rng.random()
+        if kind < 0.3 or len(words) < 4:
+            queries.append(sentence)
+        elif kind < 0.6:
+            del words[rng.randrange(len(words))]
+            queries.append(" ".join(words).lower())
+        elif kind < 0.85:
+            i = rng.randrange(len(words) - 1)
+            words[i], words[i + 1] = words[i + 1], words[i]
+            queries.append(" ".join(words) + " und so weiter")
+        else:
+            queries.append(rng.choice(UNRELATED))
+    return queries
+
+
+def _time_calls(func, queries: List[str], beat_sets: List[List[Beat]]) -> Tuple[list, list]:
+    results, durations = [], []
+    for query, beats in zip(queries, beat_sets):
+        start = time.perf_counter()
+        results.append(func(query, beats, threshold=0.5, min_overlap=0.20))
+        durations.append(time.perf_counter() - start)
+    return results, durations
+
+
+def _summary(name: str, durations: List[float]) -> str:
+    ordered = sorted(durations)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    return (f"{name:<10} p50 {statistics.median(durations) * 1000:8.2f}ms  "
+            f"p95 {p95 * 1000:8.2f}ms  total {sum(durations):7.2f}s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--beats", type=int, default=200, help="Beats in the synthetic beatpack")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--active", type=int, default=0,
+                        help="Match against a random window of N active beats instead of the whole beatpack")
+    args = parser.parse_args()
+
+    beats = build_beatpack(args.beats)
+    queries = build_queries(beats, args.queries)
+    rng = random.Random(3)
+    if args.active:
+        starts = [rng.randrange(max(1, len(beats) - args.active)) for _ in queries]
+        beat_sets = [beats[start:start + args.active] for start in starts]
+    else:
+        beat_sets = [beats] * len(queries)
+
+    print(f"{len(queries)} sentences against {args.active or len(beats)} of {len(beats)} beats\n")
+    reference, reference_times = _time_calls(legacy_fuzzy_match_quote_to_beat, queries, beat_sets)
+    print(_summary("reference", reference_times))
+    indexed, indexed_times = _time_calls(fuzzy_match_quote_to_beat, queries, beat_sets)
+    print(_summary("indexed", indexed_times))
+    print(f"\nspeed-up {sum(reference_times) / sum(indexed_times):.1f}x, "
+          f"{sum(r is not None for r in reference)} of {len(queries)} sentences grounded")
+
+    mismatches = [
+        query for query, expected, actual in zip(queries, reference, indexed)
+        if (expected is None) != (actual is None)
+        or (expected is not None and (expected[0] is not actual[0] or expected[1] != actual[1]))
+    ]
+    for query in mismatches[:10]:
+        print(f"MISMATCH: {query!r}")
+    if mismatches:
+        print(f"FAIL: {len(mismatches)} results differ from the reference implementation")
+        return 1
+    print("OK: identical results")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
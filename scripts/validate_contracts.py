@@ -0,0 +1,66 @@
+"""
+Validate the output contract of every turn of stored conversations.
+
+Reads conversations straight from the shared SQLite checkpoint store (no
+running service or LLM needed) and writes one JSON object per line: one per
+turn, one per conversation without state and a final {"summary": {...}}.
+Conversations are grouped by chapter so each chapter index is built once.
+
+Usage:
+    cd <project-root>
+    python scripts/validate_contracts.py [thread_id ...] [--db data/checkpoints.sqlite] [--output results.ndjson]
+
+Without thread IDs every stored conversation is validated.
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+_project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(_project_root))
+sys.path.insert(0, str(_project_root / "agentic-system"))
+
+from beats import BeatPackManager
+from backend.core.config import get_settings
+from backend.services.output_contract_validator import validate_contract_batch
+from backend.services.sqlite_checkpoint_store import SQLiteSaver
+
+logging.disable(logging.WARNING)
+
+CONTENT_DIR = _project_root / "agentic-system" / "content"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("thread_ids", nargs="*", help="Conversations to validate (default: all)")
+    parser.add_argument("--db", default=get_settings().checkpoint_sqlite_path)
+    parser.add_argument("--output", help="Write NDJSON here instead of stdout")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        raise SystemExit(f"Checkpoint database not found: {args.db}")
+    store = SQLiteSaver(args.db)
+
+    conversations = []
+    for thread_id in dict.fromkeys(args.thread_ids or store.list_conversations()):
+        metadata = store.load_conversation(thread_id) or {}
+        conversations.append((thread_id, metadata.get("story_id"), metadata.get("chapter_id")))
+
+    def load_state(thread_id: str):
+        checkpoint = store.get_tuple({"configurable": {"thread_id": thread_id}})
+        return checkpoint.checkpoint["channel_values"] if checkpoint else None
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for result in validate_contract_batch(conversations, load_state, beat_manager=BeatPackManager(CONTENT_DIR)):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if args.output:
+            out.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -455,3 +455,47 @@ class TestEdgeCases:
         matched_beat, _ = result
         assert matched_beat.beat_id == 3
 
+
+
+# ===========================================================================
+# 6. INDEXED MATCHING
+#    The beat index and candidate pruning must not change any result.
+# ===========================================================================
+
+class TestIndexedMatching:
+    """Results are identical to scoring every beat in full."""
+
+    @pytest.fixture(scope="class")
+    def benchmark(self):
+        import importlib.util
+        from pathlib import Path
+
+        path = Path(__file__).parents[3] / "scripts" / "benchmark_quote_matching.py"
+        spec = importlib.util.spec_from_file_location("benchmark_quote_matching", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def test_same_results_as_reference_on_generated_beatpack(self, benchmark):
+        beats = benchmark.build_beatpack(30)
+        queries = benchmark.build_queries(beats, 40)
+
+        for i, query in enumerate(queries):
+            active = beats[i % 20:i % 20 + 10]
+            expected = benchmark.legacy_fuzzy_match_quote_to_beat(query, active, threshold=0.5, min_overlap=0.20)
+            actual = fuzzy_match_quote_to_beat(query, active, threshold=0.5, min_overlap=0.20)
+            if expected is None:
+                assert actual is None, query
+            else:
+                assert actual is not None, query
+                assert actual[0] is expected[0] and actual[1] == expected[1], query
+
+    def test_same_results_as_reference_on_fixture_beats(self, benchmark, all_beats):
+        sentences = [s for beat in all_beats for s in beat.text.split(".") if len(s.split()) >= 3]
+        queries = sentences + [s.lower().replace(" und ", " ") + " heute" for s in sentences]
+
+        for query in queries:
+            for threshold in (0.4, 0.5, 0.6):
+                expected = benchmark.legacy_fuzzy_match_quote_to_beat(query, all_beats, threshold=threshold)
+                actual = fuzzy_match_quote_to_beat(query, all_beats, threshold=threshold)
+                assert (expected and (expected[0].beat_id, expected[1])) == (actual and (actual[0].beat_id, actual[1]))
@@ -0,0 +1,126 @@
+"""Tests for the coalescing background runner."""
+import threading
+import time
+
+from background_runner import BackgroundRunner
+
+
+def _blocking_run(started: threading.Event, release: threading.Event, log: list, label: str):
+    def run():
+        log.append(label)
+        started.set()
+        release.wait(5)
+    return run
+
+
+def test_coalesces_to_one_pending_run_latest_wins():
+    runner = BackgroundRunner(max_workers=2)
+    started, release, log = threading.Event(), threading.Event(), []
+
+    assert runner.submit("conv_1", _blocking_run(started, release, log, "first")) == "started"
+    started.wait(5)
+    assert runner.submit("conv_1", lambda: log.append("second")) == "pending"
+    assert runner.submit("conv_1", lambda: log.append("third")) == "coalesced"
+    assert runner.submit("conv_1", lambda: log.append("fourth")) == "coalesced"
+    assert runner.get_stats()["pending"] == 1
+
+    release.set()
+    assert runner.wait_idle(5)
+
+    assert log == ["first", "fourth"]
+    stats = runner.get_stats()
+    assert stats["started"] == 2
+    assert stats["completed"] == 2
+    assert stats["coalesced"] == 2
+    assert stats["queue_depth"] == 0
+
+
+def test_never_runs_same_key_concurrently():
+    runner = BackgroundRunner(max_workers=8)
+    active = {"conv_1": 0}
+    overlaps = []
+    lock = threading.Lock()
+
+    def run():
+        with lock:
+            active["conv_1"] += 1
+            if active["conv_1"] > 1:
+                overlaps.append(True)
+        time.sleep(0.005)
+        with lock:
+            active["conv_1"] -= 1
+
+    for _ in range(50):
+        runner.submit("conv_1", run)
+        time.sleep(0.001)
+    assert runner.wait_idle(5)
+
+    assert overlaps == []
+
+
+def test_caps_concurrency_across_keys():
+    runner = BackgroundRunner(max_workers=2)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def run():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    for i in range(6):
+        assert runner.submit(f"conv_{i}", run) == "started"
+    assert runner.get_stats()["queued"] >= 3
+    assert runner.wait_idle(5)
+
+    assert peak[0] == 2
+    assert runner.get_stats()["completed"] == 6
+
+
+def test_failures_are_logged_and_counted(caplog):
+    runner = BackgroundRunner(max_workers=1)
+
+    def fail():
+        raise RuntimeError("LLM quota exceeded")
+
+    runner.submit("conv_1", fail)
+    runner.submit("conv_2", lambda: None)
+    assert runner.wait_idle(5)
+
+    stats = runner.get_stats()
+    assert stats["failed"] == 1
+    assert stats["completed"] == 1
+    assert "LLM quota exceeded" in stats["last_error"]
+    assert "Run for conv_1 failed" in caplog.text
+
+
+def test_rejects_when_queue_is_full():
+    runner = BackgroundRunner(max_workers=1, max_queue_depth=2)
+    started, release, log = threading.Event(), threading.Event(), []
+    runner.submit("conv_0", _blocking_run(started, release, log, "blocking"))
+    started.wait(5)
+
+    assert runner.submit("conv_1", lambda: None) == "started"
+    assert runner.submit("conv_0", lambda: None) == "pending"
+    assert runner.submit("conv_2", lambda: None) == "rejected"
+    assert runner.get_stats()["rejected"] == 1
+
+    release.set()
+    assert runner.wait_idle(5)
+
+
+def test_discard_pending():
+    runner = BackgroundRunner(max_workers=1)
+    started, release, log = threading.Event(), threading.Event(), []
+    runner.submit("conv_1", _blocking_run(started, release, log, "first"))
+    started.wait(5)
+    runner.submit("conv_1", lambda: log.append("second"))
+
+    assert runner.discard_pending("conv_1")
+    release.set()
+    assert runner.wait_idle(5)
+
+    assert log == ["first"]
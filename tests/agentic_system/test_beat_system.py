@@ -324,3 +324,144 @@ def test_get_chapter_text_missing_chapter_text(tmp_path):
     manager = BeatPackManager(tmp_path)
     assert manager.get_chapter_text("story_a", "ch_01") is None
 
+
+
+def _write_beatpack(content_dir, story_id, chapter_id, chapter_text="Es war einmal."):
+    """Write a minimal beatpack to content_dir and return its path."""
+    path = content_dir / "stories" / story_id / chapter_id / "beatpack.v1.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = json.loads(_minimal_beatpack_json(story_id, chapter_id, chapter_text))
+    data["chapter_hash"] = f"hash:{chapter_text}"
+    path.write_text(json.dumps(data))
+    return path
+
+
+def test_get_retriever_is_cached(tmp_path):
+    """Repeated get_retriever calls reuse the compiled retriever."""
+    _write_beatpack(tmp_path, "story_a", "ch_01")
+    manager = BeatPackManager(tmp_path)
+
+    first = manager.get_retriever("story_a", "ch_01")
+    second = manager.get_retriever("story_a", "ch_01")
+
+    assert first is second
+    stats = manager.get_retriever_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_get_retriever_lru_eviction(tmp_path):
+    """The least recently used retriever is evicted once capacity is exceeded."""
+    for story_id in ("story_a", "story_b", "story_c"):
+        _write_beatpack(tmp_path, story_id, "ch_01")
+    manager = BeatPackManager(tmp_path, retriever_cache_size=2)
+
+    retriever_a = manager.get_retriever("story_a", "ch_01")
+    manager.get_retriever("story_b", "ch_01")
+    manager.get_retriever("story_a", "ch_01")  # story_a is now most recently used
+    manager.get_retriever("story_c", "ch_01")  # evicts story_b
+
+    stats = manager.get_retriever_cache_stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+    assert manager.get_retriever("story_a", "ch_01") is retriever_a
+    manager.get_retriever("story_b", "ch_01")
+    assert manager.get_retriever_cache_stats()["misses"] == 4
+
+
+def test_get_retriever_force_reload_rebuilds(tmp_path):
+    """force_reload picks up changed content and drops the stale retriever."""
+    path = _write_beatpack(tmp_path, "story_a", "ch_01", chapter_text="Alt.")
+    manager = BeatPackManager(tmp_path)
+    old = manager.get_retriever("story_a", "ch_01")
+
+    data = json.loads(path.read_text())
+    data["chapter_text"] = "Neu."
+    data["chapter_hash"] = "hash:Neu."
+    path.write_text(json.dumps(data))
+
+    assert manager.get_retriever("story_a", "ch_01") is old
+    new = manager.get_retriever("story_a", "ch_01", force_reload=True)
+
+    assert new is not old
+    assert new.beatpack.chapter_text == "Neu."
+    assert manager.get_retriever_cache_stats()["size"] == 1
+
+
+def test_clear_cache_drops_retrievers(tmp_path):
+    """clear_cache also empties the retriever cache."""
+    _write_beatpack(tmp_path, "story_a", "ch_01")
+    manager = BeatPackManager(tmp_path)
+    old = manager.get_retriever("story_a", "ch_01")
+
+    manager.clear_cache()
+
+    assert manager.get_retriever_cache_stats()["size"] == 0
+    assert manager.get_retriever("story_a", "ch_01") is not old
+
+
+def test_preload_loads_every_beatpack(tmp_path):
+    """preload parses all beatpacks and compiles only as many retrievers as the cache holds."""
+    for story_id in ("story_a", "story_b", "story_c"):
+        _write_beatpack(tmp_path, story_id, "ch_01")
+    manager = BeatPackManager(tmp_path, retriever_cache_size=2)
+
+    assert manager.preload() == {"beatpacks": 3, "retrievers": 2}
+    assert len(manager._cache) == 3
+    assert manager.get_retriever_cache_stats()["evictions"] == 0
+
+
+def _retriever_for(texts_and_entities):
+    """Build a BeatRetriever over in-memory beats given (text, entities) pairs."""
+    from beats import Beat, BeatPack, BeatRetriever, TextSpan
+
+    beats = [
+        Beat(beat_id=i, order=i, span=TextSpan(0, len(text)), text=text, entities=entities)
+        for i, (text, entities) in enumerate(texts_and_entities, start=1)
+    ]
+    beatpack = BeatPack(
+        story_id="s", chapter_id="c", content_version="1", beatpack_version="v1",
+        chapter_hash="h", beats=beats,
+    )
+    return BeatRetriever(beatpack)
+
+
+def test_retrieve_beats_prefers_rare_terms():
+    """A rare query term outweighs a term that appears in every beat."""
+    retriever = _retriever_for([
+        ("Mia geht in den Wald.", ["Mia"]),
+        ("Mia findet einen Fuchs im Wald.", ["Mia"]),
+        ("Mia isst Beeren.", ["Mia"]),
+    ])
+
+    beats = retriever.retrieve_beats("Mia Fuchs", top_k=1)
+
+    assert [b.beat_id for b in beats] == [2]
+
+
+def test_retrieve_beats_entity_field_boost():
+    """A beat listing the queried entity outranks one that only mentions it in passing."""
+    retriever = _retriever_for([
+        ("Am Abend erzählt Mia vom Fuchs Leo und von vielen anderen Tieren im Wald.", ["Mia"]),
+        ("Leo springt aus dem Gebüsch.", ["Leo"]),
+    ])
+
+    scores = retriever.score_beats("Leo")
+
+    assert scores[2] > scores[1]
+
+
+def test_retrieve_beats_fills_in_story_order():
+    """Unmatched slots are filled with beats in order and the result is ordered."""
+    retriever = _retriever_for([
+        ("Es war einmal.", []),
+        ("Der Fuchs schläft.", ["Fuchs"]),
+        ("Die Sonne scheint.", []),
+    ])
+
+    beats = retriever.retrieve_beats("Fuchs", top_k=2)
+
+    assert [b.beat_id for b in beats] == [1, 2]
+    assert retriever.get_beat(3).text == "Die Sonne scheint."
+    assert retriever.get_beat(99) is None
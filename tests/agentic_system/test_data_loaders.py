@@ -0,0 +1,100 @@
+"""Tests for the id-keyed child profile / audio book cache."""
+import pytest
+
+import data_loaders
+from data_loaders import DataCache, DataRepository
+from tests.agentic_system.test_prompt_repository import LocalS3
+
+
+@pytest.fixture
+def s3_repository(monkeypatch):
+    from backend.core.config import Settings
+
+    monkeypatch.setattr(DataRepository, "_instance", None)
+    monkeypatch.setattr(data_loaders, "get_settings", lambda: Settings(
+        use_s3_prompts=True, aws_s3_bucket_name="prompts", aws_s3_prompts_prefix="p/",
+        data_cache_ttl=300, data_cache_negative_ttl=60, data_cache_max_entries=100,
+    ))
+    repo = DataRepository()
+    repo._s3_client = LocalS3({
+        "p/child_profiles/1.txt": "Lena".encode("utf-8"),
+        "p/child_profiles/2.txt": "Finn".encode("utf-8"),
+        "p/audio_books/game-abc.txt": "Kokosnuss".encode("utf-8"),
+    })
+    monkeypatch.setattr(data_loaders, "_data_repository", repo)
+    return repo
+
+
+def test_items_are_cached_per_id(s3_repository):
+    s3 = s3_repository._s3_client
+
+    assert s3_repository.get_data("child_profile", "1", "fallback") == "Lena"
+    assert s3_repository.get_data("child_profile", "2", "fallback") == "Finn"
+    assert s3_repository.get_data("audio_book", "game-abc", "fallback") == "Kokosnuss"
+    assert s3_repository.get_data("child_profile", "1", "fallback") == "Lena"
+
+    assert [call[1] for call in s3.calls] == [
+        "p/child_profiles/1.txt", "p/child_profiles/2.txt", "p/audio_books/game-abc.txt",
+    ]
+    stats = s3_repository.get_stats()
+    assert (stats["hits"], stats["misses"], stats["s3_round_trips_saved"]) == (1, 3, 1)
+
+
+def test_missing_items_are_cached_negatively(s3_repository):
+    s3 = s3_repository._s3_client
+
+    for _ in range(3):
+        assert s3_repository.get_data("child_profile", "99", "unbekannt") == "unbekannt"
+
+    assert len(s3.calls) == 1
+    stats = s3_repository.get_stats()
+    assert (stats["s3_not_found"], stats["negative_hits"]) == (1, 2)
+
+
+def test_s3_errors_are_not_cached(s3_repository):
+    s3 = s3_repository._s3_client
+    get_object = s3.get_object
+
+    def failing_get_object(**kwargs):
+        raise ConnectionError("S3 down")
+
+    s3.get_object = failing_get_object
+    assert s3_repository.get_data("child_profile", "1", "fallback") == "fallback"
+
+    s3.get_object = get_object
+    assert s3_repository.get_data("child_profile", "1", "fallback") == "Lena"
+    assert s3_repository.get_stats()["s3_errors"] == 1
+
+
+def test_prefetch_warms_a_classroom(s3_repository):
+    s3 = s3_repository._s3_client
+    s3_repository.get_data("child_profile", "1", "fallback")
+
+    result = data_loaders.prefetch_child_profiles(["1", "2", "99", "2"])
+    assert result == {"requested": 3, "already_cached": 1, "fetched": 1, "not_found": 1, "failed": 0}
+
+    calls = len(s3.calls)
+    for child_id in ("1", "2", "99"):
+        data_loaders.get_child_profile({"child_id": child_id})
+    assert len(s3.calls) == calls
+    assert s3_repository.get_stats()["s3_round_trips_saved"] == 3
+
+
+def test_cache_expires_and_evicts_lru(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(data_loaders.time, "monotonic", lambda: now[0])
+    cache = DataCache(ttl=10, negative_ttl=2, max_entries=2)
+
+    cache.set(("child_profile", "1"), "Lena")
+    cache.set(("child_profile", "2"), None)
+    now[0] += 3
+    assert cache.get(("child_profile", "2")) is None
+    assert cache.get(("child_profile", "1")) == "Lena"
+
+    cache.set(("child_profile", "3"), "Mila")
+    cache.set(("child_profile", "4"), "Ben")
+    assert cache.get(("child_profile", "1")) is None
+    assert cache.evictions == 1
+
+    now[0] += 10
+    assert cache.get(("child_profile", "3")) is None
@@ -0,0 +1,109 @@
+"""Tests for the fused background graph mode (two structured-output calls instead of nine workers)."""
+import json
+import re
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+import history_window
+import nodes
+import transcript_cache
+import worker_scheduler
+from tests.agentic_system.test_history_window import RecordingChatModel, _turns
+
+ANALYSIS_KEYS = ["grammar_analysis", "speech_comprehension_analysis", "sprachhandlung_analysis",
+                 "vocabulary_analysis", "boredom_analysis", "satzbau_analysis"]
+PLANNING_KEYS = ["foerderfokus", "aufgaben", "satzbaubegrenzung"]
+
+
+class JsonChatModel(RecordingChatModel):
+    """Fake chat model that answers fused calls with a fenced JSON object of the requested keys."""
+
+    def _result(self, messages) -> ChatResult:
+        keys = re.search(r"exactly these keys, in this order: ([^.]+)\.", messages[0].content)
+        if keys is None:
+            return super()._result(messages)
+        self.calls.append(messages)
+        answer = {key: f"fused {key}" for key in keys.group(1).split(", ")}
+        text = f"```json\n{json.dumps(answer)}\n```"
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+@pytest.fixture(autouse=True)
+def restore_globals(monkeypatch):
+    monkeypatch.setattr(worker_scheduler, "_scheduler", worker_scheduler._scheduler)
+    monkeypatch.setattr(history_window, "_window", history_window._window)
+    monkeypatch.setattr(transcript_cache, "_cache", transcript_cache.TranscriptCache())
+    history_window.configure_history_window(keep_turns=0, token_budget=3000)
+
+
+def _conversation_graph(monkeypatch, memory):
+    builder = StateGraph(MessagesState)
+    builder.add_node("noop", lambda state: {})
+    builder.add_edge(START, "noop")
+    builder.add_edge("noop", END)
+    immediate = builder.compile(checkpointer=memory)
+    monkeypatch.setattr(nodes, "background_graph", immediate)
+    return immediate
+
+
+def test_fused_mode_writes_every_analysis_with_two_calls(monkeypatch):
+    from background_graph import create_background_analysis_graph
+
+    worker_scheduler.configure_worker_scheduler("adaptive")
+    memory = MemorySaver()
+    immediate = _conversation_graph(monkeypatch, memory)
+    llm = JsonChatModel(delay=0, calls=[])
+    graph = create_background_analysis_graph(llm, memory, mode="fused")
+    state = {"child_id": "1", "audio_book": "Buch", "child_profile": "Profil"}
+    config = {"configurable": {"thread_id": "conv_7_analysis"}}
+
+    immediate.invoke({"messages": _turns(2)}, {"configurable": {"thread_id": "conv_7"}})
+    result = graph.invoke(state, config)
+
+    assert len(llm.calls) == 2
+    assert all(result[key] == f"fused {key}" for key in ANALYSIS_KEYS + PLANNING_KEYS)
+    analysis_call, planning_call = (msgs[-1].content for msgs in llm.calls)
+    # The conversation is sent once per call; the planning call reads the first call's analyses
+    assert analysis_call.count("kind1") == 5 and "fused" not in analysis_call
+    assert "fused grammar_analysis" in planning_call and "fused satzbau_analysis" in planning_call
+    assert "=== aufgaben ===" in llm.calls[1][0].content
+
+    # Nothing due on the next turn except the history summary: both calls are skipped
+    immediate.invoke({"messages": _turns(3)[4:]}, {"configurable": {"thread_id": "conv_7"}})
+    llm.calls.clear()
+    second = graph.invoke(state, config)
+    assert llm.calls == []
+    assert second["aufgaben"] == "fused aufgaben"
+    stats = worker_scheduler.get_worker_scheduler().get_stats()["workers"]
+    assert stats["aufgabenWorker"]["runs"] == 1 and stats["aufgabenWorker"]["skips"] == 1
+
+    with pytest.raises(ValueError):
+        create_background_analysis_graph(llm, memory, mode="merged")
+
+
+def test_structured_output_and_incomplete_answers(monkeypatch):
+    worker_scheduler.configure_worker_scheduler("always")
+    transcript_cache.get_transcript_cache().update("conv_8", _turns(1))
+    state = {"child_profile": "Profil", "satzbau_analysis": "alt", "foerderfokus": "alter Fokus",
+             "aufgaben": "alte Aufgaben", "satzbaubegrenzung": "alte Begrenzung"}
+    config = {"configurable": {"thread_id": "conv_8_analysis"}}
+
+    class StructuredChatModel(RecordingChatModel):
+        """Fake chat model with structured output that leaves out satzbaubegrenzung."""
+
+        def with_structured_output(self, schema, **kwargs):
+            assert schema["required"] == PLANNING_KEYS
+            return RunnableLambda(lambda messages: {"foerderfokus": "Fokus", "aufgaben": ["Aufgabe 1"]})
+
+    update = nodes.fused_background_worker("fusedPlanningWorker", state, config, StructuredChatModel(calls=[])).update
+    # Missing analyses keep their previous value; non-string values are kept as JSON
+    assert update == {"foerderfokus": "Fokus", "aufgaben": '["Aufgabe 1"]'}
+
+    # Models without tool calling answer in text; an unparsable answer keeps every analysis
+    update = nodes.fused_background_worker("fusedPlanningWorker", state, config, RecordingChatModel(delay=0, calls=[])).update
+    assert update == {}
@@ -1,7 +1,7 @@
 """Unit tests for the German grammar post-processing module."""
 
 import pytest
-from german_grammar_postprocess import correct_common_german_errors
+from german_grammar_postprocess import StreamingGrammarCorrector, correct_common_german_errors
 
 
 class TestVerbConjugation2ndTo3rdPerson:
@@ -133,3 +133,31 @@ class TestNoFalsePositives:
         result, corrections = correct_common_german_errors(text)
         assert result == "Weißt du, sucht er den Ball?"
         assert len(corrections) == 1
+
+
+class TestStreamingGrammarCorrector:
+    """Tests for sentence-buffered correction of streamed output."""
+
+    def test_holds_back_incomplete_sentence(self):
+        corrector = StreamingGrammarCorrector()
+        assert corrector.feed("Dann such") == ""
+        assert corrector.feed("st er") == ""
+        assert corrector.feed(" den Ball. Und") == "Dann sucht er den Ball. "
+        assert corrector.flush() == "Und"
+
+    def test_matches_full_text_correction(self):
+        text = "Zuerst suchst er den Ball! Dann spielst sie im Garten.\nFragst man dich?"
+        corrector = StreamingGrammarCorrector()
+        streamed = "".join(corrector.feed(text[i:i + 3]) for i in range(0, len(text), 3))
+        streamed += corrector.flush()
+
+        expected, expected_corrections = correct_common_german_errors(text)
+        assert streamed == expected == corrector.text
+        assert corrector.corrections == expected_corrections
+
+    def test_boundary_after_closing_quote(self):
+        corrector = StreamingGrammarCorrector()
+        assert corrector.feed("Er ruft: »Hallo!« Dann") == "Er ruft: »Hallo!« "
+
+    def test_flush_on_empty_buffer(self):
+        assert StreamingGrammarCorrector().flush() == ""
@@ -0,0 +1,127 @@
+"""Tests for masterChatbot's history window and the rolling history summary."""
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+import history_window
+import nodes
+import transcript_cache
+from history_window import HistoryWindow, configure_history_window, estimate_tokens
+from tests.agentic_system.test_llm_limiter import ConcurrencyTrackingChatModel
+
+
+class RecordingChatModel(ConcurrencyTrackingChatModel):
+    """Fake chat model that also records the messages of every call."""
+
+    calls: list = []
+
+    def _result(self, messages):
+        self.calls.append(messages)
+        return super()._result(messages)
+
+
+def _turns(n: int, words: int = 5) -> list:
+    messages = []
+    for i in range(n):
+        messages.append(HumanMessage(content=" ".join([f"kind{i}"] * words), id=f"h{i}"))
+        messages.append(AIMessage(content=" ".join([f"ki{i}"] * words), id=f"a{i}"))
+    return messages
+
+
+@pytest.fixture(autouse=True)
+def restore_window(monkeypatch):
+    monkeypatch.setattr(history_window, "_window", history_window._window)
+    monkeypatch.setattr(transcript_cache, "_cache", transcript_cache.TranscriptCache())
+
+
+def test_window_keeps_unsummarized_and_recent_turns():
+    window = HistoryWindow(keep_turns=3, token_budget=10_000)
+    history = _turns(10) + [HumanMessage(content="Und jetzt?", id="h10")]
+
+    assert window.window_start(history) == 16
+    # Nothing summarized yet: the whole history stays verbatim
+    assert window.select(history, summarized_count=0) == history
+    # Summary lags behind the window: the unsummarized messages stay verbatim
+    assert window.select(history, summarized_count=12) == history[12:]
+    assert window.select(history, summarized_count=16) == history[16:]
+
+
+def test_token_budget_drops_oldest_turns_but_keeps_the_latest():
+    window = HistoryWindow(keep_turns=50, token_budget=60)
+    history = _turns(6, words=10)
+
+    selected = window.select(history)
+    assert selected == history[-len(selected):]
+    assert isinstance(selected[0], HumanMessage)
+    assert 2 <= len(selected) < len(history)
+    assert window.get_stats()["dropped_messages"] == len(history) - len(selected)
+
+    # A single turn over the budget is still sent
+    huge = [HumanMessage(content="x" * 1000)]
+    assert HistoryWindow(keep_turns=2, token_budget=10).select(huge) == huge
+
+
+def test_disabled_window_sends_everything():
+    history = _turns(30)
+    assert HistoryWindow(keep_turns=0).select(history, summarized_count=20) == history
+
+
+def test_master_history_is_flat_over_a_long_conversation():
+    configure_history_window(keep_turns=4, token_budget=3000)
+    state = {"child_profile": "Lena, 5", "audio_book": "Buch", "aufgaben": "", "satzbaubegrenzung": ""}
+
+    sizes = []
+    for turns in (10, 20, 40):
+        history = _turns(turns) + [HumanMessage(content="Und dann?")]
+        messages = nodes._build_master_messages({
+            **state, "messages": history,
+            "history_summary": "- Lena mag Hunde", "history_summarized_count": nodes.get_history_window().window_start(history),
+        })
+        assert "Lena mag Hunde" in messages[0].content
+        conversation = [msg for msg in messages if not isinstance(msg, SystemMessage)]
+        assert conversation[-1].content == "Und dann?"
+        assert len([msg for msg in conversation if isinstance(msg, HumanMessage)]) == 4
+        sizes.append(sum(estimate_tokens(msg.content) for msg in conversation))
+
+    # Same number of verbatim turns whatever the conversation length
+    assert max(sizes) - min(sizes) < 10
+
+
+def test_summary_worker_folds_only_new_turns(monkeypatch):
+    from background_graph import create_background_analysis_graph
+
+    configure_history_window(keep_turns=2, token_budget=3000)
+    memory = MemorySaver()
+    builder = StateGraph(MessagesState)
+    builder.add_node("noop", lambda state: {})
+    builder.add_edge(START, "noop")
+    builder.add_edge("noop", END)
+    immediate = builder.compile(checkpointer=memory)
+    monkeypatch.setattr(nodes, "background_graph", immediate)
+
+    llm = RecordingChatModel(delay=0, calls=[])
+    graph = create_background_analysis_graph(llm, memory)
+    state = {"child_id": "1", "audio_book": "Buch", "child_profile": "Profil"}
+    config = {"configurable": {"thread_id": "conv_9_analysis"}}
+
+    def summary_prompts():
+        return [msgs[-1].content for msgs in llm.calls if "Neue Gesprächsausschnitte" in msgs[-1].content]
+
+    # Two turns fit in the window: nothing to summarize
+    immediate.invoke({"messages": _turns(2)}, {"configurable": {"thread_id": "conv_9"}})
+    graph.invoke(state, config)
+    assert summary_prompts() == []
+
+    immediate.invoke({"messages": _turns(5)[4:]}, {"configurable": {"thread_id": "conv_9"}})
+    result = graph.invoke(state, config)
+    assert result["history_summarized_count"] == 6
+    assert "kind0" in summary_prompts()[-1] and "kind2" in summary_prompts()[-1]
+    assert "kind3" not in summary_prompts()[-1]
+
+    immediate.invoke({"messages": _turns(6)[10:]}, {"configurable": {"thread_id": "conv_9"}})
+    result = graph.invoke(state, config)
+    assert result["history_summarized_count"] == 8
+    # Only the turn that just left the window is folded into the previous summary
+    assert "kind3" in summary_prompts()[-1] and "kind2" not in summary_prompts()[-1]
+    assert result["history_summary"] in summary_prompts()[-1]
@@ -0,0 +1,117 @@
+"""
+Concurrency stress test for the immediate graph.
+
+Hundreds of conversations run interleaved against one compiled graph. Each
+conversation has its own background analysis, and every turn must read its
+own aufgaben/satzbaubegrenzung (previously the thread_id came from a
+process-global config that concurrent requests overwrote).
+"""
+import asyncio
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.memory import MemorySaver
+
+from immediate_graph import create_immediate_response_graph
+
+
+NUM_CONVERSATIONS = 200
+TURNS = 2
+_MARKER = re.compile(r"AUFGABEN\[(conv_\d+)\]")
+
+
+def _aufgaben_for(thread_id: str) -> str:
+    return f"AUFGABEN[{thread_id}]"
+
+
+def _satzbau_for(thread_id: str) -> str:
+    return f"SATZBAU[{thread_id}]"
+
+
+class FakeBackgroundGraph:
+    """Stands in for the background graph: per-thread analysis with jittered reads."""
+
+    def get_state(self, config):
+        thread_id = config["configurable"]["thread_id"].removesuffix("_analysis")
+        time.sleep(random.uniform(0, 0.002))
+        return SimpleNamespace(values={
+            "aufgaben": _aufgaben_for(thread_id),
+            "satzbaubegrenzung": _satzbau_for(thread_id),
+        })
+
+
+class EchoAufgabenChatModel(BaseChatModel):
+    """Replies with the thread ids of all aufgaben markers found in the prompt."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "echo-aufgaben"
+
+    def _reply(self, messages) -> ChatResult:
+        found = [m for msg in messages for m in _MARKER.findall(str(msg.content))]
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=" ".join(found) or "keine"))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(random.uniform(0, 0.002))
+        return self._reply(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(random.uniform(0, 0.01))
+        return self._reply(messages)
+
+
+def _make_graph():
+    return create_immediate_response_graph(EchoAufgabenChatModel(), MemorySaver(), FakeBackgroundGraph())
+
+
+def _turn_input(turn: int) -> dict:
+    return {"messages": [HumanMessage(content=f"Nachricht {turn}")], "child_id": "1"}
+
+
+def _assert_own_analysis(graph, thread_id: str):
+    values = graph.get_state({"configurable": {"thread_id": thread_id}}).values
+    assert values["aufgaben"] == _aufgaben_for(thread_id)
+    assert values["satzbaubegrenzung"] == _satzbau_for(thread_id)
+    replies = [m.content for m in values["messages"] if isinstance(m, AIMessage)]
+    # The prompt of every turn carried this conversation's aufgaben and no other
+    assert replies == [thread_id] * TURNS
+
+
+def test_interleaved_async_conversations_read_own_analysis():
+    graph = _make_graph()
+    thread_ids = [f"conv_{i}" for i in range(NUM_CONVERSATIONS)]
+
+    async def conversation(thread_id: str):
+        config = {"configurable": {"thread_id": thread_id}}
+        for turn in range(TURNS):
+            await graph.ainvoke(_turn_input(turn), config)
+
+    async def run():
+        await asyncio.gather(*(conversation(t) for t in thread_ids))
+
+    asyncio.run(run())
+
+    for thread_id in thread_ids:
+        _assert_own_analysis(graph, thread_id)
+
+
+def test_interleaved_threaded_conversations_read_own_analysis():
+    graph = _make_graph()
+    thread_ids = [f"conv_{i}" for i in range(NUM_CONVERSATIONS)]
+
+    def conversation(thread_id: str):
+        config = {"configurable": {"thread_id": thread_id}}
+        for turn in range(TURNS):
+            graph.invoke(_turn_input(turn), config)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(conversation, thread_ids))
+
+    for thread_id in thread_ids:
+        _assert_own_analysis(graph, thread_id)
@@ -0,0 +1,152 @@
+"""Tests for incremental (delta) background analysis with watermarks."""
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+import history_window
+import incremental_analysis
+import nodes
+import transcript_cache
+import worker_scheduler
+from incremental_analysis import IncrementalAnalysis, configure_incremental_analysis
+from tests.agentic_system.test_history_window import RecordingChatModel, _turns
+
+
+@pytest.fixture(autouse=True)
+def restore_analysis(monkeypatch):
+    monkeypatch.setattr(incremental_analysis, "_analysis", incremental_analysis._analysis)
+    monkeypatch.setattr(history_window, "_window", history_window._window)
+    monkeypatch.setattr(transcript_cache, "_cache", transcript_cache.TranscriptCache())
+    monkeypatch.setattr(worker_scheduler, "_scheduler", worker_scheduler._scheduler)
+
+
+def test_plan_falls_back_to_full_analyses():
+    analysis = IncrementalAnalysis(mode="delta", full_every=3)
+
+    # First run, then two incremental runs, then a full re-analysis
+    first = analysis.plan(2, None)
+    assert first == {"watermark": 2, "delta_start": None, "runs_since_full": 0}
+    second = analysis.plan(4, first)
+    assert second["delta_start"] == 2
+    third = analysis.plan(6, second)
+    assert third == {"watermark": 6, "delta_start": 4, "runs_since_full": 2}
+    assert analysis.plan(8, third)["delta_start"] is None
+
+    # History shorter than the watermark (replaced): full analysis
+    assert analysis.plan(3, third)["delta_start"] is None
+    # Full analyses are the default
+    assert IncrementalAnalysis().plan(4, first)["delta_start"] is None
+
+    with pytest.raises(ValueError):
+        IncrementalAnalysis(mode="sometimes")
+
+
+def test_workers_get_previous_analysis_and_only_new_messages(monkeypatch):
+    from background_graph import create_background_analysis_graph
+
+    configure_incremental_analysis("delta", full_every=3)
+    worker_scheduler.configure_worker_scheduler("always")
+    history_window.configure_history_window(keep_turns=0, token_budget=3000)
+    memory = MemorySaver()
+    builder = StateGraph(MessagesState)
+    builder.add_node("noop", lambda state: {})
+    builder.add_edge(START, "noop")
+    builder.add_edge("noop", END)
+    immediate = builder.compile(checkpointer=memory)
+    monkeypatch.setattr(nodes, "background_graph", immediate)
+
+    llm = RecordingChatModel(delay=0, calls=[])
+    graph = create_background_analysis_graph(llm, memory)
+    state = {"child_id": "1", "audio_book": "Buch", "child_profile": "Profil"}
+    config = {"configurable": {"thread_id": "conv_5_analysis"}}
+
+    def run(turns: int) -> tuple[dict, list[str]]:
+        """Add turns to the conversation, run the background graph and return its result and the worker prompts."""
+        history = immediate.get_state({"configurable": {"thread_id": "conv_5"}}).values.get("messages", [])
+        immediate.invoke({"messages": _turns(turns)[len(history):]}, {"configurable": {"thread_id": "conv_5"}})
+        llm.calls.clear()
+        result = graph.invoke(state, config)
+        prompts = [msgs[-1].content for msgs in llm.calls if "Conversation" in msgs[-1].content]
+        assert len(prompts) == 8
+        return result, prompts
+
+    def watermark(result):
+        return result["analysis_watermarks"]["speechGrammarWorker"]
+
+    result, prompts = run(2)
+    assert watermark(result)["watermark"] == 4 and watermark(result)["delta_start"] is None
+    assert all("kind0" in prompt and "Previous analysis" not in prompt for prompt in prompts)
+
+    result, prompts = run(3)
+    assert (watermark(result)["watermark"], watermark(result)["delta_start"]) == (6, 4)
+    for prompt in prompts:
+        # Only the new turn, plus the worker's own previous analysis
+        assert "kind2" in prompt and "kind1" not in prompt
+        assert "Previous analysis" in prompt and "analysis of:" in prompt
+        assert "\n\nConversation:" in prompt and " Conversation:" not in prompt
+
+    result, prompts = run(4)
+    assert watermark(result)["runs_since_full"] == 2
+    assert all("kind3" in prompt and "kind2" not in prompt for prompt in prompts)
+
+    # Every third run is a full re-analysis
+    result, prompts = run(5)
+    assert watermark(result)["delta_start"] is None and watermark(result)["runs_since_full"] == 0
+    assert all("kind0" in prompt and "Previous analysis" not in prompt for prompt in prompts)
+
+    stats = incremental_analysis.get_incremental_analysis().get_stats()
+    assert (stats["full_calls"], stats["delta_calls"]) == (16, 16)
+    assert stats["transcript_chars_sent"] < stats["transcript_chars_full"]
+
+
+def test_failed_worker_keeps_its_watermark(monkeypatch):
+    from background_graph import create_background_analysis_graph
+
+    configure_incremental_analysis("delta", full_every=10)
+    worker_scheduler.configure_worker_scheduler("always")
+    history_window.configure_history_window(keep_turns=0, token_budget=3000)
+    memory = MemorySaver()
+    builder = StateGraph(MessagesState)
+    builder.add_node("noop", lambda state: {})
+    builder.add_edge(START, "noop")
+    builder.add_edge("noop", END)
+    immediate = builder.compile(checkpointer=memory)
+    monkeypatch.setattr(nodes, "background_graph", immediate)
+
+    grammar_prompt = nodes.getSpeechGrammarWorker_prompt()
+
+    class FlakyChatModel(RecordingChatModel):
+        """Fake chat model whose grammar calls fail while failing is set."""
+
+        failing: bool = False
+
+        def _result(self, messages):
+            if self.failing and messages[0].content == grammar_prompt:
+                raise RuntimeError("grammar call failed")
+            return super()._result(messages)
+
+    llm = FlakyChatModel(delay=0, calls=[])
+    graph = create_background_analysis_graph(llm, memory)
+    state = {"child_id": "1", "audio_book": "Buch", "child_profile": "Profil"}
+    config = {"configurable": {"thread_id": "conv_6_analysis"}}
+    conversation = {"configurable": {"thread_id": "conv_6"}}
+
+    immediate.invoke({"messages": _turns(2)}, conversation)
+    graph.invoke(state, config)
+
+    immediate.invoke({"messages": _turns(3)[4:]}, conversation)
+    llm.failing = True
+    with pytest.raises(RuntimeError):
+        graph.invoke(state, config)
+    assert graph.get_state(config).values["analysis_watermarks"]["speechGrammarWorker"]["watermark"] == 4
+
+    immediate.invoke({"messages": _turns(4)[6:]}, conversation)
+    llm.failing = False
+    llm.calls.clear()
+    result = graph.invoke(state, config)
+    # The delta starts where the last successful run ended, so the failed run's turn is analyzed
+    assert result["analysis_watermarks"]["speechGrammarWorker"] == {
+        "turn": 4, "watermark": 8, "delta_start": 4, "runs_since_full": 1,
+    }
+    grammar_input = next(msgs[-1].content for msgs in llm.calls if msgs[0].content == grammar_prompt)
+    assert "kind2" in grammar_input and "kind3" in grammar_input and "kind1" not in grammar_input
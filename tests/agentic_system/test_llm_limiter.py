@@ -0,0 +1,156 @@
+"""Tests for the process-wide LLM concurrency limiter."""
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.memory import MemorySaver
+
+import llm_limiter
+from llm_limiter import BACKGROUND, IMMEDIATE, LLMConcurrencyLimiter, configure_llm_limiter
+
+
+class ConcurrencyTrackingChatModel(BaseChatModel):
+    """Fake chat model that records the peak number of concurrent calls."""
+
+    delay: float = 0.02
+    in_flight: int = 0
+    peak: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "concurrency-tracking"
+
+    def _result(self, messages) -> ChatResult:
+        # Echo the worker prompt's first line so outputs are deterministic per worker
+        text = f"analysis of: {messages[0].content.strip().splitlines()[0][:40]}"
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay)
+        self.in_flight -= 1
+        return self._result(messages)
+
+
+@pytest.fixture
+def restore_limiter():
+    original = llm_limiter._limiter
+    yield
+    llm_limiter._limiter = original
+
+
+def test_caps_concurrent_threads():
+    limiter = LLMConcurrencyLimiter(max_concurrent=3, reserved_for_immediate=0)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def call():
+        with limiter.slot(BACKGROUND):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert peak[0] == 3
+    assert limiter.get_stats()["acquired"][BACKGROUND] == 12
+    assert limiter.get_stats()["in_flight"] == {IMMEDIATE: 0, BACKGROUND: 0}
+
+
+def test_reserved_slots_only_for_immediate():
+    limiter = LLMConcurrencyLimiter(max_concurrent=2, reserved_for_immediate=1)
+    limiter.acquire(BACKGROUND)
+
+    got_background = threading.Event()
+    waiter = threading.Thread(target=lambda: (limiter.acquire(BACKGROUND), got_background.set()))
+    waiter.start()
+    time.sleep(0.02)
+    assert not got_background.is_set()
+
+    # The reserved slot is still free for the child-facing call
+    limiter.acquire(IMMEDIATE)
+    limiter.release(IMMEDIATE)
+    assert not got_background.is_set()
+
+    limiter.release(BACKGROUND)
+    waiter.join(1)
+    assert got_background.is_set()
+    limiter.release(BACKGROUND)
+
+
+def test_waiting_immediate_calls_go_first():
+    limiter = LLMConcurrencyLimiter(max_concurrent=1, reserved_for_immediate=0)
+    order = []
+
+    async def call(priority, label):
+        async with limiter.aslot(priority):
+            order.append(label)
+            await asyncio.sleep(0.005)
+
+    async def run():
+        limiter.acquire(BACKGROUND)
+        tasks = [asyncio.create_task(call(BACKGROUND, f"bg{i}")) for i in range(3)]
+        await asyncio.sleep(0.01)
+        tasks.append(asyncio.create_task(call(IMMEDIATE, "immediate")))
+        await asyncio.sleep(0.01)
+        limiter.release(BACKGROUND)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+
+    assert order == ["immediate", "bg0", "bg1", "bg2"]
+
+
+def test_cancelled_async_waiter_does_not_leak_slot():
+    limiter = LLMConcurrencyLimiter(max_concurrent=1, reserved_for_immediate=0)
+
+    async def run():
+        await limiter.aacquire(BACKGROUND)
+        waiter = asyncio.create_task(limiter.aacquire(BACKGROUND))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release(BACKGROUND)
+        # The slot is free again
+        await asyncio.wait_for(limiter.aacquire(BACKGROUND), timeout=1)
+        limiter.release(BACKGROUND)
+
+    asyncio.run(run())
+
+    assert limiter.get_stats()["in_flight"][BACKGROUND] == 0
+    assert limiter.get_stats()["waiting"][BACKGROUND] == 0
+
+
+def test_concurrent_background_graph_runs_respect_limit(restore_limiter):
+    from background_graph import create_background_analysis_graph
+
+    configure_llm_limiter(max_concurrent=3, reserved_for_immediate=1)
+    llm = ConcurrencyTrackingChatModel()
+    graph = create_background_analysis_graph(llm, MemorySaver())
+    state = {"child_id": "1", "audio_book": "Buch", "child_profile": "Profil"}
+
+    runs = [
+        threading.Thread(target=graph.invoke, args=(state, {"configurable": {"thread_id": f"conv_{i}_analysis"}}))
+        for i in range(4)
+    ]
+    for run in runs:
+        run.start()
+    for run in runs:
+        run.join(10)
+
+    # 4 conversations x 9 workers, at most 3 - 1 reserved slots used by background calls
+    assert llm.peak == 2
+    assert llm_limiter.get_llm_limiter().get_stats()["acquired"][BACKGROUND] == 36
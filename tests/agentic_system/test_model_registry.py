@@ -0,0 +1,100 @@
+"""Tests for per-node model routing and per-node LLM metrics."""
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+import history_window
+import model_registry
+import nodes
+import transcript_cache
+import worker_scheduler
+from model_registry import ModelRegistry, configure_model_registry
+from tests.agentic_system.test_history_window import RecordingChatModel, _turns
+
+
+class MeteredChatModel(RecordingChatModel):
+    """Fake chat model that reports token usage and tags its answers with its name."""
+
+    tier: str = "default"
+
+    def _result(self, messages) -> ChatResult:
+        self.calls.append(messages)
+        message = AIMessage(content=f"{self.tier} analysis",
+                            usage_metadata={"input_tokens": 100, "output_tokens": 10, "total_tokens": 110})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+@pytest.fixture(autouse=True)
+def restore_globals(monkeypatch):
+    monkeypatch.setattr(model_registry, "_registry", model_registry._registry)
+    monkeypatch.setattr(worker_scheduler, "_scheduler", worker_scheduler._scheduler)
+    monkeypatch.setattr(history_window, "_window", history_window._window)
+    monkeypatch.setattr(transcript_cache, "_cache", transcript_cache.TranscriptCache())
+
+
+def test_specs_resolve_to_shared_clients():
+    created = []
+
+    def factory(model, **kwargs):
+        created.append((model, kwargs))
+        return object()
+
+    registry = ModelRegistry("flash", {
+        "boredomWorker": "flash-lite",
+        "satzbauAnalyseWorker": {"model": "flash-lite"},
+        "aufgabenWorker": {"temperature": 0.2, "timeout": 20},
+        "masterChatbot": {"model": "flash"},
+    }, factory=factory)
+    default_llm = object()
+
+    assert registry.get("boredomWorker", default_llm) is registry.get("satzbauAnalyseWorker", default_llm)
+    # Same model, other settings: its own client on the default model
+    assert registry.get("aufgabenWorker", default_llm) is not default_llm
+    # A spec equal to the default and nodes without a spec use the default instance
+    assert registry.get("masterChatbot", default_llm) is default_llm
+    assert registry.get("speechGrammarWorker", default_llm) is default_llm
+    assert created == [("flash-lite", {}), ("flash", {"temperature": 0.2, "timeout": 20})]
+    assert registry.get_stats()["nodes"]["boredomWorker"]["model"] == "flash-lite"
+
+    assert ModelRegistry("flash", {"speechGrammarWorker": "pro", "dreamWorker": "pro"},
+                         factory=factory).unused_specs() == ["speechGrammarWorker", "dreamWorker"]
+    with pytest.raises(ValueError):
+        ModelRegistry("flash", {"boredomWorker": {"model": "flash-lite", "top_k": 3}})
+
+
+def test_background_nodes_run_on_their_tier_with_metrics(monkeypatch):
+    from background_graph import create_background_analysis_graph
+
+    worker_scheduler.configure_worker_scheduler("always")
+    history_window.configure_history_window(keep_turns=0, token_budget=3000)
+    cheap = MeteredChatModel(delay=0, calls=[], tier="cheap")
+    registry = configure_model_registry("flash", {"boredomWorker": "flash-lite", "satzbauBegrenzungsWorker": "flash-lite"},
+                                        factory=lambda model, **kwargs: cheap)
+
+    memory = MemorySaver()
+    builder = StateGraph(MessagesState)
+    builder.add_node("noop", lambda state: {})
+    builder.add_edge(START, "noop")
+    builder.add_edge("noop", END)
+    immediate = builder.compile(checkpointer=memory)
+    monkeypatch.setattr(nodes, "background_graph", immediate)
+    immediate.invoke({"messages": _turns(2)}, {"configurable": {"thread_id": "conv_9"}})
+
+    default = MeteredChatModel(delay=0, calls=[])
+    graph = create_background_analysis_graph(default, memory)
+    result = graph.invoke({"child_id": "1", "audio_book": "Buch", "child_profile": "Profil"},
+                          {"configurable": {"thread_id": "conv_9_analysis"}})
+
+    assert result["boredom_analysis"] == "cheap analysis" and result["satzbaubegrenzung"] == "cheap analysis"
+    assert result["grammar_analysis"] == "default analysis"
+    assert (len(cheap.calls), len(default.calls)) == (2, 7)
+
+    stats = registry.get_stats()
+    assert stats["tiered_clients"] == 1
+    assert stats["nodes"]["boredomWorker"] == {**stats["nodes"]["boredomWorker"], "model": "flash-lite", "calls": 1,
+                                                "errors": 0, "input_tokens": 100, "output_tokens": 10}
+    assert stats["nodes"]["speechGrammarWorker"]["model"] == "flash"
+    assert stats["nodes"]["speechGrammarWorker"]["calls"] == 1
+    assert stats["nodes"]["speechGrammarWorker"]["avg_seconds"] is not None
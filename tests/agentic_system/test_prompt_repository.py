@@ -110,6 +110,205 @@ def test_configuration():
         return False
 
 
+
+class LocalS3:
+    """In-process S3 stand-in for get_object/put_object with ETag / If-None-Match support."""
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    def __init__(self, objects: dict = None):
+        self.objects = dict(objects or {})
+        self.calls = []
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.calls.append(("put", Key))
+        self.objects[Key] = Body
+
+    def get_object(self, Bucket, Key, IfNoneMatch=None):
+        import hashlib
+        import io
+        import threading
+        from botocore.exceptions import ClientError
+
+        self.calls.append((threading.current_thread().name, Key, IfNoneMatch))
+        if Key not in self.objects:
+            raise self.exceptions.NoSuchKey(Key)
+        body = self.objects[Key]
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if IfNoneMatch == etag:
+            raise ClientError(
+                {"Error": {"Code": "304", "Message": "Not Modified"},
+                 "ResponseMetadata": {"HTTPStatusCode": 304}},
+                "GetObject",
+            )
+        return {"Body": io.BytesIO(body), "ETag": etag}
+
+
+def _publish(s3, prompts: dict) -> str:
+    import json
+    from prompt_bundle import build_bundle, manifest_key
+
+    manifest, body = build_bundle(prompts, "p/")
+    s3.objects[manifest["bundle_key"]] = body
+    s3.objects[manifest_key("p/")] = json.dumps(manifest).encode("utf-8")
+    return manifest["version"]
+
+
+def _prompts(tag: str) -> dict:
+    from prompt_repository import PromptRepository
+
+    return {key: f"Rolle: {key} {tag}" for key in PromptRepository.PROMPT_KEYS}
+
+
+def _s3_repository(monkeypatch, ttl: int):
+    import prompt_repository
+    from backend.core.config import Settings
+
+    monkeypatch.setattr(prompt_repository.PromptRepository, "_instance", None)
+    monkeypatch.setattr(prompt_repository, "get_settings", lambda: Settings(
+        use_s3_prompts=True, aws_s3_bucket_name="prompts", aws_s3_prompts_prefix="p/", prompts_cache_ttl=ttl,
+    ))
+    repo = prompt_repository.PromptRepository()
+    repo.register_fallback("master", lambda: "Rolle: master local")
+    s3 = LocalS3()
+    _publish(s3, _prompts("v1"))
+    repo._s3_client = s3
+    return repo, s3
+
+
+def _wait_for_refresh(repo):
+    import time
+
+    deadline = time.monotonic() + 5
+    while repo.get_stats()["refreshing"] and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_warm_stale_prompts_served_without_s3_on_request_path(monkeypatch):
+    import threading
+
+    repo, s3 = _s3_repository(monkeypatch, ttl=0)
+    keys = repo.PROMPT_KEYS
+
+    for key in keys:
+        assert repo.get_prompt(key) == f"Rolle: {key} v1"
+    # One manifest and one bundle GET for all eleven prompts
+    assert [call[1] for call in s3.calls] == ["p/manifest.json", f"p/bundles/{repo.get_bundle_version()}.json.gz"]
+    s3.calls.clear()
+
+    # The bundle is always stale (ttl=0): requests return at once, refreshes run on the refresh pool
+    for _ in range(20):
+        for key in keys:
+            assert repo.get_prompt(key) == f"Rolle: {key} v1"
+    _wait_for_refresh(repo)
+
+    request_thread = threading.current_thread().name
+    assert [call for call in s3.calls if call[0] == request_thread] == []
+    # Refreshes only revalidate the manifest, which comes back as 304
+    assert s3.calls and all(key == "p/manifest.json" and if_none_match for _, key, if_none_match in s3.calls)
+    assert repo.get_stats()["not_modified"] == len(s3.calls)
+
+
+def test_new_bundle_is_swapped_in_as_a_unit(monkeypatch):
+    repo, s3 = _s3_repository(monkeypatch, ttl=0)
+    v1 = repo.get_bundle_version()
+    assert repo.get_prompt("master") == "Rolle: master v1"
+
+    v2 = _publish(s3, _prompts("v2"))
+    assert repo.get_prompt("master") == "Rolle: master v1"
+    _wait_for_refresh(repo)
+
+    assert v1 != v2
+    assert repo.get_bundle_version() == v2
+    assert {repo.get_prompt(key) for key in repo.PROMPT_KEYS} == set(_prompts("v2").values())
+    assert repo.get_stats()["bundle_swaps"] == 2
+
+
+def test_concurrent_cold_requests_fetch_once(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    repo, s3 = _s3_repository(monkeypatch, ttl=60)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda key: repo.get_prompt(key), list(repo.PROMPT_KEYS) * 6))
+
+    assert set(results) == set(_prompts("v1").values())
+    assert len(s3.calls) == 2
+
+
+def test_corrupt_bundle_is_rejected(monkeypatch):
+    from prompt_bundle import build_bundle
+
+    repo, s3 = _s3_repository(monkeypatch, ttl=60)
+    manifest, _ = build_bundle(_prompts("v1"), "p/")
+    _, other_body = build_bundle(_prompts("tampered"), "p/")
+    s3.objects[manifest["bundle_key"]] = other_body
+
+    assert repo.get_prompt("master") == "Rolle: master local"
+    assert repo.get_bundle_version().startswith("local-")
+
+
+def test_missing_bundle_is_fetched_once_per_ttl(monkeypatch):
+    repo, s3 = _s3_repository(monkeypatch, ttl=60)
+    published = dict(s3.objects)
+    s3.objects.clear()
+
+    for _ in range(5):
+        assert repo.get_snapshot().version.startswith("local-")
+        assert repo.get_prompt("master") == "Rolle: master local"
+    assert [call[1] for call in s3.calls] == ["p/manifest.json"]
+    assert repo.get_stats()["failed_loads"] == 1 and repo.get_stats()["skipped_loads"] == 9
+
+    # Once the TTL has passed the next request asks S3 again and picks up the published bundle
+    s3.objects.update(published)
+    repo._failed_at -= 60
+    assert repo.get_prompt("master") == "Rolle: master v1"
+    assert len(s3.calls) == 3
+
+
+def test_uploader_publishes_bundle_then_manifest(monkeypatch):
+    from upload_prompts_to_s3 import PromptUploader
+    import upload_prompts_to_s3
+
+    repo, _ = _s3_repository(monkeypatch, ttl=60)
+    monkeypatch.setattr(upload_prompts_to_s3, "S3_PROMPTS_PREFIX", "p/")
+
+    s3 = LocalS3()
+    uploader = PromptUploader()
+    uploader.s3_client = s3
+    version = uploader.publish_bundle()
+
+    assert [key for _, key in s3.calls] == [f"p/bundles/{version}.json.gz", "p/manifest.json"]
+    repo._s3_client = s3
+    assert set(uploader.prompts) == set(repo.PROMPT_KEYS)
+    assert repo.get_prompt("aufgaben_worker") == uploader.prompts["aufgaben_worker"]
+    assert repo.get_bundle_version() == version
+
+
+def test_snapshot_pins_bundle_version(monkeypatch):
+    import pytest
+
+    repo, s3 = _s3_repository(monkeypatch, ttl=0)
+    snapshot = repo.get_snapshot()
+    assert snapshot.version == repo.get_bundle_version()
+    assert snapshot["master"] == "Rolle: master v1"
+    with pytest.raises(TypeError):
+        snapshot._prompts["master"] = "changed"
+
+    _publish(s3, _prompts("v2"))
+    repo.get_prompt("master")
+    _wait_for_refresh(repo)
+    assert repo.get_snapshot()["master"] == "Rolle: master v2"
+
+    # A restored conversation gets its old version back, from a fresh process too
+    assert repo.get_snapshot(snapshot.version) is snapshot
+    repo._snapshots.clear()
+    restored = repo.get_snapshot(snapshot.version)
+    assert restored.version == snapshot.version
+    assert restored["master"] == "Rolle: master v1"
+
+
 def main():
     """Run all tests."""
     print("\n" + "=" * 70)
@@ -0,0 +1,137 @@
+"""Tests for the incremental transcript cache shared by the background workers."""
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+import nodes
+import transcript_cache
+import worker_scheduler
+from transcript_cache import TranscriptCache, configure_transcript_cache, format_transcript_line
+from tests.agentic_system.test_llm_limiter import ConcurrencyTrackingChatModel
+
+
+def _history(n: int) -> list:
+    messages = []
+    for i in range(n):
+        cls = HumanMessage if i % 2 == 0 else AIMessage
+        messages.append(cls(content=f"Nachricht {i}", id=f"m{i}"))
+    return messages
+
+
+def _full_join(messages: list) -> str:
+    return "\n".join(format_transcript_line(msg) for msg in messages)
+
+
+def test_incremental_updates_match_full_join():
+    cache = TranscriptCache()
+    history = _history(12)
+
+    for end in (0, 1, 4, 4, 9, 12):
+        transcript = cache.update("conv_1", history[:end])
+        assert transcript.text == _full_join(history[:end])
+        assert transcript.message_count == end
+
+    stats = cache.get_stats()
+    assert stats["appended_messages"] == 12
+    assert stats["rebuilds"] == 0
+
+
+def test_transcript_lines_cut_out_message_ranges():
+    cache = TranscriptCache()
+    history = _history(9)
+    cache.update("conv_1", history[:4])
+    transcript = cache.update("conv_1", history)
+
+    assert transcript.turn_starts == (0, 2, 4, 6, 8)
+    for start, end in ((0, 9), (0, 1), (2, 6), (5, 9), (3, 3), (7, 20)):
+        assert transcript.lines(start, end) == _full_join(history[start:end])
+
+
+def test_rewritten_history_is_rebuilt():
+    cache = TranscriptCache()
+    history = _history(6)
+    cache.update("conv_1", history)
+
+    shortened = history[:2] + history[3:]
+    assert cache.update("conv_1", shortened).text == _full_join(shortened)
+
+    replaced = history[:3] + [AIMessage(content="anders", id="x")] + history[4:]
+    assert cache.update("conv_1", replaced).text == _full_join(replaced)
+    assert cache.get_stats()["rebuilds"] == 2
+
+
+def test_get_counts_hits_and_misses_and_evicts_lru():
+    cache = TranscriptCache(max_conversations=2)
+    cache.update("a", _history(2))
+    cache.update("b", _history(2))
+    assert cache.get("a").message_count == 2
+    cache.update("c", _history(2))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.discard("c")
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (2, 1, 1, 1)
+
+
+def test_background_run_reads_history_once(monkeypatch):
+    from background_graph import create_background_analysis_graph
+
+    original = transcript_cache._cache
+    cache = configure_transcript_cache(100)
+    monkeypatch.setattr(worker_scheduler, "_scheduler", worker_scheduler.WorkerScheduler("always"))
+    memory = MemorySaver()
+
+    # Immediate-style thread holding the conversation
+    builder = StateGraph(MessagesState)
+    builder.add_node("noop", lambda state: {})
+    builder.add_edge(START, "noop")
+    builder.add_edge("noop", END)
+    immediate = builder.compile(checkpointer=memory)
+    immediate.invoke({"messages": _history(5)}, {"configurable": {"thread_id": "conv_7"}})
+
+    fetches = []
+    fetch = nodes.get_messages_history_from_immediate_graph_state
+    monkeypatch.setattr(nodes, "background_graph", immediate)
+    monkeypatch.setattr(
+        nodes, "get_messages_history_from_immediate_graph_state",
+        lambda config: fetches.append(config) or fetch(config),
+    )
+
+    try:
+        graph = create_background_analysis_graph(ConcurrencyTrackingChatModel(delay=0), memory)
+        state = {"child_id": "1", "audio_book": "Buch", "child_profile": "Profil"}
+        config = {"configurable": {"thread_id": "conv_7_analysis"}}
+        graph.invoke(state, config)
+
+        immediate.invoke({"messages": _history(8)[5:]}, {"configurable": {"thread_id": "conv_7"}})
+        graph.invoke(state, config)
+
+        stats = cache.get_stats()
+    finally:
+        transcript_cache._cache = original
+
+    # One history fetch per run; scheduleWorkers and the nine transcript-reading workers hit the cache
+    assert len(fetches) == 2
+    assert stats["hits"] == 20
+    assert stats["misses"] == 0
+    assert stats["appended_messages"] == 8
+    assert cache.get("conv_7").text == _full_join(_history(8))
+
+
+def test_removed_messages_trigger_rebuild():
+    cache = TranscriptCache()
+    history = _history(4)
+    cache.update("conv_1", history)
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("noop", lambda state: {})
+    builder.add_edge(START, "noop")
+    builder.add_edge("noop", END)
+    graph = builder.compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "t"}}
+    graph.invoke({"messages": history}, config)
+    graph.update_state(config, {"messages": [RemoveMessage(id="m3")]})
+    remaining = graph.get_state(config).values["messages"]
+
+    assert cache.update("conv_1", remaining).text == _full_join(history[:3])
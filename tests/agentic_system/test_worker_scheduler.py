@@ -0,0 +1,120 @@
+"""Tests for adaptive scheduling of the background workers."""
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+import history_window
+import nodes
+import transcript_cache
+import worker_scheduler
+from worker_scheduler import DEFAULT_POLICY, WorkerRule, WorkerScheduler
+from tests.agentic_system.test_history_window import RecordingChatModel, _turns
+
+
+@pytest.fixture(autouse=True)
+def restore_scheduler(monkeypatch):
+    monkeypatch.setattr(worker_scheduler, "_scheduler", worker_scheduler._scheduler)
+    monkeypatch.setattr(history_window, "_window", history_window._window)
+    monkeypatch.setattr(transcript_cache, "_cache", transcript_cache.TranscriptCache())
+
+
+def test_rules_every_n_turns_signals_and_dependents():
+    scheduler = WorkerScheduler("adaptive")
+    everything = list(DEFAULT_POLICY)
+
+    # First run: nothing ran yet, everything is due
+    assert scheduler.schedule(1, {}, []) == everything
+
+    last_run = {worker: 1 for worker in everything}
+    assert scheduler.schedule(2, last_run, []) == ["historySummaryWorker"]
+    # Every second turn: the fast-changing analyses plus the workers that run after them
+    assert scheduler.schedule(3, last_run, []) == [
+        "historySummaryWorker", "speechComprehensionWorker", "sprachhandlungsAnalyseWorker",
+        "speechGrammarWorker", "foerderfokusWorker", "aufgabenWorker",
+    ]
+    # A disengagement signal brings in boredomWorker and the task chain right away
+    assert scheduler.schedule(2, last_run, ["disengagement"]) == [
+        "historySummaryWorker", "boredomWorker", "foerderfokusWorker", "aufgabenWorker",
+    ]
+    assert WorkerScheduler("always").schedule(2, last_run, []) == everything
+
+
+def test_overrides_and_unknown_settings():
+    scheduler = WorkerScheduler("adaptive", every_n_turns={"speechVocabularyWorker": 1})
+    last_run = {worker: 1 for worker in DEFAULT_POLICY}
+    assert "speechVocabularyWorker" in scheduler.schedule(2, last_run, [])
+
+    with pytest.raises(ValueError):
+        WorkerScheduler("adaptive", every_n_turns={"dreamWorker": 2})
+    with pytest.raises(ValueError):
+        WorkerScheduler(mode="never")
+
+
+def test_time_budget_defers_lower_priority_workers():
+    policy = {
+        "a": WorkerRule(every_n_turns=1),
+        "b": WorkerRule(every_n_turns=1),
+        "c": WorkerRule(after=("b",)),
+        "d": WorkerRule(every_n_turns=1),
+    }
+    scheduler = WorkerScheduler("adaptive", time_budget=3.0, policy=policy)
+    for worker, seconds in (("a", 1.0), ("b", 1.0), ("c", 1.5), ("d", 0.5)):
+        scheduler.record_run(worker, seconds)
+
+    # b and its dependent c (2.5s) do not fit after a; d still does
+    last_run = {"a": 1, "b": 1, "c": 1, "d": 1}
+    assert scheduler.schedule(2, last_run, []) == ["a", "d"]
+    # b stays due and is picked up once a and d are not due
+    assert scheduler.schedule(2, {**last_run, "a": 2, "d": 2}, []) == ["b", "c"]
+    # At least one worker runs even when it alone exceeds the budget
+    tight = WorkerScheduler("adaptive", time_budget=0.1, policy=policy)
+    tight.record_run("a", 1.0)
+    assert tight.schedule(2, last_run, []) == ["a"]
+    assert scheduler.get_stats()["deferred"] == 1
+
+
+def test_skipped_workers_keep_their_last_analysis(monkeypatch):
+    from background_graph import create_background_analysis_graph
+
+    worker_scheduler.configure_worker_scheduler("adaptive")
+    history_window.configure_history_window(keep_turns=0, token_budget=3000)
+    memory = MemorySaver()
+    builder = StateGraph(MessagesState)
+    builder.add_node("noop", lambda state: {})
+    builder.add_edge(START, "noop")
+    builder.add_edge("noop", END)
+    immediate = builder.compile(checkpointer=memory)
+    monkeypatch.setattr(nodes, "background_graph", immediate)
+
+    llm = RecordingChatModel(delay=0, calls=[])
+    graph = create_background_analysis_graph(llm, memory)
+    state = {"child_id": "1", "audio_book": "Buch", "child_profile": "Profil"}
+    config = {"configurable": {"thread_id": "conv_3_analysis"}}
+    conversation = {"configurable": {"thread_id": "conv_3"}}
+
+    immediate.invoke({"messages": _turns(1)}, conversation)
+    first = graph.invoke(state, config)
+    assert len(llm.calls) == 9
+    assert first["boredom_analysis"]
+
+    immediate.invoke({"messages": _turns(2)[2:]}, conversation)
+    llm.calls.clear()
+    second = graph.invoke(state, config)
+    assert second["scheduled_workers"] == ["historySummaryWorker"]
+    assert llm.calls == []
+    assert second["boredom_analysis"] == first["boredom_analysis"]
+    assert second["aufgaben"] == first["aufgaben"]
+
+    # Three "weiß nicht" in a row fire the disengagement signal
+    immediate.invoke({"messages": [
+        msg for _ in range(3) for msg in (HumanMessage(content="weiß nicht"), AIMessage(content="Okay!"))
+    ]}, conversation)
+    third = graph.invoke(state, config)
+    assert "disengagement" in third["analysis_signals"]
+    assert "boredomWorker" in third["scheduled_workers"] and "aufgabenWorker" in third["scheduled_workers"]
+
+    stats = worker_scheduler.get_worker_scheduler().get_stats()["workers"]
+    assert stats["boredomWorker"]["runs"] == 2 and stats["boredomWorker"]["skips"] == 1
+    # Skipped on turn 2, due again on turn 5 (every third turn)
+    assert stats["speechVocabularyWorker"] == {**stats["speechVocabularyWorker"], "runs": 2, "skips": 1}
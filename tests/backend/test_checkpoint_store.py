@@ -0,0 +1,105 @@
+"""
+Tests for BoundedMemorySaver: checkpoint retention, eviction and accounting.
+"""
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from backend.services.checkpoint_store import BoundedMemorySaver
+
+
+def _echo_graph(checkpointer):
+    builder = StateGraph(MessagesState)
+    builder.add_node("echo", lambda state: {"messages": [AIMessage(content="echo " + state["messages"][-1].content)]})
+    builder.add_edge(START, "echo")
+    builder.add_edge("echo", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _turn(graph, thread_id: str, text: str = "hallo"):
+    return graph.invoke({"messages": [HumanMessage(content=text)]}, {"configurable": {"thread_id": thread_id}})
+
+
+def _checkpoint_count(saver, thread_id: str) -> int:
+    return sum(len(c) for c in saver.storage.get(thread_id, {}).values())
+
+
+def test_keeps_latest_checkpoints_and_full_state():
+    saver = BoundedMemorySaver(max_checkpoints_per_thread=2)
+    graph = _echo_graph(saver)
+
+    for i in range(10):
+        result = _turn(graph, "t1", f"nachricht {i}")
+
+    assert len(result["messages"]) == 20
+    assert _checkpoint_count(saver, "t1") == 2
+    state = graph.get_state({"configurable": {"thread_id": "t1"}})
+    assert state.values["messages"][-1].content == "echo nachricht 9"
+
+
+def test_prunes_unreferenced_blobs():
+    bounded = BoundedMemorySaver(max_checkpoints_per_thread=2)
+    unbounded = MemorySaver()
+    for saver in (bounded, unbounded):
+        graph = _echo_graph(saver)
+        for i in range(20):
+            _turn(graph, "t1", f"nachricht {i}")
+
+    # Only the message versions of the two retained checkpoints are kept
+    assert len([k for k in bounded.blobs if k[2] == "messages"]) <= 2
+    assert bounded.get_thread_bytes()["t1"] < sum(len(v[1]) for v in unbounded.blobs.values()) / 5
+
+
+def test_max_threads_evicts_least_recently_used():
+    evicted = []
+    saver = BoundedMemorySaver(max_threads=2, on_evict=evicted.append)
+    graph = _echo_graph(saver)
+
+    _turn(graph, "a")
+    _turn(graph, "b")
+    graph.get_state({"configurable": {"thread_id": "a"}})  # a is now more recent than b
+    _turn(graph, "c")
+
+    assert evicted == ["b"]
+    assert set(saver.get_thread_bytes()) == {"a", "c"}
+    assert saver.get_stats()["evictions"]["capacity"] == 1
+
+
+def test_idle_ttl_evicts_stale_threads():
+    evicted = []
+    saver = BoundedMemorySaver(idle_ttl_seconds=60, on_evict=evicted.append)
+    graph = _echo_graph(saver)
+    _turn(graph, "a")
+    _turn(graph, "b")
+
+    assert saver.evict_idle(now=time.monotonic() + 30) == []
+    assert saver.evict_idle(now=time.monotonic() + 61) == ["a", "b"]
+    assert evicted == ["a", "b"]
+    assert graph.get_state({"configurable": {"thread_id": "a"}}).values == {}
+
+
+def test_delete_thread_frees_everything():
+    saver = BoundedMemorySaver(max_checkpoints_per_thread=3)
+    graph = _echo_graph(saver)
+    _turn(graph, "a")
+    _turn(graph, "b")
+
+    saver.delete_thread("a")
+
+    assert set(saver.get_thread_bytes()) == {"b"}
+    assert not any(k[0] == "a" for k in saver.blobs)
+    assert not any(k[0] == "a" for k in saver.writes)
+    assert saver.get_stats()["threads"] == 1
+
+
+def test_reading_unknown_thread_does_not_leak_entries():
+    saver = BoundedMemorySaver()
+    graph = _echo_graph(saver)
+
+    for i in range(5):
+        assert graph.get_state({"configurable": {"thread_id": f"missing_{i}"}}).values == {}
+
+    assert len(saver.storage) == 0
+    assert saver.get_stats()["threads"] == 0
@@ -0,0 +1,380 @@
+"""
+Tests for the async streaming path of ConversationService.
+
+Slow fake chat models stand in for Gemini so we can check that concurrent
+conversations overlap on the event loop instead of serializing, and that
+streamed answers reach the client sentence by sentence.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from backend.core.config import Settings
+from backend.services.conversation_service import ConversationService
+
+
+LLM_DELAY = 0.3
+
+
+class SlowFakeChatModel(BaseChatModel):
+    """Chat model that answers with a fixed text after a fixed delay."""
+
+    reply: str = "Hallo! Wie geht es dir heute?"
+    delay: float = LLM_DELAY
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+
+class StreamingFakeChatModel(SlowFakeChatModel):
+    """Chat model that streams its reply word by word with a delay per token."""
+
+    reply: str = "Dann suchst er den Ball im Garten. Wo ist der Ball? Er liegt unter dem Baum."
+    token_delay: float = 0.05
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for token in self.reply.split(" "):
+            await asyncio.sleep(self.token_delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token + " "))
+
+
+class LoopBoundFakeChatModel(SlowFakeChatModel):
+    """Chat model whose async client is tied to the event loop that first used it (like grpc.aio clients)."""
+
+    loop: object = None
+    sync_calls: int = 0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.sync_calls += 1
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        elif self.loop is not loop:
+            raise RuntimeError("async client used from a different event loop")
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+
+def _make_service(monkeypatch, llm, **settings):
+    svc = ConversationService(
+        llm_model="unused",
+        settings=Settings(use_s3_prompts=False, **settings),
+        llm=llm,
+    )
+    # Background analysis is not under test here
+    monkeypatch.setattr(svc, "_run_background_analysis", lambda *args, **kwargs: None)
+    return svc
+
+
+@pytest.fixture
+def service(monkeypatch):
+    return _make_service(monkeypatch, SlowFakeChatModel())
+
+
+async def _collect_chunks(service, thread_id: str, message: str) -> list[str]:
+    return [chunk async for chunk in service.send_message_stream(thread_id, message)]
+
+
+async def _collect(service, thread_id: str, message: str) -> str:
+    return "".join(await _collect_chunks(service, thread_id, message))
+
+
+def test_stream_returns_reply(service):
+    conversation = service.create_conversation(child_id="1")
+
+    text = asyncio.run(_collect(service, conversation.thread_id, "Hallo"))
+
+    assert "Hallo" in text
+    history = service.get_conversation_history(conversation.thread_id)
+    assert [m["role"] for m in history["messages"]] == ["human", "ai"]
+
+
+def test_concurrent_streams_do_not_serialize(service):
+    conversations = [service.create_conversation(child_id="1") for _ in range(5)]
+
+    async def run():
+        # Warm up imports and caches so the timed run only measures the LLM wait
+        await _collect(service, service.create_conversation(child_id="1").thread_id, "Hallo")
+
+        heartbeat_lag = 0.0
+        done = asyncio.Event()
+
+        async def heartbeat():
+            nonlocal heartbeat_lag
+            while not done.is_set():
+                t0 = time.perf_counter()
+                await asyncio.sleep(0.01)
+                heartbeat_lag = max(heartbeat_lag, time.perf_counter() - t0 - 0.01)
+
+        ticker = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        replies = await asyncio.gather(*(
+            _collect(service, c.thread_id, "Erzähl mir was") for c in conversations
+        ))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await ticker
+        return replies, elapsed, heartbeat_lag
+
+    replies, elapsed, heartbeat_lag = asyncio.run(run())
+
+    assert all(replies)
+    # Serialized execution would take len(conversations) * LLM_DELAY = 1.5s
+    assert elapsed < LLM_DELAY * 3
+    # The event loop must stay responsive while the LLM calls are pending
+    assert heartbeat_lag < LLM_DELAY / 2
+
+
+def test_sync_invoke_still_supported(service):
+    conversation = service.create_conversation(child_id="1")
+    config = {"configurable": {"thread_id": conversation.thread_id}}
+
+    from langchain_core.messages import HumanMessage
+    result = service.immediate_graph.invoke(
+        {"messages": [HumanMessage(content="Hallo")], "child_id": "1"}, config
+    )
+
+    assert result["messages"][-1].content.startswith("Hallo")
+    assert result["response_contract"] is not None
+
+
+def test_stream_releases_corrected_sentences_before_generation_ends(monkeypatch):
+    llm = StreamingFakeChatModel()
+    service = _make_service(monkeypatch, llm)
+    conversation = service.create_conversation(child_id="1")
+
+    async def run():
+        arrivals = []
+        start = time.perf_counter()
+        async for chunk in service.send_message_stream(conversation.thread_id, "Wo ist der Ball?"):
+            arrivals.append((time.perf_counter() - start, chunk))
+        return arrivals
+
+    arrivals = asyncio.run(run())
+    chunks = [chunk for _, chunk in arrivals]
+    generation_time = len(llm.reply.split(" ")) * llm.token_delay
+
+    assert chunks[0] == "Dann sucht er den Ball im Garten. "
+    assert len(chunks) == 3
+    assert arrivals[0][0] < generation_time / 2
+    # The stored message is exactly what was streamed
+    history = service.get_conversation_history(conversation.thread_id)
+    assert history["messages"][-1]["content"] == "".join(chunks).strip()
+
+
+def test_non_streaming_mode_sends_single_chunk(monkeypatch):
+    service = _make_service(monkeypatch, StreamingFakeChatModel(), stream_master_response=False)
+    conversation = service.create_conversation(child_id="1")
+
+    chunks = asyncio.run(_collect_chunks(service, conversation.thread_id, "Hallo"))
+
+    assert chunks == ["Dann sucht er den Ball im Garten. Wo ist der Ball? Er liegt unter dem Baum."]
+
+
+def test_delete_conversation_frees_both_threads(monkeypatch):
+    service = _make_service(monkeypatch, SlowFakeChatModel(delay=0))
+    conversation = service.create_conversation(child_id="1")
+    asyncio.run(_collect(service, conversation.thread_id, "Hallo"))
+    service.background_graph.invoke(
+        {"child_id": "1"}, {"configurable": {"thread_id": conversation.thread_id + "_analysis"}}
+    )
+    assert {conversation.thread_id, conversation.thread_id + "_analysis"} <= set(service.memory.get_thread_bytes())
+
+    assert service.delete_conversation(conversation.thread_id)
+
+    assert service.memory.get_thread_bytes() == {}
+    assert service.get_checkpoint_stats()["threads"] == 0
+
+
+class RecordingFakeChatModel(SlowFakeChatModel):
+    """Chat model that records the system prompt of every call."""
+
+    system_prompts: list = []
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.system_prompts.append(messages[0].content)
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+
+def test_conversation_keeps_prompts_pinned_at_creation(monkeypatch):
+    from prompt_repository import get_prompt_repository
+
+    llm = RecordingFakeChatModel(delay=0, system_prompts=[])
+    service = _make_service(monkeypatch, llm)
+    conversation = service.create_conversation(child_id="1")
+    original_master = conversation.prompt_snapshot["master"]
+
+    # A new master prompt is published mid-conversation
+    monkeypatch.setitem(get_prompt_repository()._fallback_prompts, "master", lambda: "NEUER MASTER PROMPT")
+    asyncio.run(_collect(service, conversation.thread_id, "Hallo"))
+
+    assert original_master.strip() in llm.system_prompts[-1]
+    assert "NEUER MASTER PROMPT" not in llm.system_prompts[-1]
+    contract = service.get_last_response_contract(conversation.thread_id)
+    assert contract["contract"].prompt_version == conversation.prompt_version
+
+    # New conversations pin the new prompts
+    newer = service.create_conversation(child_id="1")
+    asyncio.run(_collect(service, newer.thread_id, "Hallo"))
+    assert "NEUER MASTER PROMPT" in llm.system_prompts[-1]
+    assert newer.prompt_version != conversation.prompt_version
+
+
+def test_deferred_contract_is_built_after_the_turn(monkeypatch):
+    service = _make_service(monkeypatch, SlowFakeChatModel(delay=0))
+    conversation = service.create_conversation(child_id="1", story_id="mia_und_leo", chapter_id="chapter_01")
+    release = threading.Event()
+
+    from deferred_contracts import get_deferred_contracts
+    contracts = get_deferred_contracts()
+    prepare = contracts.prepare
+
+    def gated_prepare(conversation_id, message_id, build):
+        prepare(conversation_id, message_id, lambda: release.wait(5) and build())
+
+    monkeypatch.setattr(contracts, "prepare", gated_prepare)
+
+    reply = asyncio.run(_collect(service, conversation.thread_id, "Hallo"))
+
+    # The turn completed while the contract is still being built
+    assert reply.startswith("Hallo")
+    state = service.immediate_graph.get_state({"configurable": {"thread_id": conversation.thread_id}})
+    assert state.values["response_contract"] is None
+    pending = service.get_last_response_contract(conversation.thread_id, wait_timeout=0.05)
+    assert pending["pending"] is True and pending["contract"] is None
+
+    release.set()
+    result = service.get_last_response_contract(conversation.thread_id, wait_timeout=5)
+    assert result["contract"].spoken_text.startswith("Hallo")
+    assert result["contract"].prompt_version == conversation.prompt_version
+    assert service.get_background_stats()["contracts"]["stored"] == 1
+
+
+def test_deferred_contract_for_an_outdated_reply_is_dropped(monkeypatch):
+    service = _make_service(monkeypatch, SlowFakeChatModel(delay=0))
+    conversation = service.create_conversation(child_id="1")
+    contracts = service.contracts
+
+    asyncio.run(_collect(service, conversation.thread_id, "Hallo"))
+    assert contracts.wait(conversation.thread_id, 5)
+
+    # A contract arriving for a message that is no longer the latest reply is not written
+    assert service._store_contract(conversation.thread_id, "older-message", object()) is False
+    assert service.get_last_response_contract(conversation.thread_id)["contract"] is not None
+
+
+def test_slow_contract_does_not_write_during_the_next_turn(monkeypatch):
+    service = _make_service(monkeypatch, StreamingFakeChatModel(delay=0, token_delay=0.02),
+                            contract_wait_timeout=0.05)
+    conversation = service.create_conversation(child_id="1")
+    release = threading.Event()
+
+    from deferred_contracts import get_deferred_contracts
+    contracts = get_deferred_contracts()
+    prepare = contracts.prepare
+    gated = []
+
+    def gated_prepare(conversation_id, message_id, build):
+        if not gated:
+            gated.append(message_id)
+            prepare(conversation_id, message_id, lambda: release.wait(5) and build())
+        else:
+            prepare(conversation_id, message_id, build)
+
+    monkeypatch.setattr(contracts, "prepare", gated_prepare)
+    get_state = service.immediate_graph.get_state
+    seen_by_contract_writes = []
+
+    def recording_get_state(config, *args, **kwargs):
+        state = get_state(config, *args, **kwargs)
+        if threading.current_thread().name.startswith("contracts"):
+            seen_by_contract_writes.append(len(state.values["messages"]))
+        return state
+
+    monkeypatch.setattr(service.immediate_graph, "get_state", recording_get_state)
+
+    asyncio.run(_collect(service, conversation.thread_id, "Hallo"))
+
+    async def second_turn():
+        chunks = []
+        async for chunk in service.send_message_stream(conversation.thread_id, "Noch einmal"):
+            # The first reply's contract finishes while the second turn is streaming
+            release.set()
+            chunks.append(chunk)
+        return chunks
+
+    assert asyncio.run(second_turn())
+    assert contracts.wait(conversation.thread_id, 5)
+
+    # The first contract's write waited for the turn to end (it saw the second reply, not the
+    # turn's input checkpoint); it kept its per-turn entry but did not replace the latest contract
+    assert seen_by_contract_writes == [4, 4]
+    assert service.get_background_stats()["contracts"]["stored"] == 1
+    state = service.immediate_graph.get_state({"configurable": {"thread_id": conversation.thread_id}})
+    latest_id = state.values["messages"][-1].id
+    assert sorted(entry["message_id"] for entry in state.values["response_contracts"]) == sorted([gated[0], latest_id])
+    from output_contract_builder import compact_contract
+    entries = {entry["message_id"]: entry for entry in state.values["response_contracts"]}
+    assert compact_contract(state.values["response_contract"], latest_id) == entries[latest_id]
+
+
+def test_inline_contract_mode(monkeypatch):
+    service = _make_service(monkeypatch, SlowFakeChatModel(delay=0), contract_mode="inline")
+    conversation = service.create_conversation(child_id="1")
+
+    asyncio.run(_collect(service, conversation.thread_id, "Hallo"))
+
+    state = service.immediate_graph.get_state({"configurable": {"thread_id": conversation.thread_id}})
+    assert state.values["response_contract"] is not None
+    assert service.get_background_stats()["contracts"]["prepared"] == 0
+
+
+def test_master_chatbot_calls_are_counted_per_node(monkeypatch):
+    service = _make_service(monkeypatch, StreamingFakeChatModel(delay=0, token_delay=0),
+                            stream_master_response=True, llm_node_models={"masterChatbot": "unused"})
+    conversation = service.create_conversation(child_id="1")
+
+    asyncio.run(_collect(service, conversation.thread_id, "Hallo"))
+
+    master = service.get_background_stats()["models"]["nodes"]["masterChatbot"]
+    assert master["model"] == "unused" and master["calls"] == 1 and master["errors"] == 0
+
+
+def test_background_runs_do_not_use_the_chat_models_async_client(monkeypatch):
+    llm = LoopBoundFakeChatModel(delay=0)
+    service = _make_service(monkeypatch, llm, stream_master_response=False, background_schedule="always")
+    monkeypatch.delattr(service, "_run_background_analysis")
+    conversation = service.create_conversation(child_id="1")
+
+    async def session():
+        # The chat turn (and its background run) and a second background run, all while
+        # the server's loop is alive, followed by another chat turn on that loop
+        reply = await _collect(service, conversation.thread_id, "Hallo")
+        await asyncio.to_thread(service.background_runner.wait_idle, 10)
+        service._run_background_analysis(conversation.thread_id, "1")
+        await asyncio.to_thread(service.background_runner.wait_idle, 10)
+        return reply, await _collect(service, conversation.thread_id, "Noch einmal")
+
+    first, second = asyncio.run(session())
+    service.background_runner.wait_idle(10)
+
+    assert first.startswith("Hallo") and second.startswith("Hallo")
+    stats = service.get_background_stats()
+    assert stats["failed"] == 0 and stats["completed"] == 3
+    assert llm.sync_calls > 0
@@ -0,0 +1,40 @@
+"""The API module must not import the heavy dependencies the startup warm-up loads."""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+BUDGET = json.loads((PROJECT_ROOT / "scripts" / "import_time_budget.json").read_text())
+
+
+def test_heavy_modules_load_lazily():
+    code = (
+        f"import sys, json, {BUDGET['module']}\n"
+        "print(json.dumps(sorted(sys.modules)))"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(PROJECT_ROOT), str(PROJECT_ROOT / "agentic-system")])}
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+
+    eager = [
+        name for name in loaded
+        if any(name == module or name.startswith(module + ".") for module in BUDGET["deferred_modules"])
+    ]
+    assert eager == []
+
+
+def test_importing_prompts_does_not_create_the_repository():
+    code = (
+        "import prompts, prompt_repository\n"
+        "print(prompt_repository._repository is None, sorted(prompt_repository._fallbacks) == "
+        "sorted(prompt_repository.get_prompt_repository()._fallback_prompts))"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(PROJECT_ROOT), str(PROJECT_ROOT / "agentic-system")])}
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip().splitlines()[-1] == "True True"
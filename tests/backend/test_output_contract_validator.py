@@ -0,0 +1,156 @@
+"""Tests for evidence validation against the cached chapter corpus."""
+from pathlib import Path
+
+import pytest
+
+from backend.models.output_contract import AnswerType, Claim, Evidence, Grounding, ResponseContract
+from backend.services import output_contract_validator
+from backend.services.output_contract_validator import (
+    SourceCorpusCache,
+    SubstringIndex,
+    validate_contract_batch,
+    validate_response_contract,
+)
+from beats import BeatPackManager
+
+CONTENT_DIR = Path(__file__).parent.parent.parent / "agentic-system" / "content"
+
+
+@pytest.fixture(scope="module")
+def beat_manager():
+    return BeatPackManager(CONTENT_DIR)
+
+
+@pytest.fixture(autouse=True)
+def corpus_cache(monkeypatch):
+    cache = SourceCorpusCache()
+    monkeypatch.setattr(output_contract_validator, "_corpus_cache", cache)
+    return cache
+
+
+def _contract(*quotes):
+    return {
+        "spoken_text": "Mia und Leo.",
+        "grounding": {
+            "evidence": [{"quote": quote, "beat_id": None} for quote in quotes],
+            "claims": [{"claim": "Mia und Leo", "supported_by": list(range(len(quotes)))}],
+        },
+    }
+
+
+def test_beat_sources_validate_and_are_cached(beat_manager, corpus_cache):
+    beat = beat_manager.get_retriever("mia_und_leo", "chapter_01").get_all_beats()[1]
+    quote = beat.text.split(".")[0].strip()
+
+    result = validate_response_contract(
+        _contract(quote, "Der Drache fliegt zum Mond"),
+        beat_manager=beat_manager, story_id="mia_und_leo", chapter_id="chapter_01",
+    )
+
+    assert [item["found"] for item in result.evidence_validation] == [True, False]
+    assert not result.is_valid
+
+    validate_response_contract(_contract(quote), beat_manager=beat_manager,
+                               story_id="mia_und_leo", chapter_id="chapter_01")
+    assert corpus_cache.get_stats() == {"hits": 1, "misses": 1, "size": 1, "capacity": 32}
+
+
+def test_full_content_with_normalized_whitespace():
+    content = "Mia geht in den Garten.\nDort   findet sie\neinen roten Ball."
+
+    result = validate_response_contract(
+        _contract("Mia geht in den Garten.", "findet sie einen roten Ball", "Ball"),
+        full_content=content,
+    )
+
+    assert result.is_valid
+    assert [item.get("match_type") for item in result.evidence_validation] == [None, "normalized", None]
+
+
+def test_response_contract_models_are_accepted(beat_manager):
+    beat = beat_manager.get_retriever("mia_und_leo", "chapter_01").get_all_beats()[0]
+    contract = ResponseContract(
+        answer_type=AnswerType.ANSWER,
+        spoken_text=beat.text,
+        grounding=Grounding(
+            evidence=[Evidence(quote=beat.text, beat_id=beat.beat_id)],
+            claims=[Claim(claim=beat.text, supported_by=[0])],
+        ),
+    )
+
+    result = validate_response_contract(contract, beat_manager=beat_manager,
+                                        story_id="mia_und_leo", chapter_id="chapter_01")
+
+    assert result.is_valid
+    assert result.evidence_validation[0]["found"]
+
+
+def test_substring_index_matches_str_contains():
+    text = "der Ball, der Baum und der Ball im Garten. Der Hund bellt den Ball an."
+    index = SubstringIndex(text, q=4)
+    probes = [text[i:j] for i in range(0, len(text), 3) for j in range(i + 1, len(text) + 1, 5)]
+    probes += ["der Ball im Haus", "Katze", "Ball an.", "xyz"]
+
+    assert [probe in index for probe in probes] == [probe in text for probe in probes]
+
+
+def test_batch_validation_covers_every_turn_grouped_by_chapter(monkeypatch, corpus_cache):
+    import asyncio
+    import json
+
+    from fastapi.testclient import TestClient
+
+    from backend import main
+    from backend.api import dependencies
+    from tests.backend.test_conversation_service import SlowFakeChatModel, _collect, _make_service
+
+    service = _make_service(monkeypatch, SlowFakeChatModel(delay=0, reply="Mia und Leo spielen im Garten."))
+    mia = [service.create_conversation(child_id="1", story_id="mia_und_leo", chapter_id="chapter_01") for _ in range(2)]
+    pia = service.create_conversation(child_id="1", story_id="pia_muss_nicht_perfekt_sein", chapter_id="chapter_01")
+    for conversation, turns in ((mia[0], 2), (pia, 1), (mia[1], 1)):
+        for _ in range(turns):
+            asyncio.run(_collect(service, conversation.thread_id, "Hallo"))
+        service.contracts.wait(conversation.thread_id, 5)
+
+    monkeypatch.setitem(main.app.dependency_overrides, dependencies.get_conversation_service, lambda: service)
+    monkeypatch.setattr(dependencies, "get_conversation_service", lambda: service)
+    with TestClient(main.app) as client:
+        response = client.post("/conversations/contracts/validate", json={
+            "thread_ids": [mia[0].thread_id, pia.thread_id, "conv_unknown", mia[1].thread_id],
+        })
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {"thread_id": "conv_unknown", "error": "Conversation not found"}
+    turns = [(line["thread_id"], line["turn"]) for line in lines if "turn" in line]
+    # Grouped by chapter: both mia_und_leo conversations before pia
+    assert turns == [(mia[0].thread_id, 0), (mia[0].thread_id, 1), (mia[1].thread_id, 0), (pia.thread_id, 0)]
+    assert all("evidence_validation" in line for line in lines[1:-1])
+    assert lines[-1]["summary"]["turns"] == 4 and lines[-1]["summary"]["chapters"] == 2
+
+
+def test_batch_builds_each_chapter_corpus_once(beat_manager, corpus_cache):
+    def quotes(story_id):
+        beats = beat_manager.get_retriever(story_id, "chapter_01").get_all_beats()
+        return [beat.text.split(".")[0].strip() for beat in beats[:2]]
+
+    states = {
+        "mia_1": {"response_contracts": [_contract(*quotes("mia_und_leo")), _contract("Der Drache fliegt zum Mond")]},
+        "pia_1": {"response_contracts": [_contract(*quotes("pia_muss_nicht_perfekt_sein"))]},
+        "mia_2": {"response_contracts": [_contract(quotes("mia_und_leo")[0])]},
+    }
+    conversations = [
+        ("mia_1", "mia_und_leo", "chapter_01"),
+        ("pia_1", "pia_muss_nicht_perfekt_sein", "chapter_01"),
+        ("gone", "pia_muss_nicht_perfekt_sein", "chapter_01"),
+        ("mia_2", "mia_und_leo", "chapter_01"),
+    ]
+
+    results = list(validate_contract_batch(conversations, states.get, beat_manager=beat_manager))
+
+    assert [(r.get("thread_id"), r.get("turn"), r.get("is_valid")) for r in results[:-1]] == [
+        ("mia_1", 0, True), ("mia_1", 1, False), ("mia_2", 0, True), ("pia_1", 0, True), ("gone", None, None),
+    ]
+    assert results[-1]["summary"] == {**results[-1]["summary"], "conversations": 3, "turns": 4,
+                                      "valid": 3, "invalid": 1, "missing": 1, "chapters": 2}
+    assert corpus_cache.get_stats()["misses"] == 2
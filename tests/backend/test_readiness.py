@@ -0,0 +1,65 @@
+"""Tests for the startup warm-up and the /ready endpoint."""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.api import dependencies
+from backend.core import readiness
+from tests.backend.test_conversation_service import SlowFakeChatModel, _make_service
+
+
+@pytest.fixture(autouse=True)
+def restore_readiness(monkeypatch):
+    monkeypatch.setattr(readiness, "_readiness", readiness.Readiness())
+
+
+def _wait_for_warm_up(client):
+    # The warm-up runs in the background; the server answers while it is in progress
+    deadline = time.monotonic() + 30
+    response = client.get("/ready")
+    while response.json()["status"] == "warming_up" and time.monotonic() < deadline:
+        time.sleep(0.05)
+        response = client.get("/ready")
+    return response
+
+
+def test_ready_reports_warm_up_timings(monkeypatch):
+    service = _make_service(monkeypatch, SlowFakeChatModel(delay=0))
+    monkeypatch.setattr(dependencies, "get_conversation_service", lambda: service)
+
+    with TestClient(main.app) as client:
+        response = _wait_for_warm_up(client)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert set(body["components"]) == {"conversation_service", "beatpacks", "prompts"}
+    assert body["components"]["beatpacks"]["beatpacks"] >= 3
+    assert body["components"]["beatpacks"]["retrievers"] >= 3
+    assert body["components"]["prompts"]["version"].startswith("local-")
+    # Compiled at startup, so the first conversation does not build a retriever
+    stats = service.beat_manager.get_retriever_cache_stats()
+    service.beat_manager.get_retriever("mia_und_leo", "chapter_01")
+    assert service.beat_manager.get_retriever_cache_stats()["misses"] == stats["misses"]
+
+
+def test_not_ready_before_and_after_failed_warm_up(monkeypatch):
+    client = TestClient(main.app)
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+    assert client.get("/health").status_code == 200
+
+    def broken_service():
+        raise RuntimeError("GOOGLE_API_KEY missing")
+
+    monkeypatch.setattr(dependencies, "get_conversation_service", broken_service)
+    with TestClient(main.app) as client:
+        response = _wait_for_warm_up(client)
+        assert client.get("/health").status_code == 200
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "failed"
+    assert "GOOGLE_API_KEY" in response.json()["error"]
@@ -0,0 +1,131 @@
+"""
+Tests for SQLiteSaver: persistence across instances, batching, retention and
+conversation metadata shared between service instances.
+"""
+import asyncio
+import sqlite3
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from backend.core.config import Settings
+from backend.services.conversation_service import ConversationService
+from backend.services.sqlite_checkpoint_store import SQLiteSaver
+from tests.backend.test_conversation_service import SlowFakeChatModel
+
+
+def _echo_graph(checkpointer):
+    builder = StateGraph(MessagesState)
+    builder.add_node("echo", lambda state: {"messages": [AIMessage(content="echo " + state["messages"][-1].content)]})
+    builder.add_edge(START, "echo")
+    builder.add_edge("echo", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _turn(graph, thread_id: str, text: str):
+    return graph.invoke({"messages": [HumanMessage(content=text)]}, _config(thread_id))
+
+
+def test_second_instance_resumes_thread(tmp_path):
+    path = tmp_path / "checkpoints.sqlite"
+    first = _echo_graph(SQLiteSaver(path))
+    _turn(first, "t1", "eins")
+    _turn(first, "t1", "zwei")
+
+    # A different connection (as another worker process would have) continues the thread
+    second = _echo_graph(SQLiteSaver(path))
+    result = _turn(second, "t1", "drei")
+
+    assert [m.content for m in result["messages"]] == [
+        "eins", "echo eins", "zwei", "echo zwei", "drei", "echo drei"
+    ]
+    assert first.get_state(_config("t1")).values == second.get_state(_config("t1")).values
+
+
+def test_async_graph_uses_async_methods(tmp_path):
+    graph = _echo_graph(SQLiteSaver(tmp_path / "checkpoints.sqlite"))
+
+    async def run():
+        await asyncio.gather(*(
+            graph.ainvoke({"messages": [HumanMessage(content=f"hallo {i}")]}, _config(f"t{i}"))
+            for i in range(10)
+        ))
+
+    asyncio.run(run())
+
+    for i in range(10):
+        assert graph.get_state(_config(f"t{i}")).values["messages"][-1].content == f"echo hallo {i}"
+
+
+def test_pending_writes_are_committed_per_call(tmp_path):
+    path = tmp_path / "checkpoints.sqlite"
+    saver = SQLiteSaver(path)
+    config = {"configurable": {"thread_id": "t1", "checkpoint_ns": "", "checkpoint_id": "1"}}
+
+    # Visible to other connections without a following put() or read
+    saver.put_writes(config, [("messages", "a"), ("other", "b")], task_id="task")
+    count = lambda: sqlite3.connect(path).execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+    assert count() == 2
+
+    saver.put_writes(config, [("messages", "c")], task_id="task")
+    assert count() == 2
+
+
+def test_retention_prunes_checkpoints_and_blobs(tmp_path):
+    path = tmp_path / "checkpoints.sqlite"
+    saver = SQLiteSaver(path, max_checkpoints_per_thread=2)
+    graph = _echo_graph(saver)
+    for i in range(10):
+        _turn(graph, "t1", f"nachricht {i}")
+
+    db = sqlite3.connect(path)
+    assert db.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0] == 2
+    assert db.execute("SELECT COUNT(*) FROM blobs WHERE channel = 'messages'").fetchone()[0] <= 2
+    assert len(graph.get_state(_config("t1")).values["messages"]) == 20
+
+
+def test_delete_thread(tmp_path):
+    saver = SQLiteSaver(tmp_path / "checkpoints.sqlite")
+    graph = _echo_graph(saver)
+    _turn(graph, "a", "hallo")
+    _turn(graph, "b", "hallo")
+
+    saver.delete_thread("a")
+
+    assert set(saver.get_thread_bytes()) == {"b"}
+    assert graph.get_state(_config("a")).values == {}
+    assert saver.get_stats()["threads"] == 1
+
+
+def test_conversation_metadata_shared_between_services(tmp_path, monkeypatch):
+    settings = Settings(
+        use_s3_prompts=False,
+        checkpoint_backend="sqlite",
+        checkpoint_sqlite_path=str(tmp_path / "checkpoints.sqlite"),
+    )
+
+    def make_service():
+        service = ConversationService(llm_model="unused", settings=settings, llm=SlowFakeChatModel(delay=0))
+        monkeypatch.setattr(service, "_run_background_analysis", lambda *args, **kwargs: None)
+        return service
+
+    async def send(service, thread_id, text):
+        return [chunk async for chunk in service.send_message_stream(thread_id, text)]
+
+    first = make_service()
+    conversation = first.create_conversation(child_id="2", story_id="s", chapter_id="c", num_planned_tasks=3)
+    asyncio.run(send(first, conversation.thread_id, "Hallo"))
+
+    second = make_service()
+    restored = second.get_conversation(conversation.thread_id)
+    assert restored.to_dict() == conversation.to_dict()
+    asyncio.run(send(second, conversation.thread_id, "Noch einmal"))
+    assert len(first.get_conversation_history(conversation.thread_id)["messages"]) == 4
+
+    assert second.delete_conversation(conversation.thread_id)
+    first._conversations.clear()
+    assert first.get_conversation(conversation.thread_id) is None
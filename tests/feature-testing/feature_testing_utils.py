@@ -678,8 +678,9 @@ def run_background_analysis(
     node order, and LLM bindings are always in sync with the real implementation
     — no manual duplication of the DAG here.
 
-    The background workers call ``get_messages_history_from_immediate_graph_state``
-    to fetch the conversation from the immediate graph's LangGraph checkpoint.
+    The background graph's ``loadTranscript`` node calls
+    ``get_messages_history_from_immediate_graph_state`` to fetch the conversation
+    from the immediate graph's LangGraph checkpoint.
     In the test context there is no LangGraph runtime, so we monkey-patch that
     helper to return our in-memory message list instead.
 
@@ -710,6 +711,8 @@ def run_background_analysis(
     """
     from langgraph.checkpoint.memory import MemorySaver
     from background_graph import create_background_analysis_graph
+    from ft_config import BACKGROUND_GRAPH_MODE
+    from transcript_cache import get_transcript_cache
     import nodes as _nodes_module
 
     # Build child_profile in the same format used by data_loaders.py.
@@ -746,8 +749,11 @@ def run_background_analysis(
     # Each test run gets its own in-memory checkpointer so state never leaks
     # between invocations.
     _memory = MemorySaver()
-    _graph = create_background_analysis_graph(background_llm_instance, _memory)
+    _graph = create_background_analysis_graph(background_llm_instance, _memory, mode=BACKGROUND_GRAPH_MODE)
     _config = {"configurable": {"thread_id": "fixture_bg_thread"}}
+    # Fixture messages may have no ids, so never extend a transcript left over
+    # from a previous scenario on the same thread.
+    get_transcript_cache().discard("fixture_bg")
 
     try:
         _graph.invoke(initial_input, _config)
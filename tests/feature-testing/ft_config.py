@@ -50,6 +50,15 @@ JUDGE_LANGSMITH_TRACING: bool = _os.environ.get("JUDGE_LANGSMITH_TRACING", "fals
 Defaults to false to avoid polluting traces with evaluation calls.
 Set JUDGE_LANGSMITH_TRACING=true to enable."""
 
+# ---------------------------------------------------------------------------
+# Background graph
+# ---------------------------------------------------------------------------
+
+BACKGROUND_GRAPH_MODE: str = _os.environ.get("BACKGROUND_GRAPH_MODE", "workers")
+"""Background graph mode used by run_background_analysis: "workers" (one LLM
+call per worker) or "fused" (two structured-output calls).
+scripts/ab_background_mode.py sets it to compare the pass rates of both modes."""
+
 # ---------------------------------------------------------------------------
 # Strategy B (fully-simulated) defaults
 # ---------------------------------------------------------------------------